@@ -2,16 +2,20 @@ import asyncio
 import importlib
 import json
 import os
+import platform
 import subprocess
 import sys
 import tempfile
-import venv
 import uuid
 from pathlib import Path
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Any, List
 from core.logger import logger
 from core.gui.handler import GUIHandler
+from core.action.action_framework.action_cache import action_cache
+from core.action.action_framework.requirements import PENDING, get_requirement_resolver
+from core.action.venv_pool import get_venv_pool
+from core.config import ACTION_REQUIREMENTS_WAIT_TIMEOUT
 
 # ============================================
 # Global process pool (shared safely)
@@ -204,9 +208,13 @@ def _atomic_action_venv_process(
     requirements: List[str] = None,
 ) -> dict:
     """
-    Executes an action inside an ephemeral virtual environment.
+    Executes an action inside a pooled virtual environment.
     Runs in a SEPARATE PROCESS via ProcessPoolExecutor.
 
+    The venv is leased from the warm pool keyed by the requirement set, so
+    it is only built (and its requirements installed) the first time that
+    set is seen. The action script itself lives in a per-run temp directory.
+
     stdout/stderr are suppressed at the OS level so that venv creation
     and other subprocess calls do not corrupt the parent's TUI.
     """
@@ -219,42 +227,10 @@ def _atomic_action_venv_process(
 
     # Sandboxed mode - NOT in a Docker container
     try:
-        with tempfile.TemporaryDirectory(prefix="action_venv_") as tmpdir:
+        with get_venv_pool().acquire(requirements) as lease, \
+                tempfile.TemporaryDirectory(prefix="action_venv_") as tmpdir:
             tmp = Path(tmpdir)
-
-            # ─── Create virtual environment ───
-            venv_dir = tmp / "venv"
-            venv.EnvBuilder(with_pip=True).create(venv_dir)
-
-            python_bin = (
-                venv_dir / "Scripts" / "python.exe"
-                if os.name == "nt"
-                else venv_dir / "bin" / "python"
-            )
-
-            # ─── Install requirements in the venv ───
-            # Installation failures are logged but don't block execution.
-            # If a package is truly needed, the action will fail with an import error.
-            if requirements:
-                for pkg in requirements:
-                    try:
-                        pip_result = subprocess.run(
-                            [str(python_bin), "-m", "pip", "install", "--quiet", pkg],
-                            capture_output=True,
-                            text=True,
-                            timeout=120
-                        )
-                        if pip_result.returncode != 0:
-                            stderr_lower = pip_result.stderr.lower()
-                            if "no matching distribution" in stderr_lower or "could not find" in stderr_lower:
-                                pass  # Not a real package, skip silently
-                            else:
-                                # Log but continue - action will fail with import error if truly needed
-                                print(f"Warning: Could not install '{pkg}': {pip_result.stderr.strip()[:100]}", file=sys.stderr)
-                    except subprocess.TimeoutExpired:
-                        print(f"Warning: Installation timed out for '{pkg}'", file=sys.stderr)
-                    except Exception as e:
-                        print(f"Warning: Error installing '{pkg}': {e}", file=sys.stderr)
+            python_bin = lease.python_bin
 
             # ─── Write action script ───
             # We inject input_data as a global so the action code can access it
@@ -305,6 +281,7 @@ except Exception as e:
                 capture_output=True,
                 text=True,
                 timeout=timeout,
+                cwd=tmpdir,
             )
 
             return {
@@ -413,7 +390,9 @@ def _atomic_action_internal(
 ) -> dict:
     """
     Executes an internal action in-process.
-    Requirements are pre-installed at startup via install_all_action_requirements().
+    Requirements are resolved beforehand (see ActionExecutor.execute_atomic_action).
+    The action code is compiled once per (name, platform, source hash) and
+    the cached code object is executed into a fresh namespace on each call.
     """
     try:
         # Execute the function definition
@@ -431,7 +410,8 @@ def _atomic_action_internal(
             }
             pre_exec_keys = set(local_ns.keys())
 
-            exec(action_code, local_ns, local_ns)
+            compiled = action_cache.get_code(action_name, platform.system().lower(), action_code)
+            exec(compiled, local_ns, local_ns)
 
             function_to_call = None
             for key, value in local_ns.items():
@@ -473,13 +453,31 @@ class ActionExecutor:
 
         frozen = getattr(sys, "frozen", False)
 
-        # Pre-install declared pip requirements
+        # Make sure declared pip requirements are installed, without blocking the loop
         requirements = getattr(action, "requirements", [])
         if requirements and execution_mode == "internal":
-            _ensure_requirements(requirements)
+            loop = asyncio.get_running_loop()
+            if frozen:
+                # The bundled exe cannot pip install; use the system Python
+                await loop.run_in_executor(None, _ensure_requirements, requirements)
+            else:
+                # Jumps the resolver queue if the action is still pending
+                readiness = await loop.run_in_executor(
+                    None,
+                    get_requirement_resolver().wait_until_ready,
+                    action.name,
+                    ACTION_REQUIREMENTS_WAIT_TIMEOUT,
+                )
+                if readiness == PENDING:
+                    return {
+                        "status": "error",
+                        "message": (
+                            f"Action '{action.name}' is unavailable: its requirements are still being "
+                            f"installed after {ACTION_REQUIREMENTS_WAIT_TIMEOUT:g}s. Try another action or retry later."
+                        ),
+                    }
 
         if execution_mode == "internal":
-            # Requirements are pre-installed at startup, no need to pass them
             loop = asyncio.get_running_loop()
             try:
                 result = await asyncio.wait_for(
@@ -497,7 +495,7 @@ class ActionExecutor:
                 return {"status": "error", "message": f"Execution timed out after {effective_timeout}s while running internal action."}
 
         elif execution_mode == "sandboxed":
-            # Sandboxed mode needs requirements since it creates a fresh venv each time
+            # Sandboxed mode needs requirements to pick (or build) its pooled venv
             requirements = getattr(action, "requirements", [])
             loop = asyncio.get_running_loop()
             try:
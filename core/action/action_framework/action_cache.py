@@ -0,0 +1,156 @@
+# core/action/action_framework/action_cache.py
+"""
+Compiled artifact cache for registered actions.
+
+Three artifacts are cached so the hot action loop does not re-parse or
+re-compile anything:
+
+1. Stripped source per handler (``inspect.getsource`` + ``textwrap.dedent`` +
+   ``_strip_decorator``), keyed by the handler's code location and stamped
+   with the source file's mtime.
+2. The serialized JSON view built by ``ActionRegistry._get_action_as_json``,
+   keyed by action name and platform and stamped with a fingerprint of the
+   registered implementations and their files.
+3. Compiled code objects for action code strings, keyed by action name,
+   platform and a hash of the source.
+
+Editing an action file changes its mtime, which invalidates (1) and (2); the
+new source then hashes differently, so (3) compiles it afresh.
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from types import CodeType
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger("ActionCache")
+
+# Upper bound on compiled code objects kept around. Stale entries (old source
+# hashes) fall out of the LRU naturally.
+MAX_COMPILED_ENTRIES = 512
+
+
+def _file_stamp(path: Optional[str]) -> Optional[int]:
+    """Return the mtime (ns) of ``path`` or ``None`` when it cannot be stat'ed."""
+    if not path:
+        return None
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def handler_stamp(handler: Callable) -> Tuple[Optional[str], Optional[int]]:
+    """Identify the source file of ``handler`` and its current mtime."""
+    code = getattr(handler, "__code__", None)
+    filename = code.co_filename if code is not None else None
+    return filename, _file_stamp(filename)
+
+
+def source_hash(code: str) -> str:
+    """Stable content hash used to key compiled action code."""
+    return hashlib.sha1(code.encode("utf-8")).hexdigest()
+
+
+class ActionArtifactCache:
+    """Thread-safe cache of per-action source, JSON and compiled artifacts."""
+
+    def __init__(self, max_compiled: int = MAX_COMPILED_ENTRIES):
+        self._lock = threading.Lock()
+        self._sources: Dict[Hashable, Tuple[Optional[int], str]] = {}
+        self._json: Dict[Tuple[str, str], Tuple[Hashable, Dict[str, Any]]] = {}
+        self._compiled: "OrderedDict[Tuple[str, str, str], CodeType]" = OrderedDict()
+        self._max_compiled = max_compiled
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Stripped source
+    # ------------------------------------------------------------------
+    def get_source(self, handler: Callable, build: Callable[[], str]) -> str:
+        """
+        Return the stripped source for ``handler``, calling ``build`` on a miss.
+
+        The entry is rebuilt whenever the handler's file mtime changes.
+        """
+        code = getattr(handler, "__code__", None)
+        key = (code.co_filename, code.co_firstlineno, handler.__qualname__) if code else id(handler)
+        _, stamp = handler_stamp(handler)
+
+        with self._lock:
+            cached = self._sources.get(key)
+            if cached is not None and cached[0] == stamp:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        source = build()
+        with self._lock:
+            self._sources[key] = (stamp, source)
+        return source
+
+    # ------------------------------------------------------------------
+    # JSON view
+    # ------------------------------------------------------------------
+    def get_json(self, name: str, platform: str, fingerprint: Hashable) -> Optional[Dict[str, Any]]:
+        """Return a shallow copy of the cached JSON view when ``fingerprint`` matches."""
+        with self._lock:
+            cached = self._json.get((name, platform))
+            if cached is None or cached[0] != fingerprint:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(cached[1])
+
+    def put_json(self, name: str, platform: str, fingerprint: Hashable, action_json: Dict[str, Any]) -> None:
+        with self._lock:
+            self._json[(name, platform)] = (fingerprint, dict(action_json))
+
+    # ------------------------------------------------------------------
+    # Compiled code
+    # ------------------------------------------------------------------
+    def get_code(self, name: str, platform: str, code: str) -> CodeType:
+        """
+        Return a compiled code object for ``code``, compiling it on a miss.
+
+        Raises:
+            SyntaxError: If ``code`` does not compile.
+        """
+        key = (name, platform, source_hash(code))
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        compiled = compile(code, f"<action:{name}>", "exec")
+        with self._lock:
+            self._compiled[key] = compiled
+            while len(self._compiled) > self._max_compiled:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop cached JSON views and compiled code for ``name`` (or everything)."""
+        with self._lock:
+            if name is None:
+                self._sources.clear()
+                self._json.clear()
+                self._compiled.clear()
+                return
+            for key in [k for k in self._json if k[0] == name]:
+                del self._json[key]
+            for key in [k for k in self._compiled if k[0] == name]:
+                del self._compiled[key]
+        logger.debug(f"Invalidated cached artifacts for action '{name}'")
+
+
+# Global singleton shared by the registry and the action executor
+action_cache = ActionArtifactCache()
@@ -2,11 +2,18 @@
 import os
 import importlib.util
 import sys
-from typing import List
+from typing import Any, Dict, List, Optional
 import logging
 from pathlib import Path
 
-from core.action.action_framework.registry import install_all_action_requirements
+from core.action.action_framework.manifest import DEFAULT_MANIFEST_NAME, ActionManifest
+from core.action.action_framework.registry import (
+    LazyActionHandler,
+    RegisteredAction,
+    install_all_action_requirements,
+    make_action_metadata,
+    registry_instance,
+)
 
 logger = logging.getLogger("ActionLoader")
 
@@ -17,10 +24,49 @@ DEFAULT_ACTION_PATHS = [
     # os.path.join('agents'), 
 ]
 
-def load_actions_from_directories(base_dir: str = None, paths_to_scan: List[str] = None):
+def import_action_module(module_name: str, file_path: str):
+    """Import an action file under ``module_name``; its @action decorators register it."""
+    # 1. Create a module spec from the file location
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if not spec or not spec.loader:
+        raise ImportError(f"Cannot load action module from {file_path}")
+    # 2. Create the module from the spec
+    module = importlib.util.module_from_spec(spec)
+    # 3. Add to sys.modules so imports inside that script work normally
+    sys.modules[module_name] = module
+    try:
+        # 4. Execute the module body. This triggers the @action decorators.
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(module_name, None)
+        raise
+    return module
+
+
+def _register_from_manifest(module_name: str, file_path: str, entries: List[Dict[str, Any]]) -> None:
+    """Register a file's actions from its manifest entries without importing it."""
+    for entry in entries:
+        metadata = make_action_metadata(*entry["args"], **entry["kwargs"])
+        handler = LazyActionHandler(module_name, file_path, entry["function"], entry["source"])
+        registry_instance.register(RegisteredAction(handler=handler, metadata=metadata))
+
+
+def load_actions_from_directories(
+    base_dir: str = None,
+    paths_to_scan: List[str] = None,
+    lazy: bool = True,
+    manifest_path: Optional[str] = None,
+):
     """
-    Walks through specified directories, finds .py files, and dynamically imports them.
-    Importing them triggers the @action decorator, registering them in the registry.
+    Walks through specified directories and registers the actions in their .py files.
+
+    With ``lazy`` (the default) actions are registered from the static action
+    manifest (see :mod:`core.action.action_framework.manifest`) and a module is
+    only imported the first time its handler is called. Files the manifest
+    cannot describe, and every file when ``lazy`` is False, are imported
+    eagerly, which triggers their @action decorators.
+
+    ``manifest_path`` defaults to ``<base_dir>/.action_manifest.json``.
     """
     if base_dir is None:
         if getattr(sys, 'frozen', False):
@@ -35,8 +81,13 @@ def load_actions_from_directories(base_dir: str = None, paths_to_scan: List[str]
         paths_to_scan += DEFAULT_ACTION_PATHS
         
     logger.info(f"--- Starting Action Discovery from base: {base_dir} ---")
-    
+
+    manifest = None
+    if lazy:
+        manifest = ActionManifest(manifest_path or os.path.join(base_dir, DEFAULT_MANIFEST_NAME), base_dir)
+
     count = 0
+    deferred = 0
     processed_files = set()
 
     for relative_path in paths_to_scan:
@@ -73,23 +124,29 @@ def load_actions_from_directories(base_dir: str = None, paths_to_scan: List[str]
                     module_name_safe = rel_path_from_base.replace(os.path.sep, "_").replace(".", "_").replace("-", "_")
 
                     try:
+                        entries = manifest.actions_for(file_path) if manifest else None
+                        if entries is not None:
+                            logger.debug(f"Registering action file from manifest: {rel_path_from_base}")
+                            _register_from_manifest(module_name_safe, file_path, entries)
+                            deferred += 1
+                            continue
+
                         logger.debug(f"Loading action file: {rel_path_from_base}")
                         # --- Dynamic Import Magic ---
-                        # 1. Create a module spec from the file location
-                        spec = importlib.util.spec_from_file_location(module_name_safe, file_path)
-                        if spec and spec.loader:
-                            # 2. Create the module from the spec
-                            module = importlib.util.module_from_spec(spec)
-                            # 3. Add to sys.modules so imports inside that script work normally
-                            sys.modules[module_name_safe] = module
-                            # 4. Execute the module body. This triggers the @action decorators.
-                            spec.loader.exec_module(module)
-                            count += 1
+                        import_action_module(module_name_safe, file_path)
+                        count += 1
                     except Exception as e:
                         # Catch errors so one bad action file doesn't crash the whole startup
                          logger.error(f"Failed to load action script {file_path}: {e}", exc_info=True)
 
-    logger.info(f"--- Action Discovery Complete. Processed {count} files. ---")
+    if manifest is not None:
+        manifest.save()
+        logger.info(
+            f"--- Action Discovery Complete. Imported {count} files, registered {deferred} from the "
+            f"manifest ({manifest.extracted} re-read). ---"
+        )
+    else:
+        logger.info(f"--- Action Discovery Complete. Processed {count} files. ---")
 
     # Install all requirements from registered actions
     install_all_action_requirements()
\ No newline at end of file
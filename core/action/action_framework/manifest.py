@@ -0,0 +1,240 @@
+# core/action/action_framework/manifest.py
+"""
+Static action manifest.
+
+Every ``@action(...)`` in an action file is read with ``ast`` instead of by
+importing the file: the decorator arguments (literals, or module-level
+constants holding literals) and the decorator-free source of the function.
+That is everything the registry needs to list, search and execute an
+action, so the loader can register actions without running their modules.
+
+The manifest is a JSON file keyed by action file path and stamped with
+each file's mtime and size; stale or missing entries are re-extracted on
+load and written back. A file is marked non-static (``"actions": null``)
+and imported as before when any of its decorators cannot be read this way,
+e.g. computed arguments, async handlers or decorators below module level.
+
+Regenerate it explicitly with:
+    python -m core.action.action_framework.manifest [manifest_path] [action_dir ...]
+"""
+import argparse
+import ast
+import json
+import logging
+import os
+import textwrap
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("ActionManifest")
+
+MANIFEST_VERSION = 1
+DEFAULT_MANIFEST_NAME = ".action_manifest.json"
+
+
+class _NotStatic(Exception):
+    """Raised when a decorator argument cannot be evaluated without running the module."""
+
+
+def _static_value(node: ast.AST, constants: Dict[str, Any]) -> Any:
+    """Evaluate a literal expression, resolving names against module-level constants."""
+    if isinstance(node, ast.Name):
+        if node.id in constants:
+            return constants[node.id]
+        raise _NotStatic(node.id)
+    if isinstance(node, ast.Dict):
+        if any(key is None for key in node.keys):  # {**other}
+            raise _NotStatic("dict unpacking")
+        return {
+            _static_value(key, constants): _static_value(value, constants)
+            for key, value in zip(node.keys, node.values)
+        }
+    if isinstance(node, ast.List):
+        return [_static_value(element, constants) for element in node.elts]
+    if isinstance(node, ast.Tuple):
+        return tuple(_static_value(element, constants) for element in node.elts)
+    try:
+        return ast.literal_eval(node)
+    except ValueError as exc:
+        raise _NotStatic(ast.dump(node)) from exc
+
+
+def _is_action_decorator(node: ast.AST) -> bool:
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    return (isinstance(func, ast.Name) and func.id == "action") or (
+        isinstance(func, ast.Attribute) and func.attr == "action"
+    )
+
+
+def extract_actions(source: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Read the actions defined in ``source`` without executing it.
+
+    Returns:
+        One ``{"function", "args", "kwargs", "source"}`` dict per decorated
+        function, or ``None`` when the file has to be imported instead
+        (including files with no ``@action`` at all).
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+
+    constants: Dict[str, Any] = {}
+    actions: List[Dict[str, Any]] = []
+    top_level = set()
+    # linecache (behind inspect.getsource) terminates the last line too
+    lines = [line if line.endswith("\n") else line + "\n" for line in source.splitlines(keepends=True)]
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                constants[node.targets[0].id] = _static_value(node.value, constants)
+            except _NotStatic:
+                constants.pop(node.targets[0].id, None)
+            continue
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        decorators = [d for d in node.decorator_list if _is_action_decorator(d)]
+        if not decorators:
+            continue
+        # The executor runs the bare function source, so only plain
+        # functions with the action decorator alone can be described statically.
+        if isinstance(node, ast.AsyncFunctionDef) or len(node.decorator_list) != 1:
+            return None
+        decorator = decorators[0]
+        try:
+            args = [_static_value(arg, constants) for arg in decorator.args]
+            kwargs = {kw.arg: _static_value(kw.value, constants) for kw in decorator.keywords if kw.arg}
+        except _NotStatic:
+            return None
+        if any(kw.arg is None for kw in decorator.keywords):  # @action(**options)
+            return None
+        top_level.add(id(node))
+        actions.append({
+            "function": node.name,
+            "args": args,
+            "kwargs": kwargs,
+            # Same text the registry gets from inspect.getsource() + _strip_decorator()
+            "source": textwrap.dedent("".join(lines[node.lineno - 1:node.end_lineno])),
+        })
+
+    # An action decorated anywhere else (inside an `if`, a class, ...) is only
+    # registered when the module body runs.
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and id(node) not in top_level:
+            if any(_is_action_decorator(d) for d in node.decorator_list):
+                return None
+    # Files without decorators may register actions some other way
+    return actions or None
+
+
+def _file_stamp(path: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class ActionManifest:
+    """Statically extracted actions per file, persisted as JSON."""
+
+    def __init__(self, path: Optional[str | Path], base_dir: str | Path):
+        self.path = Path(path) if path else None
+        self.base_dir = Path(base_dir)
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._seen: set = set()
+        self._dirty = False
+        self.extracted = 0
+        self._load()
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Ignoring unreadable action manifest {self.path}: {exc}")
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self._files = data.get("files", {})
+
+    def _key(self, file_path: str) -> str:
+        try:
+            return Path(os.path.relpath(file_path, self.base_dir)).as_posix()
+        except ValueError:  # different drive on Windows
+            return Path(file_path).as_posix()
+
+    def actions_for(self, file_path: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the manifest entries for ``file_path``, re-extracting them if the file changed.
+
+        ``None`` means the file must be imported.
+        """
+        key = self._key(file_path)
+        self._seen.add(key)
+        stamp = _file_stamp(file_path)
+        entry = self._files.get(key)
+        if entry is not None and entry.get("stamp") == stamp:
+            return entry.get("actions")
+
+        try:
+            source = Path(file_path).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+        actions = extract_actions(source)
+        self._files[key] = {"stamp": stamp, "actions": actions}
+        self._dirty = True
+        self.extracted += 1
+        return actions
+
+    def save(self, prune: bool = True) -> None:
+        """Write the manifest back if anything changed, dropping files not seen this run."""
+        if prune:
+            for key in [key for key in self._files if key not in self._seen]:
+                del self._files[key]
+                self._dirty = True
+        if self.path is None or not self._dirty:
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            tmp_path.write_text(
+                json.dumps({"version": MANIFEST_VERSION, "files": self._files}, indent=1),
+                encoding="utf-8",
+            )
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as exc:
+            logger.warning(f"Could not write action manifest {self.path}: {exc}")
+
+
+def main() -> None:
+    from core.action.action_framework.loader import DEFAULT_ACTION_PATHS
+
+    parser = argparse.ArgumentParser(description="Build the static action manifest.")
+    parser.add_argument("manifest", nargs="?", default=DEFAULT_MANIFEST_NAME, help="Manifest file to write")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_ACTION_PATHS, help="Action directories to scan")
+    args = parser.parse_args()
+
+    if os.path.exists(args.manifest):
+        os.remove(args.manifest)
+    manifest = ActionManifest(args.manifest, os.getcwd())
+    static = dynamic = 0
+    for directory in args.paths:
+        for root, _, files in os.walk(directory):
+            for file in sorted(files):
+                if file.endswith(".py") and not file.startswith("__"):
+                    actions = manifest.actions_for(os.path.join(root, file))
+                    if actions is None:
+                        dynamic += 1
+                    else:
+                        static += len(actions)
+    manifest.save()
+    print(f"Wrote {args.manifest}: {static} actions read statically, {dynamic} files to import")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 # core/action/action_framework/registry.py
 import functools
 import platform as platform_lib
+import sys
 from typing import List, Dict, Any, Optional, Callable, Union
 from dataclasses import dataclass, field
 import logging
@@ -8,6 +9,8 @@ import inspect
 import textwrap
 import ast
 
+from core.action.action_framework.action_cache import action_cache, handler_stamp
+
 # Setup basic logging
 logger = logging.getLogger("ActionRegistry")
 # logger.setLevel(logging.INFO)
@@ -89,6 +92,44 @@ class ActionMetadata:
         """
         return self.name.replace('_', ' ').capitalize()
 
+class LazyActionHandler:
+    """
+    Stands in for an action function whose module has not been imported.
+
+    Built by the loader from the action manifest, it carries the function's
+    decorator-free source so the action can be listed and executed (the
+    executor runs the source string) without importing the module. Calling
+    it imports the module once and forwards to the real function.
+    """
+
+    def __init__(self, module_name: str, file_path: str, func_name: str, source: str):
+        self.module_name = module_name
+        self.file_path = file_path
+        self.source = source
+        self.__name__ = func_name
+        self.__qualname__ = func_name
+        self.__module__ = module_name
+
+    def resolve(self) -> Callable[..., Dict[str, Any]]:
+        """Import the defining module (once) and return the real function."""
+        module = sys.modules.get(self.module_name)
+        if module is None:
+            from core.action.action_framework.loader import import_action_module
+
+            module = import_action_module(self.module_name, self.file_path)
+        return getattr(module, self.__name__)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<LazyActionHandler {self.module_name}.{self.__name__}>"
+
+
+def _handler_origin(handler: Callable) -> tuple:
+    return getattr(handler, "__module__", None), getattr(handler, "__qualname__", None)
+
+
 @dataclass
 class RegisteredAction:
     """Combines the actual Python callable with its metadata."""
@@ -108,6 +149,8 @@ class ActionRegistry:
     #   } 
     # }
     _registry: Dict[str, Dict[str, RegisteredAction]] = {}
+    # Bumped on every registration so derived indexes know when to rebuild
+    _generation: int = 0
 
     def __new__(cls):
         # Ensure singleton pattern
@@ -125,12 +168,22 @@ class ActionRegistry:
         for platform in action_def.metadata.platforms:
             platform_key = platform.lower()
             
-            if platform_key in self._registry[name]:
+            existing = self._registry[name].get(platform_key)
+            # Importing a lazily registered module replaces its placeholders quietly
+            if existing is not None and _handler_origin(existing.handler) != _handler_origin(action_def.handler):
                  logger.warning(f"Overwriting existing action implementation for '{name}' on platform '{platform_key}'")
             
             self._registry[name][platform_key] = action_def
             logger.debug(f"Registered '{name}' for platform: '{platform_key}'")
 
+        ActionRegistry._generation += 1
+        action_cache.invalidate(name)
+
+    @property
+    def generation(self) -> int:
+        """Changes whenever an action is (re)registered."""
+        return ActionRegistry._generation
+
     def get_action_implementation(self, name: str, target_platform: Optional[str] = None) -> Optional[RegisteredAction]:
         """
         Retrieves the best fit action implementation.
@@ -216,8 +269,41 @@ class ActionRegistry:
 
         return self._get_action_as_json(platform_impls=platform_impls)
 
+    @staticmethod
+    def _handler_source(handler: Callable) -> str:
+        """Return the decorator-free source of ``handler`` (cached per file mtime)."""
+        # Check for stored source code first (used by MCP handlers which are dynamically created)
+        if hasattr(handler, '_mcp_source_code'):
+            return handler._mcp_source_code
+        # Lazily registered actions carry the source extracted from the manifest
+        if isinstance(handler, LazyActionHandler):
+            return handler.source
+        # getsource returns the raw code, including indentation; dedent removes
+        # leading common whitespace and the decorator is stripped afterwards.
+        return action_cache.get_source(
+            handler,
+            lambda: _strip_decorator(textwrap.dedent(inspect.getsource(handler))),
+        )
+
     def _get_action_as_json(self, platform_impls) -> Dict[str, Any]:
-        main_impl = platform_impls.get(platform_lib.system().lower())
+        current_os = platform_lib.system().lower()
+        # Fingerprint the implementations and their source files so the cached
+        # view is rebuilt when an action is re-registered or its file is edited.
+        fingerprint = tuple(
+            (platform_key, id(impl.handler), handler_stamp(impl.handler))
+            for platform_key, impl in platform_impls.items()
+        )
+        logical_name = next(iter(platform_impls.values())).metadata.name
+        cached = action_cache.get_json(logical_name, current_os, fingerprint)
+        if cached is not None:
+            return cached
+
+        action_json = self._build_action_json(platform_impls, current_os)
+        action_cache.put_json(logical_name, current_os, fingerprint, action_json)
+        return action_json
+
+    def _build_action_json(self, platform_impls, current_os: str) -> Dict[str, Any]:
+        main_impl = platform_impls.get(current_os)
         if not main_impl:
             main_impl = platform_impls.get(PLATFORM_ALL)
         if not main_impl:
@@ -227,20 +313,11 @@ class ActionRegistry:
         logical_name = meta.name
 
         # 1. Extract source code for the main implementation
-        # Check for stored source code first (used by MCP handlers which are dynamically created)
-        if hasattr(main_impl.handler, '_mcp_source_code'):
-            main_code_str = main_impl.handler._mcp_source_code
-        else:
-            try:
-                # getsource returns the raw code, including indentation
-                raw_code = inspect.getsource(main_impl.handler)
-                # dedent removes leading common whitespace to make it clean
-                dedented_code = textwrap.dedent(raw_code)
-                # Strip decorator from the code
-                main_code_str = _strip_decorator(dedented_code)
-            except Exception as e:
-                logger.error(f"Could not extract source for action '{logical_name}': {e}")
-                main_code_str = f"# Error extracting source code: {e}"
+        try:
+            main_code_str = self._handler_source(main_impl.handler)
+        except Exception as e:
+            logger.error(f"Could not extract source for action '{logical_name}': {e}")
+            main_code_str = f"# Error extracting source code: {e}"
 
 
         # 2. Build the base JSON structure with required hardcoded fields
@@ -270,18 +347,11 @@ class ActionRegistry:
             if impl == main_impl:
                 continue
 
-            # Check for stored source code first (used by MCP handlers)
-            if hasattr(impl.handler, '_mcp_source_code'):
-                override_code_str = impl.handler._mcp_source_code
-            else:
-                try:
-                    override_raw = inspect.getsource(impl.handler)
-                    override_dedented = textwrap.dedent(override_raw)
-                    # Strip decorator from the override code
-                    override_code_str = _strip_decorator(override_dedented)
-                except Exception as e:
-                    logger.warning(f"Could not extract override source for {logical_name} on {platform_key}: {e}")
-                    continue
+            try:
+                override_code_str = self._handler_source(impl.handler)
+            except Exception as e:
+                logger.warning(f"Could not extract override source for {logical_name} on {platform_key}: {e}")
+                continue
 
             action_json["platform_overrides"][platform_key] = {
                 "code": override_code_str
@@ -299,80 +369,62 @@ registry_instance = ActionRegistry()
 
 def install_all_action_requirements():
     """
-    Collect all unique requirements from registered actions and install them.
+    Hand the requirements of all registered actions to the requirement resolver.
     Should be called once after all actions are loaded.
-    """
-    import subprocess
-    import sys
-    from importlib.metadata import distribution, PackageNotFoundError
-
-    # Collect all unique requirements from all registered actions
-    all_requirements: set = set()
-    for logical_name, platform_impls in registry_instance._registry.items():
-        for platform_key, registered_action in platform_impls.items():
-            if registered_action.metadata.requirements:
-                all_requirements.update(registered_action.metadata.requirements)
-
-    if not all_requirements:
-        logger.info("No action requirements to install.")
-        return
-
-    logger.info(f"Checking {len(all_requirements)} unique requirements from registered actions...")
-
-    # Check which packages need to be installed
-    packages_to_install = []
-    for pkg in all_requirements:
-        try:
-            distribution(pkg)
-            logger.debug(f"Package '{pkg}' is already installed.")
-        except PackageNotFoundError:
-            packages_to_install.append(pkg)
 
-    if not packages_to_install:
-        logger.info("All action requirements are already satisfied.")
-        return
-
-    logger.info(f"Installing {len(packages_to_install)} missing packages: {packages_to_install}")
+    Depending on ``ACTION_REQUIREMENTS_MODE`` the missing packages are
+    installed in the background (default), on first use, or before returning.
+    """
+    from core.action.action_framework.requirements import get_requirement_resolver
 
-    # Install all missing packages in one pip call for efficiency
-    try:
-        result = subprocess.run(
-            [sys.executable, "-m", "pip", "install", "--quiet"] + packages_to_install,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout for all packages
-        )
-        if result.returncode == 0:
-            logger.info(f"Successfully installed packages: {packages_to_install}")
-        else:
-            # Some packages may have failed - try installing individually to identify which
-            logger.warning(f"Batch install had issues, trying individual installs...")
-            for pkg in packages_to_install:
-                try:
-                    pkg_result = subprocess.run(
-                        [sys.executable, "-m", "pip", "install", "--quiet", pkg],
-                        capture_output=True,
-                        text=True,
-                        timeout=120
-                    )
-                    if pkg_result.returncode == 0:
-                        logger.info(f"Installed: {pkg}")
-                    else:
-                        stderr_lower = pkg_result.stderr.lower()
-                        if "no matching distribution" in stderr_lower or "could not find" in stderr_lower:
-                            logger.debug(f"Package '{pkg}' not found on PyPI (may be a class/module name)")
-                        else:
-                            logger.warning(f"Could not install '{pkg}': {pkg_result.stderr.strip()[:100]}")
-                except Exception as e:
-                    logger.warning(f"Error installing '{pkg}': {e}")
-    except subprocess.TimeoutExpired:
-        logger.error("Package installation timed out")
-    except Exception as e:
-        logger.error(f"Error during package installation: {e}")
+    get_requirement_resolver().start()
 
 # ==========================================
 # The Decorator Implementation
 # ==========================================
+def make_action_metadata(
+    name: str,
+    description: str = "",
+    mode: str = "ALL",
+    default: bool = False,
+    execution_mode: str = "internal",
+    platforms: Union[str, List[str], None] = None,
+    input_schema: Optional[Dict[str, Any]] = None,
+    output_schema: Optional[Dict[str, Any]] = None,
+    requirement: Optional[List[str]] = None,
+    test_payload: Optional[Dict[str, Any]] = None,
+    action_sets: Optional[List[str]] = None
+) -> ActionMetadata:
+    """
+    Build the metadata for an action from the ``@action`` decorator arguments.
+
+    Shared by the decorator and the loader, which passes arguments read
+    statically from the action manifest.
+    """
+    # Normalize platforms input to a list of lowercase strings
+    if platforms is None:
+        # If not specified, assume it works everywhere
+        platform_list = [PLATFORM_ALL]
+    elif isinstance(platforms, str):
+        platform_list = [platforms.lower()]
+    else:
+        platform_list = [p.lower() for p in platforms]
+
+    return ActionMetadata(
+        name=name,
+        description=description,
+        mode=mode,
+        default=default,
+        execution_mode=execution_mode,
+        platforms=platform_list,
+        input_schema=input_schema or {},
+        output_schema=output_schema or {},
+        requirements=requirement or [],
+        test_payload=test_payload,
+        action_sets=action_sets or []
+    )
+
+
 def action(
     name: str,
     description: str = "",
@@ -404,31 +456,24 @@ def action(
         action_sets: List of action set names this action belongs to
                      (e.g., ["file_operations", "core"])
     """
-    # Normalize platforms input to a list of lowercase strings
-    if platforms is None:
-        # If not specified, assume it works everywhere
-        platform_list = [PLATFORM_ALL]
-    elif isinstance(platforms, str):
-        platform_list = [platforms.lower()]
-    else:
-        platform_list = [p.lower() for p in platforms]
+    metadata_kwargs = dict(
+        name=name,
+        description=description,
+        mode=mode,
+        default=default,
+        execution_mode=execution_mode,
+        platforms=platforms,
+        input_schema=input_schema,
+        output_schema=output_schema,
+        requirement=requirement,
+        test_payload=test_payload,
+        action_sets=action_sets,
+    )
 
     def decorator_factory(func: Callable):
         # 1. Create the metadata object from decorator arguments
-        metadata = ActionMetadata(
-            name=name,
-            description=description,
-            mode=mode,
-            default=default,
-            execution_mode=execution_mode,
-            platforms=platform_list,
-            input_schema=input_schema or {},
-            output_schema=output_schema or {},
-            requirements=requirement or [],
-            test_payload=test_payload,
-            action_sets=action_sets or []
-        )
-        
+        metadata = make_action_metadata(**metadata_kwargs)
+
         # 2. Create the full registration object
         action_definition = RegisteredAction(
             handler=func,
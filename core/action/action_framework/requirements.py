@@ -0,0 +1,371 @@
+# core/action/action_framework/requirements.py
+"""
+Background resolver for the pip requirements of in-process actions.
+
+Startup no longer blocks on pip. The loader hands the catalogue to the
+resolver, which checks each distinct package once with ``importlib.metadata``
+and installs the missing ones on a worker thread. Packages requested while
+the worker is busy are deduplicated and go into the next batch; each batch is
+a single pip invocation (falling back to one install per package only when
+the batch fails), optionally against a local wheel index.
+
+Readiness is reported per action:
+
+- ``ready``:    every requirement is installed
+- ``pending``:  a requirement is still missing, queued or installing
+- ``degraded``: installation finished but some requirement failed; the
+  action is offered as before and fails at run time if it really needs it
+
+Entries that are not pip packages are resolved up front instead of going
+through pip: standard-library modules and names the action's source imports
+with ``from module import name`` (classes and functions listed by mistake)
+are ignored, and a name that is already importable as a module counts as
+installed.
+
+The executor waits for a pending action's requirements for at most
+``ACTION_REQUIREMENTS_WAIT_TIMEOUT`` seconds and reports the action as
+unavailable after that; the install carries on in the background.
+
+The router hides ``pending`` actions. Sandboxed actions are skipped: their
+requirements are installed into pooled venvs (see ``core.action.venv_pool``).
+
+Modes (``ACTION_REQUIREMENTS_MODE`` in ``core.config``):
+
+- ``background``: schedule every missing requirement at startup
+- ``on_demand``:  install when an action is first offered or executed
+- ``blocking``:   install everything before startup continues
+"""
+import ast
+import importlib
+import importlib.util
+import re
+import subprocess
+import sys
+import threading
+import time
+from importlib.metadata import PackageNotFoundError, distribution
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from core.action.action_framework.registry import logger, registry_instance
+from core.config import ACTION_REQUIREMENTS_MODE, ACTION_VENV_WHEELHOUSE
+
+# Package states
+SATISFIED = "satisfied"
+MISSING = "missing"
+QUEUED = "queued"
+INSTALLING = "installing"
+FAILED = "failed"
+
+# Action readiness
+READY = "ready"
+PENDING = "pending"
+DEGRADED = "degraded"
+
+REQUIREMENT_MODES = ("background", "on_demand", "blocking")
+
+_NAME_RE = re.compile(r"[<>=!~;\[\s@]")
+
+
+def _distribution_name(requirement: str) -> str:
+    """Project name of a requirement specifier (``"requests>=2"`` -> ``"requests"``)."""
+    return _NAME_RE.split(requirement.strip(), 1)[0]
+
+
+def _imported_symbols(source: str) -> FrozenSet[str]:
+    """Names bound by ``from module import name`` in ``source`` (not the modules themselves)."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return frozenset()
+    return frozenset(
+        alias.name
+        for node in ast.walk(tree)
+        if isinstance(node, ast.ImportFrom)
+        for alias in node.names
+        if alias.name != "*"
+    )
+
+
+def _is_importable(name: str) -> bool:
+    """Whether ``name`` is a top-level module that can already be imported."""
+    if not name.isidentifier():
+        return False
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class RequirementResolver:
+    """Deduplicating, batching pip installer with per-action readiness."""
+
+    def __init__(
+        self,
+        *,
+        mode: str = "background",
+        wheelhouse: Optional[str] = ACTION_VENV_WHEELHOUSE,
+        batch_delay: float = 0.2,
+        install_timeout: int = 300,
+    ) -> None:
+        """
+        Args:
+            mode: One of :data:`REQUIREMENT_MODES`.
+            wheelhouse: Local wheel index. When set, pip runs with
+                ``--no-index --find-links`` so installs work offline.
+                Defaults to ``ACTION_VENV_WHEELHOUSE`` in ``core.config``,
+                shared with the sandboxed venv pool.
+            batch_delay: Seconds the worker waits after a request so
+                requests arriving together share one pip invocation.
+            install_timeout: Timeout for a batch pip invocation in seconds.
+        """
+        if mode not in REQUIREMENT_MODES:
+            raise ValueError(f"Unknown requirement mode '{mode}'. Expected one of: {', '.join(REQUIREMENT_MODES)}")
+        self.mode = mode
+        self.wheelhouse = wheelhouse or None
+        self.batch_delay = batch_delay
+        self.install_timeout = install_timeout
+
+        self._cond = threading.Condition()
+        self._status: Dict[str, str] = {}
+        self._queue: List[str] = []
+        self._worker: Optional[threading.Thread] = None
+        self._symbols: Dict[Tuple[str, int], FrozenSet[str]] = {}
+        self.invocations = 0
+
+    # ------------------------------------------------------------------
+    # Package state
+    # ------------------------------------------------------------------
+    def _check(self, requirement: str) -> str:
+        """Status of ``requirement``, looking it up on first sight. Caller holds the lock."""
+        status = self._status.get(requirement)
+        if status is None:
+            name = _distribution_name(requirement)
+            try:
+                distribution(name)
+                status = SATISFIED
+            except (PackageNotFoundError, ValueError):
+                # Module names such as "docx" or "PIL" are provided by a
+                # differently named distribution that may already be installed
+                status = SATISFIED if name == requirement.strip() and _is_importable(name) else MISSING
+            self._status[requirement] = status
+        return status
+
+    def schedule(self, requirements: Iterable[str], *, front: bool = False) -> None:
+        """Queue the missing ones among ``requirements`` for the background worker."""
+        with self._cond:
+            added = False
+            for requirement in requirements:
+                requirement = requirement.strip()
+                if not requirement or self._check(requirement) != MISSING:
+                    if front and requirement in self._queue:
+                        self._queue.remove(requirement)
+                        self._queue.insert(0, requirement)
+                    continue
+                self._status[requirement] = QUEUED
+                if front:
+                    self._queue.insert(0, requirement)
+                else:
+                    self._queue.append(requirement)
+                added = True
+            if added:
+                self._ensure_worker()
+                self._cond.notify_all()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="action-requirements", daemon=True)
+            self._worker.start()
+
+    # ------------------------------------------------------------------
+    # Actions
+    # ------------------------------------------------------------------
+    def _pip_requirements(self, impl) -> List[str]:
+        """The entries of ``impl``'s requirements that can be pip packages."""
+        key = (impl.metadata.name, id(impl.handler))
+        symbols = self._symbols.get(key)
+        if symbols is None:
+            try:
+                source = registry_instance._handler_source(impl.handler)
+            except Exception:
+                source = ""
+            symbols = self._symbols[key] = _imported_symbols(source)
+        return [
+            req.strip()
+            for req in impl.metadata.requirements
+            if req
+            and req.strip()
+            and req.strip() not in symbols
+            and _distribution_name(req) not in sys.stdlib_module_names
+        ]
+
+    def requirements_for(self, action_name: str) -> List[str]:
+        """Pip requirements of the action's in-process implementation for this platform."""
+        impl = registry_instance.get_action_implementation(action_name)
+        if impl is None or impl.metadata.execution_mode == "sandboxed":
+            return []
+        return self._pip_requirements(impl)
+
+    def readiness(self, action_name: str, *, schedule: bool = True) -> str:
+        """
+        Readiness of ``action_name``: ``ready``, ``pending`` or ``degraded``.
+
+        With ``schedule`` (the default), missing requirements are queued, so
+        asking about an action is what triggers its install in ``on_demand``
+        mode.
+        """
+        requirements = self.requirements_for(action_name)
+        if not requirements:
+            return READY
+        with self._cond:
+            states = {self._check(req.strip()) for req in requirements}
+        if MISSING in states and schedule:
+            self.schedule(requirements)
+        if states & {MISSING, QUEUED, INSTALLING}:
+            return PENDING
+        return DEGRADED if FAILED in states else READY
+
+    def is_ready(self, action_name: str) -> bool:
+        """False while the action's requirements are still being installed."""
+        return self.readiness(action_name) != PENDING
+
+    def wait_until_ready(self, action_name: str, timeout: Optional[float] = None) -> str:
+        """
+        Install the action's requirements ahead of anything else queued and wait for them.
+
+        Returns:
+            The action's readiness once resolved, or ``pending`` on timeout.
+        """
+        requirements = self.requirements_for(action_name)
+        if not requirements:
+            return READY
+        self.schedule(requirements, front=True)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while any(self._status.get(req.strip()) in (QUEUED, INSTALLING) for req in requirements):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        return self.readiness(action_name, schedule=False)
+
+    def report(self) -> Dict[str, str]:
+        """Readiness of every registered action."""
+        return {name: self.readiness(name, schedule=False) for name in list(registry_instance.list_all_actions())}
+
+    def all_requirements(self) -> List[str]:
+        """Distinct requirements of every registered in-process action."""
+        requirements = {
+            req
+            for platform_impls in list(registry_instance.list_all_actions().values())
+            for impl in platform_impls.values()
+            if impl.metadata.execution_mode != "sandboxed"
+            for req in self._pip_requirements(impl)
+        }
+        return sorted(requirements)
+
+    def start(self) -> None:
+        """Apply the configured mode to the currently registered catalogue."""
+        requirements = self.all_requirements()
+        if not requirements:
+            logger.info("No action requirements to install.")
+            return
+        if self.mode == "on_demand":
+            return
+        self.schedule(requirements)
+        with self._cond:
+            queued = len(self._queue)
+        if queued:
+            logger.info(f"Installing {queued} missing action requirements in the background ({self.mode})")
+        if self.mode == "blocking":
+            self.wait_idle()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until nothing is queued or installing. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or INSTALLING in self._status.values():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._queue:
+                    self._worker = None
+                    return
+            # Let requests that arrive together share the invocation
+            time.sleep(self.batch_delay)
+            with self._cond:
+                batch, self._queue = self._queue, []
+                for requirement in batch:
+                    self._status[requirement] = INSTALLING
+            results = self._install(batch)
+            importlib.invalidate_caches()
+            with self._cond:
+                self._status.update(results)
+                self._cond.notify_all()
+
+    def _pip(self, packages: List[str], timeout: int) -> subprocess.CompletedProcess:
+        cmd = [sys.executable, "-m", "pip", "install", "--quiet"]
+        if self.wheelhouse:
+            cmd += ["--no-index", "--find-links", str(self.wheelhouse)]
+        self.invocations += 1
+        return subprocess.run(cmd + packages, capture_output=True, text=True, timeout=timeout)
+
+    def _install(self, batch: List[str]) -> Dict[str, str]:
+        logger.info(f"Installing {len(batch)} missing packages: {batch}")
+        try:
+            result = self._pip(batch, self.install_timeout)
+            if result.returncode == 0:
+                logger.info(f"Successfully installed packages: {batch}")
+                return {requirement: SATISFIED for requirement in batch}
+        except subprocess.TimeoutExpired:
+            logger.error("Package installation timed out")
+            return {requirement: FAILED for requirement in batch}
+        except Exception as e:
+            logger.error(f"Error during package installation: {e}")
+            return {requirement: FAILED for requirement in batch}
+
+        # Some packages may have failed - try installing individually to identify which
+        if len(batch) == 1:
+            logger.warning(f"Could not install '{batch[0]}': {result.stderr.strip()[:100]}")
+            return {batch[0]: FAILED}
+        logger.warning("Batch install had issues, trying individual installs...")
+        results: Dict[str, str] = {}
+        for requirement in batch:
+            try:
+                pkg_result = self._pip([requirement], 120)
+            except Exception as e:
+                logger.warning(f"Error installing '{requirement}': {e}")
+                results[requirement] = FAILED
+                continue
+            if pkg_result.returncode == 0:
+                logger.info(f"Installed: {requirement}")
+                results[requirement] = SATISFIED
+                continue
+            results[requirement] = FAILED
+            stderr_lower = pkg_result.stderr.lower()
+            if "no matching distribution" in stderr_lower or "could not find" in stderr_lower:
+                logger.debug(f"Package '{requirement}' not found (may be a class/module name)")
+            else:
+                logger.warning(f"Could not install '{requirement}': {pkg_result.stderr.strip()[:100]}")
+        return results
+
+
+_resolver: Optional[RequirementResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_requirement_resolver() -> RequirementResolver:
+    """The process-wide resolver, configured from ``core.config`` on first use."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = RequirementResolver(mode=ACTION_REQUIREMENTS_MODE)
+        return _resolver
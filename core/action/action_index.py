@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+core.action.action_index
+
+In-process search index over the registered actions.
+
+The catalogue is small and only changes when actions are (re)registered, so
+instead of a Chroma query per lookup the index keeps three rankings in
+memory and fuses them with reciprocal rank fusion:
+
+- BM25 over words from the action name, parameter names and description
+  (name and parameter words weigh more)
+- BM25 over character trigrams of the same words, for partial words and typos
+- cosine similarity against the action embeddings, which come from the
+  embedding service's cache (the same documents the Chroma sync embeds)
+
+The lexical indexes are rebuilt when the registry generation changes; the
+action vectors are loaded on the first vector search after a rebuild.
+"""
+
+import math
+import operator
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:  # installed with chromadb; only speeds up the vector ranking
+    import numpy as np
+except ImportError:
+    np = None
+
+from core.action.action_framework.registry import PLATFORM_ALL, registry_instance
+from core.database_interface import DatabaseInterface
+from core.logger import logger
+
+# Field weights: a term in the action name counts three times
+NAME_WEIGHT = 3
+PARAMETER_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+# Reciprocal rank fusion: score = sum(weight / (RRF_K + rank))
+RRF_K = 60
+LEXICAL_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 0.5
+VECTOR_WEIGHT = 1.0
+
+_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it its of on or that the this to use used "
+    "using when with will you your".split()
+)
+_SUFFIXES = ("ing", "ies", "es", "ed", "s")
+
+
+def _stem(word: str) -> str:
+    """Strip a common English suffix so "emails"/"emailing" match "email"."""
+    for suffix in _SUFFIXES:
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, stemmed words of ``text``; ``snake_case`` and ``camelCase`` are split."""
+    words = _WORD_RE.findall(_CAMEL_RE.sub(r"\1 \2", text or "").lower())
+    return [_stem(word) for word in words if word not in _STOPWORDS]
+
+
+def trigrams(words: Iterable[str]) -> List[str]:
+    """Character trigrams of each word, padded so short words still produce some."""
+    grams: List[str] = []
+    for word in words:
+        padded = f" {word} "
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class _BM25:
+    """Okapi BM25 over pre-tokenized documents, with an inverted index."""
+
+    def __init__(self, documents: Sequence[Counter], k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.lengths = [sum(doc.values()) for doc in documents]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for index, doc in enumerate(documents):
+            for term, freq in doc.items():
+                self.postings.setdefault(term, []).append((index, freq))
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    def scores(self, terms: Iterable[str]) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for term, query_freq in Counter(terms).items():
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = self.idf[term]
+            for index, freq in posting:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / (self.avg_length or 1.0))
+                scores[index] = scores.get(index, 0.0) + query_freq * idf * freq * (self.k1 + 1) / (freq + norm)
+        return scores
+
+
+def _ranks(scores: Dict[int, float]) -> Dict[int, int]:
+    """1-based rank of each scored document, best first."""
+    ordered = sorted(scores, key=lambda index: scores[index], reverse=True)
+    return {index: rank for rank, index in enumerate(ordered, start=1)}
+
+
+class ActionSearchIndex:
+    """Hybrid lexical + vector search over the action registry."""
+
+    def __init__(self, embedding_service=None, *, query_cache_size: int = 256) -> None:
+        """
+        Args:
+            embedding_service: Service used for the vector ranking. ``None``
+                resolves the process-wide service on the first vector search.
+            query_cache_size: Query embeddings kept in memory, so repeated
+                queries skip the model.
+        """
+        self._embedding_service = embedding_service
+        self._query_cache_size = query_cache_size
+        self._lock = threading.RLock()
+        self._key: Optional[Tuple[int, int]] = None
+        self._names: List[str] = []
+        self._documents: List[str] = []
+        self._words: Optional[_BM25] = None
+        self._grams: Optional[_BM25] = None
+        self._vectors = None  # normalised action vectors (matrix with numpy)
+        self._query_vectors: OrderedDict = OrderedDict()
+        self.builds = 0
+
+    @property
+    def embedding_service(self):
+        if self._embedding_service is None:
+            from core.embedding_service import get_embedding_service
+
+            self._embedding_service = get_embedding_service()
+        return self._embedding_service
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def _ensure_current(self) -> None:
+        # The length catches callers that clear the registry directly
+        key = (registry_instance.generation, len(registry_instance.list_all_actions()))
+        if key == self._key:
+            return
+        with self._lock:
+            if key != self._key:
+                self._build()
+                self._key = key
+
+    def _build(self) -> None:
+        names: List[str] = []
+        documents: List[str] = []
+        word_docs: List[Counter] = []
+        gram_docs: List[Counter] = []
+        for name, platform_impls in list(registry_instance.list_all_actions().items()):
+            impl = registry_instance.get_action_implementation(name) or platform_impls.get(PLATFORM_ALL)
+            if impl is None and platform_impls:
+                impl = next(iter(platform_impls.values()))
+            if impl is None:
+                continue
+            metadata = impl.metadata
+            name_words = tokenize(name)
+            parameter_words = [word for param in (metadata.input_schema or {}) for word in tokenize(param)]
+            description_words = tokenize(metadata.description)
+
+            words = Counter()
+            for field, weight in (
+                (name_words, NAME_WEIGHT),
+                (parameter_words, PARAMETER_WEIGHT),
+                (description_words, DESCRIPTION_WEIGHT),
+            ):
+                for word in field:
+                    words[word] += weight
+            names.append(name)
+            documents.append(DatabaseInterface._action_entry({"name": name, "description": metadata.description})[0])
+            word_docs.append(words)
+            gram_docs.append(Counter(trigrams(name_words * NAME_WEIGHT + parameter_words + description_words)))
+
+        self._names = names
+        self._documents = documents
+        self._words = _BM25(word_docs)
+        self._grams = _BM25(gram_docs)
+        self._vectors = None
+        self.builds += 1
+        logger.debug(f"[ActionSearchIndex] Indexed {len(names)} actions")
+
+    def _action_vectors(self):
+        """Normalised embedding per action, loaded once per build (cache hits after the Chroma sync)."""
+        if self._vectors is None:
+            try:
+                vectors = self.embedding_service.embed(self._documents)
+            except Exception as e:
+                logger.warning(f"[ActionSearchIndex] Vector ranking unavailable: {e}")
+                return None
+            self._vectors = _normalise_rows(vectors)
+        return self._vectors
+
+    def _query_vector(self, query: str):
+        with self._lock:
+            vector = self._query_vectors.get(query)
+            if vector is not None:
+                self._query_vectors.move_to_end(query)
+                return vector
+        try:
+            vector = _normalise_rows([self.embedding_service.embed_query(query)])[0]
+        except Exception as e:
+            logger.warning(f"[ActionSearchIndex] Could not embed query: {e}")
+            return None
+        with self._lock:
+            self._query_vectors[query] = vector
+            while len(self._query_vectors) > self._query_cache_size:
+                self._query_vectors.popitem(last=False)
+        return vector
+
+    # ------------------------------------------------------------------
+    # Searching
+    # ------------------------------------------------------------------
+    def search_scored(
+        self,
+        query: str,
+        top_k: int = 50,
+        *,
+        candidates: Optional[Iterable[str]] = None,
+        use_vectors: bool = True,
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank actions for ``query``.
+
+        Args:
+            query: Natural-language description of the desired action.
+            top_k: Maximum number of results.
+            candidates: Restrict results to these action names.
+            use_vectors: Fuse in the vector ranking. Without it the search
+                is purely lexical and never calls the embedding model.
+
+        Returns:
+            ``(action_name, fused_score)`` pairs, best first.
+        """
+        self._ensure_current()
+        with self._lock:
+            names, words, grams = self._names, self._words, self._grams
+            vectors = self._action_vectors() if use_vectors and names else None
+        if not names:
+            return []
+
+        allowed = None
+        if candidates is not None:
+            wanted = set(candidates)
+            allowed = {index for index, name in enumerate(names) if name in wanted}
+
+        query_words = tokenize(query)
+        rankings = [
+            (LEXICAL_WEIGHT, words.scores(query_words)),
+            (TRIGRAM_WEIGHT, grams.scores(trigrams(query_words))),
+        ]
+        if vectors is not None:
+            query_vector = self._query_vector(query)
+            if query_vector is not None:
+                rankings.append((VECTOR_WEIGHT, _similarities(vectors, query_vector, allowed)))
+
+        fused: Dict[int, float] = {}
+        for weight, scores in rankings:
+            if allowed is not None:
+                scores = {index: score for index, score in scores.items() if index in allowed}
+            for index, rank in _ranks(scores).items():
+                fused[index] = fused.get(index, 0.0) + weight / (RRF_K + rank)
+
+        best = sorted(fused, key=lambda index: fused[index], reverse=True)[:top_k]
+        return [(names[index], fused[index]) for index in best]
+
+    def search(self, query: str, top_k: int = 50, **kwargs: Any) -> List[str]:
+        """Action names ranked for ``query``; see :meth:`search_scored`."""
+        return [name for name, _ in self.search_scored(query, top_k, **kwargs)]
+
+
+def _normalise_rows(vectors: Sequence[Sequence[float]]):
+    """Unit-length copies of ``vectors`` (a float32 matrix when numpy is available)."""
+    if np is not None:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+    rows = []
+    for vector in vectors:
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        rows.append([value / norm for value in vector])
+    return rows
+
+
+def _similarities(vectors, query_vector, allowed: Optional[set]) -> Dict[int, float]:
+    """Cosine similarity of the query to each (allowed) action."""
+    if np is not None:
+        scores = (vectors @ query_vector).tolist()
+        if allowed is None:
+            return dict(enumerate(scores))
+        return {index: scores[index] for index in allowed}
+    indexes = allowed if allowed is not None else range(len(vectors))
+    return {index: sum(map(operator.mul, query_vector, vectors[index])) for index in indexes}
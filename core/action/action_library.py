@@ -13,6 +13,7 @@ from typing import List, Optional
 
 from core.database_interface import DatabaseInterface
 from core.action.action import Action
+from core.action.action_index import ActionSearchIndex
 from core.logger import logger
 from decorators.profiler import profile, OperationCategory
 
@@ -31,6 +32,7 @@ class ActionLibrary:
         """
         self.llm_interface = llm_interface
         self.db_interface = db_interface
+        self.action_index = ActionSearchIndex(getattr(db_interface, "embedding_service", None))
 
     def store_action(self, action: Action):
         """
@@ -78,18 +80,26 @@ class ActionLibrary:
         }
 
     @profile("action_library_search_action", OperationCategory.ACTION_LIBRARY)
-    def search_action(self, query: str, top_k=50) -> List[str]:
+    def search_action(
+        self,
+        query: str,
+        top_k=50,
+        candidates: Optional[List[str]] = None,
+        use_vectors: bool = True,
+    ) -> List[str]:
         """
-        Search for actions using vector similarity.
+        Search for actions with the in-memory hybrid index (BM25 + trigram + vector).
 
         Args:
             query: Natural-language description of the desired action.
             top_k: Maximum number of action names to return.
+            candidates: Optional action names to restrict the search to.
+            use_vectors: Fuse in embedding similarity; False keeps it lexical only.
 
         Returns:
             List[str]: Ranked list of matching action names.
         """
-        return self.db_interface.search_actions(query, top_k)
+        return self.action_index.search(query, top_k, candidates=candidates, use_vectors=use_vectors)
 
     def delete_action(self, action_name: str):
         """Deletes an action from both MongoDB and ChromaDB."""
@@ -8,15 +8,21 @@ Agent uses this module to select actions based on the plan
 """
 
 import json
-import ast
+import threading
+import time
 from typing import Optional, List, Dict, Any, Tuple
 from core.action.action_library import ActionLibrary
+from core.action.action_framework.requirements import get_requirement_resolver
+from core.action.action_set import action_set_manager
+from core.action.decision_parser import FieldError, get_decision_metrics, parse_decision, validate_parameters
+from core.action.speculation import Speculation, prompt_key, record_speculation
+from core.config import ACTION_PREFILTER_TOP_K
 from core.context_engine import ContextEngine
 from core.state.agent_state import STATE
 
 from core.logger import logger
-from core.llm import LLMCallType
-from core.prompt import SELECT_ACTION_IN_TASK_PROMPT, SELECT_ACTION_PROMPT, SELECT_ACTION_IN_GUI_PROMPT, SELECT_ACTION_IN_SIMPLE_TASK_PROMPT, GUI_ACTION_SPACE_PROMPT
+from core.llm import LLMCallType, usage_tags
+from core.prompt import SELECT_ACTION_IN_TASK_PROMPT, SELECT_ACTION_PROMPT, SELECT_ACTION_IN_GUI_PROMPT, SELECT_ACTION_IN_SIMPLE_TASK_PROMPT, GUI_ACTION_SPACE_PROMPT, FIX_ACTION_PARAMETERS_PROMPT
 from decorators.profiler import profile, OperationCategory
 
 
@@ -59,6 +65,9 @@ class ActionRouter:
         self.action_library = action_library
         self.llm_interface = llm_interface
         self.context_engine = context_engine
+        # Pending speculative task step decision (see speculate_next_action)
+        self._speculation: Optional[Speculation] = None
+        self._speculation_lock = threading.Lock()
 
     @profile("action_router_select_action", OperationCategory.ACTION_ROUTING)
     async def select_action(
@@ -146,47 +155,95 @@ class ActionRouter:
             Dict[str, Any]: Decision payload with ``action_name``, ``parameters``,
             and ``reasoning`` for execution.
         """
-        action_candidates = []
-        action_name_candidates = []
+        static_prompt, full_prompt = self._task_prompts(query, GUI_mode)
+        speculated = await self._take_speculation(full_prompt, GUI_mode)
+        if speculated is not None:
+            return speculated
+        return await self._decide_in_task(full_prompt, static_prompt, GUI_mode)
 
-        # List of filtered actions
-        ignore_actions = ["ignore"]
+    @profile("action_router_select_action_in_simple_task", OperationCategory.ACTION_ROUTING)
+    async def select_action_in_simple_task(
+        self,
+        query: str,
+    ) -> Dict[str, Any]:
+        """
+        Action selection for simple task mode - streamlined without todo workflow.
 
-        # Get compiled action list from task's action sets
-        compiled_actions = self._get_current_task_compiled_actions()
+        Reasoning is now integrated directly into the action selection prompt,
+        eliminating the need for a separate reasoning LLM call.
 
-        # Use static compiled list - NO RAG SEARCH
-        action_candidates = self._build_candidates_from_compiled_list(
-            compiled_actions, GUI_mode, ignore_actions
-        )
-        logger.info(f"ActionRouter using compiled action list: {len(action_candidates)} actions")
+        Simple tasks don't use todos and auto-end after delivering results.
+        This method excludes todo-related actions and uses a simpler prompt.
+
+        Args:
+            query: Task-level instruction for the next step.
+
+        Returns:
+            Dict[str, Any]: Decision payload with ``action_name``, ``parameters``,
+            and ``reasoning`` for execution.
+        """
+        static_prompt, full_prompt = self._simple_task_prompts(query)
+        speculated = await self._take_speculation(full_prompt, GUI_mode=False)
+        if speculated is not None:
+            return speculated
+        return await self._decide_in_task(full_prompt, static_prompt, GUI_mode=False)
+
+    @profile("action_router_select_action_in_GUI", OperationCategory.ACTION_ROUTING)
+    async def select_action_in_GUI(
+        self,
+        query: str,
+        action_type: Optional[str] = None,
+        GUI_mode=False,
+        reasoning: str = "",
+    ) -> Dict[str, Any]:
+        """
+        GUI-specific action selection when a task is running.
+
+        Uses LLM with session caching for efficient multi-turn execution.
+        Reasoning from VLM/OmniParser is passed in and included in the prompt.
+
+        1. Gets compiled action list from task's action sets.
+        2. LLM selects an action based on reasoning and current state.
+        3. Returns the decision with action, parameters, and element_to_find.
+
+        Args:
+            query: Task-level instruction for the next step.
+            action_type: Optional action type hint supplied to the LLM.
+            GUI_mode: Whether the user is interacting through a GUI, affecting
+                which actions are visible.
+            reasoning: Pre-computed reasoning from VLM/OmniParser about screen state.
+
+        Returns:
+            Dict[str, Any]: Decision payload with ``action_name``, ``parameters``,
+            and ``element_to_find`` for execution.
+        """
+        # GUI mode uses hardcoded compact action space prompt for efficiency
+        # No need to build candidates dynamically - action validation happens after selection
+        compiled_actions = self._get_current_task_compiled_actions()
+        logger.info(f"ActionRouter (GUI) using compact action space prompt with {len(compiled_actions)} actions")
 
         # Build the instruction prompt for the LLM
         # KV CACHING: Static/session-static content first, dynamic (event_stream) last
-        # Reasoning is now part of the action selection prompt (single LLM call)
         #
-        # For session caching:
+        # For session caching (BytePlus):
         # - static_prompt: everything except event_stream (cached prefix)
         # - full_prompt: includes event_stream (used for first call or non-cached)
         # Note: task_state includes skill instructions and is session-static (doesn't change during task)
-        # Memory context provides relevant memories for context-aware decisions
         task_state = self.context_engine.get_task_state()
         memory_context = self.context_engine.get_memory_context(query)
-        static_prompt = SELECT_ACTION_IN_TASK_PROMPT.format(
+        static_prompt = SELECT_ACTION_IN_GUI_PROMPT.format(
             agent_state=self.context_engine.get_agent_state(),
             task_state=task_state,
-            memory_context=memory_context,
             event_stream="",  # Empty for static prompt
-            query=query,
-            action_candidates=self._format_candidates(action_candidates),
+            memory_context=memory_context,
+            gui_action_space=GUI_ACTION_SPACE_PROMPT,
         )
-        full_prompt = SELECT_ACTION_IN_TASK_PROMPT.format(
+        full_prompt = SELECT_ACTION_IN_GUI_PROMPT.format(
             agent_state=self.context_engine.get_agent_state(),
             task_state=task_state,
-            memory_context=memory_context,
             event_stream=self.context_engine.get_event_stream(),
-            query=query,
-            action_candidates=self._format_candidates(action_candidates),
+            memory_context=memory_context,
+            gui_action_space=GUI_ACTION_SPACE_PROMPT,
         )
 
         max_retries = 3
@@ -195,7 +252,8 @@ class ActionRouter:
                 full_prompt,
                 is_task=True,
                 static_prompt=static_prompt,
-                call_type=LLMCallType.ACTION_SELECTION,
+                call_type=LLMCallType.GUI_ACTION_SELECTION,
+                use_cache=attempt == 0,
             )
 
             selected_action_name = decision.get("action_name", "")
@@ -214,43 +272,101 @@ class ActionRouter:
         # 3. If we fail to find a valid action name after the retries, raise an error
         raise ValueError("Invalid selected action returned by LLM after retries.")
 
-    @profile("action_router_select_action_in_simple_task", OperationCategory.ACTION_ROUTING)
-    async def select_action_in_simple_task(
-        self,
-        query: str,
-    ) -> Dict[str, Any]:
-        """
-        Action selection for simple task mode - streamlined without todo workflow.
+    # ------------------------------------------------------------------
+    # Speculative decisions
+    # ------------------------------------------------------------------
 
-        Reasoning is now integrated directly into the action selection prompt,
-        eliminating the need for a separate reasoning LLM call.
+    def speculate_next_action(self, query: str, simple_task: bool = False) -> bool:
+        """
+        Start deciding the next task step now, from the current context.
 
-        Simple tasks don't use todos and auto-end after delivering results.
-        This method excludes todo-related actions and uses a simpler prompt.
+        The decision is computed on the prompt the next
+        :meth:`select_action_in_task` / :meth:`select_action_in_simple_task`
+        call would send if nothing changed, and that call uses it only if its
+        own prompt is identical. Not used with session caches: a session
+        advances with every call and cannot take back a discarded one.
 
         Args:
-            query: Task-level instruction for the next step.
+            query: The query the next step will be asked with.
+            simple_task: Whether the running task is a simple task.
 
         Returns:
-            Dict[str, Any]: Decision payload with ``action_name``, ``parameters``,
-            and ``reasoning`` for execution.
+            True if a speculative decision was started.
         """
-        action_candidates = []
-        action_name_candidates = []
+        task_id = STATE.get_agent_property("current_task_id", "")
+        if task_id and self.llm_interface.has_session_cache(task_id, LLMCallType.ACTION_SELECTION):
+            return False
+
+        if simple_task:
+            static_prompt, full_prompt = self._simple_task_prompts(query)
+        else:
+            static_prompt, full_prompt = self._task_prompts(query, GUI_mode=False)
+
+        speculation = Speculation(
+            prompt_key(full_prompt),
+            lambda: self._decide_in_task(full_prompt, static_prompt, GUI_mode=False),
+            name="speculative-action-selection",
+        )
+        with self._speculation_lock:
+            previous, self._speculation = self._speculation, speculation
+        if previous is not None:
+            record_speculation("discarded")
+        record_speculation("started")
+        logger.debug(f"[SPECULATION] Deciding the next step of task {task_id} ahead of its trigger")
+        return True
 
-        # Exclude todo management and ignore actions for simple tasks
-        ignore_actions = ["ignore", "task_update_todos"]
+    def discard_speculation(self) -> None:
+        """Drop the pending speculative decision, if any."""
+        with self._speculation_lock:
+            previous, self._speculation = self._speculation, None
+        if previous is not None:
+            record_speculation("discarded")
+
+    async def _take_speculation(self, full_prompt: str, GUI_mode: bool) -> Optional[Dict[str, Any]]:
+        """Return the pending speculative decision if it was made on ``full_prompt``."""
+        with self._speculation_lock:
+            speculation, self._speculation = self._speculation, None
+        if speculation is None:
+            return None
+        if GUI_mode or speculation.key != prompt_key(full_prompt):
+            logger.info("[SPECULATION] Context changed since the speculative decision; deciding again")
+            record_speculation("discarded")
+            return None
+
+        asked_at = time.perf_counter()
+        try:
+            decision = await speculation.result()
+        except Exception as e:
+            logger.warning(f"[SPECULATION] Speculative decision failed, deciding again: {e}")
+            record_speculation("failed")
+            return None
+        # Time the decision had already been running when it was asked for
+        saved = min(asked_at, speculation.finished_at or asked_at) - speculation.started_at
+        record_speculation("used", saved_seconds=max(0.0, saved))
+        logger.info(f"[SPECULATION] Using speculative decision ({saved:.2f}s ahead)")
+        return decision
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _task_prompts(self, query: str, GUI_mode: bool) -> Tuple[str, str]:
+        """Build the (static, full) action selection prompts for a complex task step."""
+        # List of filtered actions
+        ignore_actions = ["ignore"]
 
         # Get compiled action list from task's action sets
         compiled_actions = self._get_current_task_compiled_actions()
 
+        compiled_actions = self._prefilter_compiled_actions(query, compiled_actions)
+
         # Use static compiled list - NO RAG SEARCH
         action_candidates = self._build_candidates_from_compiled_list(
-            compiled_actions, GUI_mode=False, ignore_actions=ignore_actions
+            compiled_actions, GUI_mode, ignore_actions
         )
-        logger.info(f"ActionRouter (simple task) using compiled action list: {len(action_candidates)} actions")
+        logger.info(f"ActionRouter using compiled action list: {len(action_candidates)} actions")
 
-        # Build the instruction prompt using simple task prompt
+        # Build the instruction prompt for the LLM
         # KV CACHING: Static/session-static content first, dynamic (event_stream) last
         # Reasoning is now part of the action selection prompt (single LLM call)
         #
@@ -261,112 +377,81 @@ class ActionRouter:
         # Memory context provides relevant memories for context-aware decisions
         task_state = self.context_engine.get_task_state()
         memory_context = self.context_engine.get_memory_context(query)
-        static_prompt = SELECT_ACTION_IN_SIMPLE_TASK_PROMPT.format(
+        candidates_text = self._format_task_candidates("task", action_candidates, GUI_mode)
+        static_prompt = SELECT_ACTION_IN_TASK_PROMPT.format(
             agent_state=self.context_engine.get_agent_state(),
             task_state=task_state,
             memory_context=memory_context,
             event_stream="",  # Empty for static prompt
             query=query,
-            action_candidates=self._format_candidates(action_candidates),
+            action_candidates=candidates_text,
         )
-        full_prompt = SELECT_ACTION_IN_SIMPLE_TASK_PROMPT.format(
+        full_prompt = SELECT_ACTION_IN_TASK_PROMPT.format(
             agent_state=self.context_engine.get_agent_state(),
             task_state=task_state,
             memory_context=memory_context,
             event_stream=self.context_engine.get_event_stream(),
             query=query,
-            action_candidates=self._format_candidates(action_candidates),
+            action_candidates=candidates_text,
         )
+        return static_prompt, full_prompt
 
-        max_retries = 3
-        for attempt in range(max_retries):
-            decision = await self._prompt_for_decision(
-                full_prompt,
-                is_task=True,
-                static_prompt=static_prompt,
-                call_type=LLMCallType.ACTION_SELECTION,
-            )
-
-            selected_action_name = decision.get("action_name", "")
-            if selected_action_name == "":
-                return decision
-
-            selected_action = self.action_library.retrieve_action(selected_action_name)
-            if selected_action is not None and _is_visible_in_mode(selected_action, GUI_mode=False):
-                decision["parameters"] = self._ensure_parameters(decision.get("parameters"))
-                return decision
-
-            logger.warning(
-                f"Received invalid action name '{selected_action_name}' during simple task selection attempt {attempt + 1}"
-            )
-
-        raise ValueError("Invalid selected action returned by LLM after retries.")
-
-    @profile("action_router_select_action_in_GUI", OperationCategory.ACTION_ROUTING)
-    async def select_action_in_GUI(
-        self,
-        query: str,
-        action_type: Optional[str] = None,
-        GUI_mode=False,
-        reasoning: str = "",
-    ) -> Dict[str, Any]:
-        """
-        GUI-specific action selection when a task is running.
-
-        Uses LLM with session caching for efficient multi-turn execution.
-        Reasoning from VLM/OmniParser is passed in and included in the prompt.
+    def _simple_task_prompts(self, query: str) -> Tuple[str, str]:
+        """Build the (static, full) action selection prompts for a simple task step."""
+        # Exclude todo management and ignore actions for simple tasks
+        ignore_actions = ["ignore", "task_update_todos"]
 
-        1. Gets compiled action list from task's action sets.
-        2. LLM selects an action based on reasoning and current state.
-        3. Returns the decision with action, parameters, and element_to_find.
+        # Get compiled action list from task's action sets
+        compiled_actions = self._get_current_task_compiled_actions()
 
-        Args:
-            query: Task-level instruction for the next step.
-            action_type: Optional action type hint supplied to the LLM.
-            GUI_mode: Whether the user is interacting through a GUI, affecting
-                which actions are visible.
-            reasoning: Pre-computed reasoning from VLM/OmniParser about screen state.
+        compiled_actions = self._prefilter_compiled_actions(query, compiled_actions)
 
-        Returns:
-            Dict[str, Any]: Decision payload with ``action_name``, ``parameters``,
-            and ``element_to_find`` for execution.
-        """
-        # GUI mode uses hardcoded compact action space prompt for efficiency
-        # No need to build candidates dynamically - action validation happens after selection
-        compiled_actions = self._get_current_task_compiled_actions()
-        logger.info(f"ActionRouter (GUI) using compact action space prompt with {len(compiled_actions)} actions")
+        # Use static compiled list - NO RAG SEARCH
+        action_candidates = self._build_candidates_from_compiled_list(
+            compiled_actions, GUI_mode=False, ignore_actions=ignore_actions
+        )
+        logger.info(f"ActionRouter (simple task) using compiled action list: {len(action_candidates)} actions")
 
-        # Build the instruction prompt for the LLM
+        # Build the instruction prompt using simple task prompt
         # KV CACHING: Static/session-static content first, dynamic (event_stream) last
+        # Reasoning is now part of the action selection prompt (single LLM call)
         #
-        # For session caching (BytePlus):
+        # For session caching:
         # - static_prompt: everything except event_stream (cached prefix)
         # - full_prompt: includes event_stream (used for first call or non-cached)
         # Note: task_state includes skill instructions and is session-static (doesn't change during task)
+        # Memory context provides relevant memories for context-aware decisions
         task_state = self.context_engine.get_task_state()
         memory_context = self.context_engine.get_memory_context(query)
-        static_prompt = SELECT_ACTION_IN_GUI_PROMPT.format(
+        candidates_text = self._format_task_candidates("simple_task", action_candidates, False)
+        static_prompt = SELECT_ACTION_IN_SIMPLE_TASK_PROMPT.format(
             agent_state=self.context_engine.get_agent_state(),
             task_state=task_state,
-            event_stream="",  # Empty for static prompt
             memory_context=memory_context,
-            gui_action_space=GUI_ACTION_SPACE_PROMPT,
+            event_stream="",  # Empty for static prompt
+            query=query,
+            action_candidates=candidates_text,
         )
-        full_prompt = SELECT_ACTION_IN_GUI_PROMPT.format(
+        full_prompt = SELECT_ACTION_IN_SIMPLE_TASK_PROMPT.format(
             agent_state=self.context_engine.get_agent_state(),
             task_state=task_state,
-            event_stream=self.context_engine.get_event_stream(),
             memory_context=memory_context,
-            gui_action_space=GUI_ACTION_SPACE_PROMPT,
+            event_stream=self.context_engine.get_event_stream(),
+            query=query,
+            action_candidates=candidates_text,
         )
+        return static_prompt, full_prompt
 
+    async def _decide_in_task(self, full_prompt: str, static_prompt: str, GUI_mode: bool) -> Dict[str, Any]:
+        """Ask for a task step decision, retrying while the chosen action is unknown or hidden."""
         max_retries = 3
         for attempt in range(max_retries):
             decision = await self._prompt_for_decision(
                 full_prompt,
                 is_task=True,
                 static_prompt=static_prompt,
-                call_type=LLMCallType.GUI_ACTION_SELECTION,
+                call_type=LLMCallType.ACTION_SELECTION,
+                use_cache=attempt == 0,
             )
 
             selected_action_name = decision.get("action_name", "")
@@ -385,16 +470,13 @@ class ActionRouter:
         # 3. If we fail to find a valid action name after the retries, raise an error
         raise ValueError("Invalid selected action returned by LLM after retries.")
 
-    # ------------------------------------------------------------------
-    # Internal helpers
-    # ------------------------------------------------------------------
-
     async def _prompt_for_decision(
         self,
         prompt: str,
         is_task: bool = False,
         static_prompt: Optional[str] = None,
         call_type: str = LLMCallType.ACTION_SELECTION,
+        use_cache: bool = True,
     ) -> Dict[str, Any]:
         """
         Prompt the LLM for an action decision with session caching support.
@@ -409,10 +491,19 @@ class ActionRouter:
             static_prompt: The static parts of the prompt without event_stream
                           (used for session cache creation)
             call_type: The type of LLM call for session cache keying
+            use_cache: Allow a cached response for an identical prompt; the
+                      callers' retry loops disable it after a rejected decision
+
+        Malformed JSON is repaired locally and parameters are validated
+        against the chosen action's schema; only a response with no
+        recoverable object triggers a full retry, and invalid parameters are
+        re-requested field by field (see ``_validate_decision_parameters``).
         """
         max_retries = 3
         last_error: Optional[Exception] = None
         current_prompt = prompt
+        provider = getattr(self.llm_interface, "provider", "unknown")
+        json_mode = getattr(self.llm_interface, "supports_json_mode", False) is True
 
         # Get current task_id for session cache (if running in a task)
         current_task_id = STATE.get_agent_property("current_task_id", "") if is_task else ""
@@ -476,15 +567,32 @@ class ActionRouter:
                         self.context_engine.mark_event_stream_synced(call_type)
                 else:
                     # No session registered (simple task) - use prefix cache / regular response
-                    raw_response = await self.llm_interface.generate_response_async(system_prompt, current_prompt)
+                    with usage_tags(call_type=call_type):
+                        raw_response = await self.llm_interface.generate_json_response_async(
+                            system_prompt, current_prompt, json_mode=json_mode, use_cache=use_cache
+                        )
             else:
-                # Not in task context - use regular response
-                raw_response = await self.llm_interface.generate_response_async(system_prompt, current_prompt)
-
-            decision, parse_error = self._parse_action_decision(raw_response)
+                # Not in task context - use regular response, returning as soon as
+                # the decision object closes in the stream
+                with usage_tags(call_type=call_type):
+                    raw_response = await self.llm_interface.generate_json_response_async(
+                        system_prompt, current_prompt, json_mode=json_mode, use_cache=use_cache
+                    )
+
+            parsed = parse_decision(raw_response)
+            decision, parse_error = parsed.decision, parsed.error
             if decision is not None:
                 decision.setdefault("parameters", {})
                 decision["parameters"] = self._ensure_parameters(decision.get("parameters"))
+                field_retries, invalid_fields, coerced = await self._validate_decision_parameters(decision, json_mode)
+                get_decision_metrics().record(
+                    provider,
+                    repaired=parsed.repaired,
+                    coerced=coerced,
+                    full_retries=attempt,
+                    field_retries=field_retries,
+                    invalid_fields=invalid_fields,
+                )
                 return decision
 
             feedback_error = parse_error or "unknown parsing error"
@@ -495,25 +603,77 @@ class ActionRouter:
             )
             current_prompt = self._augment_prompt_with_feedback(prompt, attempt + 1, raw_response, feedback_error)
 
+        get_decision_metrics().record(provider, full_retries=max_retries - 1, failed=True)
         if last_error:
             raise last_error
         raise ValueError("Unable to parse LLM decision")
 
-    def _parse_action_decision(self, raw: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
-        try:
-            parsed = json.loads(raw)
-        except json.JSONDecodeError as json_error:
-            try:
-                parsed = ast.literal_eval(raw)
-            except Exception as eval_error:
-                logger.error(f"Unable to parse action decision: {raw}")
-                return None, f"json error: {json_error}; literal_eval error: {eval_error}"
+    async def _validate_decision_parameters(
+        self,
+        decision: Dict[str, Any],
+        json_mode: bool = False,
+    ) -> Tuple[int, List[str], bool]:
+        """
+        Validate the decision's parameters against the chosen action's input schema.
 
-        if not isinstance(parsed, dict):
-            logger.error(f"Parsed action decision is not a dict: {raw}")
-            return None, "parsed value is not a dictionary"
+        Coercible values are converted in place. Fields that are still
+        invalid are re-requested once with a small prompt covering only
+        those fields, and the corrections merged into the decision.
+        Unknown action names are left to the caller's own retry loop.
 
-        return parsed, None
+        Returns:
+            (field re-requests made, names of the invalid fields, whether any value was coerced)
+        """
+        action_name = decision.get("action_name")
+        if not action_name:
+            return 0, [], False
+        action = self.action_library.retrieve_action(action_name)
+        if action is None:
+            return 0, [], False
+
+        input_schema = getattr(action, "input_schema", None) or {}
+        parameters, errors = validate_parameters(decision["parameters"], input_schema)
+        coerced = parameters != decision["parameters"]
+        decision["parameters"] = parameters
+        if not errors:
+            return 0, [], coerced
+
+        invalid_fields = [error.name for error in errors]
+        logger.warning(f"[ActionRouter] Invalid parameters for '{action_name}': {errors}")
+        corrections = await self._request_field_corrections(action, parameters, errors, json_mode)
+        if corrections:
+            parameters.update({name: value for name, value in corrections.items() if name in invalid_fields})
+            parameters, remaining = validate_parameters(parameters, input_schema)
+            decision["parameters"] = parameters
+            if remaining:
+                logger.warning(f"[ActionRouter] Parameters still invalid for '{action_name}' after correction: {remaining}")
+        return 1, invalid_fields, coerced
+
+    async def _request_field_corrections(
+        self,
+        action: Any,
+        parameters: Dict[str, Any],
+        errors: List[FieldError],
+        json_mode: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """Ask the LLM for corrected values of just the invalid fields."""
+        input_schema = getattr(action, "input_schema", None) or {}
+        prompt = FIX_ACTION_PARAMETERS_PROMPT.format(
+            name=action.name,
+            description=action.description,
+            parameters=json.dumps(parameters, indent=2, ensure_ascii=False, default=str),
+            field_errors="\n".join(f"- {error.name}: {error.message}" for error in errors),
+            field_schema=json.dumps(
+                {error.name: input_schema.get(error.name) for error in errors}, indent=2, ensure_ascii=False
+            ),
+        )
+        try:
+            with usage_tags(call_type="parameter_fix"):
+                raw_response = await self.llm_interface.generate_json_response_async(None, prompt, json_mode=json_mode)
+        except Exception as e:
+            logger.warning(f"[ActionRouter] Field correction request failed: {e}")
+            return None
+        return parse_decision(raw_response).decision
 
     def _augment_prompt_with_feedback(
         self,
@@ -534,6 +694,19 @@ class ActionRouter:
         )
         return base_prompt + feedback_block
 
+    def _format_task_candidates(self, mode: str, candidates: List[Dict[str, Any]], GUI_mode: bool) -> str:
+        """Format a task's action candidates, cached until its action sets change."""
+        task = STATE.current_task
+        deps = (
+            getattr(task, "id", None),
+            tuple(getattr(task, "action_sets", None) or ()),
+            tuple(c.get("name") for c in candidates),
+            bool(GUI_mode),
+        )
+        return self.context_engine.cached_section(
+            f"action_candidates:{mode}", deps, lambda: self._format_candidates(candidates)
+        )
+
     def _format_candidates(self, candidates: List[Dict[str, Any]]) -> str:
         """Format action candidates with compact schema for reduced prompt size.
 
@@ -618,6 +791,8 @@ class ActionRouter:
         """
         ignore_actions = ignore_actions or []
         candidates = []
+        resolver = get_requirement_resolver()
+        pending = []
 
         for name in compiled_actions:
             if name in ignore_actions:
@@ -630,6 +805,11 @@ class ActionRouter:
             if not _is_visible_in_mode(act, GUI_mode):
                 continue
 
+            # Hidden until its pip requirements are installed (asking schedules them)
+            if not resolver.is_ready(act.name):
+                pending.append(act.name)
+                continue
+
             candidates.append({
                 "name": act.name,
                 "description": act.description,
@@ -638,8 +818,34 @@ class ActionRouter:
                 "output_schema": act.output_schema
             })
 
+        if pending:
+            logger.debug(f"[ActionRouter] Hiding actions with requirements still installing: {pending}")
         return candidates
 
+    def _prefilter_compiled_actions(self, query: str, compiled_actions: List[str]) -> List[str]:
+        """
+        Narrow a long compiled action list to the best matches for ``query``.
+
+        Only active when ``ACTION_PREFILTER_TOP_K`` is set and the list is
+        longer than it. Core-set actions are always kept, and the compiled
+        order is preserved so the candidate text stays stable between steps
+        that select the same actions.
+
+        Args:
+            query: Task-level instruction for the next step.
+            compiled_actions: Pre-compiled list of action names from the task
+
+        Returns:
+            The retained action names, in compiled order
+        """
+        if ACTION_PREFILTER_TOP_K <= 0 or len(compiled_actions) <= ACTION_PREFILTER_TOP_K or not query:
+            return compiled_actions
+        keep = set(action_set_manager.get_actions_in_set("core"))
+        keep.update(self.action_library.search_action(query, top_k=ACTION_PREFILTER_TOP_K, candidates=compiled_actions))
+        filtered = [name for name in compiled_actions if name in keep]
+        logger.debug(f"[ActionRouter] Prefiltered {len(compiled_actions)} compiled actions to {len(filtered)}")
+        return filtered
+
     def _get_current_task_compiled_actions(self) -> List[str]:
         """
         Get the compiled action list from the current task.
@@ -94,6 +94,12 @@ class ActionSetManager:
 
             compiled.append(action_name)
 
+        # Start installing the selected sets' requirements now, in one batch,
+        # so they are ready by the time the router offers the actions
+        from core.action.action_framework.requirements import get_requirement_resolver
+        resolver = get_requirement_resolver()
+        resolver.schedule(req for name in compiled for req in resolver.requirements_for(name))
+
         logger.debug(f"Compiled {len(compiled)} actions from sets: {required_sets}")
         return compiled
 
@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+"""
+core.action.decision_parser
+
+Parsing and validation of the action decisions returned by the LLM.
+
+- ``parse_decision`` accepts strict JSON, Python-literal dicts, and the
+  usual malformed output (code fences, prose around the object, smart
+  quotes, trailing commas, ``True``/``true`` mix-ups, and responses cut
+  off before the closing braces) without another LLM round trip. A
+  response cut off inside a value (a half-written string or number) is
+  rejected, since its arguments are incomplete.
+- ``validate_parameters`` checks the parameters against the chosen
+  action's ``input_schema``: scalar values are coerced to the declared
+  type where unambiguous ("5" -> 5 for an integer), and the rest is
+  reported per field so the router can re-request only those fields.
+- ``DecisionMetrics`` counts per provider how often a decision needed
+  repair, a field re-request or a full retry.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.logger import logger
+
+_CODE_FENCE_RE = re.compile(r"^```(?:\w+)?\s*|\s*```$", re.MULTILINE)
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+_JSON_TO_PYTHON = {"true": "True", "false": "False", "null": "None"}
+_BARE_WORD_RE = re.compile(r"\b(true|false|null)\b")
+_COMPLETE_LITERAL_RE = re.compile(r"\b(?:true|false|null|True|False|None)$")
+
+
+@dataclass
+class ParsedDecision:
+    """Result of :func:`parse_decision`."""
+    decision: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    repaired: bool = False
+
+
+@dataclass
+class FieldError:
+    """A parameter that failed validation against the action's input schema."""
+    name: str
+    message: str
+
+
+# ─────────────────────────────── Parsing ───────────────────────────────
+
+def _map_outside_strings(text: str, fn) -> str:
+    """Apply ``fn`` to the parts of ``text`` that are not inside a quoted string."""
+    out: List[str] = []
+    start = 0
+    quote: Optional[str] = None
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote:
+                out.append(text[start:i + 1])
+                start = i + 1
+                quote = None
+        elif char in "\"'":
+            out.append(fn(text[start:i]))
+            start = i
+            quote = char
+        i += 1
+    tail = text[start:]
+    out.append(tail if quote else fn(tail))
+    return "".join(out)
+
+
+def _extract_object(text: str) -> str:
+    """The first ``{...}`` in ``text``, or everything from the first ``{`` if it never closes."""
+    start = text.find("{")
+    if start < 0:
+        return text
+    depth = 0
+    quote: Optional[str] = None
+    i = start
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+        i += 1
+    return text[start:]
+
+
+def _close_truncated(text: str) -> Optional[str]:
+    """
+    Close the arrays and objects left open by a truncated response.
+
+    Brackets are only closed when the text stops after a complete value.
+    Returns None when it stops inside a string, a number, a key or after a
+    ``:``, because closing it would produce a decision with cut-off
+    arguments.
+    """
+    stack: List[str] = []
+    quote: Optional[str] = None
+    before_string = ""  # last structural character before the most recent string
+    last = ""  # last structural character outside strings
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote:
+                quote = None
+                last = char
+        elif char in "\"'":
+            quote = char
+            before_string = last
+        elif not char.isspace():
+            if char in "{[":
+                stack.append("}" if char == "{" else "]")
+            elif char in "}]" and stack:
+                stack.pop()
+            last = char
+        i += 1
+    if not stack and not quote:
+        return text
+    if quote:
+        return None
+    text = text.rstrip()
+    if text.endswith(","):
+        text = text[:-1].rstrip()
+    tail = text[-1:]
+    if tail in "\"'":
+        # A string directly inside an object after "{" or "," is a key with no value.
+        if stack[-1] == "}" and before_string in ("{", ","):
+            return None
+    elif tail not in ("{", "[", "}", "]") and not _COMPLETE_LITERAL_RE.search(text):
+        return None
+    return text + "".join(reversed(stack))
+
+
+def _load(text: str) -> Any:
+    """``json.loads``, falling back to a Python literal with JSON keywords mapped."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    python_text = _map_outside_strings(text, lambda part: _BARE_WORD_RE.sub(lambda m: _JSON_TO_PYTHON[m.group(1)], part))
+    return ast.literal_eval(python_text)
+
+
+def parse_decision(raw: Optional[str]) -> ParsedDecision:
+    """
+    Parse an action decision, repairing common formatting mistakes.
+
+    Returns:
+        ParsedDecision with ``decision`` set to the parsed dict, or ``error``
+        describing why no dict could be recovered. ``repaired`` is True when
+        the raw text was not valid JSON or a Python literal as is.
+    """
+    text = (raw or "").strip()
+    if not text:
+        return ParsedDecision(error="empty response")
+
+    first_error: Optional[Exception] = None
+    try:
+        parsed = json.loads(text)
+        repaired = False
+    except json.JSONDecodeError as json_error:
+        first_error = json_error
+        try:
+            parsed = ast.literal_eval(text)
+            repaired = False
+        except Exception:
+            parsed, repair_error = None, None
+            stripped = _CODE_FENCE_RE.sub("", text).strip()
+            # Smart quotes are only swapped if the text does not parse with them,
+            # since they are legitimate inside string values
+            for candidate in (stripped, stripped.translate(_SMART_QUOTES)):
+                candidate = _close_truncated(_extract_object(candidate))
+                if candidate is None:
+                    repair_error = "response was cut off inside a value"
+                    continue
+                candidate = _map_outside_strings(candidate, lambda part: _TRAILING_COMMA_RE.sub(r"\1", part))
+                try:
+                    parsed = _load(candidate)
+                    break
+                except Exception as e:
+                    repair_error = e
+            else:
+                return ParsedDecision(error=f"json error: {first_error}; repair failed: {repair_error}")
+            repaired = True
+
+    if not isinstance(parsed, dict):
+        return ParsedDecision(error="parsed value is not a dictionary")
+    if repaired:
+        logger.debug(f"[DecisionParser] Repaired malformed decision: {raw!r}")
+    return ParsedDecision(decision=parsed, repaired=repaired)
+
+
+# ───────────────────────────── Validation ──────────────────────────────
+
+def _coerce(value: Any, expected: str) -> Tuple[Any, Optional[str]]:
+    """Return ``value`` converted to the JSON schema ``expected`` type, or an error message."""
+    if expected == "string":
+        if isinstance(value, str):
+            return value, None
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value), None
+        return value, f"expected a string, got {type(value).__name__}"
+
+    if expected == "integer":
+        if isinstance(value, bool):
+            return value, "expected an integer, got a boolean"
+        if isinstance(value, int):
+            return value, None
+        if isinstance(value, float) and value.is_integer():
+            return int(value), None
+        if isinstance(value, str):
+            try:
+                return int(value.strip()), None
+            except ValueError:
+                pass
+        return value, f"expected an integer, got {value!r}"
+
+    if expected == "number":
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value, None
+        if isinstance(value, str):
+            for convert in (int, float):
+                try:
+                    return convert(value.strip()), None
+                except ValueError:
+                    pass
+        return value, f"expected a number, got {value!r}"
+
+    if expected == "boolean":
+        if isinstance(value, bool):
+            return value, None
+        if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+            return value.strip().lower() == "true", None
+        if isinstance(value, int) and value in (0, 1):
+            return bool(value), None
+        return value, f"expected a boolean, got {value!r}"
+
+    if expected in ("array", "object"):
+        container = list if expected == "array" else dict
+        if isinstance(value, container):
+            return value, None
+        if isinstance(value, str):
+            try:
+                loaded = _load(value)
+                if isinstance(loaded, container):
+                    return loaded, None
+            except Exception:
+                pass
+        return value, f"expected {'an array' if expected == 'array' else 'an object'}, got {type(value).__name__}"
+
+    return value, None
+
+
+def validate_parameters(
+    parameters: Dict[str, Any],
+    input_schema: Optional[Dict[str, Any]],
+) -> Tuple[Dict[str, Any], List[FieldError]]:
+    """
+    Validate ``parameters`` against an action's ``input_schema``.
+
+    Only parameters marked ``"required": True`` are reported when missing;
+    most schemas describe optional parameters in prose, and re-requesting
+    those would cost a round trip for nothing.
+
+    Returns:
+        The parameters with coercible values converted, and the fields that
+        are still invalid.
+    """
+    if not isinstance(input_schema, dict) or not input_schema:
+        return parameters, []
+
+    coerced = dict(parameters)
+    errors: List[FieldError] = []
+    for name, definition in input_schema.items():
+        if not isinstance(definition, dict):
+            continue
+        if name not in coerced or coerced[name] is None:
+            if definition.get("required") is True:
+                errors.append(FieldError(name, "required parameter is missing"))
+            continue
+
+        value = coerced[name]
+        expected = definition.get("type")
+        if isinstance(expected, str):
+            value, message = _coerce(value, expected.lower())
+            if message:
+                errors.append(FieldError(name, message))
+                continue
+        enum = definition.get("enum")
+        if isinstance(enum, list) and enum and value not in enum:
+            errors.append(FieldError(name, f"must be one of {enum}, got {value!r}"))
+            continue
+        coerced[name] = value
+    return coerced, errors
+
+
+# ─────────────────────────────── Metrics ───────────────────────────────
+
+@dataclass
+class DecisionMetricsEntry:
+    """Decision parsing counters for one provider."""
+    decisions: int = 0
+    first_try: int = 0
+    repaired: int = 0
+    coerced: int = 0
+    field_retries: int = 0
+    full_retries: int = 0
+    failures: int = 0
+    invalid_fields: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def retry_rate(self) -> float:
+        """Percentage of decisions that needed another LLM call."""
+        if self.decisions == 0:
+            return 0.0
+        return (self.field_retries + self.full_retries) / self.decisions * 100
+
+
+class DecisionMetrics:
+    """Tracks decision parse repairs and retries per provider.
+
+    Usage:
+        metrics = get_decision_metrics()
+        metrics.record("openai", repaired=True)
+        print(metrics.get_summary())
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, DecisionMetricsEntry] = {}
+
+    def get_entry(self, provider: str) -> DecisionMetricsEntry:
+        """Get or create the entry for ``provider``."""
+        if provider not in self._metrics:
+            self._metrics[provider] = DecisionMetricsEntry()
+        return self._metrics[provider]
+
+    def record(
+        self,
+        provider: str,
+        *,
+        repaired: bool = False,
+        coerced: bool = False,
+        full_retries: int = 0,
+        field_retries: int = 0,
+        invalid_fields: Optional[List[str]] = None,
+        failed: bool = False,
+    ) -> None:
+        """Record the outcome of one decision request."""
+        entry = self.get_entry(provider)
+        entry.decisions += 1
+        entry.repaired += int(repaired)
+        entry.coerced += int(coerced)
+        entry.full_retries += full_retries
+        entry.field_retries += field_retries
+        entry.failures += int(failed)
+        if not (repaired or full_retries or field_retries or failed):
+            entry.first_try += 1
+        for name in invalid_fields or ():
+            entry.invalid_fields[name] = entry.invalid_fields.get(name, 0) + 1
+        if full_retries or field_retries or failed:
+            logger.info(
+                f"[DECISION METRICS] {provider}: retry_rate={entry.retry_rate:.1f}% "
+                f"(full={entry.full_retries}, field={entry.field_retries}, failures={entry.failures})"
+            )
+
+    def get_summary(self) -> str:
+        """Get a formatted summary of decision parsing per provider."""
+        lines = ["=" * 60, "DECISION PARSING SUMMARY", "=" * 60]
+        for provider, entry in self._metrics.items():
+            lines.append(
+                f"\n{provider.upper()}:"
+                f"\n  Decisions: {entry.decisions} (first try={entry.first_try}, failures={entry.failures})"
+                f"\n  Repaired locally: {entry.repaired}, coerced parameters: {entry.coerced}"
+                f"\n  Retries: full={entry.full_retries}, field={entry.field_retries}"
+                f"\n  Retry Rate: {entry.retry_rate:.1f}%"
+            )
+            if entry.invalid_fields:
+                worst = sorted(entry.invalid_fields.items(), key=lambda item: item[1], reverse=True)[:5]
+                lines.append("  Most invalid fields: " + ", ".join(f"{name}={count}" for name, count in worst))
+        lines.append("=" * 60)
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """Reset all metrics."""
+        self._metrics.clear()
+
+
+# Global decision metrics instance
+_decision_metrics: Optional[DecisionMetrics] = None
+
+
+def get_decision_metrics() -> DecisionMetrics:
+    """Get the global decision metrics instance."""
+    global _decision_metrics
+    if _decision_metrics is None:
+        _decision_metrics = DecisionMetrics()
+    return _decision_metrics
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+core.action.speculation
+
+Speculative action decisions.
+
+A :class:`Speculation` asks for an action decision before the agent needs
+it. It is keyed by the prompt it was started with, and the router only uses
+its result when the prompt it would send at that point is identical; any
+change (a new event, a user message, an updated todo) discards it.
+
+Each ``react`` cycle runs on its own short-lived event loop (see the TUI
+trigger consumer), so a speculative call cannot be an asyncio task of the
+cycle that starts it: it runs on a daemon thread with a loop of its own and
+is awaited from the next cycle through a ``concurrent.futures.Future``.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from core.llm.streaming import aclose_http_clients
+from core.logger import logger
+
+
+def prompt_key(prompt: str) -> str:
+    """Key a speculation by the exact prompt it sends."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class Speculation:
+    """An action decision computed ahead of time on a worker thread.
+
+    Usage:
+        speculation = Speculation(prompt_key(prompt), lambda: router_call(prompt))
+        ...
+        if speculation.key == prompt_key(current_prompt):
+            decision = await speculation.result()
+    """
+
+    def __init__(self, key: str, factory: Callable[[], Awaitable[Any]], name: str = "speculation") -> None:
+        self.key = key
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self._future: Future = Future()
+        # Carry the caller's context (request priority, usage tags) onto the thread
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(self._run, factory), name=name, daemon=True).start()
+
+    @property
+    def done(self) -> bool:
+        return self._future.done()
+
+    def _run(self, factory: Callable[[], Awaitable[Any]]) -> None:
+        loop = asyncio.new_event_loop()
+        try:
+            result = loop.run_until_complete(self._call(factory))
+        except BaseException as e:  # delivered to whoever awaits the result
+            self._future.set_exception(e)
+        else:
+            self._future.set_result(result)
+        finally:
+            self.finished_at = time.perf_counter()
+            loop.close()
+
+    @staticmethod
+    async def _call(factory: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await factory()
+        finally:
+            # Pooled HTTP clients are per loop, and this loop is about to close
+            await aclose_http_clients()
+
+    async def result(self) -> Any:
+        """Wait for the speculative result (re-raising its error) from any event loop."""
+        return await asyncio.wrap_future(self._future)
+
+
+@dataclass
+class SpeculationStats:
+    """Counters for speculative decisions."""
+    started: int = 0
+    used: int = 0
+    discarded: int = 0
+    failed: int = 0
+    # Decision time already spent when the agent asked for a used speculation
+    saved_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        settled = self.used + self.discarded + self.failed
+        return (self.used / settled * 100) if settled else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "used": self.used,
+            "discarded": self.discarded,
+            "failed": self.failed,
+            "hit_rate": round(self.hit_rate, 1),
+            "saved_seconds": round(self.saved_seconds, 2),
+        }
+
+
+_stats = SpeculationStats()
+_stats_lock = threading.Lock()
+
+
+def record_speculation(outcome: str, saved_seconds: float = 0.0) -> None:
+    """Count a speculation outcome: "started", "used", "discarded" or "failed"."""
+    with _stats_lock:
+        setattr(_stats, outcome, getattr(_stats, outcome) + 1)
+        _stats.saved_seconds += saved_seconds
+    if outcome != "started":
+        logger.debug(f"[SPECULATION] {outcome}; totals {_stats.to_dict()}")
+
+
+def get_speculation_stats() -> SpeculationStats:
+    """Snapshot of the speculation counters."""
+    with _stats_lock:
+        return SpeculationStats(**{k: getattr(_stats, k) for k in SpeculationStats.__dataclass_fields__})
@@ -0,0 +1,63 @@
+"""Tests for parse_decision's local repair of malformed and truncated decisions."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+
+from core.action.decision_parser import parse_decision  # noqa: E402
+
+
+def test_valid_json_is_not_repaired():
+    result = parse_decision('{"action_name": "wait", "parameters": {"seconds": 5}}')
+    assert result.decision == {"action_name": "wait", "parameters": {"seconds": 5}}
+    assert result.repaired is False
+
+
+def test_code_fence_and_trailing_comma_are_repaired():
+    result = parse_decision('```json\n{"action_name": "wait", "parameters": {"seconds": 5,},}\n```')
+    assert result.decision == {"action_name": "wait", "parameters": {"seconds": 5}}
+    assert result.repaired is True
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ('{"action_name": "wait", "parameters": {"seconds": 5}', {"action_name": "wait", "parameters": {"seconds": 5}}),
+        ('{"action_name": "wait", "parameters": {"seconds": 5},', {"action_name": "wait", "parameters": {"seconds": 5}}),
+        ('{"action_name": "list", "parameters": {"paths": ["a", "b"]', {"action_name": "list", "parameters": {"paths": ["a", "b"]}}),
+        ('{"action_name": "toggle", "parameters": {"on": true', {"action_name": "toggle", "parameters": {"on": True}}),
+        ('{"action_name": "noop", "parameters": {', {"action_name": "noop", "parameters": {}}),
+    ],
+)
+def test_truncation_after_a_complete_value_is_closed(raw, expected):
+    result = parse_decision(raw)
+    assert result.error is None
+    assert result.decision == expected
+    assert result.repaired is True
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        # Cut inside a string value: running it would use the wrong arguments.
+        '{"action_name": "run shell", "parameters": {"command": "rm -rf /tmp/bu',
+        '{"action_name": "write file", "parameters": {"path": "a.py", "content": "def main():\\n    retu',
+        # Cut after a key, or inside a key.
+        '{"action_name": "run shell", "parameters": {"command":',
+        '{"action_name": "run shell", "parameters": {"command"',
+        '{"action_name": "run shell", "parameters": {"comm',
+        # Cut inside a number or keyword.
+        '{"action_name": "wait", "parameters": {"seconds": 12',
+        '{"action_name": "toggle", "parameters": {"on": tr',
+    ],
+)
+def test_truncation_inside_a_value_is_an_error(raw):
+    result = parse_decision(raw)
+    assert result.decision is None
+    assert result.error
+
+
+def test_empty_response_is_an_error():
+    assert parse_decision("  ").error == "empty response"
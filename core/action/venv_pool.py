@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+core.action.venv_pool
+
+Warm pool of prebuilt virtual environments for sandboxed actions.
+
+Each venv is content-addressed by the hash of the action's sorted
+requirement set, so every sandboxed action with the same requirements shares
+one environment that is built once and then reused. The pool lives on disk
+because sandboxed actions run inside ``ProcessPoolExecutor`` workers; all
+coordination (atomic builds, leases, LRU timestamps) therefore goes through
+the filesystem rather than in-process state.
+
+Layout::
+
+    <pool root>/
+        <key>/                 ready venv (renamed into place atomically)
+            .pool.json         requirements, size, site-packages manifest
+            .leases/           one file per run currently using the venv
+        <key>.build-<id>/      venv under construction
+
+Between runs the site-packages directory is compared with the manifest taken
+at build time. Packages an action installed on its own are removed again; if
+a baseline package was modified or deleted the venv is discarded and rebuilt
+on next use.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+import venv
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from core.config import ACTION_VENV_POOL_PATH, ACTION_VENV_POOL_QUOTA_MB, ACTION_VENV_WHEELHOUSE
+from core.logger import logger
+
+_METADATA_FILE = ".pool.json"
+_LEASES_DIR = ".leases"
+
+# Leases older than this are considered left behind by a crashed worker.
+STALE_LEASE_SECONDS = 6000
+
+
+def requirements_key(requirements: Iterable[str] | None) -> str:
+    """Content address for a requirement set (order and duplicates ignored)."""
+    normalized = sorted({req.strip() for req in (requirements or []) if req and req.strip()})
+    return hashlib.sha256("\n".join(normalized).encode("utf-8")).hexdigest()[:16]
+
+
+def _venv_python(venv_dir: Path) -> Path:
+    if os.name == "nt":
+        return venv_dir / "Scripts" / "python.exe"
+    return venv_dir / "bin" / "python"
+
+
+def _site_packages(venv_dir: Path) -> Optional[Path]:
+    if os.name == "nt":
+        candidate = venv_dir / "Lib" / "site-packages"
+        return candidate if candidate.exists() else None
+    return next(iter(sorted((venv_dir / "lib").glob("python*/site-packages"))), None)
+
+
+def _snapshot(site_packages: Optional[Path]) -> Dict[str, int]:
+    """Top-level site-packages entries mapped to their mtime (ns)."""
+    if site_packages is None or not site_packages.exists():
+        return {}
+    snapshot: Dict[str, int] = {}
+    for entry in site_packages.iterdir():
+        if entry.name == "__pycache__":
+            continue
+        try:
+            snapshot[entry.name] = entry.stat().st_mtime_ns
+        except OSError:
+            continue
+    return snapshot
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+class VenvPool:
+    """Filesystem-backed pool of reusable, requirement-keyed virtualenvs."""
+
+    def __init__(
+        self,
+        root: str | Path = ACTION_VENV_POOL_PATH,
+        *,
+        quota_bytes: int = ACTION_VENV_POOL_QUOTA_MB * 1024 * 1024,
+        wheelhouse: str | Path | None = ACTION_VENV_WHEELHOUSE,
+    ) -> None:
+        """
+        Args:
+            root: Directory holding the pooled venvs.
+            quota_bytes: Disk budget for all ready venvs; least recently used
+                venvs are evicted once it is exceeded.
+            wheelhouse: Optional local directory of wheels. When set, pip
+                installs run with ``--no-index --find-links`` so the pool
+                works offline.
+        """
+        self.root = Path(root)
+        self.quota_bytes = quota_bytes
+        self.wheelhouse = Path(wheelhouse) if wheelhouse else None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def acquire(self, requirements: List[str] | None) -> "VenvLease":
+        """
+        Return a lease on a ready venv for ``requirements``, building it on a miss.
+
+        The lease must be released (or used as a context manager) so the venv
+        is reset and becomes evictable again.
+        """
+        key = requirements_key(requirements)
+        venv_dir = self.root / key
+        for _ in range(3):
+            if not (venv_dir / _METADATA_FILE).exists():
+                self._build(key, requirements or [])
+            lease = VenvLease(self, key, venv_dir)
+            try:
+                lease._open()
+                return lease
+            except OSError:
+                # Evicted or discarded between the check and the lease; rebuild.
+                continue
+        raise RuntimeError(f"Could not acquire a sandbox venv for {requirements}")
+
+    def prewarm(self, requirement_sets: Iterable[List[str]]) -> threading.Thread:
+        """Build venvs for ``requirement_sets`` on a daemon thread."""
+        unique: Dict[str, List[str]] = {}
+        for requirements in requirement_sets:
+            unique.setdefault(requirements_key(requirements), list(requirements or []))
+
+        def _run() -> None:
+            for key, requirements in unique.items():
+                if (self.root / key / _METADATA_FILE).exists():
+                    continue
+                try:
+                    self._build(key, requirements)
+                except Exception as e:
+                    logger.warning(f"[VENV POOL] Pre-warm failed for {requirements}: {e}")
+            logger.info(f"[VENV POOL] Pre-warmed {len(unique)} sandbox environment(s)")
+
+        thread = threading.Thread(target=_run, name="venv-pool-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def evict(self, keep: Iterable[str] = ()) -> int:
+        """Evict least recently used venvs until the pool fits its quota.
+
+        Venvs with live leases and keys in ``keep`` are never evicted.
+        Returns the number of evicted venvs.
+        """
+        keep = set(keep)
+        entries = []
+        total = 0
+        for venv_dir in self.root.iterdir() if self.root.exists() else []:
+            metadata_path = venv_dir / _METADATA_FILE
+            if not metadata_path.exists():
+                continue
+            try:
+                size = json.loads(metadata_path.read_text(encoding="utf-8")).get("size_bytes", 0)
+                last_used = metadata_path.stat().st_mtime
+            except (OSError, json.JSONDecodeError):
+                continue
+            total += size
+            entries.append((last_used, venv_dir, size))
+
+        evicted = 0
+        for _, venv_dir, size in sorted(entries):
+            if total <= self.quota_bytes:
+                break
+            if venv_dir.name in keep or self._has_live_leases(venv_dir):
+                continue
+            self._discard(venv_dir)
+            total -= size
+            evicted += 1
+            logger.info(f"[VENV POOL] Evicted {venv_dir.name} ({size / 1024 / 1024:.1f} MB)")
+        return evicted
+
+    # ------------------------------------------------------------------
+    # Build / reset
+    # ------------------------------------------------------------------
+    def _pip_install(self, python_bin: Path, pkg: str) -> None:
+        cmd = [str(python_bin), "-m", "pip", "install", "--quiet"]
+        if self.wheelhouse is not None:
+            cmd += ["--no-index", "--find-links", str(self.wheelhouse)]
+        try:
+            pip_result = subprocess.run(cmd + [pkg], capture_output=True, text=True, timeout=120)
+            if pip_result.returncode != 0:
+                stderr_lower = pip_result.stderr.lower()
+                # Requirement lists also carry class/module names; those are not real packages.
+                if "no matching distribution" not in stderr_lower and "could not find" not in stderr_lower:
+                    logger.warning(f"[VENV POOL] Could not install '{pkg}': {pip_result.stderr.strip()[:100]}")
+        except subprocess.TimeoutExpired:
+            logger.warning(f"[VENV POOL] Installation timed out for '{pkg}'")
+        except Exception as e:
+            logger.warning(f"[VENV POOL] Error installing '{pkg}': {e}")
+
+    def _build(self, key: str, requirements: List[str]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        final_dir = self.root / key
+        build_dir = self.root / f"{key}.build-{uuid.uuid4().hex[:8]}"
+        started = time.time()
+        try:
+            venv.EnvBuilder(with_pip=True).create(build_dir)
+            python_bin = _venv_python(build_dir)
+            for pkg in requirements:
+                pkg = pkg.strip()
+                if pkg:
+                    self._pip_install(python_bin, pkg)
+
+            metadata = {
+                "requirements": sorted(set(requirements)),
+                "created_at": time.time(),
+                "size_bytes": _dir_size(build_dir),
+                "manifest": _snapshot(_site_packages(build_dir)),
+            }
+            (build_dir / _METADATA_FILE).write_text(json.dumps(metadata), encoding="utf-8")
+            (build_dir / _LEASES_DIR).mkdir(exist_ok=True)
+
+            try:
+                os.rename(build_dir, final_dir)
+            except OSError:
+                # Another worker finished the same venv first; theirs wins.
+                shutil.rmtree(build_dir, ignore_errors=True)
+                return
+            logger.info(
+                f"[VENV POOL] Built {key} for {metadata['requirements']} "
+                f"in {time.time() - started:.1f}s"
+            )
+        except Exception:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+        self.evict(keep=[key])
+
+    def _reset(self, venv_dir: Path) -> None:
+        """Undo changes a run made to site-packages, or discard the venv."""
+        metadata_path = venv_dir / _METADATA_FILE
+        try:
+            manifest: Dict[str, int] = json.loads(metadata_path.read_text(encoding="utf-8")).get("manifest", {})
+        except (OSError, json.JSONDecodeError):
+            self._discard(venv_dir)
+            return
+
+        site_packages = _site_packages(venv_dir)
+        current = _snapshot(site_packages)
+        if current == manifest:
+            return
+
+        tampered = [name for name, mtime in manifest.items() if current.get(name) != mtime]
+        if tampered:
+            logger.info(f"[VENV POOL] Discarding {venv_dir.name}: baseline packages changed ({tampered[:3]})")
+            self._discard(venv_dir)
+            return
+
+        for name in set(current) - set(manifest):
+            target = site_packages / name
+            if target.is_dir() and not target.is_symlink():
+                shutil.rmtree(target, ignore_errors=True)
+            else:
+                target.unlink(missing_ok=True)
+
+    def _discard(self, venv_dir: Path) -> None:
+        # Rename first so concurrent acquirers never see a half-deleted venv.
+        trash = venv_dir.with_name(f"{venv_dir.name}.trash-{uuid.uuid4().hex[:8]}")
+        try:
+            os.rename(venv_dir, trash)
+        except OSError:
+            return
+        shutil.rmtree(trash, ignore_errors=True)
+
+    @staticmethod
+    def _has_live_leases(venv_dir: Path) -> bool:
+        leases_dir = venv_dir / _LEASES_DIR
+        if not leases_dir.exists():
+            return False
+        now = time.time()
+        for lease in leases_dir.iterdir():
+            try:
+                if now - lease.stat().st_mtime < STALE_LEASE_SECONDS:
+                    return True
+            except OSError:
+                continue
+        return False
+
+
+class VenvLease:
+    """A single run's claim on a pooled venv."""
+
+    def __init__(self, pool: VenvPool, key: str, venv_dir: Path) -> None:
+        self.pool = pool
+        self.key = key
+        self.venv_dir = venv_dir
+        self.python_bin = _venv_python(venv_dir)
+        self._lease_file = venv_dir / _LEASES_DIR / f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def _open(self) -> None:
+        # Fails with FileNotFoundError if the venv was evicted in the meantime.
+        self._lease_file.touch()
+        # The metadata mtime doubles as the LRU timestamp.
+        os.utime(self.venv_dir / _METADATA_FILE)
+
+    def release(self) -> None:
+        self._lease_file.unlink(missing_ok=True)
+        if not VenvPool._has_live_leases(self.venv_dir):
+            self.pool._reset(self.venv_dir)
+
+    def __enter__(self) -> "VenvLease":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+_pool: Optional[VenvPool] = None
+
+
+def get_venv_pool() -> VenvPool:
+    """Get the process-wide venv pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = VenvPool()
+    return _pool
+
+
+def prewarm_sandboxed_actions() -> Optional[threading.Thread]:
+    """Start building venvs for every registered sandboxed action in the background."""
+    from core.action.action_framework.registry import registry_instance
+
+    requirement_sets = [
+        impl.metadata.requirements
+        for platform_impls in registry_instance.list_all_actions().values()
+        for impl in platform_impls.values()
+        if impl.metadata.execution_mode == "sandboxed"
+    ]
+    if not requirement_sets:
+        return None
+    return get_venv_pool().prewarm(requirement_sets)
@@ -37,6 +37,7 @@ if TYPE_CHECKING:
 from core.action.action_library import ActionLibrary
 from core.action.action_manager import ActionManager
 from core.action.action_router import ActionRouter
+from core.action.venv_pool import prewarm_sandboxed_actions
 
 from core.config import (
     AGENT_WORKSPACE_ROOT,
@@ -44,11 +45,24 @@ from core.config import (
     AGENT_MEMORY_CHROMA_PATH,
     PROCESS_MEMORY_AT_STARTUP,
     MEMORY_PROCESSING_SCHEDULE_HOUR,
+    TRIGGER_MERGE_WINDOW_SECONDS,
+    TRIGGER_LLM_MERGE_FALLBACK,
+    MEMORY_CONTEXT_REUSE_PER_TASK,
+    TASK_BUDGET_DOWNGRADE_MODEL,
+    SPECULATIVE_ACTION_SELECTION,
 )
 
 from core.tui import TUIInterface
 from core.internal_action_interface import InternalActionInterface
-from core.llm import LLMInterface, LLMCallType
+from core.llm import (
+    BudgetStatus,
+    LLMInterface,
+    LLMCallType,
+    RequestPriority,
+    get_usage_ledger,
+    request_priority,
+    usage_tags,
+)
 from core.vlm_interface import VLMInterface
 from core.database_interface import DatabaseInterface
 from core.logger import logger
@@ -56,7 +70,7 @@ from core.memory import MemoryManager, MemoryPointer, MemoryFileWatcher, create_
 from core.context_engine import ContextEngine
 from core.state.state_manager import StateManager
 from core.state.agent_state import STATE
-from core.trigger import Trigger, TriggerQueue
+from core.trigger import Trigger, TriggerCoalescer, TriggerQueue
 from core.state.types import ReasoningResult
 from core.task.task_manager import TaskManager
 from core.event_stream.event_stream_manager import EventStreamManager
@@ -65,6 +79,9 @@ from core.gui.handler import GUIHandler
 from decorators.profiler import profile, profile_loop, OperationCategory
 from pathlib import Path
 
+# Query of the follow-up trigger that continues a running task
+NEXT_STEP_ACTION_DESCRIPTION = "Perform the next best action for the task based on the todos and event stream"
+
 
 @dataclass
 class AgentCommand:
@@ -125,6 +142,10 @@ class AgentBase:
             deferred=deferred_init,
         )
         self.vlm = VLMInterface(provider=llm_provider, deferred=deferred_init)
+        # (task_id, original model) while a task runs on TASK_BUDGET_DOWNGRADE_MODEL
+        self._budget_downgrade: tuple[str, str] | None = None
+        # Tasks already paused once for exceeding their cost budget
+        self._budget_paused_tasks: set[str] = set()
 
         self.event_stream_manager = EventStreamManager(
             self.llm,
@@ -134,13 +155,20 @@ class AgentBase:
         # action & task layers
         self.action_library = ActionLibrary(self.llm, db_interface=self.db_interface)
 
-        self.triggers = TriggerQueue(llm=self.llm)
+        self.triggers = TriggerQueue(
+            llm=self.llm,
+            coalescer=TriggerCoalescer(merge_window=TRIGGER_MERGE_WINDOW_SECONDS),
+            llm_fallback=TRIGGER_LLM_MERGE_FALLBACK,
+        )
 
         # global state
         self.state_manager = StateManager(
             self.event_stream_manager
         )
-        self.context_engine = ContextEngine(state_manager=self.state_manager)
+        self.context_engine = ContextEngine(
+            state_manager=self.state_manager,
+            reuse_task_memory_context=MEMORY_CONTEXT_REUSE_PER_TASK,
+        )
         self.context_engine.set_role_info_hook(self._generate_role_info_prompt)
 
         self.action_manager = ActionManager(
@@ -285,41 +313,43 @@ class AgentBase:
         """
         session_id = trigger.session_id
 
-        try:
-            logger.debug("[REACT] starting...")
+        # Background work queues behind interactive work for the provider's rate limits
+        with request_priority(self._request_priority_for(trigger)), usage_tags(session_id=session_id):
+            try:
+                logger.debug("[REACT] starting...")
 
-            # ----- WORKFLOW 1: Special Processing (memory, proactive, onbaording, etc) -----
-            if self._is_memory_trigger(trigger):
-                task_created = await self._handle_memory_workflow(trigger)
-                if not task_created:
-                    return  # No events to process
+                # ----- WORKFLOW 1: Special Processing (memory, proactive, onbaording, etc) -----
+                if self._is_memory_trigger(trigger):
+                    task_created = await self._handle_memory_workflow(trigger)
+                    if not task_created:
+                        return  # No events to process
 
-            # Initialize session for all other workflows
-            trigger_data: TriggerData = self._extract_trigger_data(trigger)
-            await self._initialize_session(trigger_data.gui_mode, session_id)
+                # Initialize session for all other workflows
+                trigger_data: TriggerData = self._extract_trigger_data(trigger)
+                await self._initialize_session(trigger_data.gui_mode, session_id)
 
-            # ----- WORKFLOW 2: GUI Task Mode -----
-            if self._is_gui_task_mode():
-                await self._handle_gui_task_workflow(trigger_data, session_id)
-                return
+                # ----- WORKFLOW 2: GUI Task Mode -----
+                if self._is_gui_task_mode():
+                    await self._handle_gui_task_workflow(trigger_data, session_id)
+                    return
 
-            # ----- WORKFLOW 3: Complex Task Mode -----
-            if self._is_complex_task_mode():
-                await self._handle_complex_task_workflow(trigger_data, session_id)
-                return
+                # ----- WORKFLOW 3: Complex Task Mode -----
+                if self._is_complex_task_mode():
+                    await self._handle_complex_task_workflow(trigger_data, session_id)
+                    return
 
-            # ----- WORKFLOW 4: Simple Task Mode -----
-            if self._is_simple_task_mode():
-                await self._handle_simple_task_workflow(trigger_data, session_id)
-                return
+                # ----- WORKFLOW 4: Simple Task Mode -----
+                if self._is_simple_task_mode():
+                    await self._handle_simple_task_workflow(trigger_data, session_id)
+                    return
 
-            # ----- WORKFLOW 5: Conversation Mode (default) -----
-            await self._handle_conversation_workflow(trigger_data, session_id)
+                # ----- WORKFLOW 5: Conversation Mode (default) -----
+                await self._handle_conversation_workflow(trigger_data, session_id)
 
-        except Exception as e:
-            await self._handle_react_error(e, None, session_id, {})
-        finally:
-            self._cleanup_session()
+            except Exception as e:
+                await self._handle_react_error(e, None, session_id, {})
+            finally:
+                self._cleanup_session()
 
     # =====================================
     # Memory Processing
@@ -516,6 +546,15 @@ class AgentBase:
         """Check if trigger is for memory processing."""
         return trigger.payload.get("type") == "memory_processing"
 
+    def _request_priority_for(self, trigger: Trigger) -> RequestPriority:
+        """LLM request lane for this react cycle: memory processing runs in the background lane."""
+        if self._is_memory_trigger(trigger):
+            return RequestPriority.BACKGROUND
+        task = self.task_manager.active
+        if task is not None and "memory-processor" in (getattr(task, "selected_skills", None) or []):
+            return RequestPriority.BACKGROUND
+        return RequestPriority.INTERACTIVE
+
     def _is_gui_task_mode(self) -> bool:
         """Check if in GUI task execution mode."""
         return self.state_manager.is_running_task() and STATE.gui_mode
@@ -824,6 +863,28 @@ class AgentBase:
         if not await self._check_agent_limits():
             return
         await self._create_new_trigger(new_session_id, action_output, STATE)
+        if SPECULATIVE_ACTION_SELECTION:
+            self._speculate_next_step(action_output)
+
+    def _speculate_next_step(self, action_output: dict) -> None:
+        """
+        Start deciding the task's next step while its trigger makes its way
+        through the queue.
+
+        Only for follow-ups that fire immediately in CLI task mode; the router
+        drops the early decision if the next step's prompt differs.
+        """
+        try:
+            if not self.state_manager.is_running_task() or STATE.gui_mode:
+                return
+            if float(action_output.get("fire_at_delay", 0.0) or 0.0) > 0 or action_output.get("wait_for_user_reply"):
+                return
+            self.action_router.speculate_next_action(
+                NEXT_STEP_ACTION_DESCRIPTION,
+                simple_task=self.task_manager.is_simple_task(),
+            )
+        except Exception as e:
+            logger.warning(f"[SPECULATION] Could not start a speculative decision: {e}")
 
     # ----- Error Handling -----
 
@@ -869,6 +930,9 @@ class AgentBase:
     # ----- Agent Limits -----
 
     async def _check_agent_limits(self) -> bool:
+        if not self._check_task_budget():
+            return False
+
         agent_properties = STATE.get_agent_properties()
         action_count: int = agent_properties.get("action_count", 0)
         max_actions: int = agent_properties.get("max_actions_per_task", 0)
@@ -926,6 +990,67 @@ class AgentBase:
         # No limits close or reached
         return True
 
+    def _check_task_budget(self) -> bool:
+        """
+        Apply the current task's cost budget from the usage ledger.
+
+        Past the downgrade ratio the task continues on ``TASK_BUDGET_DOWNGRADE_MODEL``
+        (when configured). Once the budget is spent the task pauses: no follow-up
+        trigger is scheduled until the user replies, which renews its budget
+        (see :meth:`_handle_chat_message`).
+
+        Returns:
+            False if the task must pause, True otherwise.
+        """
+        task_id = STATE.get_agent_property("current_task_id", "")
+        if self._budget_downgrade and self._budget_downgrade[0] != task_id:
+            # The downgraded task is over; later work runs on the configured model again
+            self.llm.set_model(self._budget_downgrade[1])
+            self._budget_downgrade = None
+        if not task_id:
+            return True
+
+        status = get_usage_ledger().budget_status(task_id)
+        if status == BudgetStatus.OK:
+            return True
+
+        if status == BudgetStatus.DOWNGRADE:
+            if TASK_BUDGET_DOWNGRADE_MODEL and self._budget_downgrade is None:
+                self._budget_downgrade = (task_id, self.llm.model)
+                self.llm.set_model(TASK_BUDGET_DOWNGRADE_MODEL)
+                if self.event_stream_manager:
+                    self.event_stream_manager.log(
+                        "warning",
+                        f"Task is nearing its cost budget. Continuing on {TASK_BUDGET_DOWNGRADE_MODEL}.",
+                        display_message=None,
+                    )
+                    self.state_manager.bump_event_stream()
+            return True
+
+        if task_id in self._budget_paused_tasks:
+            # Still waiting for the user's reply; other triggers (e.g. scheduled
+            # ones) must not resume the task. See _resume_budget_paused_task.
+            return False
+        self._budget_paused_tasks.add(task_id)
+        logger.warning(f"[BUDGET] {get_usage_ledger().describe_task(task_id)}")
+        if self.event_stream_manager:
+            self.event_stream_manager.log(
+                "warning",
+                "Cost budget reached: 100% of this task's LLM budget has been used. "
+                "The task is paused until the user replies. Inform the user and ask whether to continue.",
+                display_message="Cost budget reached for this task. Reply to continue.",
+            )
+            self.state_manager.bump_event_stream()
+        return False
+
+    def _resume_budget_paused_task(self) -> None:
+        """Give the current task a fresh budget if it was paused waiting for this user reply."""
+        task_id = STATE.get_agent_property("current_task_id", "")
+        if task_id and task_id in self._budget_paused_tasks:
+            self._budget_paused_tasks.discard(task_id)
+            get_usage_ledger().renew_budget(task_id)
+            logger.info(f"[BUDGET] User replied, resuming task {task_id} with a fresh budget")
+
     # ----- Trigger Management -----
 
     @profile("agent_create_new_trigger", OperationCategory.TRIGGER)
@@ -966,10 +1091,12 @@ class AgentBase:
                     Trigger(
                         fire_at=fire_at,
                         priority=5,
-                        next_action_description="Perform the next best action for the task based on the todos and event stream",
+                        next_action_description=NEXT_STEP_ACTION_DESCRIPTION,
                         session_id=new_session_id,
                         payload={
                             "gui_mode": STATE.gui_mode,
+                            # Lets an incoming chat be routed to this session deterministically
+                            "wait_for_user_reply": bool(action_output.get("wait_for_user_reply", False)),
                         },
                     ),
                     skip_merge=True,  # Session is already explicitly set, no LLM merge check needed
@@ -995,6 +1122,7 @@ class AgentBase:
             await self.state_manager.start_session(gui_mode)
 
             self.state_manager.record_user_message(chat_content)
+            self._resume_budget_paused_task()
 
             await self.triggers.put(
                 Trigger(
@@ -1334,6 +1462,9 @@ class AgentBase:
         # Initialize external app libraries
         await self._initialize_external_libraries()
 
+        # Build pooled venvs for sandboxed actions in the background
+        prewarm_sandboxed_actions()
+
         # Process unprocessed events into memory at startup (if enabled)
         if PROCESS_MEMORY_AT_STARTUP:
             await self._process_memory_at_startup()
@@ -1351,4 +1482,6 @@ class AgentBase:
             await cli.start()
         finally:
             # Gracefully shutdown MCP connections
-            await self._shutdown_mcp()
\ No newline at end of file
+            await self._shutdown_mcp()
+            # Stop the persistent helpers inside GUI containers
+            GUIHandler.shutdown()
\ No newline at end of file
@@ -20,10 +20,54 @@ AGENT_MEMORY_CHROMA_PATH = PROJECT_ROOT / "chroma_db_memory"
 MAX_ACTIONS_PER_TASK: int = 150
 MAX_TOKEN_PER_TASK: int = 6000000 # of tokens
 
+# Storage engine for prompt logs, action history and task logs (see core/storage): "sqlite" or "jsonl"
+AGENT_LOG_BACKEND: str = "sqlite"
+
 # Memory processing configuration
 PROCESS_MEMORY_AT_STARTUP: bool = False  # Process EVENT_UNPROCESSED.md into MEMORY.md at startup
 MEMORY_PROCESSING_SCHEDULE_HOUR: int = 3  # Hour (0-23) to run daily memory processing
 
+# Trigger coalescing (see core/trigger.py)
+TRIGGER_MERGE_WINDOW_SECONDS: float = 2.0  # Same-session triggers arriving this close together are merged
+TRIGGER_LLM_MERGE_FALLBACK: bool = False  # Ask the LLM to place triggers the coalescing rules find ambiguous
+
+# Reuse a task's retrieved memory context for all of its steps until the memory index changes
+MEMORY_CONTEXT_REUSE_PER_TASK: bool = False
+
+# Embeddings for the Chroma collections (see core/embedding_service.py)
+EMBEDDING_MODEL: str = "chroma-default"  # "chroma-default", "hash[:<dim>]" or "<provider>:<model>"
+EMBEDDING_CACHE_PATH = PROJECT_ROOT / ".embedding_cache.db"  # Vectors keyed by content hash; None disables
+EMBEDDING_BATCH_SIZE: int = 64  # Texts per model call
+EMBEDDING_BATCH_WAIT_MS: float = 10.0  # How long a partial batch waits for concurrent requests
+
+# Sandboxed action venv pool (see core/action/venv_pool.py)
+ACTION_VENV_POOL_PATH = PROJECT_ROOT / ".action_venvs"
+ACTION_VENV_POOL_QUOTA_MB: int = 4096  # Disk budget before LRU eviction
+ACTION_VENV_WHEELHOUSE = None  # Path of a local wheel directory; when set, pip installs offline from it
+
+# In-process action requirements (see core/action/action_framework/requirements.py)
+# "background": install at startup without blocking, "on_demand": on first use, "blocking": before startup continues
+# Installs use ACTION_VENV_WHEELHOUSE as a local wheel index when it is set
+ACTION_REQUIREMENTS_MODE: str = "background"
+# Seconds an action waits for its own requirements before it is reported unavailable
+ACTION_REQUIREMENTS_WAIT_TIMEOUT: float = 120.0
+
+# Action search (see core/action/action_index.py)
+# When > 0, task action lists longer than this are narrowed to the best matches for the step query
+# (core-set actions are always kept). 0 offers every compiled action, as before.
+ACTION_PREFILTER_TOP_K: int = 0
+
+# Speculative action selection (see core/action/speculation.py). Selects skills and action sets with two
+# parallel LLM calls at task start, and starts deciding a task's next step as soon as an action's result is
+# recorded; the early decision is only used if the step's prompt is unchanged when the agent gets to it.
+SPECULATIVE_ACTION_SELECTION: bool = False
+
+# LLM usage budget per task (see core/llm/usage.py). 0 disables. Past TASK_BUDGET_DOWNGRADE_RATIO of the
+# budget the task continues on TASK_BUDGET_DOWNGRADE_MODEL (if set); at the budget it pauses until the user replies.
+TASK_COST_BUDGET_USD: float = 0.0
+TASK_BUDGET_DOWNGRADE_RATIO: float = 0.8
+TASK_BUDGET_DOWNGRADE_MODEL: str = ""
+
 # Credential storage mode (local-only in CraftBot)
 USE_REMOTE_CREDENTIALS: bool = False
 
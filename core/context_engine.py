@@ -1,7 +1,10 @@
+from collections import Counter
 from datetime import datetime, timezone
+from pathlib import Path
 
 from tzlocal import get_localzone
 import json
+import platform
 
 from core.config import AGENT_WORKSPACE_ROOT
 from core.logger import logger
@@ -15,7 +18,7 @@ from core.prompt import (
 )
 from core.state.state_manager import StateManager
 from core.state.agent_state import STATE
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
 from core.task.task import Task
 
 """
@@ -29,8 +32,60 @@ KV CACHING OPTIMIZATION:
 - System prompts are now COMPLETELY STATIC (no dynamic content)
 - All dynamic content (event_stream, task_state, agent_state) moved to user prompts
 - This maximizes KV cache hit rate for LLM inference
+
+SECTION CACHE:
+- Every section declares the inputs it depends on (USER.md mtime, task id,
+  selected skills, skill set version, task action sets, ...)
+- A section is rebuilt only when those inputs change; otherwise the exact
+  same string is returned, so the assembled system prompt stays byte-stable
 """
 
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class PromptSectionCache:
+    """Memoise prompt sections keyed by their declared dependencies.
+
+    One entry is kept per section name: when the dependency key changes the
+    section is rebuilt and replaces the previous entry.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[Hashable, str]] = {}
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def get(self, name: str, deps: Hashable, build: Callable[[], str]) -> str:
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == deps:
+            self.hits[name] += 1
+            return entry[1]
+        self.misses[name] += 1
+        content = build()
+        self._entries[name] = (deps, content)
+        return content
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop one section (or every section when ``name`` is None)."""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {"hits": self.hits[name], "misses": self.misses[name]}
+            for name in sorted(set(self.hits) | set(self.misses))
+        }
+
+
 class ContextEngine:
     """Build structured prompts for the LLM from runtime state.
 
@@ -43,13 +98,22 @@ class ContextEngine:
     - User prompt: Static template first, then dynamic content, then output format
     """
 
-    def __init__(self, state_manager: StateManager, agent_identity="General AI Assistant"):
+    def __init__(
+        self,
+        state_manager: StateManager,
+        agent_identity="General AI Assistant",
+        reuse_task_memory_context: bool = False,
+    ):
         """
         Initializes the ContextEngine with optional defaults for each prompt component.
 
         agent_identity:
             Default identity/persona string to include in the system prompt when
             no role-specific hook is provided.
+        reuse_task_memory_context:
+            If True, the memory context retrieved for a task is reused for the
+            rest of that task until the memory index generation changes,
+            instead of searching again for every step's query.
         """
         self.agent_identity = agent_identity
         self.system_messages = []
@@ -57,6 +121,8 @@ class ContextEngine:
         self._role_info_func = None  # injected by AgentBase or subclass
         self.state_manager = state_manager
         self._memory_manager = None  # injected by AgentBase after creation
+        self._section_cache = PromptSectionCache()
+        self.reuse_task_memory_context = reuse_task_memory_context
 
     def set_memory_manager(self, memory_manager) -> None:
         """
@@ -66,7 +132,58 @@ class ContextEngine:
         in prompts.
         """
         self._memory_manager = memory_manager
-        
+
+    # ─────────────── SECTION CACHE ───────────────
+
+    def cached_section(self, name: str, deps: Hashable, build: Callable[[], str]) -> str:
+        """
+        Return section ``name``, rebuilding it only when ``deps`` changed.
+
+        Args:
+            name: Section identifier (also the key of the hit/miss counters).
+            deps: Hashable value capturing every input the section depends on.
+            build: Zero-argument callable producing the section content.
+        """
+        return self._section_cache.get(name, deps, build)
+
+    def invalidate_sections(self, name: Optional[str] = None) -> None:
+        """Force one section (or all sections) to be rebuilt on next use."""
+        self._section_cache.invalidate(name)
+
+    def get_section_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-section hit/miss counters."""
+        return self._section_cache.stats()
+
+    def _system_section_deps(self, key: str) -> Hashable:
+        """Inputs each system section depends on; static sections depend on nothing."""
+        if key == "agent_info":
+            from core.onboarding.manager import onboarding_manager
+            return onboarding_manager.state.agent_name
+        if key == "user_profile":
+            from core.config import AGENT_FILE_SYSTEM_PATH
+            return _file_signature(AGENT_FILE_SYSTEM_PATH / "USER.md")
+        if key == "role_info":
+            # Role hooks are expected to be static; call invalidate_sections("role_info") otherwise
+            return self._role_info_func
+        return ()
+
+    @staticmethod
+    def _task_deps(task: Task) -> Hashable:
+        """Inputs of the task-state section: task identity, mode and skill selection."""
+        try:
+            from core.skill.skill_manager import skill_manager
+            skill_version = skill_manager.version
+        except ImportError:
+            skill_version = None
+        return (
+            task.id,
+            task.name,
+            task.instruction,
+            getattr(task, "mode", "complex"),
+            tuple(getattr(task, "selected_skills", None) or ()),
+            skill_version,
+        )
+
     # ─────────────── SYSTEM MESSAGE COMPONENTS (STATIC ONLY) ───────────────
     # These components are STATIC and contribute to KV cache hits
 
@@ -87,6 +204,7 @@ class ContextEngine:
         This should be a callable that returns a string.
         """
         self._role_info_func = hook_fn
+        self._section_cache.invalidate("role_info")
 
     def create_system_role_info(self):
         """
@@ -111,7 +229,6 @@ class ContextEngine:
         Create a system message block with environmental context.
         STATIC version - no timestamp to maximize KV cache hits.
         """
-        import platform
         local_timezone = get_localzone()
         prompt = ENVIRONMENTAL_CONTEXT_PROMPT.format(
             user_location=local_timezone,
@@ -254,41 +371,50 @@ class ContextEngine:
         - This method returns STATIC content only (task name, instruction, mode, skills)
         - Todos are NOT included here - they are in the event stream via _emit_todos_event()
         - This ensures KV cache hits since task state doesn't change during execution
+        - The rendered section is cached until the task or its skill selection changes
         """
         current_task: Optional[Task] = STATE.current_task
 
         if current_task:
-            # Check if this is a simple task
-            is_simple = getattr(current_task, "mode", "complex") == "simple"
-
-            if is_simple:
-                # Simple task - streamlined output
-                return (
-                    "<current_task>\n"
-                    f"Task: {current_task.name} [SIMPLE MODE]\n"
-                    f"Instruction: {current_task.instruction}\n"
-                    "Mode: Simple task - execute directly, no todos required\n"
-                    "</current_task>"
-                )
-
-            # Complex task - static info only (todos are in event stream)
-            lines = [
-                "<current_task>",
-                f"Task: {current_task.name}",
-                f"Instruction: {current_task.instruction}",
-                "Mode: Complex task - use todos in event stream to track progress",
-            ]
-
-            # Add skill instructions if present (static for task duration)
-            skill_instructions = self.get_skill_instructions()
-            if skill_instructions:
-                lines.append("")
-                lines.append(skill_instructions)
-
-            lines.append("</current_task>")
-            return "\n".join(lines)
+            return self.cached_section(
+                "task_state",
+                self._task_deps(current_task),
+                lambda: self._build_task_state(current_task),
+            )
         return "<current_task>\n(no active task)\n</current_task>"
 
+    def _build_task_state(self, current_task: Task) -> str:
+        """Render the task-state section for ``current_task``."""
+        # Check if this is a simple task
+        is_simple = getattr(current_task, "mode", "complex") == "simple"
+
+        if is_simple:
+            # Simple task - streamlined output
+            return (
+                "<current_task>\n"
+                f"Task: {current_task.name} [SIMPLE MODE]\n"
+                f"Instruction: {current_task.instruction}\n"
+                "Mode: Simple task - execute directly, no todos required\n"
+                "</current_task>"
+            )
+
+        # Complex task - static info only (todos are in event stream)
+        lines = [
+            "<current_task>",
+            f"Task: {current_task.name}",
+            f"Instruction: {current_task.instruction}",
+            "Mode: Complex task - use todos in event stream to track progress",
+        ]
+
+        # Add skill instructions if present (static for task duration)
+        skill_instructions = self.get_skill_instructions()
+        if skill_instructions:
+            lines.append("")
+            lines.append(skill_instructions)
+
+        lines.append("</current_task>")
+        return "\n".join(lines)
+
     def get_skill_instructions(self) -> str:
         """
         Get instructions from skills selected for the current task.
@@ -354,13 +480,18 @@ class ContextEngine:
 
         Returns:
             Formatted memory context string, or empty string if no memories.
+
+        Retrieval results are cached by the MemoryManager per query and index
+        generation. With ``reuse_task_memory_context`` the formatted context
+        is additionally reused across the steps of a task.
         """
         if not self._memory_manager:
             return ""
 
+        current_task: Optional[Task] = STATE.current_task
+
         # Determine query from context if not provided
         if not query:
-            current_task: Optional[Task] = STATE.current_task
             if current_task:
                 query = current_task.instruction
             else:
@@ -368,34 +499,45 @@ class ContextEngine:
                 return ""
 
         try:
-            # Retrieve relevant memory pointers
-            pointers = self._memory_manager.retrieve(query, top_k=top_k, min_relevance=0.3)
+            if self.reuse_task_memory_context and current_task:
+                generation = getattr(self._memory_manager, "generation", None)
+                return self.cached_section(
+                    "memory_context",
+                    (current_task.id, top_k, generation),
+                    lambda: self._build_memory_context(query, top_k),
+                )
+            return self._build_memory_context(query, top_k)
 
-            if not pointers:
-                return ""
+        except Exception as e:
+            # Failures are not cached, so the next step retries
+            logger.warning(f"[MEMORY] Failed to retrieve memory context: {e}")
+            return ""
 
-            # Format memory pointers for prompt
-            lines = ["<relevant_memories>"]
-            lines.append("Historical context from previous interactions (verify against current event stream):")
-            lines.append("")
+    def _build_memory_context(self, query: str, top_k: int) -> str:
+        """Retrieve memory pointers for ``query`` and format them for the prompt."""
+        pointers = self._memory_manager.retrieve(query, top_k=top_k, min_relevance=0.3)
 
-            for ptr in pointers:
-                # Format: [file] section - summary (relevance: X.XX)
-                lines.append(
-                    f"- [{ptr.file_path}] {ptr.section_path}: {ptr.summary} "
-                    f"(relevance: {ptr.relevance_score:.2f})"
-                )
+        if not pointers:
+            return ""
 
-            lines.append("")
-            lines.append("Note: Memories may be outdated. Trust current event stream over memories if they conflict.")
-            lines.append("Use memory_search action to retrieve full content if needed.")
-            lines.append("</relevant_memories>")
+        # Format memory pointers for prompt
+        lines = ["<relevant_memories>"]
+        lines.append("Historical context from previous interactions (verify against current event stream):")
+        lines.append("")
 
-            return "\n".join(lines)
+        for ptr in pointers:
+            # Format: [file] section - summary (relevance: X.XX)
+            lines.append(
+                f"- [{ptr.file_path}] {ptr.section_path}: {ptr.summary} "
+                f"(relevance: {ptr.relevance_score:.2f})"
+            )
 
-        except Exception as e:
-            logger.warning(f"[MEMORY] Failed to retrieve memory context: {e}")
-            return ""
+        lines.append("")
+        lines.append("Note: Memories may be outdated. Trust current event stream over memories if they conflict.")
+        lines.append("Use memory_search action to retrieve full content if needed.")
+        lines.append("</relevant_memories>")
+
+        return "\n".join(lines)
 
     # ──────────────────────── USER MESSAGE COMPONENTS ────────────────────────
 
@@ -466,14 +608,22 @@ class ContextEngine:
             ("base_instruction", self.create_system_base_instruction),
         ]
 
-        system_content_list = []
-        for key, section_fn in system_sections:
-            if system_flags.get(key):
-                section_content = section_fn()
+        # Each section is rebuilt only when its declared inputs change, and the
+        # assembled prompt is reused as-is while none of them do (byte-stable prefix)
+        enabled = [(key, section_fn) for key, section_fn in system_sections if system_flags.get(key)]
+        section_deps = tuple((key, self._system_section_deps(key)) for key, _ in enabled)
+
+        def assemble() -> str:
+            system_content_list = []
+            for (key, section_fn), (_, deps) in zip(enabled, section_deps):
+                section_content = self.cached_section(key, deps, section_fn)
                 if section_content:
                     system_content_list.append(section_content)
+            return "\n".join(system_content_list).strip()
 
-        system_message_content = "\n".join(system_content_list).strip()
+        system_message_content = self.cached_section(
+            "system:" + ",".join(key for key, _ in enabled), section_deps, assemble
+        )
 
         user_sections = [
             ("query", lambda: self.create_user_query(query)),
@@ -2,28 +2,78 @@
 """core.database_interface
 
 A filesystem backed storage layer (plus ChromaDB) so the rest of the
-codebase never talks to persistence details directly.
+codebase never talks to persistence details directly. Prompt logs, action
+history and task logs are delegated to a pluggable :mod:`core.storage`
+engine.
 """
 
 from __future__ import annotations
 
+import argparse
 import datetime
+import hashlib
 import json
 import re
 
-from dataclasses import asdict
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import chromadb
 
+from core.config import AGENT_LOG_BACKEND
+from core.embedding_service import EmbeddingService, get_embedding_service, open_collection
 from core.logger import logger
+from core.storage import LogStore, create_log_store
 from core.task.task import Task
 
 from core.action.action_framework.registry import registry_instance
 from core.action.action_framework.loader import load_actions_from_directories
 from decorators.profiler import profile, OperationCategory
 
+# Chroma metadata key holding the hash of the document and metadata it was synced from
+CONTENT_HASH_KEY = "content_hash"
+
+
+def _content_hash(document: str, metadata: Dict[str, Any]) -> str:
+    payload = json.dumps({"document": document, "metadata": metadata}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _hashed_metadata(document: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadata as stored in Chroma: the source metadata plus its content hash.
+
+    Chroma rejects empty metadata dicts, so every stored document carries at
+    least the hash.
+    """
+    return {**metadata, CONTENT_HASH_KEY: _content_hash(document, metadata)}
+
+
+@dataclass
+class ChromaSyncReport:
+    """Differences found (or applied) between a Chroma collection and its sources."""
+
+    collection: str
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def drift(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+    @property
+    def indexed(self) -> int:
+        """Documents in the collection once the differences are applied."""
+        return len(self.added) + len(self.updated) + self.unchanged
+
+    def summary(self) -> str:
+        return (
+            f"{self.collection}: {len(self.added)} added, {len(self.updated)} updated, "
+            f"{len(self.removed)} removed, {self.unchanged} unchanged"
+        )
+
 
 class DatabaseInterface:
     """All persistence operations for the agent live here."""
@@ -34,6 +84,9 @@ class DatabaseInterface:
         data_dir: str = "core/data",
         chroma_path: str = "./chroma_db",
         log_file: Optional[str] = None,
+        log_backend: Optional[str] = None,
+        embedding_service: Optional[EmbeddingService] = None,
+        sync_on_start: bool = True,
     ) -> None:
         """
         Initialize storage directories and vector stores for agent data.
@@ -47,8 +100,19 @@ class DatabaseInterface:
             data_dir: Base directory used to persist logs and JSON artifacts.
             chroma_path: Root path for ChromaDB persistence; distinct suffixes
                 are used for actions and task documents.
-            log_file: Optional explicit log file path; defaults to
-                ``<data_dir>/agent_logs.txt`` when omitted.
+            log_file: Optional explicit legacy JSONL log file path; defaults
+                to ``<data_dir>/agent_logs.txt`` when omitted. With the
+                ``"sqlite"`` backend it is migrated once and then renamed.
+            log_backend: Storage engine for prompt/action/task logs,
+                ``"sqlite"`` or ``"jsonl"``. Defaults to ``AGENT_LOG_BACKEND``
+                in ``core.config``.
+            embedding_service: Service that embeds action and task document
+                text for Chroma; defaults to the process-wide one from
+                ``core.config``. Its cache makes startup re-syncs free when
+                nothing changed.
+            sync_on_start: Reconcile the Chroma collections with the action
+                registry and task documents on disk. Disable to inspect the
+                collections as they are (see :meth:`verify_chroma_sync`).
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
@@ -61,18 +125,27 @@ class DatabaseInterface:
 
         self.actions_dir.mkdir(parents=True, exist_ok=True)
         self.task_docs_dir.mkdir(parents=True, exist_ok=True)
-        self.log_file_path.touch(exist_ok=True)
         if not self.agent_info_path.exists():
             self.agent_info_path.write_text("{}", encoding="utf-8")
 
+        self.log_store: LogStore = create_log_store(
+            log_backend or AGENT_LOG_BACKEND,
+            data_dir=self.data_dir,
+            legacy_log_file=self.log_file_path,
+        )
+
+        self.embedding_service = embedding_service or get_embedding_service()
 
         # ChromaDB (for vector search on actions and task documents)
         self.chroma = chromadb.PersistentClient(path=f"{chroma_path}_actions")
-        self.chroma_actions = self.chroma.get_or_create_collection("agent_actions")
+        self.chroma_actions, _ = open_collection(self.chroma, "agent_actions", self.embedding_service)
 
         # separate ChromaDB client/collection for task documents
         self.chroma_taskdocs = chromadb.PersistentClient(path=f"{chroma_path}_taskdocs")
-        self.chroma_taskdocs_coll = self.chroma_taskdocs.get_or_create_collection("task_documents")
+        self.chroma_taskdocs_coll, _ = open_collection(self.chroma_taskdocs, "task_documents", self.embedding_service)
+
+        if not sync_on_start:
+            return
 
         # Ensure Chroma stays in sync with the filesystem sources on startup
         self.sync_actions_to_chroma(paths_to_scan=[self.actions_dir])
@@ -91,34 +164,6 @@ class DatabaseInterface:
 
         self.sync_task_documents_to_chroma()
 
-    # ------------------------------------------------------------------
-    # Log helpers
-    # ------------------------------------------------------------------
-    def _load_log_entries(self) -> List[Dict[str, Any]]:
-        entries: List[Dict[str, Any]] = []
-        try:
-            with self.log_file_path.open("r", encoding="utf-8") as handle:
-                for line in handle:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entries.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        logger.warning(f"[LOG PARSE] Skipping malformed line in {self.log_file_path}")
-        except FileNotFoundError:
-            pass
-        return entries
-
-    def _write_log_entries(self, entries: Iterable[Dict[str, Any]]) -> None:
-        with self.log_file_path.open("w", encoding="utf-8") as handle:
-            for entry in entries:
-                handle.write(json.dumps(entry, default=str) + "\n")
-
-    def _append_log_entry(self, entry: Dict[str, Any]) -> None:
-        with self.log_file_path.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(entry, default=str) + "\n")
-
     # ------------------------------------------------------------------
     # Prompt logging & token usage helpers
     # ------------------------------------------------------------------
@@ -137,7 +182,7 @@ class DatabaseInterface:
         """
         Store a single prompt interaction with metadata and token counts.
 
-        Each call appends a structured record to the log file so usage metrics
+        Each call appends a structured record to the log store so usage metrics
         and model behavior can be inspected later.
 
         Args:
@@ -163,12 +208,10 @@ class DatabaseInterface:
             "token_count_input": token_count_input,
             "token_count_output": token_count_output,
         }
-        self._append_log_entry(entry)
+        self.log_store.append_prompt_log(entry)
 
     def _iter_prompt_logs(self) -> Iterable[Dict[str, Any]]:
-        for entry in self._load_log_entries():
-            if entry.get("entry_type") == "prompt_log":
-                yield entry
+        return self.log_store.iter_prompt_logs()
 
     # ------------------------------------------------------------------
     # Action history logging
@@ -206,7 +249,6 @@ class DatabaseInterface:
             started_at: ISO timestamp for when execution began.
             ended_at: ISO timestamp for when execution completed.
         """
-        entries = self._load_log_entries()
         payload = {
             "entry_type": "action_history",
             "runId": run_id,
@@ -222,28 +264,22 @@ class DatabaseInterface:
             "endedAt": ended_at,
         }
 
-        found = False
-        for entry in entries:
-            if entry.get("entry_type") == "action_history" and entry.get("runId") == run_id:
-                entry["action_type"] = payload["action_type"]
-                entry["type"] = payload["type"]
-                entry.update({k: v for k, v in payload.items() if v is not None or k in {"inputs", "outputs"}})
-                if entry.get("startedAt") is None:
-                    entry["startedAt"] = started_at
-                found = True
-                break
-
-        if not found:
+        entry = self.log_store.get_action(run_id)
+        if entry is not None:
+            entry["action_type"] = payload["action_type"]
+            entry["type"] = payload["type"]
+            entry.update({k: v for k, v in payload.items() if v is not None or k in {"inputs", "outputs"}})
+            if entry.get("startedAt") is None:
+                entry["startedAt"] = started_at
+        else:
             if payload["startedAt"] is None:
                 payload["startedAt"] = datetime.datetime.utcnow().isoformat()
-            entries.append(payload)
+            entry = payload
 
-        self._write_log_entries(entries)
+        self.log_store.put_action(entry)
 
     def _iter_action_history(self) -> Iterable[Dict[str, Any]]:
-        for entry in self._load_log_entries():
-            if entry.get("entry_type") == "action_history":
-                yield entry
+        return self.log_store.iter_actions()
 
     def find_actions_by_status(self, status: str) -> List[Dict[str, Any]]:
         """
@@ -255,7 +291,7 @@ class DatabaseInterface:
         Returns:
             List of action history dictionaries where ``status`` matches.
         """
-        return [entry for entry in self._iter_action_history() if entry.get("status") == status]
+        return self.log_store.find_actions_by_status(status)
 
     def get_action_history(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -268,12 +304,7 @@ class DatabaseInterface:
             A list of action history dictionaries truncated to ``limit``
             entries.
         """
-        history = list(self._iter_action_history())
-        history.sort(
-            key=lambda e: datetime.datetime.fromisoformat(e.get("startedAt") or datetime.datetime.min.isoformat()),
-            reverse=True,
-        )
-        return history[:limit]
+        return self.log_store.recent_actions(limit)
 
     # ------------------------------------------------------------------
     # Task logging helpers
@@ -300,20 +331,16 @@ class DatabaseInterface:
             "updated_at": datetime.datetime.utcnow().isoformat(),
         }
 
-        entries = self._load_log_entries()
-        for entry in entries:
-            if entry.get("entry_type") == "task_log" and entry.get("task_id") == task.id:
-                entry.update(doc)
-                break
+        entry = self.log_store.get_task(task.id)
+        if entry is not None:
+            entry.update(doc)
         else:
-            entries.append(doc)
+            entry = doc
 
-        self._write_log_entries(entries)
+        self.log_store.put_task(entry)
 
     def _iter_task_logs(self) -> Iterable[Dict[str, Any]]:
-        for entry in self._load_log_entries():
-            if entry.get("entry_type") == "task_log":
-                yield entry
+        return self.log_store.iter_tasks()
 
     # ------------------------------------------------------------------
     # Action definitions (filesystem + Chroma)
@@ -345,10 +372,12 @@ class DatabaseInterface:
         path.write_text(json.dumps(action_dict, indent=2, default=str), encoding="utf-8")
 
         # keep Chroma in sync
-        self.chroma_actions.delete(ids=[action_dict["name"]], ignore_missing=True)
-        self.chroma_actions.add(
+        document, metadata = self._action_entry(action_dict)
+        self.chroma_actions.upsert(
             ids=[action_dict["name"]],
-            documents=[action_dict["name"]],
+            documents=[document],
+            metadatas=[_hashed_metadata(document, metadata)],
+            embeddings=self.embedding_service.embed([document]),
         )
 
     def list_actions(
@@ -422,44 +451,110 @@ class DatabaseInterface:
             List of action names ranked by similarity to ``query``.
         """
         result = self.chroma_actions.query(
-            query_texts=[query],
+            query_embeddings=[self.embedding_service.embed_query(query)],
             n_results=top_k,
         )
         return result.get("ids", [[]])[0] if result else []
 
     def sync_actions_to_chroma(self, paths_to_scan: List[str] = None) -> int:
         """
-        Build the Chroma action collection from JSON files on disk.
+        Load actions into the registry and bring the Chroma action collection in line.
+
+        Only actions whose content hash differs from the one stored in Chroma
+        are re-embedded and upserted; actions no longer registered are deleted.
 
         Returns:
             Number of action definitions indexed in Chroma.
-        """        
+        """
         load_actions_from_directories(paths_to_scan=paths_to_scan)
+        report = self._sync_collection(self.chroma_actions, "agent_actions", self._action_entries())
+        logger.info(f"[CHROMA SYNC] {report.summary()}")
+        return report.indexed
+
+    @staticmethod
+    def _action_entry(action: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Document and metadata indexed for an action."""
+        description = (action.get("description") or "").strip()
+        document = f"{action['name']}\n\n{description}" if description else action["name"]
+        return document, {}
+
+    def _action_entries(self) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        entries: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for action in registry_instance.list_all_actions_as_json():
+            if action.get("name"):
+                entries[action["name"]] = self._action_entry(action)
+        return entries
 
-        actions: List[Dict[str, Any]] = registry_instance.list_all_actions_as_json()
+    def _sync_collection(
+        self,
+        collection: Any,
+        label: str,
+        entries: Dict[str, Tuple[str, Dict[str, Any]]],
+        *,
+        dry_run: bool = False,
+    ) -> ChromaSyncReport:
+        """
+        Reconcile ``collection`` with ``entries`` (id -> (document, metadata)).
 
-        try:
-            existing = self.chroma_actions.get()
-            ids = existing.get("ids", []) if existing else []
-            if ids:
-                self.chroma_actions.delete(ids=list(ids))
-        except Exception:
-            pass
+        Each stored document carries the content hash of what it was built
+        from, so the stored hashes act as the sync manifest. Documents synced
+        before hashes were recorded have none and are rewritten once.
+
+        Args:
+            dry_run: Only compute the differences; leave the collection untouched.
+        """
+        report = ChromaSyncReport(collection=label)
+        existing = collection.get(include=["metadatas"]) or {}
+        stored_hashes = {
+            doc_id: (meta or {}).get(CONTENT_HASH_KEY)
+            for doc_id, meta in zip(existing.get("ids") or [], existing.get("metadatas") or [])
+        }
 
         ids: List[str] = []
         documents: List[str] = []
-        for action in actions:
-            name = action.get("name")
-            if not name:
+        metadatas: List[Dict[str, Any]] = []
+        for doc_id, (document, metadata) in entries.items():
+            stored_metadata = _hashed_metadata(document, metadata)
+            digest = stored_metadata[CONTENT_HASH_KEY]
+            if doc_id not in stored_hashes:
+                report.added.append(doc_id)
+            elif stored_hashes[doc_id] != digest:
+                report.updated.append(doc_id)
+            else:
+                report.unchanged += 1
                 continue
-            ids.append(name)
-            documents.append(name)
+            ids.append(doc_id)
+            documents.append(document)
+            metadatas.append(stored_metadata)
+        report.removed = [doc_id for doc_id in stored_hashes if doc_id not in entries]
+
+        if dry_run:
+            return report
+        if ids:
+            collection.upsert(
+                ids=ids,
+                documents=documents,
+                metadatas=metadatas,
+                embeddings=self.embedding_service.embed(documents),
+            )
+        if report.removed:
+            collection.delete(ids=report.removed)
+        return report
 
-        if not ids:
-            return 0
+    def verify_chroma_sync(self, paths_to_scan: List[str] = None) -> List[ChromaSyncReport]:
+        """
+        Report drift between the Chroma collections and their sources without changing them.
 
-        self.chroma_actions.add(ids=ids, documents=documents)
-        return len(ids)
+        Actions are loaded into the registry first so the comparison sees
+        the same catalogue a startup sync would.
+        """
+        load_actions_from_directories(paths_to_scan=paths_to_scan or [self.actions_dir])
+        return [
+            self._sync_collection(self.chroma_actions, "agent_actions", self._action_entries(), dry_run=True),
+            self._sync_collection(
+                self.chroma_taskdocs_coll, "task_documents", self._task_document_entries(), dry_run=True
+            ),
+        ]
 
     # ------------------------------------------------------------------
     # Agent configuration
@@ -543,33 +638,20 @@ class DatabaseInterface:
 
     def sync_task_documents_to_chroma(self) -> int:
         """
-        Rebuild the Chroma collection from task document text files.
+        Bring the Chroma task document collection in line with the text files on disk.
 
         Returns:
             Number of task documents indexed in Chroma after the sync.
-        """        
-        docs = self._load_task_documents_from_disk()
-        try:
-            existing = self.chroma_taskdocs_coll.get()
-            ids = existing.get("ids", []) if existing else []
-            if ids:
-                self.chroma_taskdocs_coll.delete(ids=list(ids))
-        except Exception:
-            pass
-
-        if not docs:
-            return 0
-
-        ids: List[str] = []
-        documents: List[str] = []
-        metadatas: List[Dict[str, Any]] = []
-        for doc in docs:
-            ids.append(doc["task_id"])
-            documents.append(f"{doc['name']}\n\n{doc['description']}")
-            metadatas.append({"name": doc["name"]})
-
-        self.chroma_taskdocs_coll.add(ids=ids, documents=documents, metadatas=metadatas)
-        return len(ids)
+        """
+        report = self._sync_collection(self.chroma_taskdocs_coll, "task_documents", self._task_document_entries())
+        logger.info(f"[CHROMA SYNC] {report.summary()}")
+        return report.indexed
+
+    def _task_document_entries(self) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        return {
+            doc["task_id"]: (f"{doc['name']}\n\n{doc['description']}", {"name": doc["name"]})
+            for doc in self._load_task_documents_from_disk()
+        }
 
     def retrieve_similar_task_documents(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -588,7 +670,7 @@ class DatabaseInterface:
             return []
 
         result = self.chroma_taskdocs_coll.query(
-            query_texts=[query],
+            query_embeddings=[self.embedding_service.embed_query(query)],
             n_results=top_k,
         )
 
@@ -658,21 +740,42 @@ class DatabaseInterface:
             status: New status string to assign to the step.
             failure_message: Optional failure detail to attach when updating.
         """        
-        entries = self._load_log_entries()
-        updated = False
-        for entry in entries:
-            if entry.get("entry_type") != "task_log" or entry.get("task_id") != task_id:
-                continue
-            for step in entry.get("steps", []):
-                if step.get("action_id") == action_id:
-                    step["status"] = status
-                    if failure_message is not None:
-                        step["failure_message"] = failure_message
-                    updated = True
-                    break
-            if updated:
-                entry["updated_at"] = datetime.datetime.utcnow().isoformat()
+        entry = self.log_store.get_task(task_id)
+        if entry is None:
+            return
+        for step in entry.get("steps", []):
+            if step.get("action_id") == action_id:
+                step["status"] = status
+                if failure_message is not None:
+                    step["failure_message"] = failure_message
                 break
-        if updated:
-            self._write_log_entries(entries)
-
+        else:
+            return
+        entry["updated_at"] = datetime.datetime.utcnow().isoformat()
+        self.log_store.put_task(entry)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync the Chroma action and task document collections.")
+    parser.add_argument("--data-dir", default="core/data", help="Agent data directory")
+    parser.add_argument("--chroma-path", default="./chroma_db", help="Root path of the Chroma stores")
+    parser.add_argument("--verify", action="store_true", help="Report drift without changing the collections")
+    args = parser.parse_args()
+
+    db = DatabaseInterface(data_dir=args.data_dir, chroma_path=args.chroma_path, sync_on_start=False)
+    if args.verify:
+        reports = db.verify_chroma_sync()
+        for report in reports:
+            print(report.summary())
+            for kind in ("added", "updated", "removed"):
+                ids = getattr(report, kind)
+                if ids:
+                    print(f"  {kind}: {', '.join(sorted(ids))}")
+        raise SystemExit(1 if any(report.drift for report in reports) else 0)
+
+    print(f"Indexed {db.sync_actions_to_chroma(paths_to_scan=[db.actions_dir])} actions")
+    print(f"Indexed {db.sync_task_documents_to_chroma()} task documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+"""
+core.embedding_service
+
+Batched, cached embeddings for the Chroma collections (memory chunks, task
+documents and actions).
+
+Vectors are computed here and handed to Chroma as precomputed
+``embeddings=`` / ``query_embeddings=``, instead of letting each collection
+run its own embedding function. That buys two things:
+
+- An on-disk cache keyed by ``(model name, sha256(text))``. Re-syncing a
+  collection whose documents did not change costs zero model calls, even
+  across restarts.
+- Request batching. Texts from concurrent callers are grouped into a
+  single model call once ``batch_size`` texts are pending or the oldest
+  one has waited ``max_wait_ms``.
+
+Models:
+- ``ChromaDefaultEmbeddingModel``: Chroma's bundled ONNX MiniLM model, the
+  same vectors collections were built with before this service existed.
+- ``InterfaceEmbeddingModel``: a provider model through ``EmbeddingInterface``.
+- ``HashEmbeddingModel``: a deterministic, dependency-free feature-hashing
+  model for tests and offline benchmarks.
+
+Each collection records the model it was embedded with in its metadata;
+``open_collection`` rebuilds a collection whose model no longer matches,
+since vectors from different models cannot be compared.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.logger import logger
+
+# Collection metadata key recording the embedding model of its vectors
+EMBEDDING_MODEL_KEY = "embedding_model"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# ───────────────────────────── Models ─────────────────────────────
+
+
+class EmbeddingModel:
+    """Base class: embeds a batch of texts in one call."""
+
+    name: str = "base"
+
+    def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+
+class ChromaDefaultEmbeddingModel(EmbeddingModel):
+    """Chroma's default embedding function (all-MiniLM-L6-v2 via ONNX)."""
+
+    name = "chroma-default"
+
+    def __init__(self) -> None:
+        self._fn = None
+
+    def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        if self._fn is None:
+            from chromadb.utils import embedding_functions
+
+            self._fn = embedding_functions.DefaultEmbeddingFunction()
+        return [[float(x) for x in vector] for vector in self._fn(list(texts))]
+
+
+class InterfaceEmbeddingModel(EmbeddingModel):
+    """A provider embedding model through ``EmbeddingInterface`` (one request per text)."""
+
+    def __init__(self, provider: str, model: Optional[str] = None) -> None:
+        from core.embedding_interface import EmbeddingInterface
+
+        self._interface = EmbeddingInterface(provider=provider, model=model)
+        self.name = f"{provider}:{self._interface.model}"
+
+    def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for text in texts:
+            vector = self._interface.get_embedding(text)
+            if vector is None:
+                raise RuntimeError(f"{self.name} returned no embedding")
+            vectors.append(list(vector))
+        return vectors
+
+
+class HashEmbeddingModel(EmbeddingModel):
+    """
+    Deterministic bag-of-features embedding.
+
+    Word unigrams and character trigrams are hashed into ``dim`` signed
+    buckets and the result is L2-normalised. Texts sharing words land close
+    together, which is enough to exercise retrieval without a real model.
+    """
+
+    def __init__(self, dim: int = 256) -> None:
+        self.dim = dim
+        self.name = f"hash-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = _TOKEN_RE.findall(text.lower())
+        features = [f"w:{word}" for word in words]
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(x * x for x in vector))
+        return [x / norm for x in vector] if norm else vector
+
+    def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self.embed_one(text) for text in texts]
+
+
+def create_embedding_model(spec: str) -> EmbeddingModel:
+    """
+    Build a model from a spec string.
+
+    ``"chroma-default"``, ``"hash"`` / ``"hash:<dim>"``, or
+    ``"<provider>:<model>"`` for any provider ``EmbeddingInterface`` supports
+    (e.g. ``"openai:text-embedding-3-small"``; the model may be omitted).
+
+    Raises:
+        ValueError: If ``spec`` is empty.
+    """
+    spec = (spec or "").strip()
+    if not spec:
+        raise ValueError("Embedding model spec must not be empty")
+    if spec == ChromaDefaultEmbeddingModel.name:
+        return ChromaDefaultEmbeddingModel()
+    kind, _, arg = spec.partition(":")
+    if kind == "hash":
+        return HashEmbeddingModel(int(arg) if arg else 256)
+    return InterfaceEmbeddingModel(kind, arg or None)
+
+
+# ───────────────────────────── On-disk cache ─────────────────────────────
+
+
+class EmbeddingCache:
+    """SQLite store of float32 vectors keyed by (model, sha256 of the text)."""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS embeddings (
+        model     TEXT NOT NULL,
+        text_hash TEXT NOT NULL,
+        vector    BLOB NOT NULL,
+        PRIMARY KEY (model, text_hash)
+    ) WITHOUT ROWID;
+    """
+
+    # SQLite's default limit on host parameters is 999
+    _LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """Return the cached vectors among ``hashes``."""
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        for start in range(0, len(unique), self._LOOKUP_CHUNK):
+            chunk = unique[start:start + self._LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    (model, *chunk),
+                ).fetchall()
+            for text_hash, blob in rows:
+                vector = array("f")
+                vector.frombytes(blob)
+                found[text_hash] = vector.tolist()
+        return found
+
+    def put_many(self, model: str, items: Sequence[Tuple[str, Sequence[float]]]) -> None:
+        """Store ``(text_hash, vector)`` pairs."""
+        if not items:
+            return
+        rows = [(model, text_hash, array("f", vector).tobytes()) for text_hash, vector in items]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def count(self, model: Optional[str] = None) -> int:
+        with self._lock:
+            if model is None:
+                return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ───────────────────────────── Service ─────────────────────────────
+
+
+class EmbeddingService:
+    """
+    Embeds texts through a model, a cache and a request batcher.
+
+    ``embed()`` may be called from any thread. Cache misses are queued;
+    whichever caller fills a batch (or outlives ``max_wait_ms``) runs the
+    model for everything pending, so concurrent callers share model calls.
+    """
+
+    def __init__(
+        self,
+        model: EmbeddingModel,
+        cache: Optional[EmbeddingCache] = None,
+        *,
+        batch_size: int = 64,
+        max_wait_ms: float = 10.0,
+    ) -> None:
+        self.model = model
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+
+        self._lock = threading.Lock()
+        # text_hash -> (text, future, persist); insertion order is queue order
+        self._pending: Dict[str, Tuple[str, Future, bool]] = {}
+        self._oldest_pending = 0.0
+
+        self.stats: Dict[str, float] = {
+            "requested": 0,
+            "cache_hits": 0,
+            "embedded": 0,
+            "batches": 0,
+            "model_seconds": 0.0,
+        }
+
+    @property
+    def model_name(self) -> str:
+        return self.model.name
+
+    def embed(self, texts: Sequence[str], *, persist: bool = True) -> List[List[float]]:
+        """
+        Return one vector per text, in order.
+
+        Args:
+            texts: Texts to embed. Duplicates are embedded once.
+            persist: Write newly computed vectors to the on-disk cache.
+                Query strings pass False so ad-hoc queries do not grow it.
+        """
+        if not texts:
+            return []
+        hashes = [EmbeddingCache.text_hash(text) for text in texts]
+        vectors: Dict[str, List[float]] = self.cache.get_many(self.model_name, hashes) if self.cache else {}
+
+        misses: Dict[str, str] = {}
+        hits = 0
+        for text, text_hash in zip(texts, hashes):
+            if text_hash in vectors:
+                hits += 1
+            else:
+                misses[text_hash] = text
+        with self._lock:
+            self.stats["requested"] += len(texts)
+            self.stats["cache_hits"] += hits
+
+        if misses:
+            futures = self._enqueue(misses, persist)
+            self._wait(futures, flush_now=not persist)
+            for text_hash, future in futures.items():
+                vectors[text_hash] = future.result()
+
+        return [vectors[text_hash] for text_hash in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query without waiting for a batch to fill."""
+        return self.embed([text], persist=False)[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["pending"] = len(self._pending)
+        stats["model"] = self.model_name
+        if self.cache is not None:
+            stats["cached_vectors"] = self.cache.count(self.model_name)
+        return stats
+
+    # ───────────────────────────── Batching ─────────────────────────────
+
+    def _enqueue(self, misses: Dict[str, str], persist: bool) -> Dict[str, Future]:
+        """Queue cache misses, joining requests already pending for the same text."""
+        futures: Dict[str, Future] = {}
+        batches: List[List[Tuple[str, str, Future, bool]]] = []
+        with self._lock:
+            if not self._pending:
+                self._oldest_pending = time.monotonic()
+            for text_hash, text in misses.items():
+                entry = self._pending.get(text_hash)
+                if entry is None:
+                    entry = (text, Future(), persist)
+                    self._pending[text_hash] = entry
+                futures[text_hash] = entry[1]
+                if len(self._pending) >= self.batch_size:
+                    batches.append(self._take_pending())
+        for batch in batches:
+            self._run_batch(batch)
+        return futures
+
+    def _take_pending(self) -> List[Tuple[str, str, Future, bool]]:
+        """Detach the pending queue. Caller holds ``_lock``."""
+        batch = [(text_hash, text, future, persist) for text_hash, (text, future, persist) in self._pending.items()]
+        self._pending = {}
+        self._oldest_pending = time.monotonic()
+        return batch
+
+    def _flush(self) -> None:
+        with self._lock:
+            batch = self._take_pending() if self._pending else []
+        for start in range(0, len(batch), self.batch_size):
+            self._run_batch(batch[start:start + self.batch_size])
+
+    def _wait(self, futures: Dict[str, Future], flush_now: bool) -> None:
+        """Block until ``futures`` resolve, flushing the queue once the wait limit passes."""
+        outstanding = {h: f for h, f in futures.items() if not f.done()}
+        while outstanding:
+            with self._lock:
+                queued = any(
+                    h in self._pending and self._pending[h][1] is f for h, f in outstanding.items()
+                )
+                deadline = self._oldest_pending + self.max_wait_s
+            if not queued:
+                # Another caller took these texts into a batch that is still running
+                wait(list(outstanding.values()))
+                return
+            timeout = 0.0 if flush_now else deadline - time.monotonic()
+            if timeout > 0:
+                wait(list(outstanding.values()), timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                self._flush()
+            outstanding = {h: f for h, f in outstanding.items() if not f.done()}
+
+    def _run_batch(self, batch: List[Tuple[str, str, Future, bool]]) -> None:
+        if not batch:
+            return
+        texts = [text for _, text, _, _ in batch]
+        start = time.perf_counter()
+        try:
+            vectors = self.model.embed_batch(texts)
+            if len(vectors) != len(texts):
+                raise RuntimeError(f"{self.model_name} returned {len(vectors)} vectors for {len(texts)} texts")
+        except Exception as exc:
+            logger.error(f"[EMBEDDING] {self.model_name} failed on a batch of {len(texts)}: {exc}")
+            for _, _, future, _ in batch:
+                future.set_exception(exc)
+            return
+        elapsed = time.perf_counter() - start
+
+        if self.cache is not None:
+            try:
+                self.cache.put_many(
+                    self.model_name,
+                    [(text_hash, vector) for (text_hash, _, _, persist), vector in zip(batch, vectors) if persist],
+                )
+            except Exception as exc:
+                logger.warning(f"[EMBEDDING] Failed to write {len(vectors)} vectors to the cache: {exc}")
+
+        with self._lock:
+            self.stats["embedded"] += len(texts)
+            self.stats["batches"] += 1
+            self.stats["model_seconds"] += elapsed
+        for (_, _, future, _), vector in zip(batch, vectors):
+            future.set_result(list(vector))
+
+
+# ───────────────────────────── Chroma helpers ─────────────────────────────
+
+
+def open_collection(
+    client: Any,
+    name: str,
+    service: EmbeddingService,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Tuple[Any, bool]:
+    """
+    Get or create a Chroma collection whose vectors come from ``service``.
+
+    Collections without a recorded model were embedded by Chroma's default
+    function. A collection embedded with a different model is dropped and
+    recreated empty.
+
+    Returns:
+        ``(collection, empty)`` where ``empty`` is True when the collection
+        was just created and every document must be (re-)added.
+    """
+    create_metadata = {**(metadata or {}), EMBEDDING_MODEL_KEY: service.model_name}
+    try:
+        collection = client.get_collection(name)
+    except Exception:
+        return client.create_collection(name=name, metadata=create_metadata), True
+
+    stored = (collection.metadata or {}).get(EMBEDDING_MODEL_KEY, ChromaDefaultEmbeddingModel.name)
+    if stored == service.model_name:
+        return collection, False
+
+    logger.info(f"[EMBEDDING] Rebuilding collection '{name}': embedded with {stored}, now using {service.model_name}")
+    client.delete_collection(name)
+    return client.create_collection(name=name, metadata=create_metadata), True
+
+
+_default_service: Optional[EmbeddingService] = None
+_default_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """The process-wide service configured in ``core.config``, created on first use."""
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            from core.config import (
+                EMBEDDING_BATCH_SIZE,
+                EMBEDDING_BATCH_WAIT_MS,
+                EMBEDDING_CACHE_PATH,
+                EMBEDDING_MODEL,
+            )
+
+            cache = EmbeddingCache(EMBEDDING_CACHE_PATH) if EMBEDDING_CACHE_PATH else None
+            _default_service = EmbeddingService(
+                create_embedding_model(EMBEDDING_MODEL),
+                cache,
+                batch_size=EMBEDDING_BATCH_SIZE,
+                max_wait_ms=EMBEDDING_BATCH_WAIT_MS,
+            )
+        return _default_service
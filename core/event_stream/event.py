@@ -67,7 +67,9 @@ class EventRecord:
     event: Event
     ts: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     repeat_count: int = 1
+    seq: int = 0  # Monotonically increasing per stream; assigned on append
     _cached_tokens: int | None = field(default=None, repr=False)
+    _cached_line: str | None = field(default=None, repr=False)
 
     def compact_line(self) -> str:
         t = self.ts.strftime("%H:%M:%S")
@@ -4,10 +4,17 @@ core.event_stream.event_stream
 
 The event stream maintains:
 - head_summary (str | None): a compact summary of older events
-- tail_events (List[EventRecord]): recent full-fidelity events
+- tail_events (Deque[EventRecord]): recent full-fidelity events (bounded)
+
+The rendered tail (one compact line per event) and its token total are
+maintained incrementally: log() appends one pre-rendered line, and
+summarization drops the rendered head with a single slice, so producing a
+prompt snapshot no longer costs O(stream) per event.
 
 APIs:
   log(kind, message, severity="INFO") -> int (event index)
+  subscribe(after_seq=None) -> EventSubscription  # push delivery of new events
+  events_since(seq) -> [(seq, Event)]              # cursor-style pull
   to_prompt_snapshot(max_events=60, include_summary=True) -> str
   summarize_if_needed()  # auto-rollup when thresholds exceeded
   summarize_by_rule()        # force summarization of oldest chunk
@@ -16,13 +23,16 @@ APIs:
 
 from __future__ import annotations
 import asyncio
+from collections import deque
 from datetime import datetime, timezone, timedelta
+from itertools import islice
 import re
 import time
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Deque, List, Optional, Tuple
 from core.event_stream.event import Event, EventRecord
-from core.llm import LLMInterface
+from core.event_stream.subscription import EventSubscription
+from core.llm import LLMInterface, usage_tags
 from core.prompt import EVENT_STREAM_SUMMARIZATION_PROMPT
 from sklearn.feature_extraction.text import TfidfVectorizer
 from core.logger import logger
@@ -32,6 +42,9 @@ import tiktoken
 
 SEVERITIES = ("DEBUG", "INFO", "WARN", "ERROR") # TODO duplicated declare in event and event stream
 MAX_EVENT_INLINE_CHARS = 200000
+# Hard cap on tail length, only reached when summarization cannot keep up
+# (e.g. no running event loop). Oldest events are dropped beyond it.
+MAX_TAIL_EVENTS = 5000
 
 # Token counting utility
 _tokenizer = None
@@ -50,6 +63,13 @@ def count_tokens(text: str) -> int:
     return len(_get_tokenizer().encode(text))
 
 
+def get_cached_line(rec: "EventRecord") -> str:
+    """Get the rendered compact line for an EventRecord, rendering it once."""
+    if rec._cached_line is None:
+        rec._cached_line = rec.compact_line()
+    return rec._cached_line
+
+
 def get_cached_token_count(rec: "EventRecord") -> int:
     """Get token count for an EventRecord, using cached value if available.
 
@@ -59,13 +79,14 @@ def get_cached_token_count(rec: "EventRecord") -> int:
     if rec._cached_tokens is None:
         # Cache miss - need to compute tokens (this is the slow path)
         start = time.perf_counter()
-        rec._cached_tokens = count_tokens(rec.compact_line())
+        line = get_cached_line(rec)
+        rec._cached_tokens = count_tokens(line)
         duration_ms = (time.perf_counter() - start) * 1000
         profiler.record(
             "token_count_compute",
             duration_ms,
             OperationCategory.OTHER,
-            {"text_length": len(rec.compact_line()), "token_count": rec._cached_tokens},
+            {"text_length": len(line), "token_count": rec._cached_tokens},
         )
     return rec._cached_tokens
 
@@ -85,10 +106,12 @@ class EventStream:
         summarize_at_tokens: int = 8000,
         tail_keep_after_summarize_tokens: int = 4000,
         temp_dir: Path | None = None,
+        max_tail_events: int = MAX_TAIL_EVENTS,
     ) -> None:
         self.head_summary: Optional[str] = None
         self.llm = llm
-        self.tail_events: List[EventRecord] = []
+        self.tail_events: Deque[EventRecord] = deque()
+        self.max_tail_events = max_tail_events
         self.summarize_at_tokens = summarize_at_tokens
         self.tail_keep_after_summarize_tokens = tail_keep_after_summarize_tokens
         self.temp_dir = temp_dir
@@ -105,11 +128,18 @@ class EventStream:
         self._summarize_task: asyncio.Task | None = None
         self._lock = threading.RLock()
         self._total_tokens: int = 0
+        # "\n".join of the compact lines of tail_events, kept in sync on every change
+        self._tail_text: str = ""
 
         # Session cache tracking: maps call_type -> event_index of last synced event
         # Used to track which events have been sent to each session cache
         self._session_sync_points: dict[str, int] = {}
 
+        # Sequence numbers never reset (not even on clear()), so a consumer's
+        # cursor stays valid for the lifetime of the stream
+        self._last_seq: int = 0
+        self._subscribers: List[EventSubscription] = []
+
     # ────────────────────────────── logging ──────────────────────────────
 
     def log(
@@ -147,10 +177,47 @@ class EventStream:
         ev = Event(message=msg, kind=kind.strip(), severity=severity, display_message=display)
         rec = EventRecord(event=ev)
 
+        with self._lock:
+            self._append_record(rec)
+            index = len(self.tail_events) - 1
+        self.summarize_if_needed()
+        return index
+
+    def _append_record(self, rec: EventRecord) -> None:
+        """Append ``rec`` and its pre-rendered line; caller holds the lock."""
+        line = get_cached_line(rec)
+        self._last_seq += 1
+        rec.seq = self._last_seq
         self.tail_events.append(rec)
         self._total_tokens += get_cached_token_count(rec)
-        self.summarize_if_needed()
-        return len(self.tail_events) - 1
+        self._tail_text = f"{self._tail_text}\n{line}" if self._tail_text else line
+
+        if self._subscribers:
+            self._subscribers = [sub for sub in self._subscribers if sub._push(rec.seq, rec.event)]
+
+        if len(self.tail_events) > self.max_tail_events:
+            overflow = len(self.tail_events) - self.max_tail_events
+            logger.warning(f"[EventStream] Tail exceeded {self.max_tail_events} events; dropping {overflow} oldest")
+            self._drop_head(overflow)
+            self._session_sync_points.clear()
+
+    def _drop_head(self, count: int) -> None:
+        """Remove the oldest ``count`` events and their rendered lines; caller holds the lock."""
+        count = min(count, len(self.tail_events))
+        if count <= 0:
+            return
+        if count == len(self.tail_events):
+            self.tail_events.clear()
+            self._total_tokens = 0
+            self._tail_text = ""
+            return
+
+        removed_chars = 0
+        for _ in range(count):
+            rec = self.tail_events.popleft()
+            self._total_tokens -= get_cached_token_count(rec)
+            removed_chars += len(get_cached_line(rec)) + 1  # line + "\n"
+        self._tail_text = self._tail_text[removed_chars:]
 
     # Convenience wrappers for common event families (optional use)
     def log_action_start(self, name: str) -> int:
@@ -274,20 +341,21 @@ class EventStream:
                 # Nothing old enough to summarize
                 return
 
-            chunk = list(self.tail_events[:cutoff])
+            chunk = list(islice(self.tail_events, cutoff))
             first_ts = chunk[0].ts if chunk else None
             last_ts = chunk[-1].ts if chunk else None
             window = ""
             if first_ts and last_ts:
                 window = f"{first_ts.isoformat()} to {last_ts.isoformat()}"
 
-            compact_lines = "\n".join(r.compact_line() for r in chunk)
+            compact_lines = "\n".join(get_cached_line(r) for r in chunk)
             previous_summary = self.head_summary or "(none)"
 
         prompt = EVENT_STREAM_SUMMARIZATION_PROMPT.format(window=window, previous_summary=previous_summary, compact_lines=compact_lines)
 
         try:
-            llm_output = await self.llm.generate_response_async(user_prompt=prompt)
+            with usage_tags(call_type="summarization"):
+                llm_output = await self.llm.generate_response_async(user_prompt=prompt)
             new_summary = (llm_output or "").strip()
             # timestamp can be added here. For example: (from 'start time' to 'end time')
 
@@ -297,16 +365,11 @@ class EventStream:
                 logger.warning("[EVENT STREAM SUMMARIZATION] LLM returned empty summary; not updating.")
                 return
 
-            # Apply + prune under lock
+            # Apply + prune under lock: swap the head summary and drop the
+            # summarized events (and their rendered lines) in one step
             with self._lock:
                 self.head_summary = new_summary
-                # Calculate tokens being removed (using cached values)
-                removed_tokens = sum(get_cached_token_count(r) for r in self.tail_events[:cutoff])
-                self._total_tokens -= removed_tokens
-                if cutoff >= len(self.tail_events):
-                    self.tail_events = []
-                else:
-                    self.tail_events = self.tail_events[cutoff:]
+                self._drop_head(cutoff)
 
                 # Reset all session sync points - event indices are now invalid
                 # Session caches will be recreated on next access
@@ -351,8 +414,9 @@ class EventStream:
         Build a compact, human-readable history for inclusion in LLM prompts.
 
         The snapshot optionally includes the accumulated ``head_summary`` and
-        then appends up to ``max_events`` of the most recent tail events in
-        their compact string form. An empty stream returns ``"(no events)"`` to
+        then appends the tail events in their compact string form. The tail is
+        rendered incrementally as events are logged, so this only concatenates
+        the pre-rendered pieces. An empty stream returns ``"(no events)"`` to
         make absence explicit.
 
         Args:
@@ -361,22 +425,86 @@ class EventStream:
         Returns:
             A newline-delimited string ready to embed in an LLM request.
         """
-        lines: List[str] = []
-        if include_summary and self.head_summary:
-            lines.append("Summary of folded event stream: \n" + self.head_summary)
+        with self._lock:
+            summary = self.head_summary if include_summary else None
+            tail_text = self._tail_text
 
-        recent = self.tail_events
-        if recent:
-            lines.append("Recent Event: ")
-            lines.extend(r.compact_line() for r in recent)
+        parts: List[str] = []
+        if summary:
+            parts.append("Summary of folded event stream: \n" + summary)
+        if tail_text:
+            parts.append("Recent Event: \n" + tail_text)
 
-        return "\n".join(lines) if lines else "(no events)"
+        return "\n".join(parts) if parts else "(no events)"
+
+    def get_token_count(self) -> int:
+        """Running token total of the tail events."""
+        return self._total_tokens
 
     # ─────────────────────────── util / export ───────────────────────────
 
     def as_list(self, limit: Optional[int] = None) -> List[Event]:
-        items = self.tail_events if limit is None else self.tail_events[-limit:]
-        return [r.event for r in items]
+        with self._lock:
+            start = 0 if limit is None else max(len(self.tail_events) - limit, 0)
+            return [r.event for r in islice(self.tail_events, start, None)]
+
+    # ───────────────────────── subscriptions ─────────────────────────
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the most recently logged event (0 if none)."""
+        return self._last_seq
+
+    def subscribe(
+        self,
+        *,
+        after_seq: Optional[int] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> EventSubscription:
+        """
+        Receive every event logged from now on, pushed onto an asyncio queue.
+
+        Must be called from (or given) the event loop that will consume the
+        subscription; events logged on other threads are handed over
+        thread-safely.
+
+        Args:
+            after_seq: Also replay tail events with a sequence number greater
+                than this. ``None`` replays the whole current tail; pass
+                ``last_seq`` to receive only future events.
+            loop: Consumer loop; defaults to the running loop.
+
+        Returns:
+            An :class:`EventSubscription`; call ``close()`` to unsubscribe.
+        """
+        subscription = EventSubscription(loop or asyncio.get_running_loop(), on_close=self._unsubscribe)
+        with self._lock:
+            for seq, event in self._events_after(after_seq or 0):
+                subscription._push(seq, event)
+            self._subscribers.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: EventSubscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def events_since(self, seq: int) -> List[Tuple[int, Event]]:
+        """
+        Return ``(seq, Event)`` pairs for tail events logged after ``seq``.
+
+        Events already folded into the head summary are no longer available;
+        the result then starts at the oldest remaining tail event.
+        """
+        with self._lock:
+            return self._events_after(seq)
+
+    def _events_after(self, seq: int) -> List[Tuple[int, Event]]:
+        # Tail sequence numbers are contiguous, so the start index is O(1).
+        if not self.tail_events or seq >= self._last_seq:
+            return []
+        start = max(seq - self.tail_events[0].seq + 1, 0)
+        return [(r.seq, r.event) for r in islice(self.tail_events, start, None)]
 
     def clear(self) -> None:
         """
@@ -385,10 +513,12 @@ class EventStream:
         This is typically used in tests or when reusing a session identifier for
         a new task to ensure no stale context leaks between runs.
         """
-        self.head_summary = None
-        self.tail_events.clear()
-        self._total_tokens = 0
-        self._session_sync_points.clear()
+        with self._lock:
+            self.head_summary = None
+            self.tail_events.clear()
+            self._total_tokens = 0
+            self._tail_text = ""
+            self._session_sync_points.clear()
 
     # ───────────────────── Session Cache Delta Tracking ─────────────────────
 
@@ -433,12 +563,12 @@ class EventStream:
                 return "", False
 
             # Get events since sync point
-            delta_events = self.tail_events[sync_point:]
+            delta_events = list(islice(self.tail_events, sync_point, None))
 
             if not delta_events:
                 return "", False
 
-            lines = [r.compact_line() for r in delta_events]
+            lines = [get_cached_line(r) for r in delta_events]
             return "\n".join(lines), True
 
     def reset_session_sync(self, call_type: str) -> None:
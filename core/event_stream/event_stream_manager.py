@@ -19,6 +19,7 @@ from typing import Optional
 import threading
 
 from core.event_stream.event_stream import EventStream
+from core.event_stream.subscription import EventSubscription
 from core.llm import LLMInterface
 from core.logger import logger
 
@@ -74,6 +75,10 @@ class EventStreamManager:
         """Remove all event streams."""
         self.event_stream.clear()
 
+    def subscribe(self, *, after_seq: Optional[int] = None) -> EventSubscription:
+        """Subscribe to events pushed from the stream (see ``EventStream.subscribe``)."""
+        return self.event_stream.subscribe(after_seq=after_seq)
+
     # ───────────────────────── file-based logging ─────────────────────────
 
     def set_skip_unprocessed_logging(self, skip: bool) -> None:
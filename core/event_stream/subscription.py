@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+core.event_stream.subscription
+
+Push-based delivery of new events to front-ends.
+
+Every event appended to an ``EventStream`` carries a monotonically
+increasing sequence number. A subscriber receives ``(seq, Event)`` pairs on
+an asyncio queue bound to its own event loop, so events logged from any
+thread (the agent runs ``react()`` in a worker thread with its own loop)
+are handed over with ``call_soon_threadsafe`` and never need polling or
+deduplication.
+
+Usage:
+    subscription = event_stream_manager.subscribe()
+    async for seq, event in subscription:
+        render(event)
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, Optional, Tuple
+
+from core.event_stream.event import Event
+
+
+class EventSubscription:
+    """A single consumer's queue of ``(seq, Event)`` pairs."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        on_close: Optional[Callable[["EventSubscription"], None]] = None,
+    ) -> None:
+        self._loop = loop
+        self._queue: asyncio.Queue[Tuple[int, Event]] = asyncio.Queue()
+        self._on_close = on_close
+        self.closed = False
+        # Sequence number of the last event handed to the consumer
+        self.last_seq = 0
+
+    def _push(self, seq: int, event: Event) -> bool:
+        """Deliver an event from any thread. Returns False once the subscriber is gone."""
+        if self.closed or self._loop.is_closed():
+            return False
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, (seq, event))
+        except RuntimeError:
+            # Loop closed between the check and the call
+            return False
+        return True
+
+    async def get(self) -> Tuple[int, Event]:
+        """Wait for the next event."""
+        seq, event = await self._queue.get()
+        self.last_seq = seq
+        return seq, event
+
+    def get_nowait(self) -> Optional[Tuple[int, Event]]:
+        """Return the next event if one is queued, else None."""
+        try:
+            seq, event = self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+        self.last_seq = seq
+        return seq, event
+
+    def pending(self) -> int:
+        """Number of events queued but not yet consumed."""
+        return self._queue.qsize()
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._on_close is not None:
+            self._on_close(self)
+
+    def __aiter__(self) -> "EventSubscription":
+        return self
+
+    async def __anext__(self) -> Tuple[int, Event]:
+        if self.closed:
+            raise StopAsyncIteration
+        return await self.get()
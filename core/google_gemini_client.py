@@ -11,7 +11,7 @@ from __future__ import annotations
 import base64
 import logging
 import os
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import requests
 
@@ -85,28 +85,7 @@ class GeminiClient:
             - 90% discount on cached tokens for Gemini 2.5 models
             - Returns cachedContentTokenCount in usageMetadata when cache is used
         """
-        contents = [
-            {
-                "role": "user",
-                "parts": [{"text": prompt}],
-            }
-        ]
-
-        generation_config: Dict[str, Any] = {}
-        if temperature is not None:
-            generation_config["temperature"] = temperature
-        if max_output_tokens is not None:
-            generation_config["maxOutputTokens"] = max_output_tokens
-        if json_mode:
-            generation_config["responseMimeType"] = "application/json"
-
-        payload: Dict[str, Any] = {"contents": contents}
-        if system_prompt:
-            payload["systemInstruction"] = {
-                "parts": [{"text": system_prompt}],
-            }
-        if generation_config:
-            payload["generationConfig"] = generation_config
+        payload = self._text_payload(prompt, system_prompt, temperature, max_output_tokens, json_mode)
 
         response = self._post_json(
             f"{_normalise_model_name(model)}:generateContent", payload
@@ -130,6 +109,26 @@ class GeminiClient:
             "cached_tokens": cached_tokens,
         }
 
+    def build_stream_request(
+        self,
+        model: str,
+        *,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_output_tokens: Optional[int] = None,
+        json_mode: bool = False,
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Build the URL, query params and payload of a streaming text request.
+
+        The request is sent by the async streaming layer (``core.llm.streaming``)
+        rather than this synchronous client.
+        """
+        url = self._endpoint(f"{_normalise_model_name(model)}:streamGenerateContent")
+        params = {"key": self._api_key, "alt": "sse"}
+        payload = self._text_payload(prompt, system_prompt, temperature, max_output_tokens, json_mode)
+        return url, params, payload
+
     def generate_multimodal(
         self,
         model: str,
@@ -404,6 +403,38 @@ class GeminiClient:
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
+    @staticmethod
+    def _text_payload(
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: Optional[float],
+        max_output_tokens: Optional[int],
+        json_mode: bool,
+    ) -> Dict[str, Any]:
+        contents = [
+            {
+                "role": "user",
+                "parts": [{"text": prompt}],
+            }
+        ]
+
+        generation_config: Dict[str, Any] = {}
+        if temperature is not None:
+            generation_config["temperature"] = temperature
+        if max_output_tokens is not None:
+            generation_config["maxOutputTokens"] = max_output_tokens
+        if json_mode:
+            generation_config["responseMimeType"] = "application/json"
+
+        payload: Dict[str, Any] = {"contents": contents}
+        if system_prompt:
+            payload["systemInstruction"] = {
+                "parts": [{"text": system_prompt}],
+            }
+        if generation_config:
+            payload["generationConfig"] = generation_config
+        return payload
+
     def _endpoint(self, path: str) -> str:
         return f"{self._api_base}/{self._api_version}/{path.lstrip('/')}"
 
@@ -0,0 +1,415 @@
+"""
+core.gui.container_agent
+
+Persistent helper process running inside the GUI container.
+
+Instead of one ``docker exec`` per screenshot/action (plus OS probing and an
+``.Xauthority`` touch each time), the host starts a single long-lived Python
+process in the container and talks to it over the attached stdio stream.
+
+Wire format: every frame is a 4-byte big-endian length followed by that many
+bytes. Requests are one JSON frame. Responses are one JSON frame, followed by
+a raw binary frame when the JSON header has ``"binary": true`` (used for PNG
+screenshots).
+
+The helper source is not installed in the image: the host starts a tiny
+bootstrap with ``python -c`` and sends the helper script as the first frame.
+
+A request is only replayed against a fresh helper when it never reached the
+old one, or when the op is read-only. Once an ``exec_action`` frame has been
+written, a failure is reported as :class:`ContainerAgentRequestLost` so the
+action (a click, a keystroke, a file write) is never run twice.
+"""
+
+import atexit
+import json
+import os
+import struct
+import subprocess
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+try:
+    from core.logger import logger
+except ImportError:
+    import logging
+    logger = logging.getLogger("ContainerAgent")
+
+
+class ContainerAgentError(RuntimeError):
+    """Raised when the in-container helper cannot be started or stops responding."""
+
+
+class ContainerAgentRequestLost(ContainerAgentError):
+    """
+    Raised when the helper died or timed out after a request was sent.
+
+    The request may already have taken effect inside the container, so it
+    must not be retried or run again through another path.
+    """
+
+
+# Seconds to wait for a response before the helper is considered hung.
+DEFAULT_REQUEST_TIMEOUT = 120.0
+
+# Ops that have no side effects worth protecting (or are safe to repeat), so
+# they may be resent to a fresh helper after the previous one died mid-request.
+_REPLAYABLE_OPS = frozenset({"os_info", "screenshot", "install"})
+
+
+# ==========================
+# Container runners
+# ==========================
+
+class DockerRunner:
+    """Builds ``docker exec -i`` command lines for a container."""
+
+    def command(
+        self, container_id: str, argv: List[str], env: Optional[Dict[str, str]] = None
+    ) -> Tuple[List[str], Optional[Dict[str, str]]]:
+        cmd = ["docker", "exec", "-i"]
+        for k, v in (env or {}).items():
+            cmd += ["-e", f"{k}={v}"]
+        return cmd + [container_id] + list(argv), None
+
+
+class LocalRunner:
+    """
+    Fake container runner that executes commands directly on the host.
+
+    Useful for tests and local development: point ``GUIHandler.runner`` at
+    an instance to exercise the full helper protocol without Docker.
+    """
+
+    def command(
+        self, container_id: str, argv: List[str], env: Optional[Dict[str, str]] = None
+    ) -> Tuple[List[str], Optional[Dict[str, str]]]:
+        return list(argv), ({**os.environ, **env} if env else None)
+
+
+# ==========================
+# Helper script (runs INSIDE the container)
+# ==========================
+
+# Reads exactly one frame from fd 0 with unbuffered os.read so no request
+# bytes are swallowed by a read-ahead buffer before the helper takes over.
+_BOOTSTRAP = (
+    "import os,struct\n"
+    "def _r(n):\n"
+    "    b=b''\n"
+    "    while len(b)<n:\n"
+    "        c=os.read(0,n-len(b))\n"
+    "        if not c: raise SystemExit(1)\n"
+    "        b+=c\n"
+    "    return b\n"
+    "exec(compile(_r(struct.unpack('>I',_r(4))[0]),'<gui-agent>','exec'))\n"
+)
+
+AGENT_SCRIPT = r'''
+import importlib, inspect, io, json, os, platform, struct, subprocess, sys, traceback
+
+# Keep private handles on the protocol streams, then point fd 0 at devnull
+# and fd 1 at stderr so actions (or their child processes) reading stdin or
+# printing cannot corrupt the frames.
+_proto_in = os.fdopen(os.dup(0), "rb")
+_proto_out = os.fdopen(os.dup(1), "wb")
+_devnull = os.open(os.devnull, os.O_RDONLY)
+os.dup2(_devnull, 0)
+os.dup2(2, 1)
+sys.stdin = open(os.devnull)
+sys.stdout = sys.stderr
+
+if os.name != "nt":
+    os.environ.setdefault("DISPLAY", ":1")
+    os.environ.setdefault("XAUTHORITY", "/config/.Xauthority")
+    try:
+        open(os.environ["XAUTHORITY"], "a").close()
+    except OSError:
+        pass
+
+
+def _read_frame():
+    header = _proto_in.read(4)
+    if len(header) < 4:
+        return None
+    (size,) = struct.unpack(">I", header)
+    return _proto_in.read(size)
+
+
+def _reply(obj, binary=None):
+    obj["binary"] = binary is not None
+    data = json.dumps(obj).encode("utf-8")
+    _proto_out.write(struct.pack(">I", len(data)) + data)
+    if binary is not None:
+        _proto_out.write(struct.pack(">I", len(binary)) + binary)
+    _proto_out.flush()
+
+
+def _os_info(req):
+    return {"ok": True, "system": platform.system().lower(), "python": sys.version.split()[0]}, None
+
+
+def _screenshot(req):
+    if os.name == "nt":
+        proc = subprocess.run(
+            ["powershell.exe", "-NoProfile", "-NonInteractive", "-Command", "-"],
+            input=req.get("powershell", "").encode(), capture_output=True,
+        )
+        if proc.returncode != 0:
+            return {"ok": False, "error": proc.stderr.decode(errors="replace").strip()}, None
+        return {"ok": True}, proc.stdout
+    try:
+        import mss
+        from PIL import Image
+    except ImportError:
+        return {"ok": False, "error": "missing_package"}, None
+    with mss.mss() as sct:
+        # Capture the full virtual desktop (monitor 0 is the entire virtual screen)
+        shot = sct.grab(sct.monitors[0])
+        img = Image.frombytes("RGB", shot.size, shot.rgb)
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+    return {"ok": True}, buf.getvalue()
+
+
+def _install(req):
+    proc = subprocess.run(
+        [sys.executable, "-m", "pip", "install", "--quiet"] + list(req.get("packages", [])),
+        capture_output=True,
+    )
+    importlib.invalidate_caches()
+    if proc.returncode != 0:
+        err = proc.stderr.decode(errors="replace").strip() or proc.stdout.decode(errors="replace").strip()
+        return {"ok": False, "error": err, "returncode": proc.returncode}, None
+    return {"ok": True}, None
+
+
+def _exec_action(req):
+    input_data = req.get("input_data") or {}
+    local_ns = {"input_data": input_data, "json": json, "inspect": inspect, "sys": sys, "os": os, "traceback": traceback}
+    pre_exec_keys = set(local_ns.keys())
+    try:
+        exec(req["code"], local_ns)
+        function_to_call = None
+        for key, value in local_ns.items():
+            if key not in pre_exec_keys and key != "__builtins__" and inspect.isfunction(value) and value.__module__ == local_ns.get("__name__", None):
+                function_to_call = value
+                break
+        if function_to_call is None:
+            return {"ok": True, "returncode": 1, "result": {"status": "error", "message": "No function definition found in action code."}}, None
+        result_dict = function_to_call(input_data)
+        if not isinstance(result_dict, dict):
+            result_dict = {"status": "success", "stdout": str(result_dict), "stderr": "", "note": "Action did not return a dict, wrapped output."}
+        # Round-trip through JSON so the host receives exactly what it would have parsed before.
+        return {"ok": True, "returncode": 0, "result": json.loads(json.dumps(result_dict, default=str))}, None
+    except Exception as e:
+        err = {"status": "error", "message": "Execution error: " + repr(str(e)), "stderr": traceback.format_exc()}
+        return {"ok": True, "returncode": 1, "result": err}, None
+
+
+_HANDLERS = {"os_info": _os_info, "screenshot": _screenshot, "install": _install, "exec_action": _exec_action}
+
+while True:
+    frame = _read_frame()
+    if frame is None:
+        break
+    try:
+        req = json.loads(frame.decode("utf-8"))
+        if req.get("op") == "shutdown":
+            _reply({"ok": True})
+            break
+        handler = _HANDLERS.get(req.get("op"))
+        if handler is None:
+            _reply({"ok": False, "error": "unknown op: " + str(req.get("op"))})
+            continue
+        response, binary = handler(req)
+        _reply(response, binary)
+    except Exception as e:
+        _reply({"ok": False, "error": "AGENT_ERROR: " + repr(e), "traceback": traceback.format_exc()})
+'''
+
+
+# ==========================
+# Host-side client
+# ==========================
+
+class ContainerAgent:
+    """Host-side handle on one helper process inside one container."""
+
+    def __init__(
+        self,
+        container_id: str,
+        os_type: str,
+        runner: Any,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ) -> None:
+        self.container_id = container_id
+        self.os_type = os_type
+        self.runner = runner
+        self.timeout = timeout
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._stderr_tail: Deque[str] = deque(maxlen=50)
+        self._timed_out = False
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    @property
+    def is_alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _start(self) -> None:
+        python = "python" if self.os_type == "windows" else "python3"
+        env = None
+        if self.os_type == "linux":
+            env = {"DISPLAY": ":1", "XAUTHORITY": "/config/.Xauthority"}
+        cmd, popen_env = self.runner.command(self.container_id, [python, "-u", "-c", _BOOTSTRAP], env)
+        try:
+            self._proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=popen_env,
+            )
+        except FileNotFoundError as e:
+            raise ContainerAgentError(f"Could not launch GUI helper: {e}") from e
+
+        # Drain stderr continuously so a chatty action can never block the helper.
+        threading.Thread(target=self._drain_stderr, args=(self._proc,), daemon=True).start()
+
+        script = AGENT_SCRIPT.encode("utf-8")
+        self._write(struct.pack(">I", len(script)) + script)
+        logger.debug(f"[GUI AGENT] Started helper in '{self.container_id}' ({self.os_type})")
+
+    def _drain_stderr(self, proc: subprocess.Popen) -> None:
+        for line in iter(proc.stderr.readline, b""):
+            self._stderr_tail.append(line.decode(errors="replace").rstrip())
+
+    def close(self) -> None:
+        with self._lock:
+            if self.is_alive:
+                try:
+                    self._send({"op": "shutdown"})
+                    self._proc.wait(timeout=5)
+                except Exception:
+                    self._proc.kill()
+            self._proc = None
+
+    # ------------------------------------------------------------------
+    # Framing
+    # ------------------------------------------------------------------
+    def _write(self, data: bytes) -> None:
+        try:
+            self._proc.stdin.write(data)
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise ContainerAgentError(f"GUI helper pipe closed: {e}") from e
+
+    def _read_frame(self) -> bytes:
+        header = self._proc.stdout.read(4)
+        if len(header) < 4:
+            if self._timed_out:
+                raise ContainerAgentRequestLost(f"GUI helper did not answer within {self.timeout:g}s.")
+            tail = "\n".join(self._stderr_tail)
+            raise ContainerAgentRequestLost(f"GUI helper exited unexpectedly. Stderr: {tail}")
+        (size,) = struct.unpack(">I", header)
+        data = self._proc.stdout.read(size)
+        if len(data) < size:
+            raise ContainerAgentRequestLost("GUI helper returned a truncated frame.")
+        return data
+
+    def _send(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        """
+        Write one request frame and read its response.
+
+        Failures before the frame is written raise :class:`ContainerAgentError`;
+        failures after it raise :class:`ContainerAgentRequestLost`. A watchdog
+        kills the helper if no response arrives within ``timeout`` seconds,
+        which unblocks the pending read.
+        """
+        data = json.dumps(payload, default=str).encode("utf-8")
+        self._write(struct.pack(">I", len(data)) + data)
+
+        proc = self._proc
+        self._timed_out = False
+
+        def _expire() -> None:
+            self._timed_out = True
+            proc.kill()
+
+        watchdog = threading.Timer(self.timeout if timeout is None else timeout, _expire)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            response = json.loads(self._read_frame().decode("utf-8"))
+            binary = self._read_frame() if response.get("binary") else None
+        except ValueError as e:
+            raise ContainerAgentRequestLost(f"GUI helper returned an invalid frame: {e}") from e
+        finally:
+            watchdog.cancel()
+        return response, binary
+
+    def request(
+        self, op: str, *, timeout: Optional[float] = None, **params: Any
+    ) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        """
+        Send one request and wait for its response.
+
+        The helper is (re)started on demand. If the request frame could not be
+        written, it is retried once against a fresh process. If the helper
+        dies or times out after the frame was written, only read-only ops are
+        retried; anything else raises :class:`ContainerAgentRequestLost`.
+        """
+        payload = {"op": op, **params}
+        with self._lock:
+            for attempt in range(2):
+                if not self.is_alive:
+                    self._start()
+                try:
+                    return self._send(payload, timeout)
+                except ContainerAgentError as e:
+                    self._discard()
+                    if attempt == 1:
+                        raise
+                    if isinstance(e, ContainerAgentRequestLost) and op not in _REPLAYABLE_OPS:
+                        raise
+        raise ContainerAgentError("unreachable")
+
+    def _discard(self) -> None:
+        """Kill the current helper; the next request starts a new one."""
+        if self._proc is not None:
+            self._proc.kill()
+        self._proc = None
+
+
+# One helper per (runner, container) in this process. Sandboxed GUI actions
+# run in ProcessPoolExecutor workers, which each get their own helper.
+_agents: Dict[Tuple[int, str], ContainerAgent] = {}
+_agents_lock = threading.Lock()
+
+
+def get_container_agent(container_id: str, os_type: str, runner: Any) -> ContainerAgent:
+    """Return the cached helper for ``container_id``, creating it lazily."""
+    key = (id(runner), container_id)
+    with _agents_lock:
+        agent = _agents.get(key)
+        if agent is None or agent.os_type != os_type:
+            agent = ContainerAgent(container_id, os_type, runner)
+            _agents[key] = agent
+        return agent
+
+
+def close_all_agents() -> None:
+    """Shut down every helper started by this process."""
+    with _agents_lock:
+        agents = list(_agents.values())
+        _agents.clear()
+    for agent in agents:
+        agent.close()
+
+
+# Sandboxed action workers never run the agent's shutdown path.
+atexit.register(close_all_agents)
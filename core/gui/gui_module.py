@@ -17,7 +17,7 @@ from core.action.action_library import ActionLibrary
 from core.action.action_router import ActionRouter
 from core.context_engine import ContextEngine
 from core.event_stream.event_stream_manager import EventStreamManager
-from core.llm import LLMInterface, LLMCallType
+from core.llm import LLMInterface, LLMCallType, usage_tags
 from core.logger import logger
 from decorators.profiler import profile, OperationCategory
 
@@ -505,10 +505,12 @@ class GUIModule:
 
         # Attempt the LLM call and parsing up to (retries + 1) times
         for attempt in range(retries + 1):            
-            response = await self.llm.generate_response_async(
-                system_prompt=system_prompt,
-                user_prompt=prompt,
-            )
+            with usage_tags(call_type=LLMCallType.GUI_REASONING):
+                response = await self.llm.generate_response_async(
+                    system_prompt=system_prompt,
+                    user_prompt=prompt,
+                    use_cache=attempt == 0,
+                )
 
             try:
                 # Parse and validate the structured JSON response
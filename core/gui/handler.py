@@ -8,6 +8,14 @@ if TYPE_CHECKING:
     from core.gui.gui_module import GUIModule
     
 from core.state.agent_state import STATE
+from core.gui.container_agent import (
+    ContainerAgent,
+    ContainerAgentError,
+    ContainerAgentRequestLost,
+    DockerRunner,
+    close_all_agents,
+    get_container_agent,
+)
 
 # Adjust import path as needed for your project structure
 try:
@@ -21,6 +29,11 @@ class GUIHandler:
     """
     Static handler for interacting with VM/Container GUIs via agent injection.
     Supports retrieving screenshots (bytes) and executing actions (dict).
+
+    Screenshots and actions go through a persistent helper process inside the
+    container (see :mod:`core.gui.container_agent`), so a step costs one
+    round-trip instead of several ``docker exec`` spawns. If the helper
+    cannot be started, the per-call ``docker exec`` path is used instead.
     """
 
     # Class attribute that can be set externally to avoid circular dependency
@@ -29,6 +42,16 @@ class GUIHandler:
     # Default container name (can be overridden per instance)
     TARGET_CONTAINER = "simple-agent-desktop"
 
+    # Builds the command lines used to reach the container. Swap for
+    # container_agent.LocalRunner to run everything on the host (tests/dev).
+    runner = DockerRunner()
+
+    # Detected OS per container id; probing costs one or two docker execs.
+    _os_cache: Dict[str, str] = {}
+
+    # pip inside the container can take much longer than a screenshot or click.
+    _INSTALL_TIMEOUT = 600.0
+
     # Name of the Python packages required for Linux screen capture
     _LINUX_REQUIRED_PKG = "mss Pillow"
     
@@ -100,14 +123,18 @@ try {
         """
         logger.debug(f"[GUIHandler] Initiating screen capture for '{container_id}' (debug={debug})...")
         os_type = cls._detect_os(container_id)
-
-        if os_type == "linux":
-            img_bytes = cls._get_linux_screen_with_auto_install(container_id)
-        elif os_type == "windows":
-            img_bytes = cls._get_windows_screen(container_id)
-        else:
+        if os_type not in ("linux", "windows"):
             raise RuntimeError(f"Could not determine OS type for container '{container_id}'")
 
+        try:
+            img_bytes = cls._get_screen_via_agent(container_id, os_type)
+        except ContainerAgentError as e:
+            logger.warning(f"[GUIHandler] GUI helper unavailable ({e}); falling back to docker exec.")
+            if os_type == "linux":
+                img_bytes = cls._get_linux_screen_with_auto_install(container_id)
+            else:
+                img_bytes = cls._get_windows_screen(container_id)
+
         if debug:
             try:
                 timestamp = int(time.time())
@@ -135,7 +162,78 @@ try {
             }
 
         os_type = cls._detect_os(container_id)
-        
+        if os_type not in ("linux", "windows"):
+            raise RuntimeError(f"Unknown OS Type: {os_type}")
+
+        try:
+            response, _ = cls._agent(container_id, os_type).request(
+                "exec_action", code=action_code, input_data=input_data
+            )
+        except ContainerAgentRequestLost as e:
+            # The action may already have run; running it again could repeat
+            # a click, keystroke or file write.
+            logger.error(f"[GUIHandler] GUI helper failed while running the action: {e}")
+            return {
+                "status": "error",
+                "message": f"GUI helper failed while running the action; it was not retried. {e}",
+                "returncode": -1,
+            }
+        except ContainerAgentError as e:
+            logger.warning(f"[GUIHandler] GUI helper unavailable ({e}); falling back to docker exec.")
+            return cls._execute_action_via_exec(container_id, os_type, action_code, input_data)
+
+        if not response.get("ok"):
+            return {
+                "status": "error",
+                "message": response.get("error", "GUI helper request failed."),
+                "stderr": response.get("traceback", ""),
+                "returncode": -1,
+            }
+        return cls._finalize_action_result(response.get("result") or {}, "", response.get("returncode", 0))
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Stop the persistent GUI helpers started by this process."""
+        close_all_agents()
+
+    # ==========================
+    # Persistent helper
+    # ==========================
+
+    @classmethod
+    def _agent(cls, container_id: str, os_type: str) -> ContainerAgent:
+        return get_container_agent(container_id, os_type, cls.runner)
+
+    @classmethod
+    def _get_screen_via_agent(cls, container_id: str, os_type: str) -> bytes:
+        """Capture a screenshot through the helper, installing capture packages on demand."""
+        agent = cls._agent(container_id, os_type)
+        response, png = agent.request("screenshot", powershell=cls._WINDOWS_SCREENSHOT_PAYLOAD)
+
+        if not response.get("ok") and response.get("error") == "missing_package":
+            logger.debug(f"[GUIHandler] Missing package(s): '{cls._LINUX_REQUIRED_PKG}'. Installing...")
+            installed, _ = agent.request(
+                "install", timeout=cls._INSTALL_TIMEOUT, packages=cls._LINUX_REQUIRED_PKG.split()
+            )
+            if not installed.get("ok"):
+                raise RuntimeError(
+                    f"Failed to install '{cls._LINUX_REQUIRED_PKG}'. "
+                    f"Exit {installed.get('returncode')}. Error: {installed.get('error')}"
+                )
+            logger.debug("[GUIHandler] Retrying capture after installation...")
+            response, png = agent.request("screenshot", powershell=cls._WINDOWS_SCREENSHOT_PAYLOAD)
+
+        if not response.get("ok"):
+            raise RuntimeError(f"Screenshot failed. Stderr: {response.get('error', '')}")
+        return cls._validate_screenshot_output(png or b"", b"", 0)
+
+    # ==========================
+    # Per-call docker exec fallback
+    # ==========================
+
+    @classmethod
+    def _execute_action_via_exec(cls, container_id: str, os_type: str, action_code: str, input_data: dict) -> Dict[str, Any]:
+        """Run one action with a dedicated ``docker exec`` (used when the helper is unavailable)."""
         # We wrap the raw action code in a script that handles data injection,
         # execution, and JSON serialization of results.
         wrapper_script = cls._generate_python_action_wrapper(action_code, input_data)
@@ -143,11 +241,9 @@ try {
         if os_type == "linux":
             # Assume 'python3' is available on Linux containers
             python_executable = ["python3"]
-        elif os_type == "windows":
+        else:
             # Assume 'python' is in the PATH on Windows containers. adjust if needed.
             python_executable = ["python"]
-        else:
-            raise RuntimeError(f"Unknown OS Type: {os_type}")
 
         logger.debug(f"[GUIHandler] Running action via {python_executable[0]} on {os_type}...")
 
@@ -341,7 +437,12 @@ except Exception as e:
                 "returncode": code
             }
 
-        # 2. If the container exited with an error code, ensure the dict indicates error.
+        return cls._finalize_action_result(result_dict, stderr_str, code)
+
+    @classmethod
+    def _finalize_action_result(cls, result_dict: Dict[str, Any], stderr_str: str, code: int) -> Dict[str, Any]:
+        """Mark non-zero exits as errors and attach the return code."""
+        # If the container exited with an error code, ensure the dict indicates error.
         # The wrapper script usually handles this, but this is a fallback safety check.
         if code != 0:
             logger.warning(f"Action container exited with non-zero code {code}.")
@@ -351,7 +452,7 @@ except Exception as e:
                  result_dict["message"] = result_dict.get("message", f"Process exited with code {code}")
                  result_dict["stderr"] = (result_dict.get("stderr", "") + "\n" + stderr_str).strip()
 
-        # 3. Ensure returncode is included in the final result
+        # Ensure returncode is included in the final result
         result_dict["returncode"] = code
         return result_dict
 
@@ -377,17 +478,14 @@ except Exception as e:
     def _run_docker_exec(cls, container_id: str, shell_cmd: list, stdin_data: Optional[bytes] = None, env: Optional[Dict[str, str]] = None) -> Tuple[bytes, bytes, int]:
         """Helper to run docker exec piping data in and out."""
         try:
-            cmd = ["docker", "exec", "-i"]
-            if env:
-                for k, v in env.items():
-                    cmd += ["-e", f"{k}={v}"]
-            cmd += [container_id] + shell_cmd
+            cmd, popen_env = cls.runner.command(container_id, shell_cmd, env)
             # logger.debug(f"Executing command: {' '.join(cmd)}") # Optional verbose logging
             process = subprocess.Popen(
                 cmd,
                 stdin=subprocess.PIPE if stdin_data else None,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+                stderr=subprocess.PIPE,
+                env=popen_env,
             )
             stdout, stderr = process.communicate(input=stdin_data)
             return stdout, stderr, process.returncode
@@ -396,7 +494,21 @@ except Exception as e:
 
     @classmethod
     def _detect_os(cls, container_id: str) -> str:
-        """Probes container to guess OS type."""
+        """Probes container to guess OS type (cached per container once detected)."""
+        cached = cls._os_cache.get(container_id)
+        if cached:
+            return cached
+        os_type = cls._probe_os(container_id)
+        if os_type is None:
+            # Both probes failed (possibly a transient docker exec error); guess
+            # without caching so the next call probes again
+            logger.warning(f"Could not detect OS for {container_id}, defaulting to Linux based on previous examples.")
+            return "linux"
+        cls._os_cache[container_id] = os_type
+        return os_type
+
+    @classmethod
+    def _probe_os(cls, container_id: str) -> Optional[str]:
         # Try Linux
         _, _, code_linux = cls._run_docker_exec(container_id, ["/bin/sh", "-c", "uname"])
         if code_linux == 0: return "linux"
@@ -404,10 +516,8 @@ except Exception as e:
         # Try Windows
         _, _, code_win = cls._run_docker_exec(container_id, ["cmd.exe", "/c", "ver"])
         if code_win == 0: return "windows"
-        
-        # Fallback/Testing assumption (Remove in production if detection is robust)
-        logger.warning(f"Could not detect OS for {container_id}, defaulting to Linux based on previous examples.")
-        return "linux" 
+
+        return None
 
 # ==========================================
 # Example Usage (Testing the fix)
@@ -0,0 +1,119 @@
+"""
+Tests for the persistent GUI helper protocol.
+
+The helper runs on the host through ``LocalRunner``, so no container is
+needed. Actions append to a marker file to count how often they ran.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+
+from core.gui.container_agent import (  # noqa: E402
+    ContainerAgent,
+    ContainerAgentError,
+    ContainerAgentRequestLost,
+    LocalRunner,
+)
+
+COUNTING_ACTION = """
+def counting_action(input_data):
+    with open(input_data["marker"], "a") as f:
+        f.write("x")
+    return {"status": "success", "value": input_data["value"] * 2}
+"""
+
+DYING_ACTION = """
+def dying_action(input_data):
+    with open(input_data["marker"], "a") as f:
+        f.write("x")
+    os._exit(3)
+"""
+
+HANGING_ACTION = """
+def hanging_action(input_data):
+    import time
+    time.sleep(30)
+    return {"status": "success"}
+"""
+
+
+class HostPythonRunner(LocalRunner):
+    """LocalRunner that swaps the container's ``python3`` for ``python``."""
+
+    def __init__(self, python=sys.executable):
+        self.python = python
+
+    def command(self, container_id, argv, env=None):
+        return super().command(container_id, [self.python] + list(argv[1:]), env)
+
+
+@pytest.fixture
+def agent():
+    agent = ContainerAgent("local", "linux", HostPythonRunner(), timeout=10)
+    yield agent
+    agent.close()
+
+
+def test_exec_action_round_trip(agent, tmp_path):
+    marker = tmp_path / "marker"
+    response, binary = agent.request(
+        "exec_action", code=COUNTING_ACTION, input_data={"marker": str(marker), "value": 21}
+    )
+    assert binary is None
+    assert response["ok"] and response["returncode"] == 0
+    assert response["result"] == {"status": "success", "value": 42}
+    assert marker.read_text() == "x"
+
+
+def test_helper_is_reused_between_requests(agent, tmp_path):
+    marker = tmp_path / "marker"
+    agent.request("exec_action", code=COUNTING_ACTION, input_data={"marker": str(marker), "value": 1})
+    pid = agent._proc.pid
+    agent.request("exec_action", code=COUNTING_ACTION, input_data={"marker": str(marker), "value": 2})
+    assert agent._proc.pid == pid
+    assert marker.read_text() == "xx"
+
+
+def test_unknown_op_reports_error(agent):
+    response, _ = agent.request("no_such_op")
+    assert response["ok"] is False
+    assert "unknown op" in response["error"]
+
+
+def test_helper_dying_mid_action_is_not_retried(agent, tmp_path):
+    marker = tmp_path / "marker"
+    with pytest.raises(ContainerAgentRequestLost):
+        agent.request("exec_action", code=DYING_ACTION, input_data={"marker": str(marker)})
+    assert marker.read_text() == "x"
+    assert not agent.is_alive
+
+    # The next request starts a fresh helper.
+    response, _ = agent.request(
+        "exec_action", code=COUNTING_ACTION, input_data={"marker": str(marker), "value": 1}
+    )
+    assert response["result"]["status"] == "success"
+    assert marker.read_text() == "xx"
+
+
+def test_replayable_op_is_retried_after_helper_death(agent):
+    agent.request("os_info")
+    agent._proc.kill()
+    agent._proc.wait()
+    response, _ = agent.request("os_info")
+    assert response["ok"] is True
+
+
+def test_hung_action_times_out(agent):
+    with pytest.raises(ContainerAgentRequestLost, match="did not answer"):
+        agent.request("exec_action", timeout=0.5, code=HANGING_ACTION, input_data={})
+    assert not agent.is_alive
+
+
+def test_start_failure_is_a_plain_agent_error():
+    agent = ContainerAgent("local", "linux", HostPythonRunner("/nonexistent/python3"))
+    with pytest.raises(ContainerAgentError) as excinfo:
+        agent.request("exec_action", code=COUNTING_ACTION, input_data={})
+    assert not isinstance(excinfo.value, ContainerAgentRequestLost)
@@ -0,0 +1,45 @@
+"""Tests for GUIHandler's per-container OS detection cache."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+
+from core.gui.handler import GUIHandler  # noqa: E402
+
+
+@pytest.fixture
+def docker(monkeypatch):
+    """Scripted ``docker exec`` results: the probe command's name -> return code."""
+    codes = {}
+    calls = []
+
+    def run(container_id, command, *args, **kwargs):
+        calls.append(command[0])
+        return b"", b"", codes.get(command[0], 1)
+
+    monkeypatch.setattr(GUIHandler, "_run_docker_exec", staticmethod(run))
+    monkeypatch.setattr(GUIHandler, "_os_cache", {})
+    return codes, calls
+
+
+def test_detected_os_is_cached(docker):
+    codes, calls = docker
+    codes["cmd.exe"] = 0
+
+    assert GUIHandler._detect_os("box") == "windows"
+    assert GUIHandler._detect_os("box") == "windows"
+    assert calls == ["/bin/sh", "cmd.exe"]
+
+
+def test_failed_probe_falls_back_without_pinning_the_container(docker):
+    codes, calls = docker
+
+    # docker exec fails transiently for both probes
+    assert GUIHandler._detect_os("box") == "linux"
+    assert GUIHandler._os_cache == {}
+
+    codes["cmd.exe"] = 0
+    assert GUIHandler._detect_os("box") == "windows"
+    assert GUIHandler._os_cache == {"box": "windows"}
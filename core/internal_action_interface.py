@@ -5,8 +5,9 @@ This interface contains all the agent actions calling to the agent
 framework internal functions.
 """
 
+import asyncio
 from typing import Dict, Any, Optional, List, TYPE_CHECKING
-from core.llm import LLMInterface, LLMCallType
+from core.llm import LLMInterface, LLMCallType, usage_tags
 from core.vlm_interface import VLMInterface
 from core.task.task_manager import TaskManager
 from core.task.task import Task
@@ -15,7 +16,7 @@ from core.state.agent_state import STATE
 from datetime import datetime
 from core.logger import logger
 from pathlib import Path
-from core.config import AGENT_WORKSPACE_ROOT
+from core.config import AGENT_WORKSPACE_ROOT, SPECULATIVE_ACTION_SELECTION
 from core.gui.gui_module import GUI_MODE_ACTIONS
 from core.memory import MemoryManager
 import mss, mss.tools, os
@@ -219,11 +220,17 @@ class InternalActionInterface:
         cls.state_manager.event_stream_manager.clear_all()
         logger.info(f"[TASK] Cleared event stream for new task: {task_name}")
 
-        # Select skills and action sets in a single LLM call (optimized)
-        # Skills are selected first, then action sets with knowledge of skill recommendations
-        selected_skills, all_action_sets = await cls._select_skills_and_action_sets_via_llm(
-            task_name, task_description
-        )
+        if SPECULATIVE_ACTION_SELECTION:
+            # Two smaller selection calls in parallel instead of one combined call
+            selected_skills, all_action_sets = await cls._select_skills_and_action_sets_in_parallel(
+                task_name, task_description
+            )
+        else:
+            # Select skills and action sets in a single LLM call (optimized)
+            # Skills are selected first, then action sets with knowledge of skill recommendations
+            selected_skills, all_action_sets = await cls._select_skills_and_action_sets_via_llm(
+                task_name, task_description
+            )
         logger.info(f"[TASK] Auto-selected skills for '{task_name}': {selected_skills}")
         logger.info(f"[TASK] Final action sets: {all_action_sets}")
 
@@ -301,10 +308,11 @@ class InternalActionInterface:
             )
 
             # Step 3: Call LLM asynchronously to avoid blocking TUI
-            response = await cls.llm_interface.generate_response_async(
-                user_prompt=prompt,
-                system_prompt="You are a helpful assistant that selects action sets for tasks. Return only valid JSON.",
-            )
+            with usage_tags(call_type="action_set_selection"):
+                response = await cls.llm_interface.generate_response_async(
+                    user_prompt=prompt,
+                    system_prompt="You are a helpful assistant that selects action sets for tasks. Return only valid JSON.",
+                )
 
             # Step 4: Parse the JSON response
             # Clean up the response (remove markdown code blocks if present)
@@ -389,10 +397,11 @@ class InternalActionInterface:
             )
 
             # Call LLM asynchronously to avoid blocking TUI
-            response = await cls.llm_interface.generate_response_async(
-                user_prompt=prompt,
-                system_prompt="You are a helpful assistant that selects skills for tasks. Return only valid JSON.",
-            )
+            with usage_tags(call_type="skill_selection"):
+                response = await cls.llm_interface.generate_response_async(
+                    user_prompt=prompt,
+                    system_prompt="You are a helpful assistant that selects skills for tasks. Return only valid JSON.",
+                )
 
             # Parse response (clean up markdown if present)
             response = response.strip()
@@ -522,10 +531,11 @@ class InternalActionInterface:
             )
 
             # Call LLM asynchronously to avoid blocking TUI
-            response = await cls.llm_interface.generate_response_async(
-                user_prompt=prompt,
-                system_prompt="You are a helpful assistant that selects skills and action sets for tasks. Return only valid JSON.",
-            )
+            with usage_tags(call_type="skill_and_action_set_selection"):
+                response = await cls.llm_interface.generate_response_async(
+                    user_prompt=prompt,
+                    system_prompt="You are a helpful assistant that selects skills and action sets for tasks. Return only valid JSON.",
+                )
 
             # Parse response (clean up markdown if present)
             response = response.strip()
@@ -573,6 +583,44 @@ class InternalActionInterface:
             logger.warning(f"[TASK] Failed to select skills/action sets via LLM: {e}")
             return [], []
 
+    @classmethod
+    async def _select_skills_and_action_sets_in_parallel(
+        cls, task_name: str, task_description: str
+    ) -> tuple[List[str], List[str]]:
+        """
+        Select skills and action sets with two concurrent LLM calls.
+
+        Used in speculative mode. The action set call cannot see the chosen
+        skill, so the skill's recommended action sets are merged in afterwards,
+        as the combined call does.
+
+        Args:
+            task_name: Short name for the task.
+            task_description: Detailed description of the task.
+
+        Returns:
+            Tuple of (selected_skills, selected_action_sets).
+        """
+        from core.action.action_set import action_set_manager
+
+        selected_skills, selected_sets = await asyncio.gather(
+            cls._select_skills_via_llm(task_name, task_description),
+            cls._select_action_sets_via_llm(task_name, task_description),
+        )
+
+        # Same limit as the combined selection: one skill to prevent context overload
+        if len(selected_skills) > 1:
+            logger.info(f"[TASK] Multiple skills selected, limiting to first one: {selected_skills[0]}")
+            selected_skills = selected_skills[:1]
+
+        valid_set_names = set(action_set_manager.list_all_sets().keys())
+        for rec_set in cls._get_skill_action_sets(selected_skills):
+            if rec_set in valid_set_names and rec_set != "core" and rec_set not in selected_sets:
+                selected_sets.append(rec_set)
+
+        logger.info(f"[TASK] Parallel selection: skills={selected_skills}, action_sets={selected_sets}")
+        return selected_skills, selected_sets
+
     @classmethod
     def update_todos(cls, todos: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
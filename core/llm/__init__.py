@@ -8,6 +8,8 @@ This module organizes:
 - LLMInterface: Main interface class for interacting with LLM providers
 - LLMCallType: Enum for session cache keying
 - Cache components: Configuration, metrics, and provider-specific cache managers
+- Request scheduling: per-provider rate limits, retries and priority lanes
+- Usage accounting: per-call token/cost ledger with rolling aggregates and budgets
 
 Usage:
     from core.llm import LLMInterface, LLMCallType
@@ -21,6 +23,12 @@ Usage:
         user_prompt="Hello!"
     )
 
+    # Stream a response (async)
+    stream = llm.stream_response(user_prompt="Hello!")
+    async for delta in stream:
+        print(delta, end="")
+    print(stream.usage)
+
     # Use session caching
     llm.create_session_cache(task_id, LLMCallType.REASONING, system_prompt)
     response = llm.generate_response_with_session(
@@ -30,6 +38,23 @@ Usage:
 
 from .types import LLMCallType
 from .interface import LLMInterface
+from .streaming import JsonObjectScanner, LLMStream, LLMUsage
+from .scheduler import (
+    RequestPriority,
+    RequestScheduler,
+    SchedulerConfig,
+    get_request_scheduler,
+    request_priority,
+    set_request_scheduler,
+)
+from .usage import (
+    BudgetStatus,
+    ModelPrice,
+    UsageBudget,
+    UsageLedger,
+    get_usage_ledger,
+    usage_tags,
+)
 from .cache import (
     CacheConfig,
     CacheMetrics,
@@ -40,6 +65,15 @@ from .cache import (
     BytePlusContextOverflowError,
     BYTEPLUS_MAX_INPUT_TOKENS,
     GeminiCacheManager,
+    CachePlan,
+    CachePlanner,
+    get_cache_planner,
+    Cassette,
+    CassetteMissError,
+    ResponseCache,
+    get_cassette,
+    get_response_cache,
+    set_cassette,
 )
 
 __all__ = [
@@ -47,6 +81,24 @@ __all__ = [
     "LLMInterface",
     # Types
     "LLMCallType",
+    # Streaming
+    "LLMStream",
+    "LLMUsage",
+    "JsonObjectScanner",
+    # Request scheduling
+    "RequestPriority",
+    "RequestScheduler",
+    "SchedulerConfig",
+    "get_request_scheduler",
+    "set_request_scheduler",
+    "request_priority",
+    # Usage accounting
+    "UsageLedger",
+    "UsageBudget",
+    "BudgetStatus",
+    "ModelPrice",
+    "get_usage_ledger",
+    "usage_tags",
     # Cache config
     "CacheConfig",
     "get_cache_config",
@@ -60,4 +112,15 @@ __all__ = [
     "BYTEPLUS_MAX_INPUT_TOKENS",
     # Gemini cache
     "GeminiCacheManager",
+    # Prompt-prefix cache planning
+    "CachePlanner",
+    "CachePlan",
+    "get_cache_planner",
+    # Response cache / record-replay
+    "ResponseCache",
+    "Cassette",
+    "CassetteMissError",
+    "get_response_cache",
+    "get_cassette",
+    "set_cassette",
 ]
@@ -13,6 +13,15 @@ from .byteplus import (
     BYTEPLUS_MAX_INPUT_TOKENS,
 )
 from .gemini import GeminiCacheManager
+from .planner import CachePlan, CachePlanner, PromptSegment, get_cache_planner
+from .response import (
+    Cassette,
+    CassetteMissError,
+    ResponseCache,
+    get_cassette,
+    get_response_cache,
+    set_cassette,
+)
 
 __all__ = [
     # Config
@@ -28,4 +37,16 @@ __all__ = [
     "BYTEPLUS_MAX_INPUT_TOKENS",
     # Gemini
     "GeminiCacheManager",
+    # Prompt-prefix planning
+    "CachePlanner",
+    "CachePlan",
+    "PromptSegment",
+    "get_cache_planner",
+    # Response cache / cassettes
+    "ResponseCache",
+    "Cassette",
+    "CassetteMissError",
+    "get_response_cache",
+    "get_cassette",
+    "set_cassette",
 ]
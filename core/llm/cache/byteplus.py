@@ -13,6 +13,7 @@ import requests
 from typing import Any, Dict, List, Optional
 
 from .config import get_cache_config
+from ..scheduler import COMPLETION_TOKEN_ESTIMATE, estimate_tokens, get_request_scheduler
 
 
 # Logging setup
@@ -101,6 +102,9 @@ class BytePlusCacheManager:
         Returns:
             Raw response dict from the API including 'id' and 'output'.
 
+        Rate limits and retries of transient failures are handled by the
+        BytePlus request scheduler.
+
         Raises:
             requests.HTTPError: If the API call fails.
         """
@@ -137,32 +141,41 @@ class BytePlusCacheManager:
         logger.info(f"[BYTEPLUS REQUEST] URL: {url}")
         logger.info(f"[BYTEPLUS REQUEST] Payload: {self._sanitize_payload_for_logging(payload)}")
 
-        response = requests.post(url, json=payload, headers=headers, timeout=120)
-
-        # Log the response status
-        logger.info(f"[BYTEPLUS RESPONSE] Status: {response.status_code}")
+        def _post() -> Dict[str, Any]:
+            response = requests.post(url, json=payload, headers=headers, timeout=120)
+
+            # Log the response status
+            logger.info(f"[BYTEPLUS RESPONSE] Status: {response.status_code}")
+
+            # Try to log response body even on error
+            try:
+                response_json = response.json()
+                logger.info(f"[BYTEPLUS RESPONSE] Body: {response_json}")
+            except Exception as json_err:
+                logger.warning(f"[BYTEPLUS RESPONSE] Failed to parse JSON: {json_err}")
+                logger.info(f"[BYTEPLUS RESPONSE] Raw text: {response.text[:1000]}")  # First 1000 chars
+                response.raise_for_status()
+                return {}
+
+            # Check for context overflow error before raising status
+            if response.status_code == 400:
+                error_info = response_json.get("error", {})
+                error_message = error_info.get("message", "")
+                # Detect "Input length X exceeds the maximum length Y" error
+                if "exceeds the maximum length" in error_message:
+                    logger.warning(f"[BYTEPLUS] Context overflow detected: {error_message}")
+                    raise BytePlusContextOverflowError(error_message)
 
-        # Try to log response body even on error
-        try:
-            response_json = response.json()
-            logger.info(f"[BYTEPLUS RESPONSE] Body: {response_json}")
-        except Exception as json_err:
-            logger.warning(f"[BYTEPLUS RESPONSE] Failed to parse JSON: {json_err}")
-            logger.info(f"[BYTEPLUS RESPONSE] Raw text: {response.text[:1000]}")  # First 1000 chars
             response.raise_for_status()
-            return {}
-
-        # Check for context overflow error before raising status
-        if response.status_code == 400:
-            error_info = response_json.get("error", {})
-            error_message = error_info.get("message", "")
-            # Detect "Input length X exceeds the maximum length Y" error
-            if "exceeds the maximum length" in error_message:
-                logger.warning(f"[BYTEPLUS] Context overflow detected: {error_message}")
-                raise BytePlusContextOverflowError(error_message)
-
-        response.raise_for_status()
-        return response_json
+            return response_json
+
+        tokens = estimate_tokens(
+            *(str(message.get("content", "")) for message in input_messages),
+            completion=min(max_tokens, COMPLETION_TOKEN_ESTIMATE),
+        )
+        return get_request_scheduler("byteplus").call(
+            _post, tokens=tokens, usage=lambda result: (result.get("usage") or {}).get("total_tokens")
+        )
 
     def _sanitize_payload_for_logging(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Sanitize payload for logging by truncating long content."""
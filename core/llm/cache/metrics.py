@@ -8,6 +8,7 @@ Cache effectiveness metrics tracking for all LLM providers.
 from __future__ import annotations
 
 import logging
+import threading
 from dataclasses import dataclass
 from typing import Dict, Optional
 
@@ -28,6 +29,9 @@ class CacheMetricsEntry:
     cache_misses: int = 0
     tokens_cached: int = 0
     tokens_uncached: int = 0
+    # Cached tokens the cache planner expected vs. what the provider reported
+    tokens_expected: int = 0
+    tokens_observed: int = 0
 
     @property
     def hit_rate(self) -> float:
@@ -44,10 +48,19 @@ class CacheMetricsEntry:
             return 0.0
         return (self.tokens_cached / total) * 100
 
+    @property
+    def plan_accuracy(self) -> float:
+        """Observed cached tokens as a percentage of the planned ones."""
+        if self.tokens_expected == 0:
+            return 0.0
+        return (self.tokens_observed / self.tokens_expected) * 100
+
 
 class CacheMetrics:
     """Tracks cache effectiveness metrics per provider and operation type.
 
+    Thread-safe: calls are recorded from worker threads as well as the event loop.
+
     Usage:
         metrics = CacheMetrics()
         metrics.record_hit("byteplus", "prefix", cached_tokens=500, total_tokens=800)
@@ -58,6 +71,7 @@ class CacheMetrics:
     def __init__(self) -> None:
         # Structure: provider -> cache_type -> CacheMetricsEntry
         self._metrics: Dict[str, Dict[str, CacheMetricsEntry]] = {}
+        self._lock = threading.RLock()
 
     def _get_entry(self, provider: str, cache_type: str) -> CacheMetricsEntry:
         """Get or create metrics entry for provider/cache_type."""
@@ -75,11 +89,12 @@ class CacheMetrics:
         total_tokens: int = 0,
     ) -> None:
         """Record a cache hit with optional token counts."""
-        entry = self._get_entry(provider, cache_type)
-        entry.total_calls += 1
-        entry.cache_hits += 1
-        entry.tokens_cached += cached_tokens
-        entry.tokens_uncached += max(0, total_tokens - cached_tokens)
+        with self._lock:
+            entry = self._get_entry(provider, cache_type)
+            entry.total_calls += 1
+            entry.cache_hits += 1
+            entry.tokens_cached += cached_tokens
+            entry.tokens_uncached += max(0, total_tokens - cached_tokens)
 
         logger.info(
             f"[CACHE METRICS] {provider}/{cache_type}: HIT "
@@ -94,21 +109,59 @@ class CacheMetrics:
         total_tokens: int = 0,
     ) -> None:
         """Record a cache miss."""
-        entry = self._get_entry(provider, cache_type)
-        entry.total_calls += 1
-        entry.cache_misses += 1
-        entry.tokens_uncached += total_tokens
+        with self._lock:
+            entry = self._get_entry(provider, cache_type)
+            entry.total_calls += 1
+            entry.cache_misses += 1
+            entry.tokens_uncached += total_tokens
 
         logger.info(
             f"[CACHE METRICS] {provider}/{cache_type}: MISS "
             f"(total={total_tokens}, hit_rate={entry.hit_rate:.1f}%)"
         )
 
+    def record_expected(
+        self,
+        provider: str,
+        cache_type: str,
+        expected_tokens: int,
+        observed_tokens: int,
+    ) -> None:
+        """Record the cached tokens the cache planner expected for a call against those observed."""
+        with self._lock:
+            entry = self._get_entry(provider, cache_type)
+            entry.tokens_expected += expected_tokens
+            entry.tokens_observed += observed_tokens
+
+        if expected_tokens and observed_tokens < expected_tokens // 2:
+            logger.debug(
+                f"[CACHE METRICS] {provider}/{cache_type}: expected {expected_tokens} cached tokens, "
+                f"observed {observed_tokens}"
+            )
+
+    def get_provider_totals(self) -> Dict[str, CacheMetricsEntry]:
+        """Metrics per provider, summed over its cache types."""
+        totals: Dict[str, CacheMetricsEntry] = {}
+        with self._lock:
+            for provider, cache_types in self._metrics.items():
+                total = totals[provider] = CacheMetricsEntry()
+                for entry in cache_types.values():
+                    total.total_calls += entry.total_calls
+                    total.cache_hits += entry.cache_hits
+                    total.cache_misses += entry.cache_misses
+                    total.tokens_cached += entry.tokens_cached
+                    total.tokens_uncached += entry.tokens_uncached
+                    total.tokens_expected += entry.tokens_expected
+                    total.tokens_observed += entry.tokens_observed
+        return totals
+
     def get_summary(self) -> str:
         """Get a formatted summary of all cache metrics."""
         lines = ["=" * 60, "CACHE METRICS SUMMARY", "=" * 60]
 
-        for provider, cache_types in self._metrics.items():
+        with self._lock:
+            snapshot = {provider: dict(cache_types) for provider, cache_types in self._metrics.items()}
+        for provider, cache_types in snapshot.items():
             lines.append(f"\n{provider.upper()}:")
             for cache_type, entry in cache_types.items():
                 lines.append(
@@ -120,13 +173,19 @@ class CacheMetrics:
                     f"\n    Tokens Uncached: {entry.tokens_uncached:,}"
                     f"\n    Token Cache Rate: {entry.token_cache_rate:.1f}%"
                 )
+                if entry.tokens_expected:
+                    lines.append(
+                        f"    Planned vs Observed: {entry.tokens_expected:,} / {entry.tokens_observed:,} "
+                        f"({entry.plan_accuracy:.1f}%)"
+                    )
 
         lines.append("=" * 60)
         return "\n".join(lines)
 
     def reset(self) -> None:
         """Reset all metrics."""
-        self._metrics.clear()
+        with self._lock:
+            self._metrics.clear()
 
 
 # Global cache metrics instance
@@ -0,0 +1,461 @@
+# -*- coding: utf-8 -*-
+"""
+core.llm.cache.planner
+
+Prompt-prefix cache planning shared by all providers.
+
+Every provider caches a *prefix* of the prompt, but each marks it
+differently: BytePlus keeps the system prompt in a prefix cache, Gemini in
+an explicit cache per call type (or implicitly), Anthropic caches up to each
+``cache_control`` breakpoint and OpenAI caches prefixes automatically, routed
+by ``prompt_cache_key``. :class:`CachePlanner` makes the decision for all of
+them in one place:
+
+1. Split the request into segments: the system prompt, the part of the user
+   prompt shared with recent requests on the same channel (provider, call
+   type and system prompt), and the volatile rest. Prompts put
+   session-static content first and the event stream last, so the shared
+   part is the stable header of the step prompt.
+2. Pick the provider's cache mode and breakpoints for the stable prefix.
+3. Estimate how many prompt tokens the provider should report as cached, so
+   :class:`CacheMetrics` can compare expected against observed tokens.
+
+Usage:
+    plan = get_cache_planner().plan("anthropic", system_prompt, user_prompt, call_type="reasoning")
+    payload["system"] = plan.anthropic_system()
+    payload["messages"] = [{"role": "user", "content": plan.anthropic_user_content()}]
+    ...
+    plan.record(cached_tokens=usage.cached_tokens)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from .config import get_cache_config
+from .metrics import get_cache_metrics
+
+# Rough token estimate, as elsewhere in core.llm
+CHARS_PER_TOKEN = 4
+
+# Recent user prompts kept per channel to find the stable prefix
+HISTORY_PER_CHANNEL = 8
+MAX_CHANNELS = 128
+# Chunk size of common_prefix_length's slice comparisons
+PREFIX_CHUNK_CHARS = 256
+
+MODE_NONE = "none"
+MODE_AUTOMATIC = "automatic"  # OpenAI, Gemini implicit: provider caches prefixes it has seen
+MODE_BREAKPOINTS = "breakpoints"  # Anthropic: cache_control markers
+MODE_EXPLICIT = "explicit"  # Gemini explicit cache of the system prompt
+MODE_PREFIX = "prefix"  # BytePlus prefix cache of the system prompt
+
+
+@dataclass(frozen=True)
+class ProviderCacheRules:
+    """How a provider caches prompt prefixes.
+
+    Attributes:
+        min_prefix_tokens: Shortest prefix the provider caches.
+        block_tokens: Cached prefixes are counted in blocks of this size.
+        ttl_seconds: How long an unused prefix stays cached.
+        max_breakpoints: ``cache_control`` markers a request may carry (Anthropic).
+    """
+    min_prefix_tokens: int = 1024
+    block_tokens: int = 1
+    ttl_seconds: float = 300.0
+    max_breakpoints: int = 0
+
+
+PROVIDER_RULES: Dict[str, ProviderCacheRules] = {
+    "openai": ProviderCacheRules(min_prefix_tokens=1024, block_tokens=128, ttl_seconds=300),
+    "anthropic": ProviderCacheRules(min_prefix_tokens=1024, ttl_seconds=300, max_breakpoints=4),
+    "gemini": ProviderCacheRules(min_prefix_tokens=1024, ttl_seconds=300),
+    "byteplus": ProviderCacheRules(min_prefix_tokens=1024, ttl_seconds=3600),
+}
+
+# Anthropic's extended cache lifetime, used for calls with a call type
+ANTHROPIC_EXTENDED_TTL_SECONDS = 3600
+
+
+def estimate_prompt_tokens(*texts: Optional[str]) -> int:
+    return sum(len(text) for text in texts if text) // CHARS_PER_TOKEN
+
+
+def _digest(*texts: Optional[str]) -> str:
+    h = hashlib.sha256()
+    for text in texts:
+        h.update((text or "").encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def common_prefix_length(a: str, b: str, chunk: int = PREFIX_CHUNK_CHARS) -> int:
+    """Length of the common prefix of two strings.
+
+    Compares fixed-size chunks at the same offsets, then characters within
+    the first chunk that differs, so each character is compared at most twice.
+    """
+    limit = min(len(a), len(b))
+    start = 0
+    while start < limit:
+        end = min(start + chunk, limit)
+        if a[start:end] != b[start:end]:
+            break
+        start = end
+    else:
+        return limit
+    while a[start] == b[start]:
+        start += 1
+    return start
+
+
+class PrefixFingerprint:
+    """Hashes of a text's prefixes at each line end and at the end of the text.
+
+    Stable prefixes are cut at line boundaries, so these hashes find the
+    same prefix as comparing the texts would, while keeping about 12 bytes
+    per line instead of the prompt itself.
+    """
+
+    __slots__ = ("offsets", "digests")
+
+    _SIZE = 8
+
+    def __init__(self, text: str) -> None:
+        self.offsets = array("I")
+        digests = bytearray()
+        h = hashlib.blake2b(digest_size=self._SIZE)
+        start = 0
+        while start < len(text):
+            end = text.find("\n", start) + 1 or len(text)
+            h.update(text[start:end].encode("utf-8"))
+            self.offsets.append(end)
+            digests += h.copy().digest()
+            start = end
+        self.digests = bytes(digests)
+
+    def _matches(self, other: "PrefixFingerprint", index: int) -> bool:
+        span = slice(index * self._SIZE, (index + 1) * self._SIZE)
+        return self.offsets[index] == other.offsets[index] and self.digests[span] == other.digests[span]
+
+    def common_prefix(self, other: "PrefixFingerprint") -> int:
+        """Length of the prefix shared with ``other``, cut at the last shared line end."""
+        # Prefix hashes are cumulative, so agreement is monotone: binary search for the last match
+        lo, hi = 0, min(len(self.offsets), len(other.offsets))
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._matches(other, mid - 1):
+                lo = mid
+            else:
+                hi = mid - 1
+        return self.offsets[lo - 1] if lo else 0
+
+
+@dataclass(frozen=True)
+class PromptSegment:
+    """A contiguous piece of a request."""
+    role: str  # "system" or "user"
+    text: str
+    stable: bool
+
+
+@dataclass(frozen=True)
+class CacheBreakpoint:
+    """A point the provider caches the prompt up to."""
+    segment: int  # index of the last segment included
+    tokens: int  # estimated prompt tokens up to and including that segment
+    hit_tokens: int = 0  # of those, tokens an earlier request should have left in the cache
+
+    @property
+    def warm(self) -> bool:
+        return self.hit_tokens > 0
+
+
+@dataclass
+class CachePlan:
+    """Cache placement for one request; see :meth:`CachePlanner.plan`."""
+    provider: str
+    call_type: Optional[str]
+    mode: str
+    segments: List[PromptSegment]
+    breakpoints: List[CacheBreakpoint] = field(default_factory=list)
+    cache_key: Optional[str] = None  # OpenAI prompt_cache_key
+    ttl: Optional[str] = None  # Anthropic cache_control ttl
+    prompt_tokens: int = 0
+    expected_cached_tokens: int = 0
+
+    @property
+    def cacheable(self) -> bool:
+        """Whether any part of the prompt is expected to be cached."""
+        return self.mode != MODE_NONE
+
+    @property
+    def system_prompt(self) -> Optional[str]:
+        texts = [s.text for s in self.segments if s.role == "system"]
+        return texts[0] if texts else None
+
+    @property
+    def stable_user_prefix(self) -> str:
+        return "".join(s.text for s in self.segments if s.role == "user" and s.stable)
+
+    @property
+    def volatile_suffix(self) -> str:
+        return "".join(s.text for s in self.segments if s.role == "user" and not s.stable)
+
+    @property
+    def cache_type(self) -> str:
+        """Metrics label, matching the labels the provider calls already use."""
+        if self.mode == MODE_AUTOMATIC:
+            base = "automatic" if self.provider == "openai" else "implicit"
+        elif self.mode == MODE_BREAKPOINTS:
+            base = "ephemeral"
+        else:
+            base = self.mode
+        return f"{base}_{self.call_type}" if self.call_type else base
+
+    # ─────────────────────── Provider rendering ───────────────────────
+
+    def _cache_control(self) -> Dict[str, str]:
+        control = {"type": "ephemeral"}
+        if self.ttl:
+            control["ttl"] = self.ttl
+        return control
+
+    def _breaks_after(self, index: int) -> bool:
+        return any(bp.segment == index for bp in self.breakpoints)
+
+    def anthropic_system(self) -> Union[str, List[Dict[str, Any]], None]:
+        """``system`` for an Anthropic request, with its breakpoint if planned."""
+        for index, segment in enumerate(self.segments):
+            if segment.role == "system":
+                if self.mode == MODE_BREAKPOINTS and self._breaks_after(index):
+                    return [{"type": "text", "text": segment.text, "cache_control": self._cache_control()}]
+                return segment.text
+        return None
+
+    def anthropic_user_content(self) -> Union[str, List[Dict[str, Any]]]:
+        """User message content for an Anthropic request, split at the stable prefix if planned."""
+        user = [(i, s) for i, s in enumerate(self.segments) if s.role == "user"]
+        if self.mode != MODE_BREAKPOINTS or not any(self._breaks_after(i) for i, _ in user):
+            return "".join(s.text for _, s in user)
+        blocks: List[Dict[str, Any]] = []
+        for index, segment in user:
+            if not segment.text:
+                continue
+            block: Dict[str, Any] = {"type": "text", "text": segment.text}
+            if self._breaks_after(index):
+                block["cache_control"] = self._cache_control()
+            blocks.append(block)
+        return blocks
+
+    # ─────────────────────────── Metrics ───────────────────────────
+
+    def record(self, cached_tokens: int, cache_type: Optional[str] = None) -> None:
+        """Record expected against observed cached tokens for this request."""
+        if not self.cacheable:
+            return
+        get_cache_metrics().record_expected(
+            self.provider,
+            cache_type or self.cache_type,
+            expected_tokens=self.expected_cached_tokens,
+            observed_tokens=cached_tokens,
+        )
+
+
+@dataclass
+class _Channel:
+    recent: Deque[Tuple[PrefixFingerprint, float]] = field(default_factory=lambda: deque(maxlen=HISTORY_PER_CHANNEL))
+    # Breakpoints written: (user prefix length, digest of that prefix, time)
+    written: Deque[Tuple[int, str, float]] = field(default_factory=lambda: deque(maxlen=HISTORY_PER_CHANNEL))
+
+
+class CachePlanner:
+    """Decides which prompt prefix each provider should cache, and how.
+
+    Thread-safe. Keeps prefix fingerprints of the last few user prompts per
+    channel (provider, call type and system prompt) and the cache breakpoints
+    written on it.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[Dict[str, ProviderCacheRules]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.rules = dict(PROVIDER_RULES if rules is None else rules)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._channels: "OrderedDict[Tuple[str, str, str], _Channel]" = OrderedDict()
+
+    def _channel(self, key: Tuple[str, str, str]) -> _Channel:
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = self._channels[key] = _Channel()
+            while len(self._channels) > MAX_CHANNELS:
+                self._channels.popitem(last=False)
+        self._channels.move_to_end(key)
+        return channel
+
+    @staticmethod
+    def _stable_prefix(channel: _Channel, fingerprint: PrefixFingerprint, now: float, ttl: float) -> Tuple[int, bool]:
+        """Length of the user prompt shared with recent requests, and whether that request is within ``ttl``.
+
+        The length ends at a line boundary (or covers the whole prompt), so a
+        half-shared line stays volatile.
+        """
+        best, best_at = 0, None
+        for previous, sent_at in channel.recent:
+            length = fingerprint.common_prefix(previous)
+            if length > best or (length == best and best_at is not None and sent_at > best_at):
+                best, best_at = length, sent_at
+        warm = best_at is not None and now - best_at <= ttl
+        return best, warm
+
+    @staticmethod
+    def _write_breakpoint(channel: _Channel, user_prompt: str, length: int, now: float, ttl: float) -> int:
+        """
+        Remember a breakpoint after ``length`` characters of the user prompt.
+
+        Returns the longest user prefix, up to the breakpoint, that an earlier
+        breakpoint within ``ttl`` cached (-1 if none): the provider reads the
+        cache from there.
+        """
+        digest = _digest(user_prompt[:length])
+        best = -1
+        for written_length, written_digest, written_at in channel.written:
+            if best < written_length <= length and now - written_at <= ttl:
+                if _digest(user_prompt[:written_length]) == written_digest:
+                    best = written_length
+        for entry in list(channel.written):
+            if entry[0] == length and entry[1] == digest:
+                channel.written.remove(entry)
+        channel.written.append((length, digest, now))
+        return best
+
+    def plan(
+        self,
+        provider: str,
+        system_prompt: Optional[str],
+        user_prompt: str,
+        call_type: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> CachePlan:
+        """
+        Plan the cache placement of one request, and remember it for the next ones.
+
+        Args:
+            provider: Provider the request goes to.
+            system_prompt: The system prompt (the stable head of every request).
+            user_prompt: The user prompt.
+            call_type: Call type, if the caller keys caches by it.
+            now: Time of the request (defaults to the planner's clock; used by replays).
+        """
+        call_type = str(getattr(call_type, "value", call_type)) if call_type else None
+        user_prompt = user_prompt or ""
+        now = self._clock() if now is None else now
+        rules = self.rules.get(provider)
+        min_chars = get_cache_config().min_cache_tokens
+        system_cacheable = bool(system_prompt) and len(system_prompt) >= min_chars
+        ttl = rules.ttl_seconds if rules else 0.0
+        if provider == "anthropic" and call_type:
+            ttl = ANTHROPIC_EXTENDED_TTL_SECONDS
+
+        with self._lock:
+            channel = self._channel((provider, call_type or "prompt", _digest(system_prompt)))
+            fingerprint = PrefixFingerprint(user_prompt)
+            shared, recent_warm = self._stable_prefix(channel, fingerprint, now, ttl)
+            channel.recent.append((fingerprint, now))
+
+            segments: List[PromptSegment] = []
+            if system_prompt:
+                segments.append(PromptSegment("system", system_prompt, stable=True))
+            if shared >= min_chars:
+                segments.append(PromptSegment("user", user_prompt[:shared], stable=True))
+                segments.append(PromptSegment("user", user_prompt[shared:], stable=False))
+            else:
+                segments.append(PromptSegment("user", user_prompt, stable=False))
+
+            plan = CachePlan(
+                provider=provider,
+                call_type=call_type,
+                mode=MODE_NONE,
+                segments=segments,
+                prompt_tokens=estimate_prompt_tokens(system_prompt, user_prompt),
+            )
+            if rules is None:
+                return plan
+
+            stable_index = max((i for i, s in enumerate(segments) if s.stable), default=-1)
+            stable_tokens = estimate_prompt_tokens(*(s.text for s in segments[: stable_index + 1]))
+            system_tokens = estimate_prompt_tokens(system_prompt)
+
+            if provider == "openai" or (provider == "gemini" and not (call_type and system_cacheable)):
+                # Automatic prefix caching: whatever prefix recent requests shared is cached
+                if system_cacheable or stable_index >= 0 and stable_tokens >= rules.min_prefix_tokens:
+                    plan.mode = MODE_AUTOMATIC
+                    if provider == "openai" and call_type and system_cacheable:
+                        plan.cache_key = f"{call_type}_{_digest(system_prompt)[:16]}"
+                    if stable_index >= 0:
+                        hit = stable_tokens if recent_warm else 0
+                        plan.breakpoints.append(CacheBreakpoint(stable_index, stable_tokens, hit))
+            elif provider == "gemini":
+                # Explicit cache of the system prompt per call type; created on first use
+                plan.mode = MODE_EXPLICIT
+                plan.breakpoints.append(CacheBreakpoint(0, system_tokens, system_tokens))
+            elif provider == "byteplus":
+                if system_cacheable:
+                    plan.mode = MODE_PREFIX
+                    plan.breakpoints.append(CacheBreakpoint(0, system_tokens, system_tokens))
+            elif provider == "anthropic":
+                if system_cacheable or len(segments) == 3:
+                    # A breakpoint after the system prompt and one after the stable user prefix.
+                    # Reads come from the longest earlier breakpoint the prompt still starts with.
+                    plan.mode = MODE_BREAKPOINTS
+                    plan.ttl = "1h" if call_type else None
+                    candidates = [i for i, s in enumerate(segments) if s.stable]
+                    for index in candidates[-rules.max_breakpoints:]:
+                        if segments[index].role == "system" and not system_cacheable:
+                            continue
+                        user_length = sum(len(s.text) for s in segments[: index + 1] if s.role == "user")
+                        reused = self._write_breakpoint(channel, user_prompt, user_length, now, ttl)
+                        tokens = estimate_prompt_tokens(*(s.text for s in segments[: index + 1]))
+                        hit = estimate_prompt_tokens(system_prompt, user_prompt[:reused]) if reused >= 0 else 0
+                        plan.breakpoints.append(CacheBreakpoint(index, tokens, hit))
+
+            plan.expected_cached_tokens = self._expected_tokens(rules, plan.breakpoints)
+            return plan
+
+    @staticmethod
+    def _expected_tokens(rules: ProviderCacheRules, breakpoints: List[CacheBreakpoint]) -> int:
+        hits = [bp.hit_tokens for bp in breakpoints if bp.hit_tokens >= rules.min_prefix_tokens]
+        if not hits:
+            return 0
+        tokens = max(hits)
+        if rules.block_tokens > 1:
+            tokens = rules.min_prefix_tokens + (tokens - rules.min_prefix_tokens) // rules.block_tokens * rules.block_tokens
+        return tokens
+
+    def reset(self) -> None:
+        with self._lock:
+            self._channels.clear()
+
+
+# Global cache planner instance
+_cache_planner: Optional[CachePlanner] = None
+_planner_lock = threading.Lock()
+
+
+def get_cache_planner() -> CachePlanner:
+    """Get the global cache planner."""
+    global _cache_planner
+    with _planner_lock:
+        if _cache_planner is None:
+            _cache_planner = CachePlanner()
+        return _cache_planner
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+core.llm.cache.response
+
+Client-side response cache and record/replay cassettes for LLM calls.
+
+- :class:`ResponseCache` is a content-addressed, TTL- and size-bounded
+  in-memory cache of complete responses. The key covers everything that
+  determines the output (provider, model, system prompt, user prompt,
+  temperature, max tokens, JSON mode), so only identical requests hit. It is
+  only consulted for deterministic requests (temperature 0).
+- :class:`Cassette` records every response to a JSONL file and, in replay
+  mode, serves them back without contacting the provider, so complete agent
+  loops can be benchmarked offline and reproducibly. Volatile prompt content
+  (timestamps, UUIDs) is normalised out of cassette keys, repeated requests
+  replay their responses in recorded order, and a request whose key is not
+  in the cassette raises :class:`CassetteMissError`. Taking the next
+  unplayed response recorded on the same channel instead is opt-in, since it
+  answers a different prompt. Each line also keeps its request and time, so recorded prompts can
+  be replayed through the cache planner (scripts/bench_prompt_cache_plan.py).
+
+Configuration (environment):
+    LLM_RESPONSE_CACHE_TTL   seconds a response stays valid (0 disables, default 0)
+    LLM_RESPONSE_CACHE_SIZE  maximum cached responses (default 256)
+    LLM_CASSETTE_MODE        "record" or "replay" (unset disables)
+    LLM_CASSETTE_PATH        cassette file (default llm_cassette.jsonl)
+    LLM_CASSETTE_OVERWRITE   "1" to start a fresh recording instead of
+                             appending to an existing cassette
+    LLM_CASSETTE_FALLBACK    "1" to replay the next response of the same
+                             channel for unknown requests instead of failing
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Logging setup
+try:
+    from core.logger import logger  # type: ignore
+except Exception:  # pragma: no cover
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+CASSETTE_RECORD = "record"
+CASSETTE_REPLAY = "replay"
+
+# Prompt content that differs between otherwise identical runs
+_VOLATILE_PATTERNS = [
+    re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE),
+    re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"),
+    re.compile(r"\b\d{1,2}:\d{2}:\d{2}(?:\.\d+)?\b"),
+    re.compile(r"\b\d{4}-\d{2}-\d{2}\b"),
+    re.compile(r"\b1\d{9}(?:\.\d+)?\b"),  # unix timestamps
+]
+
+
+class CassetteMissError(RuntimeError):
+    """Raised in replay mode when the cassette has no response for a request."""
+
+
+def request_key(parts: Dict[str, Any]) -> str:
+    """Content address of a request."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def normalise_prompt(text: Optional[str]) -> Optional[str]:
+    """Replace timestamps and UUIDs so recorded and replayed prompts share keys."""
+    if not text:
+        return text
+    for pattern in _VOLATILE_PATTERNS:
+        text = pattern.sub("<v>", text)
+    return text
+
+
+# ─────────────────────────── In-memory cache ───────────────────────────
+
+class ResponseCache:
+    """TTL- and size-bounded LRU of complete responses, keyed by :func:`request_key`.
+
+    Usage:
+        cache = ResponseCache(ttl=120, max_entries=256)
+        key = request_key({"model": "m", "user": "hi"})
+        content = cache.get(key)
+        if content is None:
+            content = call_provider()
+            cache.put(key, content)
+    """
+
+    def __init__(
+        self,
+        ttl: float = 120.0,
+        max_entries: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` if it has not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, content: str) -> None:
+        """Cache ``content`` for ``key``, evicting the least recently used entries past the bound."""
+        if not self.enabled or not content:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / total * 100) if total else 0.0,
+            }
+
+
+# ────────────────────────────── Cassettes ──────────────────────────────
+
+@dataclass
+class _Recording:
+    key: str
+    channel: str
+    content: str
+    played: bool = False
+
+
+class Cassette:
+    """Responses recorded to (or replayed from) a JSONL file.
+
+    Each line holds ``{"key", "channel", "content"}``. The channel groups
+    calls of one kind (``"prompt"`` or ``"session:<call_type>"``) for the
+    in-order fallback that ``fallback=True`` enables for unknown keys.
+
+    Recording appends to an existing cassette unless ``overwrite`` is set.
+    """
+
+    def __init__(self, path: str | Path, mode: str, overwrite: bool = False, fallback: bool = False) -> None:
+        if mode not in (CASSETTE_RECORD, CASSETTE_REPLAY):
+            raise ValueError(f"Unknown cassette mode '{mode}'. Expected '{CASSETTE_RECORD}' or '{CASSETTE_REPLAY}'")
+        self.path = Path(path)
+        self.mode = mode
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._recordings: List[_Recording] = []
+        self._by_key: Dict[str, List[_Recording]] = {}
+        self.served = 0
+        self.fallbacks = 0
+        if mode == CASSETTE_REPLAY:
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if overwrite or not self.path.exists():
+                self.path.write_text("", encoding="utf-8")
+                logger.info(f"[LLM CASSETTE] Recording responses to {self.path}")
+            else:
+                logger.info(f"[LLM CASSETTE] Appending recorded responses to {self.path}")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == CASSETTE_REPLAY
+
+    @staticmethod
+    def key(parts: Dict[str, Any]) -> str:
+        """Request key with volatile prompt content normalised away."""
+        return request_key({
+            name: normalise_prompt(value) if isinstance(value, str) else value
+            for name, value in parts.items()
+        })
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            raise FileNotFoundError(f"LLM cassette not found: {self.path}")
+        with self.path.open(encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                recording = _Recording(data["key"], data.get("channel", "prompt"), data.get("content", ""))
+                self._recordings.append(recording)
+                self._by_key.setdefault(recording.key, []).append(recording)
+        logger.info(f"[LLM CASSETTE] Replaying {len(self._recordings)} responses from {self.path}")
+
+    def record(self, parts: Dict[str, Any], channel: str, content: str) -> None:
+        """Append a response, with its request and time, to the cassette (record mode)."""
+        if self.mode != CASSETTE_RECORD:
+            return
+        line = json.dumps(
+            {"key": self.key(parts), "channel": channel, "content": content, "request": parts, "at": time.time()},
+            ensure_ascii=False,
+            default=str,
+        )
+        with self._lock:
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+
+    def replay(self, parts: Dict[str, Any], channel: str) -> str:
+        """
+        Serve the recorded response for a request (replay mode).
+
+        Raises:
+            CassetteMissError: If the request was never recorded (and, with
+                ``fallback``, the channel has no response left either).
+        """
+        key = self.key(parts)
+        with self._lock:
+            candidates = self._by_key.get(key)
+            if candidates:
+                recording = next((r for r in candidates if not r.played), candidates[-1])
+            else:
+                recording = None
+                if self.fallback:
+                    recording = next((r for r in self._recordings if r.channel == channel and not r.played), None)
+                if recording is None:
+                    raise CassetteMissError(f"No recorded response for {channel} request {key[:12]} in {self.path}")
+                self.fallbacks += 1
+                logger.warning(f"[LLM CASSETTE] Unknown {channel} request {key[:12]}, replaying the next recorded response")
+            recording.played = True
+            self.served += 1
+            return recording.content
+
+
+# ─────────────────────────── Global instances ──────────────────────────
+
+_response_cache: Optional[ResponseCache] = None
+_cassette: Optional[Cassette] = None
+_cassette_loaded = False
+_instance_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the global response cache, configured from the environment on first use."""
+    global _response_cache
+    with _instance_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                ttl=float(os.getenv("LLM_RESPONSE_CACHE_TTL", "0")),
+                max_entries=int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "256")),
+            )
+        return _response_cache
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Get the global cassette, or None when record/replay is off."""
+    global _cassette, _cassette_loaded
+    with _instance_lock:
+        if not _cassette_loaded:
+            mode = os.getenv("LLM_CASSETTE_MODE", "").strip().lower()
+            if mode:
+                _cassette = Cassette(
+                    os.getenv("LLM_CASSETTE_PATH", "llm_cassette.jsonl"),
+                    mode,
+                    overwrite=os.getenv("LLM_CASSETTE_OVERWRITE", "").strip() == "1",
+                    fallback=os.getenv("LLM_CASSETTE_FALLBACK", "").strip() == "1",
+                )
+            _cassette_loaded = True
+        return _cassette
+
+
+def set_cassette(cassette: Optional[Cassette]) -> None:
+    """Install (or remove) the global cassette, e.g. from a benchmark harness."""
+    global _cassette, _cassette_loaded
+    with _instance_lock:
+        _cassette = cassette
+        _cassette_loaded = True
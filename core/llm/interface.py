@@ -3,32 +3,56 @@
 core.llm.interface
 
 Main LLM interface class that provides a unified API for multiple LLM providers.
+
+Async calls go through the native streaming layer in ``core.llm.streaming``
+(pooled HTTP clients, token deltas as they arrive). Paths that depend on
+stateful provider caches (sessions, BytePlus prefix cache) still run the
+synchronous client on a worker thread. Every provider request, streamed or
+blocking, is rate-limited and retried by ``core.llm.scheduler``.
 """
 
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import logging
 import re
+import threading
+import time
 import requests
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
 
 from openai import OpenAI
 
 from core.models.factory import ModelFactory
 from core.models.types import InterfaceType
 from core.google_gemini_client import GeminiAPIError, GeminiClient
-from core.state.agent_state import STATE
 from decorators.profiler import profile, OperationCategory
 
 from .cache import (
     BytePlusCacheManager,
     BytePlusContextOverflowError,
     GeminiCacheManager,
-    get_cache_config,
     get_cache_metrics,
+    get_cassette,
+    get_response_cache,
+)
+from .cache.planner import MODE_EXPLICIT, MODE_PREFIX, CachePlan, get_cache_planner
+from .cache.response import request_key
+from .scheduler import COMPLETION_TOKEN_ESTIMATE, estimate_tokens, get_request_scheduler
+from .streaming import (
+    MAX_CONNECTIONS,
+    MAX_KEEPALIVE_CONNECTIONS,
+    JsonObjectScanner,
+    LLMStream,
+    LLMUsage,
+    StreamItem,
+    get_http_client,
+    stream_anthropic,
+    stream_gemini,
+    stream_ollama,
+    stream_openai_compatible,
 )
+from .usage import get_usage_ledger, usage_tags
 
 # Logging setup
 try:
@@ -37,6 +61,22 @@ except Exception:  # pragma: no cover
     logger = logging.getLogger(__name__)
     logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
+# Streams drained after their first JSON object was returned. The event loop
+# only keeps weak references to tasks, so these are held until they finish.
+_background_drains: Set[asyncio.Task] = set()
+
+# Shared keep-alive pool for the blocking HTTP providers (Ollama, BytePlus
+# standard), sized like the async clients in core.llm.streaming.
+_http_session = requests.Session()
+_http_session.mount(
+    "http://",
+    requests.adapters.HTTPAdapter(pool_connections=MAX_KEEPALIVE_CONNECTIONS, pool_maxsize=MAX_CONNECTIONS),
+)
+_http_session.mount(
+    "https://",
+    requests.adapters.HTTPAdapter(pool_connections=MAX_KEEPALIVE_CONNECTIONS, pool_maxsize=MAX_CONNECTIONS),
+)
+
 
 class LLMInterface:
     """Simple wrapper to interact with multiple Large-Language-Model back-ends.
@@ -175,49 +215,116 @@ class LLMInterface:
             logger.error(f"[LLM] Failed to reinitialize - unexpected error: {e}", exc_info=True)
             return False
 
+    def set_model(self, model: str) -> None:
+        """Switch to another model of the current provider, e.g. to downgrade a task near its budget.
+
+        Provider-side caches are tied to a model, so the BytePlus and Gemini
+        cache managers (and their sessions) start over.
+        """
+        if not model or model == self.model:
+            return
+        logger.info(f"[LLM] Switching model: {self.model} -> {model}")
+        self.model = model
+        self._session_system_prompts = {}
+        if self._byteplus_cache_manager:
+            self._byteplus_cache_manager = BytePlusCacheManager(
+                api_key=self.api_key,
+                base_url=self.byteplus_base_url,
+                model=self.model,
+            )
+        if self._gemini_cache_manager:
+            self._gemini_cache_manager = GeminiCacheManager(
+                gemini_client=self._gemini_client,
+                model=self.model,
+            )
+
     # ───────────────────────────  Public helpers  ────────────────────────────
     def _generate_response_sync(
         self,
         system_prompt: Optional[str] = None,
         user_prompt: Optional[str] = None,
         log_response: bool = True,
+        use_cache: bool = True,
+        record: bool = True,
     ) -> str:
-        """Synchronous implementation shared by sync/async entry points."""
+        """Synchronous implementation shared by sync/async entry points.
+
+        ``record=False`` bypasses the response cache and cassette entirely;
+        the session path uses it for fallbacks it records itself.
+        """
         if user_prompt is None:
             raise ValueError("`user_prompt` cannot be None.")
 
         if log_response:
             logger.info(f"[LLM SEND] system={system_prompt} | user={user_prompt}")
 
+        # This path never requests JSON mode; keep its key distinct from JSON-mode streams.
+        parts = self._request_parts(system_prompt, user_prompt, json_mode=False)
+        if record:
+            cached = self._cached_response(parts, "prompt", use_cache)
+            if cached is not None:
+                cleaned = re.sub(self._CODE_BLOCK_RE, "", cached.strip())
+                if log_response:
+                    logger.info(f"[LLM RECV] (cached) {cleaned}")
+                return cleaned
+
+        response = self._call_provider(system_prompt, user_prompt)
+        if record:
+            self._store_response(parts, "prompt", response.get("content", ""))
+
+        cleaned = re.sub(self._CODE_BLOCK_RE, "", response.get("content", "").strip())
+
+        if log_response:
+            logger.info(f"[LLM RECV] {cleaned}")
+        return cleaned
+
+    def _mark_call_start(self) -> None:
+        """Note when this thread's provider call started, for the usage ledger's latency."""
+        # Created lazily: instances built with object.__new__ skip __init__
+        local = self.__dict__.setdefault("_call_timing", threading.local())
+        local.started = time.perf_counter()
+
+    def _call_latency(self) -> Optional[float]:
+        """Seconds since :meth:`_mark_call_start` on this thread, consuming the mark."""
+        local = self.__dict__.get("_call_timing")
+        started = getattr(local, "started", None)
+        if started is None:
+            return None
+        local.started = None
+        return time.perf_counter() - started
+
+    def _call_provider(
+        self, system_prompt: Optional[str], user_prompt: str, plan: Optional[CachePlan] = None
+    ) -> Dict[str, Any]:
+        """Run one blocking, non-session request against the configured provider."""
+        self._mark_call_start()
         if self.provider == "openai":
-            response = self._generate_openai(system_prompt, user_prompt)
+            return self._generate_openai(system_prompt, user_prompt, plan=plan)
         elif self.provider == "remote":
-            response = self._generate_ollama(system_prompt, user_prompt)
+            return self._generate_ollama(system_prompt, user_prompt)
         elif self.provider == "gemini":
-            response = self._generate_gemini(system_prompt, user_prompt)
+            return self._generate_gemini(system_prompt, user_prompt, plan=plan)
         elif self.provider == "byteplus":
-            response = self._generate_byteplus(system_prompt, user_prompt)
+            return self._generate_byteplus(system_prompt, user_prompt, plan=plan)
         elif self.provider == "anthropic":
-            response = self._generate_anthropic(system_prompt, user_prompt)
+            return self._generate_anthropic(system_prompt, user_prompt, plan=plan)
         else:  # pragma: no cover
             raise RuntimeError(f"Unknown provider {self.provider!r}")
 
-        cleaned = re.sub(self._CODE_BLOCK_RE, "", response.get("content", "").strip())
-
-        STATE.set_agent_property("token_count", STATE.get_agent_property("token_count", 0) + response.get("tokens_used", 0))
-        if log_response:
-            logger.info(f"[LLM RECV] {cleaned}")
-        return cleaned
-
     @profile("llm_generate_response", OperationCategory.LLM)
     def generate_response(
         self,
         system_prompt: Optional[str] = None,
         user_prompt: Optional[str] = None,
         log_response: bool = True,
+        use_cache: bool = True,
     ) -> str:
-        """Generate a single response from the configured provider."""
-        return self._generate_response_sync(system_prompt, user_prompt, log_response)
+        """Generate a single response from the configured provider.
+
+        Pass ``use_cache=False`` when retrying a prompt whose previous answer
+        was rejected, so the retry reaches the provider.
+        """
+        return self._generate_response_sync(system_prompt, user_prompt, log_response, use_cache)
 
     @profile("llm_generate_response_async", OperationCategory.LLM)
     async def generate_response_async(
@@ -225,15 +332,314 @@ class LLMInterface:
         system_prompt: Optional[str] = None,
         user_prompt: Optional[str] = None,
         log_response: bool = True,
+        use_cache: bool = True,
     ) -> str:
-        """Async wrapper that defers the blocking call to a worker thread."""
-        return await asyncio.to_thread(
-            self._generate_response_sync,
-            system_prompt,
-            user_prompt,
-            log_response,
+        """Generate a single response without blocking the event loop.
+
+        Streams from the provider's pooled async client and returns the
+        complete, cleaned content (empty on provider errors, like the
+        synchronous path).
+        """
+        stream = self.stream_response(system_prompt, user_prompt, log_response=log_response, use_cache=use_cache)
+        return re.sub(self._CODE_BLOCK_RE, "", (await stream.read_all()).strip())
+
+    async def generate_json_response_async(
+        self,
+        system_prompt: Optional[str] = None,
+        user_prompt: Optional[str] = None,
+        log_response: bool = True,
+        json_mode: bool = False,
+        use_cache: bool = True,
+    ) -> str:
+        """Return the first JSON object of the response as soon as it closes.
+
+        The rest of the stream is drained in the background so usage and
+        prompt logs are still recorded. If the response contains no complete
+        JSON object, the full cleaned content is returned.
+
+        With ``json_mode`` the provider's native JSON output mode is requested
+        where it has one (see ``supports_json_mode``).
+        """
+        stream = self.stream_response(
+            system_prompt, user_prompt, log_response=log_response, json_mode=json_mode, use_cache=use_cache
+        )
+        scanner = JsonObjectScanner()
+        async for delta in stream:
+            if scanner.feed(delta) is not None:
+                if not stream.done:
+                    task = asyncio.ensure_future(stream.read_all())
+                    _background_drains.add(task)
+                    task.add_done_callback(_background_drains.discard)
+                return scanner.result
+        return re.sub(self._CODE_BLOCK_RE, "", stream.content.strip())
+
+    @property
+    def supports_json_mode(self) -> bool:
+        """Whether ``json_mode`` requests constrain the output to a JSON object."""
+        return self.provider in ("openai", "gemini", "remote")
+
+    def stream_response(
+        self,
+        system_prompt: Optional[str] = None,
+        user_prompt: Optional[str] = None,
+        log_response: bool = True,
+        json_mode: bool = False,
+        use_cache: bool = True,
+    ) -> LLMStream:
+        """Start a streamed request and return an async iterator of text deltas.
+
+        ``stream.usage`` holds the final token usage once iteration ends.
+        Token accounting and prompt logging happen when the stream completes.
+        Identical deterministic requests are served from the response cache
+        (or the replay cassette) as a single delta.
+
+        Raises:
+            CassetteMissError: In replay mode when the cassette has no response.
+        """
+        if user_prompt is None:
+            raise ValueError("`user_prompt` cannot be None.")
+
+        if log_response:
+            logger.info(f"[LLM SEND] system={system_prompt} | user={user_prompt}")
+
+        parts = self._request_parts(system_prompt, user_prompt, json_mode=json_mode)
+        cached = self._cached_response(parts, "prompt", use_cache)
+        if cached is not None:
+            if log_response:
+                logger.info(f"[LLM RECV] (cached) {cached.strip()}")
+            return LLMStream(self._cached_stream(cached))
+
+        started = time.perf_counter()
+        plan = self._cache_plan(system_prompt, user_prompt)
+        source = self._native_stream(system_prompt, user_prompt, json_mode=json_mode, plan=plan)
+        native = source is not None
+        if native:
+            # A fresh provider stream per attempt, under the provider's rate limits
+            source = get_request_scheduler(self.provider).stream(
+                lambda: self._native_stream(system_prompt, user_prompt, json_mode=json_mode, plan=plan),
+                tokens=self._request_tokens(system_prompt, user_prompt),
+            )
+        else:
+            source = self._threaded_stream(system_prompt, user_prompt, plan)
+
+        async def _on_complete(stream: LLMStream) -> None:
+            usage = stream.usage or LLMUsage()
+            if native:
+                # Threaded calls already logged and recorded metrics in _generate_*.
+                content = stream.content.strip() if stream.error is None else str(stream.error)
+                self._log_to_db(
+                    system_prompt,
+                    user_prompt,
+                    content,
+                    "success" if stream.error is None else "failed",
+                    usage.prompt_tokens,
+                    usage.completion_tokens,
+                    cached_tokens=usage.cached_tokens,
+                    latency=time.perf_counter() - started,
+                )
+                if stream.error is None:
+                    self._record_stream_cache_metrics(plan, usage)
+            if stream.error is None:
+                self._store_response(parts, "prompt", stream.content)
+            if log_response:
+                logger.info(f"[LLM RECV] {stream.content.strip()}")
+
+        return LLMStream(source, on_complete=_on_complete)
+
+    # ─────────────────── Native streaming providers ───────────────────
+
+    def _native_stream(
+        self,
+        system_prompt: Optional[str],
+        user_prompt: str,
+        json_mode: bool = False,
+        plan: Optional[CachePlan] = None,
+    ) -> Optional[AsyncIterator[StreamItem]]:
+        """Build the provider's async delta stream, or None when it must run threaded."""
+        plan = plan or self._cache_plan(system_prompt, user_prompt)
+        messages: List[Dict[str, str]] = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": user_prompt})
+
+        if self.provider == "openai" and self.client is not None:
+            payload = {
+                "model": self.model,
+                "messages": messages,
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
+            }
+            if json_mode:
+                payload["response_format"] = {"type": "json_object"}
+            if plan.cache_key:
+                payload["prompt_cache_key"] = plan.cache_key
+            headers = {"Authorization": f"Bearer {self.client.api_key}"}
+            url = f"{str(self.client.base_url).rstrip('/')}/chat/completions"
+            return stream_openai_compatible(get_http_client("openai"), url, payload, headers)
+
+        if self.provider == "byteplus":
+            if plan.mode == MODE_PREFIX and self._byteplus_cache_manager:
+                # Prefix caching goes through the stateful Responses API.
+                return None
+            payload = {
+                "model": self.model,
+                "messages": messages,
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
+            }
+            headers = {"Authorization": f"Bearer {self.api_key}"}
+            url = f"{self.byteplus_base_url.rstrip('/')}/chat/completions"
+            return stream_openai_compatible(get_http_client("byteplus"), url, payload, headers)
+
+        if self.provider == "remote" and self.remote_url:
+            payload = {
+                "model": self.model,
+                "system": system_prompt,
+                "prompt": user_prompt,
+                "options": {
+                    "temperature": self.temperature,
+                },
+            }
+            if json_mode:
+                payload["format"] = "json"
+            url = f"{self.remote_url.rstrip('/')}/generate"
+            return stream_ollama(get_http_client("remote"), url, payload)
+
+        if self.provider == "anthropic" and self._anthropic_client is not None:
+            payload: Dict[str, Any] = {
+                "model": self.model,
+                "max_tokens": self.max_tokens,
+                "messages": [{"role": "user", "content": plan.anthropic_user_content()}],
+                # Always pass temperature for Anthropic (their default is 1.0, not 0.0)
+                "temperature": self.temperature,
+            }
+            if system_prompt:
+                payload["system"] = plan.anthropic_system()
+            headers = {
+                "x-api-key": self._anthropic_client.api_key,
+                "anthropic-version": "2023-06-01",
+            }
+            url = f"{str(self._anthropic_client.base_url).rstrip('/')}/v1/messages"
+            return stream_anthropic(get_http_client("anthropic"), url, payload, headers)
+
+        if self.provider == "gemini" and self._gemini_client is not None:
+            url, params, payload = self._gemini_client.build_stream_request(
+                self.model,
+                prompt=user_prompt,
+                system_prompt=system_prompt,
+                temperature=self.temperature,
+                max_output_tokens=self.max_tokens,
+                json_mode=json_mode,
+            )
+            return stream_gemini(get_http_client("gemini"), url, params, payload)
+
+        return None
+
+    async def _threaded_stream(
+        self, system_prompt: Optional[str], user_prompt: str, plan: Optional[CachePlan] = None
+    ) -> AsyncIterator[StreamItem]:
+        """Run the blocking provider call on a worker thread and yield it as one delta."""
+        response = await asyncio.to_thread(self._call_provider, system_prompt, user_prompt, plan)
+        if response.get("content"):
+            yield response["content"]
+        yield LLMUsage(
+            cached_tokens=response.get("cached_tokens", 0) or 0,
+            total_tokens=response.get("tokens_used", 0) or 0,
+        )
+
+    # ─────────────────────── Request scheduling ───────────────────────
+
+    def _request_tokens(self, system_prompt: Optional[str], user_prompt: Optional[str]) -> int:
+        """Tokens reserved against the provider's tokens/minute limit for one request."""
+        return estimate_tokens(system_prompt, user_prompt, completion=min(self.max_tokens, COMPLETION_TOKEN_ESTIMATE))
+
+    def _scheduled(
+        self,
+        fn: Callable[[], Any],
+        system_prompt: Optional[str],
+        user_prompt: Optional[str],
+        usage: Optional[Callable[[Any], Optional[int]]] = None,
+    ) -> Any:
+        """Send a blocking provider request through the provider's scheduler (rate limits, retries)."""
+        return get_request_scheduler(self.provider).call(
+            fn, tokens=self._request_tokens(system_prompt, user_prompt), usage=usage
         )
 
+    # ─────────────────── Response cache / cassette ───────────────────
+
+    def _request_parts(
+        self,
+        system_prompt: Optional[str],
+        user_prompt: str,
+        **extra: Any,
+    ) -> Dict[str, Any]:
+        """Everything that determines a response, for cache and cassette keys."""
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "system": system_prompt,
+            "user": user_prompt,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            **extra,
+        }
+
+    def _cached_response(self, parts: Dict[str, Any], channel: str, use_cache: bool = True) -> Optional[str]:
+        """Replay from the cassette, or return a fresh cached response for a deterministic request.
+
+        Raises:
+            CassetteMissError: In replay mode when the cassette has no response.
+        """
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            return cassette.replay(parts, channel)
+        if not use_cache or self.temperature > 0:
+            return None
+        cache = get_response_cache()
+        if not cache.enabled:
+            return None
+        content = cache.get(request_key(parts))
+        if content is not None:
+            get_cache_metrics().record_hit(self.provider, "response")
+        return content
+
+    def _store_response(self, parts: Dict[str, Any], channel: str, content: str) -> None:
+        """Remember a successful response in the response cache and the recording cassette."""
+        if not content:
+            return
+        cassette = get_cassette()
+        if cassette is not None:
+            cassette.record(parts, channel, content)
+        if self.temperature <= 0:
+            get_response_cache().put(request_key(parts), content)
+
+    @staticmethod
+    async def _cached_stream(content: str) -> AsyncIterator[StreamItem]:
+        yield content
+        yield LLMUsage()
+
+    def _cache_plan(
+        self, system_prompt: Optional[str], user_prompt: Optional[str], call_type: Optional[str] = None
+    ) -> CachePlan:
+        """Which prompt prefix this request should cache, and how (see core.llm.cache.planner)."""
+        return get_cache_planner().plan(self.provider, system_prompt, user_prompt or "", call_type)
+
+    def _record_stream_cache_metrics(self, plan: CachePlan, usage: LLMUsage) -> None:
+        """Record cache hit/miss for a native stream the way the blocking calls do."""
+        if self.provider not in ("openai", "anthropic", "gemini"):
+            return
+        cache_type = plan.cache_type
+        metrics = get_cache_metrics()
+        plan.record(usage.cached_tokens)
+        if usage.cached_tokens > 0:
+            logger.info(
+                f"[CACHE] {self.provider} {cache_type} cache hit: "
+                f"{usage.cached_tokens}/{usage.prompt_tokens} tokens from cache"
+            )
+            metrics.record_hit(self.provider, cache_type, cached_tokens=usage.cached_tokens, total_tokens=usage.prompt_tokens)
+        elif usage.cache_creation_tokens > 0 or plan.cacheable:
+            metrics.record_miss(self.provider, cache_type, total_tokens=usage.prompt_tokens)
+
     # ─────────────────── Session/Explicit Cache Methods ───────────────────
 
     def create_session_cache(
@@ -411,6 +817,46 @@ class LLMInterface:
         user_prompt: str,
         system_prompt_for_new_session: Optional[str] = None,
         log_response: bool = True,
+    ) -> str:
+        """Session-based generation with cassette record/replay.
+
+        Session responses depend on the conversation held by the provider,
+        so they are never served from the in-memory response cache; only a
+        replaying cassette short-circuits them.
+        """
+        if user_prompt is None:
+            raise ValueError("`user_prompt` cannot be None.")
+
+        with usage_tags(task_id=task_id, call_type=call_type):
+            cassette = get_cassette()
+            if cassette is None:
+                return self._generate_session_response(
+                    task_id, call_type, user_prompt, system_prompt_for_new_session, log_response
+                )
+
+            system_prompt = system_prompt_for_new_session or self._session_system_prompts.get(f"{task_id}:{call_type}")
+            parts = self._request_parts(system_prompt, user_prompt, call_type=call_type)
+            channel = f"session:{call_type}"
+            if cassette.replaying:
+                cleaned = re.sub(self._CODE_BLOCK_RE, "", cassette.replay(parts, channel).strip())
+                if log_response:
+                    logger.info(f"[LLM RECV] (replayed) {cleaned}")
+                return cleaned
+
+            cleaned = self._generate_session_response(
+                task_id, call_type, user_prompt, system_prompt_for_new_session, log_response
+            )
+            if cleaned:
+                cassette.record(parts, channel, cleaned)
+            return cleaned
+
+    def _generate_session_response(
+        self,
+        task_id: str,
+        call_type: str,
+        user_prompt: str,
+        system_prompt_for_new_session: Optional[str] = None,
+        log_response: bool = True,
     ) -> str:
         """Generate response using session/explicit cache for the given task and call type.
 
@@ -437,6 +883,7 @@ class LLMInterface:
 
         if log_response:
             logger.info(f"[LLM SESSION] task={task_id} call_type={call_type} | user={user_prompt}")
+        self._mark_call_start()
 
         # Handle Gemini with explicit caching (per call_type)
         if self.provider == "gemini" and self._gemini_cache_manager:
@@ -453,10 +900,6 @@ class LLMInterface:
             # Use Gemini with explicit caching (call_type passed for cache keying)
             response = self._generate_gemini(effective_system_prompt, user_prompt, call_type=call_type)
             cleaned = re.sub(self._CODE_BLOCK_RE, "", response.get("content", "").strip())
-            STATE.set_agent_property(
-                "token_count",
-                STATE.get_agent_property("token_count", 0) + response.get("tokens_used", 0)
-            )
             if log_response:
                 logger.info(f"[LLM RECV] {cleaned}")
             return cleaned
@@ -476,10 +919,6 @@ class LLMInterface:
             # Use OpenAI with call_type for better cache routing via prompt_cache_key
             response = self._generate_openai(effective_system_prompt, user_prompt, call_type=call_type)
             cleaned = re.sub(self._CODE_BLOCK_RE, "", response.get("content", "").strip())
-            STATE.set_agent_property(
-                "token_count",
-                STATE.get_agent_property("token_count", 0) + response.get("tokens_used", 0)
-            )
             if log_response:
                 logger.info(f"[LLM RECV] {cleaned}")
             return cleaned
@@ -499,10 +938,6 @@ class LLMInterface:
             # Use Anthropic with call_type for extended 1-hour TTL caching
             response = self._generate_anthropic(effective_system_prompt, user_prompt, call_type=call_type)
             cleaned = re.sub(self._CODE_BLOCK_RE, "", response.get("content", "").strip())
-            STATE.set_agent_property(
-                "token_count",
-                STATE.get_agent_property("token_count", 0) + response.get("tokens_used", 0)
-            )
             if log_response:
                 logger.info(f"[LLM RECV] {cleaned}")
             return cleaned
@@ -510,7 +945,7 @@ class LLMInterface:
         # If not BytePlus (and not Gemini/OpenAI/Anthropic which are handled above), fall back to standard
         if self.provider != "byteplus" or not self._byteplus_cache_manager:
             return self._generate_response_sync(
-                system_prompt_for_new_session, user_prompt, log_response=False
+                system_prompt_for_new_session, user_prompt, log_response=False, record=False
             )
 
         # Use SESSION cache for BytePlus - context grows with each call via previous_response_id
@@ -550,15 +985,11 @@ class LLMInterface:
             stored_system_prompt = self._session_system_prompts.get(session_key)
             effective_system_prompt = system_prompt_for_new_session or stored_system_prompt
             return self._generate_response_sync(
-                effective_system_prompt, user_prompt, log_response=False
+                effective_system_prompt, user_prompt, log_response=False, record=False
             )
 
         cleaned = re.sub(self._CODE_BLOCK_RE, "", response.get("content", "").strip())
 
-        STATE.set_agent_property(
-            "token_count",
-            STATE.get_agent_property("token_count", 0) + response.get("tokens_used", 0)
-        )
         if log_response:
             logger.info(f"[LLM RECV] {cleaned}")
         return cleaned
@@ -607,6 +1038,7 @@ class LLMInterface:
             "success",
             token_count_input,
             token_count_output,
+            cached_tokens=cached_tokens,
         )
 
         return {
@@ -654,6 +1086,7 @@ class LLMInterface:
             "success",
             token_count_input,
             token_count_output,
+            cached_tokens=cached_tokens,
         )
 
         return {
@@ -722,6 +1155,7 @@ class LLMInterface:
         """
         token_count_input = token_count_output = 0
         total_tokens = 0
+        cached_tokens = 0
         status = "failed"
         content: Optional[str] = None
         exc_obj: Optional[Exception] = None
@@ -821,6 +1255,7 @@ class LLMInterface:
             status,
             token_count_input,
             token_count_output,
+            cached_tokens=cached_tokens,
         )
         return {
             "tokens_used": total_tokens or 0,
@@ -830,7 +1265,11 @@ class LLMInterface:
     # ───────────────────── Provider‑specific private helpers ─────────────────────
     @profile("llm_openai_call", OperationCategory.LLM)
     def _generate_openai(
-        self, system_prompt: str | None, user_prompt: str, call_type: Optional[str] = None
+        self,
+        system_prompt: str | None,
+        user_prompt: str,
+        call_type: Optional[str] = None,
+        plan: Optional[CachePlan] = None,
     ) -> Dict[str, Any]:
         """Generate response using OpenAI with automatic prompt caching.
 
@@ -847,6 +1286,7 @@ class LLMInterface:
             call_type: Optional call type for cache routing (e.g., "reasoning", "action_selection").
                        When provided, generates a prompt_cache_key to improve cache hit rates
                        when alternating between different call types.
+            plan: Cache plan for this request, when the caller already made one.
 
         Cache hits are logged when cached_tokens > 0 in the response.
         """
@@ -855,8 +1295,8 @@ class LLMInterface:
         status = "failed"
         content: Optional[str] = None
         exc_obj: Optional[Exception] = None
-        config = get_cache_config()
-        cache_type = f"automatic_{call_type}" if call_type else "automatic"
+        plan = plan or self._cache_plan(system_prompt, user_prompt, call_type)
+        cache_type = plan.cache_type
 
         try:
             messages: List[Dict[str, str]] = []
@@ -872,15 +1312,19 @@ class LLMInterface:
                 "max_tokens": self.max_tokens,
             }
 
-            # Add prompt_cache_key when call_type is provided for better cache routing
+            # The planner sets prompt_cache_key when call_type is provided for better cache routing
             # This helps when alternating between different call types (reasoning, action_selection)
-            if call_type and system_prompt and len(system_prompt) >= config.min_cache_tokens:
-                prompt_hash = hashlib.sha256(system_prompt.encode()).hexdigest()[:16]
-                cache_key = f"{call_type}_{prompt_hash}"
-                request_kwargs["extra_body"] = {"prompt_cache_key": cache_key}
-                logger.debug(f"[OPENAI] Using prompt_cache_key: {cache_key}")
-
-            response = self.client.chat.completions.create(**request_kwargs)
+            if plan.cache_key:
+                request_kwargs["extra_body"] = {"prompt_cache_key": plan.cache_key}
+                logger.debug(f"[OPENAI] Using prompt_cache_key: {plan.cache_key}")
+
+            # Retries and rate limits are handled by the request scheduler
+            response = self._scheduled(
+                lambda: self.client.with_options(max_retries=0).chat.completions.create(**request_kwargs),
+                system_prompt,
+                user_prompt,
+                usage=lambda r: r.usage.total_tokens,
+            )
             content = response.choices[0].message.content.strip()
             token_count_input = response.usage.prompt_tokens
             token_count_output = response.usage.completion_tokens
@@ -893,10 +1337,11 @@ class LLMInterface:
 
             # Record cache metrics
             metrics = get_cache_metrics()
+            plan.record(cached_tokens)
             if cached_tokens > 0:
                 logger.info(f"[CACHE] OpenAI {cache_type} cache hit: {cached_tokens}/{token_count_input} tokens from cache")
                 metrics.record_hit("openai", cache_type, cached_tokens=cached_tokens, total_tokens=token_count_input)
-            elif system_prompt and len(system_prompt) >= config.min_cache_tokens:
+            elif plan.cacheable:
                 # Caching should have been attempted (prompt long enough)
                 # This is a miss - either first call or cache expired
                 metrics.record_miss("openai", cache_type, total_tokens=token_count_input)
@@ -915,6 +1360,7 @@ class LLMInterface:
             status,
             token_count_input,
             token_count_output,
+            cached_tokens=cached_tokens,
         )
         return {
             "tokens_used": total_tokens or 0,
@@ -940,9 +1386,13 @@ class LLMInterface:
                 }
             }
             url: str = f"{self.remote_url.rstrip('/')}/generate"
-            response = requests.post(url, json=payload, timeout=120)
-            response.raise_for_status()
-            result = response.json()
+
+            def _post() -> Dict[str, Any]:
+                response = _http_session.post(url, json=payload, timeout=120)
+                response.raise_for_status()
+                return response.json()
+
+            result = self._scheduled(_post, system_prompt, user_prompt)
 
             content = result.get("response", "").strip()
             total_tokens = result.get("usage", {}).get("total_tokens", 0)
@@ -968,7 +1418,11 @@ class LLMInterface:
 
     @profile("llm_gemini_call", OperationCategory.LLM)
     def _generate_gemini(
-        self, system_prompt: str | None, user_prompt: str, call_type: Optional[str] = None
+        self,
+        system_prompt: str | None,
+        user_prompt: str,
+        call_type: Optional[str] = None,
+        plan: Optional[CachePlan] = None,
     ) -> Dict[str, Any]:
         """Generate response using Gemini with explicit or implicit caching.
 
@@ -984,6 +1438,7 @@ class LLMInterface:
             user_prompt: The user prompt for this request.
             call_type: Optional call type for cache keying (e.g., "reasoning", "action_selection").
                        When provided, enables explicit caching per call type.
+            plan: Cache plan for this request, when the caller already made one.
 
         Returns:
             Dict with tokens_used, content, cached_tokens.
@@ -994,7 +1449,7 @@ class LLMInterface:
         status = "failed"
         content: Optional[str] = None
         exc_obj: Optional[Exception] = None
-        config = get_cache_config()
+        plan = plan or self._cache_plan(system_prompt, user_prompt, call_type)
         cache_type = "implicit"  # Default cache type for metrics
 
         try:
@@ -1002,36 +1457,40 @@ class LLMInterface:
                 raise RuntimeError("Gemini client was not initialised.")
 
             # Use explicit caching when:
-            # 1. call_type is provided
-            # 2. system_prompt is long enough
-            # 3. cache manager is available
+            # 1. the planner chose it (call_type provided, system_prompt long enough)
+            # 2. cache manager is available
             # Note: GeminiCacheManager will automatically fall back to implicit caching
             # if the system prompt is below Gemini's 1024 token minimum
-            use_explicit_cache = (
-                call_type
-                and system_prompt
-                and len(system_prompt) >= config.min_cache_tokens
-                and self._gemini_cache_manager
-            )
+            use_explicit_cache = plan.mode == MODE_EXPLICIT and self._gemini_cache_manager
 
             if use_explicit_cache:
-                cache_type = f"explicit_{call_type}"
+                cache_type = plan.cache_type
                 logger.debug(f"[GEMINI] Using explicit caching for call_type: {call_type}")
-                result = self._gemini_cache_manager.get_or_create_cache(
-                    system_prompt=system_prompt,
-                    user_prompt=user_prompt,
-                    call_type=call_type,
-                    temperature=self.temperature,
-                    max_tokens=self.max_tokens,
+                result = self._scheduled(
+                    lambda: self._gemini_cache_manager.get_or_create_cache(
+                        system_prompt=system_prompt,
+                        user_prompt=user_prompt,
+                        call_type=call_type,
+                        temperature=self.temperature,
+                        max_tokens=self.max_tokens,
+                    ),
+                    system_prompt,
+                    user_prompt,
+                    usage=lambda r: r.get("tokens_used"),
                 )
             else:
                 # Fall back to implicit caching (or no caching for short prompts)
-                result = self._gemini_client.generate_text(
-                    self.model,
-                    prompt=user_prompt,
-                    system_prompt=system_prompt,
-                    temperature=self.temperature,
-                    max_output_tokens=self.max_tokens,
+                result = self._scheduled(
+                    lambda: self._gemini_client.generate_text(
+                        self.model,
+                        prompt=user_prompt,
+                        system_prompt=system_prompt,
+                        temperature=self.temperature,
+                        max_output_tokens=self.max_tokens,
+                    ),
+                    system_prompt,
+                    user_prompt,
+                    usage=lambda r: r.get("tokens_used"),
                 )
 
             # Extract response data
@@ -1043,10 +1502,11 @@ class LLMInterface:
 
             # Record cache metrics
             metrics = get_cache_metrics()
+            plan.record(cached_tokens, cache_type)
             if cached_tokens > 0:
                 logger.info(f"[CACHE] Gemini {cache_type} cache hit: {cached_tokens}/{token_count_input} tokens from cache")
                 metrics.record_hit("gemini", cache_type, cached_tokens=cached_tokens, total_tokens=token_count_input)
-            elif system_prompt and len(system_prompt) >= config.min_cache_tokens:
+            elif plan.cacheable:
                 # Caching should have been attempted (prompt long enough)
                 # This is a miss - either first call or cache expired
                 metrics.record_miss("gemini", cache_type, total_tokens=token_count_input)
@@ -1066,6 +1526,7 @@ class LLMInterface:
             status,
             token_count_input,
             token_count_output,
+            cached_tokens=cached_tokens,
         )
         return {
             "tokens_used": total_tokens or 0,
@@ -1074,28 +1535,25 @@ class LLMInterface:
         }
 
     @profile("llm_byteplus_call", OperationCategory.LLM)
-    def _generate_byteplus(self, system_prompt: str | None, user_prompt: str) -> Dict[str, Any]:
+    def _generate_byteplus(
+        self, system_prompt: str | None, user_prompt: str, plan: Optional[CachePlan] = None
+    ) -> Dict[str, Any]:
         """Generate response using BytePlus with automatic prefix caching.
 
-        Routes to prefix cache or standard API based on context.
+        Routes to prefix cache or standard API based on the cache plan.
         """
-        config = get_cache_config()
+        plan = plan or self._cache_plan(system_prompt, user_prompt)
         # Use prefix caching if:
-        # - System prompt is provided
-        # - System prompt is long enough (uses shared config)
+        # - The planner chose it (system prompt provided and long enough)
         # - Cache manager is available
-        if (
-            system_prompt
-            and len(system_prompt) >= config.min_cache_tokens
-            and self._byteplus_cache_manager
-        ):
-            return self._generate_byteplus_with_prefix_cache(system_prompt, user_prompt)
+        if plan.mode == MODE_PREFIX and self._byteplus_cache_manager:
+            return self._generate_byteplus_with_prefix_cache(system_prompt, user_prompt, plan)
 
         # Standard path (no caching)
         return self._generate_byteplus_standard(system_prompt, user_prompt)
 
     def _generate_byteplus_with_prefix_cache(
-        self, system_prompt: str, user_prompt: str
+        self, system_prompt: str, user_prompt: str, plan: Optional[CachePlan] = None
     ) -> Dict[str, Any]:
         """Use Responses API with prefix caching.
 
@@ -1105,6 +1563,7 @@ class LLMInterface:
         """
         token_count_input = token_count_output = 0
         total_tokens = 0
+        cached_tokens = 0
         status = "failed"
         content: Optional[str] = None
         exc_obj: Optional[Exception] = None
@@ -1133,6 +1592,8 @@ class LLMInterface:
             # Responses API uses input_tokens_details instead of prompt_tokens_details
             cached_tokens = usage.get("input_tokens_details", {}).get("cached_tokens", 0)
             metrics = get_cache_metrics()
+            if plan is not None:
+                plan.record(cached_tokens or 0)
             if cached_tokens and cached_tokens > 0:
                 logger.info(f"[CACHE] BytePlus prefix cache hit: {cached_tokens}/{token_count_input} tokens cached")
                 metrics.record_hit("byteplus", "prefix", cached_tokens=cached_tokens, total_tokens=token_count_input)
@@ -1179,6 +1640,7 @@ class LLMInterface:
             status,
             token_count_input,
             token_count_output,
+            cached_tokens=cached_tokens,
         )
         return {
             "tokens_used": total_tokens or 0,
@@ -1244,12 +1706,14 @@ class LLMInterface:
             logger.info(f"[BYTEPLUS STANDARD REQUEST] Model: {self.model}, Temp: {self.temperature}, MaxTokens: {self.max_tokens}")
             logger.info(f"[BYTEPLUS STANDARD REQUEST] Messages count: {len(messages)}")
 
-            response = requests.post(url, json=payload, headers=headers, timeout=120)
-
-            # Log response status
-            logger.info(f"[BYTEPLUS STANDARD RESPONSE] Status: {response.status_code}")
+            def _post() -> requests.Response:
+                response = _http_session.post(url, json=payload, headers=headers, timeout=120)
+                # Log response status
+                logger.info(f"[BYTEPLUS STANDARD RESPONSE] Status: {response.status_code}")
+                response.raise_for_status()
+                return response
 
-            response.raise_for_status()
+            response = self._scheduled(_post, system_prompt, user_prompt)
             result = response.json()
 
             logger.info(f"[BYTEPLUS STANDARD RESPONSE] Body: {result}")
@@ -1291,12 +1755,17 @@ class LLMInterface:
 
     @profile("llm_anthropic_call", OperationCategory.LLM)
     def _generate_anthropic(
-        self, system_prompt: str | None, user_prompt: str, call_type: Optional[str] = None
+        self,
+        system_prompt: str | None,
+        user_prompt: str,
+        call_type: Optional[str] = None,
+        plan: Optional[CachePlan] = None,
     ) -> Dict[str, Any]:
         """Generate response using Anthropic with prompt caching.
 
         Anthropic's prompt caching uses `cache_control` markers on content blocks.
-        When the system prompt is long enough (≥1024 tokens), we enable caching.
+        The cache planner places them: on the system prompt when it is long enough,
+        and after the part of the user prompt shared with recent requests.
 
         TTL Options:
         - Default (5 minutes): Free, uses "ephemeral" type
@@ -1309,17 +1778,18 @@ class LLMInterface:
             user_prompt: The user prompt for this request.
             call_type: Optional call type (e.g., "reasoning", "action_selection").
                        When provided, uses extended 1-hour TTL for better cache hit rates.
+            plan: Cache plan for this request, when the caller already made one.
 
         Cache hits are logged when `cache_read_input_tokens` > 0 in the response.
         """
         token_count_input = token_count_output = 0
         total_tokens = 0
-        cached_tokens = 0
+        cached_tokens = cache_read = 0
         status = "failed"
         content: Optional[str] = None
         exc_obj: Optional[Exception] = None
-        config = get_cache_config()
-        cache_type = f"ephemeral_{call_type}" if call_type else "ephemeral"
+        plan = plan or self._cache_plan(system_prompt, user_prompt, call_type)
+        cache_type = plan.cache_type
 
         try:
             if not self._anthropic_client:
@@ -1329,37 +1799,28 @@ class LLMInterface:
             message_kwargs: Dict[str, Any] = {
                 "model": self.model,
                 "max_tokens": self.max_tokens,
-                "messages": [{"role": "user", "content": user_prompt}],
+                "messages": [{"role": "user", "content": plan.anthropic_user_content()}],
             }
 
             if system_prompt:
-                # Use caching if system prompt is long enough
-                if len(system_prompt) >= config.min_cache_tokens:
-                    # Format system as list of content blocks with cache_control
-                    # Use extended 1-hour TTL when call_type is provided for better
-                    # cache hit rates when alternating between different call types
-                    cache_control: Dict[str, str] = {"type": "ephemeral"}
-                    if call_type:
-                        # Extended TTL: cache writes cost 100% more, reads 90% cheaper
-                        # Better for alternating call types where 5-minute TTL might expire
-                        cache_control["ttl"] = "1h"
-                        logger.debug(f"[ANTHROPIC] Using 1-hour TTL for call_type: {call_type}")
-
-                    message_kwargs["system"] = [
-                        {
-                            "type": "text",
-                            "text": system_prompt,
-                            "cache_control": cache_control,
-                        }
-                    ]
-                else:
-                    # Short prompt - use simple string format (no caching)
-                    message_kwargs["system"] = system_prompt
+                # Content blocks with cache_control when the planner caches the system prompt,
+                # otherwise the simple string format (no caching). The planner uses the extended
+                # 1-hour TTL when call_type is provided: cache writes cost 100% more, reads 90%
+                # cheaper, better for alternating call types where 5-minute TTL might expire
+                message_kwargs["system"] = plan.anthropic_system()
+                if plan.ttl:
+                    logger.debug(f"[ANTHROPIC] Using {plan.ttl} TTL for call_type: {call_type}")
 
             # Always pass temperature for Anthropic (their default is 1.0, not 0.0)
             message_kwargs["temperature"] = self.temperature
 
-            response = self._anthropic_client.messages.create(**message_kwargs)
+            # Retries and rate limits are handled by the request scheduler
+            response = self._scheduled(
+                lambda: self._anthropic_client.with_options(max_retries=0).messages.create(**message_kwargs),
+                system_prompt,
+                user_prompt,
+                usage=lambda r: r.usage.input_tokens + r.usage.output_tokens,
+            )
 
             # Extract content from the response
             content = ""
@@ -1383,6 +1844,7 @@ class LLMInterface:
 
             # Record metrics
             metrics = get_cache_metrics()
+            plan.record(cache_read)
             if cache_read > 0:
                 logger.info(f"[CACHE] Anthropic {cache_type} cache hit: {cache_read}/{token_count_input} tokens from cache")
                 metrics.record_hit("anthropic", cache_type, cached_tokens=cache_read, total_tokens=token_count_input)
@@ -1390,7 +1852,7 @@ class LLMInterface:
                 logger.info(f"[CACHE] Anthropic {cache_type} cache created: {cache_creation} tokens cached")
                 # Cache creation is a "miss" for the current call but sets up future hits
                 metrics.record_miss("anthropic", cache_type, total_tokens=token_count_input)
-            elif system_prompt and len(system_prompt) >= config.min_cache_tokens:
+            elif plan.cacheable:
                 # Caching was attempted but no cache info returned - unexpected
                 metrics.record_miss("anthropic", cache_type, total_tokens=token_count_input)
 
@@ -1405,8 +1867,10 @@ class LLMInterface:
             user_prompt,
             content if content is not None else str(exc_obj),
             status,
-            token_count_input,
+            # Anthropic reports cache reads/writes outside input_tokens
+            token_count_input + cached_tokens,
             token_count_output,
+            cached_tokens=cache_read,
         )
         return {
             "tokens_used": total_tokens or 0,
@@ -1424,8 +1888,21 @@ class LLMInterface:
         status: str,
         token_count_input: int,
         token_count_output: int,
+        cached_tokens: int = 0,
+        latency: Optional[float] = None,
     ) -> None:
-        """Persist prompt/response metadata using the optional `db_interface`."""
+        """Record the call in the usage ledger and persist prompt/response metadata
+        using the optional `db_interface`."""
+        call_latency = self._call_latency()
+        get_usage_ledger().record(
+            self.provider,
+            self.model,
+            prompt_tokens=token_count_input,
+            completion_tokens=token_count_output,
+            cached_tokens=cached_tokens,
+            latency=latency if latency is not None else call_latency,
+            success=status == "success",
+        )
         if not self.db_interface:
             return
 
@@ -0,0 +1,492 @@
+# -*- coding: utf-8 -*-
+"""
+core.llm.scheduler
+
+Per-provider request scheduling for LLM calls: rate limits, retries and
+priority lanes.
+
+Every provider request (blocking SDK/HTTP calls and native streams) goes
+through the provider's :class:`RequestScheduler`, which
+
+- admits requests through token buckets for requests/minute and
+  tokens/minute, so concurrent sessions queue instead of all hitting the
+  provider's limit at once;
+- serves waiting requests by priority lane: interactive work (the agent
+  reacting to a user or running a task) goes first, and background work
+  (memory processing) may not dip into a reserved share of either bucket;
+- retries transient failures (429, 5xx, timeouts, dropped connections) with
+  jittered exponential backoff. A ``Retry-After`` header sets the delay and
+  pauses the whole provider, since the limit it reports is shared.
+
+Streams are only retried while no text has been yielded yet.
+
+The lane comes from the calling context, set with :func:`request_priority`.
+
+Configuration (environment), per provider with a global fallback:
+    LLM_<PROVIDER>_RPM / LLM_RPM    requests per minute (0 = unlimited, default)
+    LLM_<PROVIDER>_TPM / LLM_TPM    tokens per minute (0 = unlimited, default)
+    LLM_MAX_RETRIES                 retries after the first attempt (default 4)
+    LLM_RETRY_BASE_DELAY            first backoff in seconds (default 1)
+    LLM_RETRY_MAX_DELAY             backoff cap in seconds (default 60)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from .streaming import LLMUsage, StreamItem
+
+# Logging setup
+try:
+    from core.logger import logger  # type: ignore
+except Exception:  # pragma: no cover
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+T = TypeVar("T")
+
+# Status codes worth another attempt (529 is Anthropic's "overloaded")
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+_TRANSIENT_ERROR_NAMES = ("Timeout", "ConnectionError", "ConnectError", "RemoteProtocolError", "ReadError")
+
+# Completion tokens assumed when reserving tokens/minute for a request;
+# the reservation is corrected once the provider reports usage
+COMPLETION_TOKEN_ESTIMATE = 512
+_POLL_INTERVAL = 0.05
+
+
+class RequestPriority(IntEnum):
+    """Priority lanes, most urgent first."""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+_current_priority: ContextVar[RequestPriority] = ContextVar("llm_request_priority", default=RequestPriority.NORMAL)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """Run the LLM requests made in this context (and its threads) in ``priority``'s lane."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> RequestPriority:
+    return _current_priority.get()
+
+
+def estimate_tokens(*texts: Optional[str], completion: int = 0) -> int:
+    """Rough token count of a request (4 characters per token) plus ``completion``."""
+    return sum(len(text) for text in texts if text) // 4 + completion
+
+
+# ───────────────────────────── Configuration ─────────────────────────────
+
+@dataclass
+class SchedulerConfig:
+    """Rate limits and retry policy for one provider.
+
+    Attributes:
+        requests_per_minute: Request bucket size and refill rate (0 = unlimited).
+        tokens_per_minute: Token bucket size and refill rate (0 = unlimited).
+        max_retries: Retries after the first attempt.
+        base_delay: Backoff before the first retry; doubles per attempt.
+        max_delay: Cap on a single backoff (and on honoured Retry-After values).
+        background_reserve: Share of each bucket that background requests
+            leave for interactive ones.
+    """
+    requests_per_minute: float = 0
+    tokens_per_minute: float = 0
+    max_retries: int = 4
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    background_reserve: float = 0.25
+
+    @classmethod
+    def from_env(cls, provider: str) -> "SchedulerConfig":
+        """Load the configuration for ``provider`` from environment variables."""
+        prefix = f"LLM_{provider.upper()}_"
+        return cls(
+            requests_per_minute=float(os.getenv(prefix + "RPM", os.getenv("LLM_RPM", "0"))),
+            tokens_per_minute=float(os.getenv(prefix + "TPM", os.getenv("LLM_TPM", "0"))),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+            base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "1")),
+            max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "60")),
+        )
+
+
+# ──────────────────────────── Error inspection ────────────────────────────
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of an SDK, requests or httpx error, if it has one."""
+    for attr in ("status_code", "http_status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    value = getattr(getattr(error, "response", None), "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, from ``Retry-After`` / ``retry-after-ms``."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(error, "headers", None)
+    if not headers:
+        return None
+    try:
+        millis = headers.get("retry-after-ms")
+        if millis:
+            return max(0.0, float(millis) / 1000)
+        value = headers.get("retry-after")
+    except Exception:
+        return None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether ``error`` is a rate limit, a server error or a network failure."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    return any(name in cls.__name__ for cls in type(error).__mro__ for name in _TRANSIENT_ERROR_NAMES)
+
+
+# ────────────────────────────── Token bucket ──────────────────────────────
+
+class TokenBucket:
+    """Holds up to ``per_minute`` units, refilled continuously at ``per_minute`` per minute."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.capacity = max(0.0, float(per_minute))
+        self._rate = self.capacity / 60.0
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, reserve: float = 0.0) -> float:
+        """Seconds until ``amount`` can be taken while leaving ``reserve`` of the capacity."""
+        if self.unlimited or amount <= 0:
+            return 0.0
+        self._refill()
+        floor = reserve * self.capacity
+        # Requests larger than the bucket go through once it is full
+        needed = min(amount + floor, self.capacity)
+        return max(0.0, (needed - self._level) / self._rate)
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self._refill()
+            self._level -= amount
+
+    def give(self, amount: float) -> None:
+        """Return (or, when negative, additionally take) ``amount`` after the real usage is known."""
+        if not self.unlimited:
+            self._refill()
+            self._level = min(self.capacity, self._level + amount)
+
+
+# ──────────────────────────────── Scheduler ────────────────────────────────
+
+@dataclass
+class SchedulerStats:
+    """Counters for one provider's scheduler."""
+    requests: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    failures: int = 0
+    throttled_seconds: float = 0.0
+    backoff_seconds: float = 0.0
+
+
+class RequestScheduler:
+    """Rate-limits, prioritises and retries the requests to one provider.
+
+    Usage:
+        scheduler = get_request_scheduler("openai")
+        response = scheduler.call(lambda: client.chat.completions.create(**kwargs), tokens=1200)
+
+        async for item in scheduler.stream(lambda: stream_openai_compatible(...), tokens=1200):
+            ...
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        config: Optional[SchedulerConfig] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.provider = provider
+        self.config = config or SchedulerConfig.from_env(provider)
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng
+        self._requests = TokenBucket(self.config.requests_per_minute, clock)
+        self._tokens = TokenBucket(self.config.tokens_per_minute, clock)
+        self._cond = threading.Condition()
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self.stats = SchedulerStats()
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+    def _enqueue(self, priority: RequestPriority) -> Tuple[int, int]:
+        ticket = (int(priority), next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _withdraw(self, ticket: Tuple[int, int]) -> None:
+        with self._cond:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def _try_admit(self, ticket: Tuple[int, int], tokens: int) -> Optional[float]:
+        """Admit ``ticket`` (returns 0), or return how long to wait (None: not first in line)."""
+        if self._waiting[0] != ticket:
+            return None
+        reserve = self.config.background_reserve if ticket[0] >= RequestPriority.BACKGROUND else 0.0
+        delay = max(
+            self._paused_until - self._clock(),
+            self._requests.wait_time(1, reserve),
+            self._tokens.wait_time(tokens, reserve),
+        )
+        if delay > 0:
+            return delay
+        self._requests.take(1)
+        self._tokens.take(tokens)
+        heapq.heappop(self._waiting)
+        self.stats.requests += 1
+        self._cond.notify_all()
+        return 0.0
+
+    def acquire(self, tokens: int = 0, priority: Optional[RequestPriority] = None) -> float:
+        """Block until a request of ``tokens`` may be sent; returns the seconds waited."""
+        ticket = self._enqueue(current_priority() if priority is None else priority)
+        started = self._clock()
+        try:
+            with self._cond:
+                while True:
+                    delay = self._try_admit(ticket, tokens)
+                    if delay == 0:
+                        break
+                    self._cond.wait(timeout=delay if delay is not None else _POLL_INTERVAL)
+        except BaseException:
+            self._withdraw(ticket)
+            raise
+        return self._record_wait(started)
+
+    async def acquire_async(self, tokens: int = 0, priority: Optional[RequestPriority] = None) -> float:
+        """Async variant of :meth:`acquire`; waits without blocking the event loop."""
+        ticket = self._enqueue(current_priority() if priority is None else priority)
+        started = self._clock()
+        try:
+            while True:
+                with self._cond:
+                    delay = self._try_admit(ticket, tokens)
+                if delay == 0:
+                    break
+                await asyncio.sleep(min(delay, 1.0) if delay is not None else _POLL_INTERVAL)
+        except BaseException:
+            self._withdraw(ticket)
+            raise
+        return self._record_wait(started)
+
+    def _record_wait(self, started: float) -> float:
+        waited = self._clock() - started
+        if waited > 0.01:
+            self.stats.throttled_seconds += waited
+            logger.debug(f"[LLM SCHEDULER] {self.provider} request waited {waited:.2f}s for rate limits")
+        return waited
+
+    def settle(self, reserved: int, used: Optional[int]) -> None:
+        """Correct the token bucket once a request's real usage is known."""
+        if used is None or used <= 0:
+            return
+        with self._cond:
+            self._tokens.give(reserved - used)
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Retries
+    # ------------------------------------------------------------------
+    def _retry_delay(self, error: BaseException, attempt: int) -> Optional[float]:
+        """Backoff before retrying ``error``, or None to give up."""
+        if attempt >= self.config.max_retries or not is_retryable(error):
+            with self._cond:
+                self.stats.failures += 1
+            return None
+
+        status = _status_code(error)
+        backoff = min(self.config.max_delay, self.config.base_delay * (2 ** attempt))
+        delay = backoff * (0.5 + self._rng() / 2)
+        retry_after = _retry_after(error)
+        with self._cond:
+            self.stats.retries += 1
+            if status == 429:
+                self.stats.rate_limited += 1
+            if retry_after is not None:
+                retry_after = min(retry_after, self.config.max_delay)
+                # The limit is shared: hold every request to this provider
+                self._paused_until = max(self._paused_until, self._clock() + retry_after)
+                delay = retry_after + self._rng() * self.config.base_delay
+            self.stats.backoff_seconds += delay
+        logger.warning(
+            f"[LLM SCHEDULER] {self.provider} request failed "
+            f"({status or type(error).__name__}: {str(error)[:200]}); "
+            f"retry {attempt + 1}/{self.config.max_retries} in {delay:.1f}s"
+        )
+        return delay
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        *,
+        tokens: int = 0,
+        priority: Optional[RequestPriority] = None,
+        usage: Optional[Callable[[T], Optional[int]]] = None,
+    ) -> T:
+        """
+        Run a blocking provider request under the rate limits, retrying transient failures.
+
+        Args:
+            fn: Sends the request and returns the response; called once per attempt.
+            tokens: Estimated tokens of the request (see :func:`estimate_tokens`).
+            priority: Lane; defaults to the calling context's.
+            usage: Extracts the real token count from the response.
+
+        Raises:
+            The last error once it is not retryable or retries are exhausted.
+        """
+        priority = current_priority() if priority is None else priority
+        for attempt in itertools.count():
+            self.acquire(tokens, priority)
+            try:
+                result = fn()
+            except Exception as error:
+                delay = self._retry_delay(error, attempt)
+                if delay is None:
+                    raise
+                self._sleep(delay)
+                continue
+            if usage is not None:
+                try:
+                    self.settle(tokens, usage(result))
+                except Exception:
+                    pass
+            return result
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    async def stream(
+        self,
+        factory: Callable[[], AsyncIterator[StreamItem]],
+        *,
+        tokens: int = 0,
+        priority: Optional[RequestPriority] = None,
+    ) -> AsyncIterator[StreamItem]:
+        """
+        Stream a provider response under the rate limits.
+
+        ``factory`` opens a new stream per attempt. Failures are retried only
+        until the first text delta has been yielded.
+        """
+        priority = current_priority() if priority is None else priority
+        for attempt in itertools.count():
+            await self.acquire_async(tokens, priority)
+            source = factory()
+            started = False
+            try:
+                async for item in source:
+                    if isinstance(item, LLMUsage):
+                        self.settle(tokens, item.total_tokens or item.prompt_tokens + item.completion_tokens)
+                    else:
+                        started = True
+                    yield item
+                return
+            except Exception as error:
+                delay = None if started else self._retry_delay(error, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+            finally:
+                aclose = getattr(source, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "provider": self.provider,
+                "requests": self.stats.requests,
+                "retries": self.stats.retries,
+                "rate_limited": self.stats.rate_limited,
+                "failures": self.stats.failures,
+                "throttled_seconds": round(self.stats.throttled_seconds, 3),
+                "backoff_seconds": round(self.stats.backoff_seconds, 3),
+                "waiting": len(self._waiting),
+            }
+
+
+# Global schedulers, one per provider
+_schedulers: Dict[str, RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_request_scheduler(provider: str) -> RequestScheduler:
+    """Get the scheduler for ``provider``, configured from the environment on first use."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(provider)
+        if scheduler is None:
+            scheduler = _schedulers[provider] = RequestScheduler(provider)
+        return scheduler
+
+
+def set_request_scheduler(provider: str, scheduler: Optional[RequestScheduler]) -> None:
+    """Install (or with None, reset) the scheduler for ``provider``."""
+    with _schedulers_lock:
+        if scheduler is None:
+            _schedulers.pop(provider, None)
+        else:
+            _schedulers[provider] = scheduler
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+core.llm.streaming
+
+Native async streaming layer for the LLM providers.
+
+- One pooled ``httpx.AsyncClient`` per provider (and event loop), so
+  concurrent sessions share keep-alive connections instead of opening a new
+  one per call or tying up a worker thread each.
+- Per-provider stream parsers (OpenAI-compatible SSE, Ollama NDJSON,
+  Anthropic SSE, Gemini SSE) that yield text deltas followed by one
+  :class:`LLMUsage`.
+- :class:`LLMStream`, the consumer-facing async iterator of deltas that
+  exposes the accumulated content and final usage.
+- :class:`JsonObjectScanner`, which spots the end of the first top-level
+  JSON object in a stream so callers can act on it before generation ends.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import weakref
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Union
+
+import httpx
+
+try:
+    from core.logger import logger  # type: ignore
+except Exception:  # pragma: no cover
+    logger = logging.getLogger(__name__)
+
+# Connection pool sizing shared by every provider client.
+MAX_CONNECTIONS = 32
+MAX_KEEPALIVE_CONNECTIONS = 16
+REQUEST_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+
+@dataclass
+class LLMUsage:
+    """Token usage reported at the end of a streamed response."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cache_creation_tokens: int = 0
+    total_tokens: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.total_tokens:
+            self.total_tokens = self.prompt_tokens + self.completion_tokens
+
+
+StreamItem = Union[str, LLMUsage]
+
+
+# ───────────────────────────── Pooled clients ─────────────────────────────
+
+# loop -> provider -> client. Keyed by the loop object itself (not its id,
+# which a later loop may reuse), and dropped when the loop is collected.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_http_client(provider: str) -> httpx.AsyncClient:
+    """Return the shared pooled client for ``provider`` on the running loop.
+
+    ``httpx.AsyncClient`` connections are bound to the loop they were opened
+    on, so clients are pooled per loop. Code that runs a private loop must
+    ``await aclose_http_clients()`` before closing it.
+    """
+    loop_clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    client = loop_clients.get(provider)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+        loop_clients[provider] = client
+    return client
+
+
+async def aclose_http_clients() -> None:
+    """Close every pooled client opened on the running loop."""
+    for client in _clients.pop(asyncio.get_running_loop(), {}).values():
+        await client.aclose()
+
+
+# ───────────────────────────── Wire parsers ─────────────────────────────
+
+async def _iter_sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """Yield the ``data:`` payloads of a server-sent event stream."""
+    async for line in response.aiter_lines():
+        if line.startswith("data:"):
+            yield line[5:].strip()
+
+
+async def _raise_for_status(response: httpx.Response) -> None:
+    if response.status_code >= 400:
+        body = (await response.aread()).decode("utf-8", errors="replace")
+        raise httpx.HTTPStatusError(
+            f"HTTP {response.status_code} from {response.request.url}: {body[:1000]}",
+            request=response.request,
+            response=response,
+        )
+
+
+async def stream_openai_compatible(
+    client: httpx.AsyncClient,
+    url: str,
+    payload: Dict[str, Any],
+    headers: Dict[str, str],
+) -> AsyncIterator[StreamItem]:
+    """Stream a ``/chat/completions`` request (OpenAI, BytePlus)."""
+    body = {**payload, "stream": True, "stream_options": {"include_usage": True}}
+    usage = LLMUsage()
+    async with client.stream("POST", url, json=body, headers=headers) as response:
+        await _raise_for_status(response)
+        async for data in _iter_sse_data(response):
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            for choice in chunk.get("choices") or []:
+                text = (choice.get("delta") or {}).get("content")
+                if text:
+                    yield text
+            if chunk.get("usage"):
+                raw = chunk["usage"]
+                details = raw.get("prompt_tokens_details") or {}
+                usage = LLMUsage(
+                    prompt_tokens=int(raw.get("prompt_tokens", 0) or 0),
+                    completion_tokens=int(raw.get("completion_tokens", 0) or 0),
+                    cached_tokens=int(details.get("cached_tokens", 0) or 0),
+                    total_tokens=int(raw.get("total_tokens", 0) or 0),
+                )
+    yield usage
+
+
+async def stream_ollama(
+    client: httpx.AsyncClient,
+    url: str,
+    payload: Dict[str, Any],
+) -> AsyncIterator[StreamItem]:
+    """Stream an Ollama ``/api/generate`` request (newline-delimited JSON)."""
+    usage = LLMUsage()
+    async with client.stream("POST", url, json={**payload, "stream": True}) as response:
+        await _raise_for_status(response)
+        async for line in response.aiter_lines():
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                raise RuntimeError(f"Ollama error: {chunk['error']}")
+            if chunk.get("response"):
+                yield chunk["response"]
+            if chunk.get("done"):
+                usage = LLMUsage(
+                    prompt_tokens=int(chunk.get("prompt_eval_count", 0) or 0),
+                    completion_tokens=int(chunk.get("eval_count", 0) or 0),
+                )
+    yield usage
+
+
+async def stream_anthropic(
+    client: httpx.AsyncClient,
+    url: str,
+    payload: Dict[str, Any],
+    headers: Dict[str, str],
+) -> AsyncIterator[StreamItem]:
+    """Stream an Anthropic ``/v1/messages`` request."""
+    usage = LLMUsage()
+    async with client.stream("POST", url, json={**payload, "stream": True}, headers=headers) as response:
+        await _raise_for_status(response)
+        async for data in _iter_sse_data(response):
+            event = json.loads(data)
+            event_type = event.get("type")
+            if event_type == "content_block_delta":
+                delta = event.get("delta") or {}
+                if delta.get("type") == "text_delta" and delta.get("text"):
+                    yield delta["text"]
+            elif event_type == "message_start":
+                raw = (event.get("message") or {}).get("usage") or {}
+                usage.prompt_tokens = int(raw.get("input_tokens", 0) or 0)
+                usage.cached_tokens = int(raw.get("cache_read_input_tokens", 0) or 0)
+                usage.cache_creation_tokens = int(raw.get("cache_creation_input_tokens", 0) or 0)
+            elif event_type == "message_delta":
+                usage.completion_tokens = int((event.get("usage") or {}).get("output_tokens", 0) or 0)
+            elif event_type == "error":
+                raise RuntimeError(f"Anthropic stream error: {event.get('error')}")
+    usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+    yield usage
+
+
+async def stream_gemini(
+    client: httpx.AsyncClient,
+    url: str,
+    params: Dict[str, str],
+    payload: Dict[str, Any],
+) -> AsyncIterator[StreamItem]:
+    """Stream a Gemini ``:streamGenerateContent`` request (SSE mode)."""
+    usage = LLMUsage()
+    async with client.stream("POST", url, params=params, json=payload) as response:
+        await _raise_for_status(response)
+        async for data in _iter_sse_data(response):
+            chunk = json.loads(data)
+            feedback = chunk.get("promptFeedback") or {}
+            if feedback.get("blockReason"):
+                raise RuntimeError(f"Prompt blocked by Gemini: {feedback['blockReason']}")
+            for candidate in chunk.get("candidates") or []:
+                for part in (candidate.get("content") or {}).get("parts") or []:
+                    if part.get("text"):
+                        yield part["text"]
+            meta = chunk.get("usageMetadata")
+            if meta:
+                usage = LLMUsage(
+                    prompt_tokens=int(meta.get("promptTokenCount", 0) or 0),
+                    completion_tokens=int(meta.get("candidatesTokenCount", 0) or 0),
+                    cached_tokens=int(meta.get("cachedContentTokenCount", 0) or 0),
+                    total_tokens=int(meta.get("totalTokenCount", 0) or 0),
+                )
+    yield usage
+
+
+# ───────────────────────────── Consumer API ─────────────────────────────
+
+class LLMStream:
+    """Async iterator over the text deltas of one LLM response.
+
+    ``content`` accumulates as deltas arrive; ``usage`` is set once the
+    provider reports it at the end. A provider error ends the iteration and
+    is kept on ``error`` rather than raised, matching the non-streaming
+    methods, which log failures and return empty content.
+
+    Usage:
+        stream = llm.stream_response(system_prompt, user_prompt)
+        async for delta in stream:
+            print(delta, end="")
+        print(stream.usage)
+    """
+
+    def __init__(
+        self,
+        source: AsyncIterator[StreamItem],
+        on_complete: Optional[Callable[["LLMStream"], Awaitable[None]]] = None,
+    ) -> None:
+        self._source = source
+        self._on_complete = on_complete
+        self._parts: list[str] = []
+        self.usage: Optional[LLMUsage] = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+
+    @property
+    def content(self) -> str:
+        return "".join(self._parts)
+
+    def __aiter__(self) -> "LLMStream":
+        return self
+
+    async def __anext__(self) -> str:
+        while not self.done:
+            try:
+                item = await self._source.__anext__()
+            except StopAsyncIteration:
+                await self._finish()
+                break
+            except asyncio.CancelledError:
+                await self._finish(asyncio.CancelledError())
+                raise
+            except Exception as exc:
+                logger.error(f"[LLM STREAM] {type(exc).__name__}: {exc}")
+                await self._finish(exc)
+                break
+            if isinstance(item, LLMUsage):
+                self.usage = item
+                continue
+            self._parts.append(item)
+            return item
+        raise StopAsyncIteration
+
+    async def _finish(self, error: Optional[BaseException] = None) -> None:
+        if self.done:
+            return
+        self.done = True
+        self.error = error
+        aclose = getattr(self._source, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception:
+                pass
+        if self._on_complete is not None:
+            await self._on_complete(self)
+
+    async def read_all(self) -> str:
+        """Consume the rest of the stream and return the full content."""
+        async for _ in self:
+            pass
+        return self.content
+
+    async def aclose(self) -> None:
+        """Stop the stream early (the provider request is aborted)."""
+        await self._finish(asyncio.CancelledError())
+
+
+class JsonObjectScanner:
+    """Incrementally find the first complete top-level JSON object in a text stream.
+
+    Tracks brace depth outside of string literals, so it can tell when the
+    object closes without parsing partial JSON. Leading prose or code fences
+    before the first ``{`` are ignored.
+    """
+
+    def __init__(self) -> None:
+        self._buffer: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._started = False
+        self.result: Optional[str] = None
+
+    def feed(self, text: str) -> Optional[str]:
+        """Feed the next delta; returns the object text once it has closed."""
+        if self.result is not None:
+            return self.result
+        start = 0
+        for i, ch in enumerate(text):
+            if not self._started:
+                if ch != "{":
+                    continue
+                self._started = True
+                start = i
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.result = "".join(self._buffer) + text[start : i + 1]
+                    return self.result
+        if self._started:
+            self._buffer.append(text[start:])
+        return None
@@ -0,0 +1,90 @@
+"""Tests for the response cache defaults and cassette record/replay."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+
+from core.llm.cache import response  # noqa: E402
+from core.llm.cache.response import (  # noqa: E402
+    CASSETTE_RECORD,
+    CASSETTE_REPLAY,
+    Cassette,
+    CassetteMissError,
+    ResponseCache,
+    request_key,
+)
+
+
+def _parts(user):
+    return {"provider": "openai", "model": "m", "system": "sys", "user": user, "json_mode": False}
+
+
+def _record(path, *pairs, overwrite=False):
+    cassette = Cassette(path, CASSETTE_RECORD, overwrite=overwrite)
+    for user, content in pairs:
+        cassette.record(_parts(user), "prompt", content)
+
+
+def test_response_cache_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("LLM_RESPONSE_CACHE_TTL", raising=False)
+    monkeypatch.setattr(response, "_response_cache", None)
+    assert not response.get_response_cache().enabled
+
+
+def test_response_cache_expires_entries():
+    now = [0.0]
+    cache = ResponseCache(ttl=10, clock=lambda: now[0])
+    key = request_key(_parts("hi"))
+    cache.put(key, "hello")
+    assert cache.get(key) == "hello"
+    now[0] = 11
+    assert cache.get(key) is None
+
+
+def test_replay_serves_recorded_responses_in_order(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    _record(path, ("hi", "first"), ("hi", "second"))
+
+    cassette = Cassette(path, CASSETTE_REPLAY)
+    assert cassette.replay(_parts("hi"), "prompt") == "first"
+    assert cassette.replay(_parts("hi"), "prompt") == "second"
+
+
+def test_replay_keys_ignore_timestamps(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    _record(path, ("Now: 2024-01-01 10:00:00", "recorded"))
+
+    cassette = Cassette(path, CASSETTE_REPLAY)
+    assert cassette.replay(_parts("Now: 2026-10-16 08:30:12"), "prompt") == "recorded"
+
+
+def test_unknown_request_raises_instead_of_answering_another_prompt(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    _record(path, ("hi", "recorded"))
+
+    cassette = Cassette(path, CASSETTE_REPLAY)
+    with pytest.raises(CassetteMissError):
+        cassette.replay(_parts("something else"), "prompt")
+
+
+def test_channel_fallback_is_opt_in(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    _record(path, ("hi", "recorded"))
+
+    cassette = Cassette(path, CASSETTE_REPLAY, fallback=True)
+    assert cassette.replay(_parts("something else"), "prompt") == "recorded"
+    assert cassette.fallbacks == 1
+    with pytest.raises(CassetteMissError):
+        cassette.replay(_parts("another"), "prompt")
+
+
+def test_recording_appends_unless_overwrite(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    _record(path, ("a", "1"))
+    _record(path, ("b", "2"))
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+
+    _record(path, ("c", "3"), overwrite=True)
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 1
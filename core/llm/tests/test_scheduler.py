@@ -0,0 +1,216 @@
+"""Tests for the request scheduler's retry backoff and Retry-After handling."""
+import asyncio
+import sys
+import time
+from email.utils import formatdate
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+
+from core.llm.scheduler import RequestScheduler, SchedulerConfig  # noqa: E402
+
+
+class ProviderError(Exception):
+    """Shaped like an SDK/httpx error: a status code and a response with headers."""
+
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+def _flaky(*errors, result="ok"):
+    """A request that raises ``errors`` in turn, then returns ``result``."""
+    calls = []
+
+    def fn():
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return fn, calls
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the scheduler sleeps."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _scheduler(rng=0.0, **config):
+    clock = FakeClock()
+    scheduler = RequestScheduler(
+        "test",
+        SchedulerConfig(**config),
+        clock=clock,
+        sleep=clock.sleep,
+        rng=lambda: rng,
+    )
+    return scheduler, clock.sleeps
+
+
+# ───────────────────────────── Backoff ─────────────────────────────
+
+def test_backoff_doubles_per_attempt_with_jitter_floor():
+    scheduler, sleeps = _scheduler(base_delay=1.0, max_retries=4)
+    fn, calls = _flaky(ProviderError(503), ProviderError(502), ProviderError(500))
+
+    assert scheduler.call(fn) == "ok"
+    assert len(calls) == 4
+    # rng() == 0 gives the lower half of the jitter range
+    assert sleeps == [0.5, 1.0, 2.0]
+    assert scheduler.get_stats()["retries"] == 3
+
+
+def test_backoff_is_capped_at_max_delay():
+    scheduler, sleeps = _scheduler(rng=1.0, base_delay=4.0, max_delay=10.0, max_retries=4)
+    fn, _ = _flaky(*[ProviderError(503)] * 4)
+
+    scheduler.call(fn)
+    assert sleeps == [4.0, 8.0, 10.0, 10.0]
+
+
+def test_transient_network_errors_are_retried():
+    scheduler, sleeps = _scheduler()
+    fn, calls = _flaky(ConnectionError("reset"), TimeoutError("slow"))
+
+    assert scheduler.call(fn) == "ok"
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_non_retryable_status_raises_without_retry():
+    scheduler, sleeps = _scheduler()
+    fn, calls = _flaky(ProviderError(400))
+
+    with pytest.raises(ProviderError):
+        scheduler.call(fn)
+    assert len(calls) == 1
+    assert sleeps == []
+    assert scheduler.get_stats()["failures"] == 1
+
+
+def test_gives_up_after_max_retries():
+    scheduler, sleeps = _scheduler(max_retries=2)
+    fn, calls = _flaky(*[ProviderError(503)] * 5)
+
+    with pytest.raises(ProviderError):
+        scheduler.call(fn)
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+# ───────────────────────────── Retry-After ─────────────────────────────
+
+def test_retry_after_seconds_sets_the_delay():
+    scheduler, sleeps = _scheduler(base_delay=1.0)
+    fn, _ = _flaky(ProviderError(429, {"retry-after": "7"}))
+
+    scheduler.call(fn)
+    assert sleeps == [7.0]
+    stats = scheduler.get_stats()
+    assert stats["rate_limited"] == 1
+    assert stats["retries"] == 1
+
+
+def test_retry_after_ms_takes_precedence():
+    scheduler, sleeps = _scheduler()
+    fn, _ = _flaky(ProviderError(429, {"retry-after-ms": "1500", "retry-after": "30"}))
+
+    scheduler.call(fn)
+    assert sleeps == [1.5]
+
+
+def test_retry_after_http_date():
+    scheduler, sleeps = _scheduler(max_delay=120.0)
+    fn, _ = _flaky(ProviderError(503, {"retry-after": formatdate(time.time() + 30, usegmt=True)}))
+
+    scheduler.call(fn)
+    # HTTP dates have one-second resolution
+    assert 28.0 <= sleeps[0] <= 31.0
+
+
+def test_retry_after_is_capped_at_max_delay():
+    scheduler, sleeps = _scheduler(max_delay=5.0)
+    fn, _ = _flaky(ProviderError(429, {"retry-after": "3600"}))
+
+    scheduler.call(fn)
+    assert sleeps == [5.0]
+
+
+def test_unparseable_retry_after_falls_back_to_backoff():
+    scheduler, sleeps = _scheduler(base_delay=2.0)
+    fn, _ = _flaky(ProviderError(429, {"retry-after": "soon"}))
+
+    scheduler.call(fn)
+    assert sleeps == [1.0]
+
+
+def test_retry_after_pauses_other_requests_to_the_provider():
+    # Another request sent while the rate-limited one backs off must wait out
+    # the pause too, on the real clock.
+    waits = []
+    scheduler = RequestScheduler(
+        "test",
+        SchedulerConfig(),
+        sleep=lambda seconds: waits.append((seconds, scheduler.acquire())),
+        rng=lambda: 0.0,
+    )
+    fn, _ = _flaky(ProviderError(429, {"retry-after-ms": "300"}))
+
+    scheduler.call(fn)
+    (delay, waited), = waits
+    assert delay == 0.3
+    assert waited >= 0.25
+
+
+# ───────────────────────────── Streams ─────────────────────────────
+
+def _collect(scheduler, factory):
+    async def run():
+        return [item async for item in scheduler.stream(factory)]
+
+    return asyncio.run(run())
+
+
+def test_stream_is_retried_before_the_first_delta():
+    scheduler, _ = _scheduler(base_delay=0.01)
+    attempts = []
+
+    async def source():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ProviderError(503)
+        yield "hello"
+        yield " world"
+
+    assert _collect(scheduler, source) == ["hello", " world"]
+    assert len(attempts) == 2
+
+
+def test_stream_is_not_retried_after_text_was_yielded():
+    scheduler, _ = _scheduler(base_delay=0.01)
+    attempts = []
+
+    async def source():
+        attempts.append(1)
+        yield "partial"
+        raise ProviderError(503)
+
+    with pytest.raises(ProviderError):
+        _collect(scheduler, source)
+    assert len(attempts) == 1
+    assert scheduler.get_stats()["retries"] == 0
@@ -0,0 +1,177 @@
+"""Tests for LLMStream, JsonObjectScanner and the SSE parser with split deltas."""
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+
+from core.llm import streaming  # noqa: E402
+from core.llm.streaming import (  # noqa: E402
+    JsonObjectScanner,
+    LLMStream,
+    LLMUsage,
+    aclose_http_clients,
+    get_http_client,
+    stream_openai_compatible,
+)
+
+
+def _scan(deltas):
+    scanner = JsonObjectScanner()
+    for index, delta in enumerate(deltas):
+        if scanner.feed(delta) is not None:
+            return scanner.result, index
+    return None, None
+
+
+# ───────────────────────────── JsonObjectScanner ─────────────────────────────
+
+def test_scanner_finds_object_split_across_deltas():
+    result, index = _scan(['{"action', '_name": "wa', 'it", "parameters": {"seconds"', ": 5}", "}", " trailing"])
+    assert result == '{"action_name": "wait", "parameters": {"seconds": 5}}'
+    assert index == 4
+
+
+def test_scanner_ignores_prose_and_code_fence_before_object():
+    result, _ = _scan(["Sure, here it is:\n```json\n", '{"a": 1}', "\n```"])
+    assert result == '{"a": 1}'
+
+
+def test_scanner_ignores_braces_inside_strings_split_across_deltas():
+    result, _ = _scan(['{"code": "if (x) {', " return ", '}", "b": "}', '"}'])
+    assert result == '{"code": "if (x) { return }", "b": "}"}'
+
+
+def test_scanner_handles_escape_split_from_quote():
+    # The backslash and the quote it escapes arrive in different deltas.
+    result, _ = _scan(['{"text": "say \\', '"hi\\', '"}"}', "}"])
+    assert result == '{"text": "say \\"hi\\"}"}'
+
+
+def test_scanner_one_character_at_a_time():
+    text = 'noise {"a": {"b": "}{"}, "c": [1, 2]} more'
+    result, _ = _scan(list(text))
+    assert result == '{"a": {"b": "}{"}, "c": [1, 2]}'
+
+
+def test_scanner_returns_none_until_object_closes():
+    scanner = JsonObjectScanner()
+    assert scanner.feed('{"a": {') is None
+    assert scanner.feed('"b": 1}') is None
+    assert scanner.feed("}") == '{"a": {"b": 1}}'
+    assert scanner.feed("{}") == '{"a": {"b": 1}}'
+
+
+# ───────────────────────────────── LLMStream ─────────────────────────────────
+
+async def _source(items, error=None):
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+    if error is not None:
+        raise error
+
+
+def test_stream_accumulates_content_and_usage():
+    completed = []
+
+    async def on_complete(stream):
+        completed.append((stream.content, stream.usage, stream.error))
+
+    async def run():
+        stream = LLMStream(_source(["He", "llo", LLMUsage(prompt_tokens=3, completion_tokens=2)]), on_complete)
+        deltas = [delta async for delta in stream]
+        return stream, deltas
+
+    stream, deltas = asyncio.run(run())
+    assert deltas == ["He", "llo"]
+    assert stream.done
+    assert stream.usage.total_tokens == 5
+    assert completed == [("Hello", stream.usage, None)]
+
+
+def test_stream_keeps_provider_error_instead_of_raising():
+    async def run():
+        stream = LLMStream(_source(["partial"], error=RuntimeError("boom")))
+        content = await stream.read_all()
+        return stream, content
+
+    stream, content = asyncio.run(run())
+    assert content == "partial"
+    assert isinstance(stream.error, RuntimeError)
+
+
+def test_read_all_after_partial_iteration_finishes_once():
+    calls = []
+
+    async def on_complete(stream):
+        calls.append(stream.content)
+
+    async def run():
+        stream = LLMStream(_source(["a", "b", "c"]), on_complete)
+        first = await stream.__anext__()
+        rest = await stream.read_all()
+        return first, rest
+
+    assert asyncio.run(run()) == ("a", "abc")
+    assert calls == ["abc"]
+
+
+# ────────────────────────────── SSE parser ──────────────────────────────
+
+class _ChunkedBody(httpx.AsyncByteStream):
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            yield chunk
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64])
+def test_openai_sse_parser_with_network_chunks_split_mid_line(chunk_size):
+    body = (
+        b'data: {"choices": [{"delta": {"content": "{\\"a\\""}}]}\n\n'
+        b'data: {"choices": [{"delta": {"content": ": 1}"}}]}\n\n'
+        b'data: {"choices": [], "usage": {"prompt_tokens": 4, "completion_tokens": 2, '
+        b'"prompt_tokens_details": {"cached_tokens": 3}}}\n\n'
+        b"data: [DONE]\n\n"
+    )
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    def handler(request):
+        return httpx.Response(200, stream=_ChunkedBody(chunks))
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            source = stream_openai_compatible(client, "https://llm.test/v1/chat/completions", {}, {})
+            stream = LLMStream(source)
+            scanner = JsonObjectScanner()
+            async for delta in stream:
+                scanner.feed(delta)
+            return stream, scanner.result
+
+    stream, result = asyncio.run(run())
+    assert stream.content == '{"a": 1}'
+    assert result == '{"a": 1}'
+    assert stream.usage == LLMUsage(prompt_tokens=4, completion_tokens=2, cached_tokens=3, total_tokens=6)
+
+
+# ──────────────────────────── Pooled clients ────────────────────────────
+
+def test_http_clients_are_pooled_per_loop_and_closed_with_it():
+    async def react():
+        client = get_http_client("openai")
+        assert get_http_client("openai") is client
+        assert get_http_client("anthropic") is not client
+        await aclose_http_clients()
+        return client
+
+    # Each run gets a fresh loop, as the TUI does for every react
+    clients = [asyncio.run(react()) for _ in range(3)]
+    assert len({id(client) for client in clients}) == 3
+    assert all(client.is_closed for client in clients)
+    assert len(streaming._clients) == 0
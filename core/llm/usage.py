@@ -0,0 +1,537 @@
+# -*- coding: utf-8 -*-
+"""
+core.llm.usage
+
+Per-call token and cost accounting for LLM requests.
+
+Every provider call is recorded once in the :class:`UsageLedger` with its
+prompt, completion and cached tokens, latency and estimated cost, tagged
+with session, task, call type (``LLMCallType`` or a free-form label),
+provider and model. The ledger keeps
+
+- cumulative totals per tag value (``task:<id>``, ``call_type:reasoning``, ...);
+  the totals of finished tasks are kept for the last ``MAX_FINISHED_TASKS``
+  tasks only,
+- a rolling window of recent calls for rate-style aggregates,
+- optional per-task budgets (tokens and/or cost), which report when a
+  task should be downgraded to a cheaper model or paused. A paused task
+  that the user resumes gets a fresh budget measured from that point.
+
+All updates happen under one lock, and the ledger is also the writer of the
+agent's ``token_count`` property, so counts from concurrent worker threads
+no longer drift.
+
+Tags that the interface cannot know (session, call type of non-session
+calls) come from the calling context, set with :func:`usage_tags`.
+
+Prices are USD per million tokens, matched by the longest model-name
+prefix. The defaults are list prices at the time of writing; override or
+extend them with a JSON file at ``LLM_PRICING_PATH`` of the form
+``{"model-prefix": {"input": 1.0, "output": 2.0, "cached_input": 0.1}}``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+from .cache.metrics import get_cache_metrics
+
+# Logging setup
+try:
+    from core.logger import logger  # type: ignore
+except Exception:  # pragma: no cover
+    logger = logging.getLogger(__name__)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+UNTAGGED = "general"
+ROLLING_WINDOW_SECONDS = 3600
+MAX_FINISHED_TASKS = 100
+
+
+# ─────────────────────────────── Pricing ───────────────────────────────
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """USD per million tokens."""
+    input: float = 0.0
+    output: float = 0.0
+    cached_input: Optional[float] = None
+
+    def cost(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+        cached = min(cached_tokens, prompt_tokens)
+        cached_rate = self.input if self.cached_input is None else self.cached_input
+        return (
+            (prompt_tokens - cached) * self.input
+            + cached * cached_rate
+            + completion_tokens * self.output
+        ) / 1_000_000
+
+
+MODEL_PRICES: Dict[str, ModelPrice] = {
+    "gpt-5": ModelPrice(1.25, 10.0, 0.125),
+    "gpt-4.1": ModelPrice(2.0, 8.0, 0.5),
+    "gpt-4o-mini": ModelPrice(0.15, 0.6, 0.075),
+    "gpt-4o": ModelPrice(2.5, 10.0, 1.25),
+    "claude-opus-4": ModelPrice(15.0, 75.0, 1.5),
+    "claude-sonnet-4": ModelPrice(3.0, 15.0, 0.3),
+    "claude-3-5-haiku": ModelPrice(0.8, 4.0, 0.08),
+    "gemini-2.5-pro": ModelPrice(1.25, 10.0, 0.31),
+    "gemini-2.5-flash": ModelPrice(0.3, 2.5, 0.075),
+}
+
+
+def _load_price_overrides() -> Dict[str, ModelPrice]:
+    path = os.getenv("LLM_PRICING_PATH")
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as handle:
+            raw = json.load(handle)
+        return {
+            prefix: ModelPrice(
+                float(values.get("input", 0.0)),
+                float(values.get("output", 0.0)),
+                None if values.get("cached_input") is None else float(values["cached_input"]),
+            )
+            for prefix, values in raw.items()
+        }
+    except Exception as e:
+        logger.warning(f"[USAGE] Could not load LLM prices from {path}: {e}")
+        return {}
+
+
+# ──────────────────────────────── Tags ────────────────────────────────
+
+_usage_tags: ContextVar[Dict[str, str]] = ContextVar("llm_usage_tags", default={})
+
+
+def _tag(value: Any) -> str:
+    """Tag value as text; enum members (e.g. ``LLMCallType``) contribute their value."""
+    return str(getattr(value, "value", value))
+
+
+@contextmanager
+def usage_tags(**tags: Optional[str]) -> Iterator[None]:
+    """Tag the LLM calls made in this context, e.g. ``usage_tags(call_type="trigger_merge")``.
+
+    Recognised tags are ``session_id``, ``task_id`` and ``call_type``; inner
+    contexts override outer ones.
+    """
+    merged = {**_usage_tags.get(), **{name: _tag(value) for name, value in tags.items() if value}}
+    token = _usage_tags.set(merged)
+    try:
+        yield
+    finally:
+        _usage_tags.reset(token)
+
+
+def current_usage_tags() -> Dict[str, str]:
+    return dict(_usage_tags.get())
+
+
+# ─────────────────────────────── Records ───────────────────────────────
+
+@dataclass(frozen=True)
+class UsageRecord:
+    """One provider call."""
+    timestamp: float
+    provider: str
+    model: str
+    session_id: str
+    task_id: str
+    call_type: str
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int
+    latency: float
+    cost: float
+    success: bool = True
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass
+class UsageTotals:
+    """Aggregate of many :class:`UsageRecord`."""
+    calls: int = 0
+    failures: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency: float = 0.0
+    cost: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def avg_latency(self) -> float:
+        return self.latency / self.calls if self.calls else 0.0
+
+    @property
+    def cached_rate(self) -> float:
+        """Percentage of prompt tokens served from the provider's cache."""
+        return (self.cached_tokens / self.prompt_tokens * 100) if self.prompt_tokens else 0.0
+
+    def add(self, record: UsageRecord) -> None:
+        self.calls += 1
+        self.failures += int(not record.success)
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.cached_tokens += record.cached_tokens
+        self.latency += record.latency
+        self.cost += record.cost
+
+    def since(self, baseline: "UsageTotals") -> "UsageTotals":
+        """Usage added after ``baseline`` was taken from these totals."""
+        return UsageTotals(**{name: value - getattr(baseline, name) for name, value in vars(self).items()})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "total_tokens": self.total_tokens,
+            "latency_seconds": round(self.latency, 3),
+            "cost_usd": round(self.cost, 6),
+        }
+
+
+# ─────────────────────────────── Budgets ───────────────────────────────
+
+class BudgetStatus(str, Enum):
+    OK = "ok"
+    DOWNGRADE = "downgrade"  # past the downgrade threshold: switch to a cheaper model
+    EXCEEDED = "exceeded"  # budget used up: pause the task
+
+
+@dataclass
+class UsageBudget:
+    """Limits for one task; 0 disables a limit.
+
+    Attributes:
+        max_tokens: Total tokens the task may use.
+        max_cost: Estimated USD the task may spend.
+        downgrade_ratio: Share of either limit after which the task should
+            continue on a cheaper model.
+    """
+    max_tokens: int = 0
+    max_cost: float = 0.0
+    downgrade_ratio: float = 0.8
+
+    def status(self, totals: UsageTotals) -> BudgetStatus:
+        used = max(
+            totals.total_tokens / self.max_tokens if self.max_tokens else 0.0,
+            totals.cost / self.max_cost if self.max_cost else 0.0,
+        )
+        if used >= 1.0:
+            return BudgetStatus.EXCEEDED
+        if self.downgrade_ratio and used >= self.downgrade_ratio:
+            return BudgetStatus.DOWNGRADE
+        return BudgetStatus.OK
+
+
+# ──────────────────────────────── Ledger ────────────────────────────────
+
+class UsageLedger:
+    """Thread-safe ledger of LLM usage.
+
+    Usage:
+        ledger = get_usage_ledger()
+        ledger.record("openai", "gpt-4o", prompt_tokens=1200, completion_tokens=80, cached_tokens=1024,
+                      latency=1.4, task_id="t1", call_type="reasoning")
+        ledger.totals("task", "t1").cost
+        print(ledger.get_summary())
+    """
+
+    DIMENSIONS = ("session", "task", "call_type", "provider", "model")
+
+    def __init__(
+        self,
+        prices: Optional[Dict[str, ModelPrice]] = None,
+        window: float = ROLLING_WINDOW_SECONDS,
+        default_budget: Optional[UsageBudget] = None,
+        clock=time.time,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._prices = dict(MODEL_PRICES if prices is None else prices)
+        self._window = window
+        self._clock = clock
+        self._overall = UsageTotals()
+        self._totals: Dict[Tuple[str, str], UsageTotals] = {}
+        self._recent: Deque[UsageRecord] = deque()
+        self._budgets: Dict[str, UsageBudget] = {}
+        self._budget_baselines: Dict[str, UsageTotals] = {}
+        self._finished_tasks: Deque[str] = deque()
+        self.default_budget = default_budget
+        self._unpriced: set = set()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def price_for(self, model: str) -> Optional[ModelPrice]:
+        """Price of the longest matching model-name prefix."""
+        matches = [prefix for prefix in self._prices if model.startswith(prefix)]
+        return self._prices[max(matches, key=len)] if matches else None
+
+    def set_price(self, model_prefix: str, price: ModelPrice) -> None:
+        with self._lock:
+            self._prices[model_prefix] = price
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        *,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cached_tokens: int = 0,
+        latency: float = 0.0,
+        session_id: Optional[str] = None,
+        task_id: Optional[str] = None,
+        call_type: Optional[str] = None,
+        success: bool = True,
+    ) -> UsageRecord:
+        """Record one provider call; missing tags come from :func:`usage_tags`, then the agent state."""
+        tags = _usage_tags.get()
+        task_id = task_id or tags.get("task_id") or _current_task_id()
+        price = self.price_for(model or "")
+        if price is None and model and model not in self._unpriced:
+            self._unpriced.add(model)
+            logger.debug(f"[USAGE] No price for model {model!r}; its cost is counted as 0")
+        record = UsageRecord(
+            timestamp=self._clock(),
+            provider=provider or "unknown",
+            model=model or "unknown",
+            session_id=session_id or tags.get("session_id") or task_id or "",
+            task_id=task_id,
+            call_type=_tag(call_type or tags.get("call_type") or UNTAGGED),
+            prompt_tokens=int(prompt_tokens or 0),
+            completion_tokens=int(completion_tokens or 0),
+            cached_tokens=int(cached_tokens or 0),
+            latency=max(0.0, float(latency or 0.0)),
+            cost=price.cost(int(prompt_tokens or 0), int(completion_tokens or 0), int(cached_tokens or 0)) if price else 0.0,
+            success=success,
+        )
+        with self._lock:
+            self._overall.add(record)
+            for dimension in self.DIMENSIONS:
+                key = (dimension, getattr(record, f"{dimension}_id" if dimension in ("session", "task") else dimension))
+                if key not in self._totals:
+                    self._totals[key] = UsageTotals()
+                self._totals[key].add(record)
+            self._recent.append(record)
+            self._trim(record.timestamp)
+            if record.total_tokens:
+                _add_to_agent_token_count(record.total_tokens)
+        return record
+
+    def _trim(self, now: float) -> None:
+        while self._recent and self._recent[0].timestamp < now - self._window:
+            self._recent.popleft()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def totals(self, dimension: Optional[str] = None, value: Optional[str] = None) -> UsageTotals:
+        """Copy of the cumulative totals for ``dimension=value`` (overall without arguments)."""
+        with self._lock:
+            source = self._overall if dimension is None else self._totals.get((dimension, str(value)), UsageTotals())
+            return UsageTotals(**vars(source))
+
+    def breakdown(self, dimension: str, **filters: str) -> Dict[str, UsageTotals]:
+        """Totals grouped by ``dimension``; with ``filters`` (e.g. ``task_id="t1"``) from the rolling window only."""
+        attribute = f"{dimension}_id" if dimension in ("session", "task") else dimension
+        with self._lock:
+            if not filters:
+                return {
+                    value: UsageTotals(**vars(totals))
+                    for (dim, value), totals in self._totals.items()
+                    if dim == dimension
+                }
+            groups: Dict[str, UsageTotals] = {}
+            for record in self._recent:
+                if all(getattr(record, name) == value for name, value in filters.items()):
+                    groups.setdefault(getattr(record, attribute), UsageTotals()).add(record)
+            return groups
+
+    def rolling(self, seconds: Optional[float] = None, dimension: Optional[str] = None) -> Dict[str, UsageTotals]:
+        """Totals over the last ``seconds`` (at most the ledger window), grouped by ``dimension`` or under "all"."""
+        seconds = self._window if seconds is None else min(seconds, self._window)
+        attribute = None
+        if dimension:
+            attribute = f"{dimension}_id" if dimension in ("session", "task") else dimension
+        with self._lock:
+            now = self._clock()
+            self._trim(now)
+            groups: Dict[str, UsageTotals] = {}
+            for record in reversed(self._recent):
+                if record.timestamp < now - seconds:
+                    break
+                group = getattr(record, attribute) if attribute else "all"
+                groups.setdefault(group, UsageTotals()).add(record)
+            return groups
+
+    # ------------------------------------------------------------------
+    # Budgets
+    # ------------------------------------------------------------------
+    def set_budget(self, task_id: str, budget: Optional[UsageBudget]) -> None:
+        """Set (or with None, clear) the budget of ``task_id``; tasks without one use ``default_budget``."""
+        with self._lock:
+            if budget is None:
+                self._budgets.pop(task_id, None)
+            else:
+                self._budgets[task_id] = budget
+
+    def budget_status(self, task_id: str) -> BudgetStatus:
+        """Budget status of ``task_id``, counting usage since its last :meth:`renew_budget`."""
+        with self._lock:
+            budget = self._budgets.get(task_id, self.default_budget)
+            if budget is None:
+                return BudgetStatus.OK
+            totals = self._totals.get(("task", task_id), UsageTotals())
+            baseline = self._budget_baselines.get(task_id)
+            return budget.status(totals.since(baseline) if baseline else totals)
+
+    def renew_budget(self, task_id: str) -> None:
+        """Give ``task_id`` its full budget again, counted from its usage so far (e.g. after the user resumes it)."""
+        with self._lock:
+            self._budget_baselines[task_id] = UsageTotals(**vars(self._totals.get(("task", task_id), UsageTotals())))
+
+    def forget_task(self, task_id: str) -> None:
+        """Drop a finished task's budget; its totals are kept until ``MAX_FINISHED_TASKS`` newer tasks finish."""
+        with self._lock:
+            self._budgets.pop(task_id, None)
+            self._budget_baselines.pop(task_id, None)
+            if task_id in self._finished_tasks:
+                return
+            self._finished_tasks.append(task_id)
+            while len(self._finished_tasks) > MAX_FINISHED_TASKS:
+                evicted = self._finished_tasks.popleft()
+                self._totals.pop(("task", evicted), None)
+                # Sessions default to their task id
+                self._totals.pop(("session", evicted), None)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def describe_task(self, task_id: str) -> str:
+        """One-line usage of a task: cumulative totals, then the rolling window by call type."""
+        totals = self.totals("task", task_id)
+        by_type = self.breakdown("call_type", task_id=task_id)
+        parts = ", ".join(
+            f"{call_type}={t.total_tokens:,} tok/{t.latency:.1f}s"
+            for call_type, t in sorted(by_type.items(), key=lambda item: item[1].latency, reverse=True)
+        )
+        return (
+            f"[USAGE] task {task_id}: {totals.calls} calls, {totals.total_tokens:,} tokens "
+            f"({totals.cached_tokens:,} cached), ${totals.cost:.4f}, {totals.latency:.1f}s LLM time"
+            + (f" | last {self._window / 60:g} min by call type: {parts}" if parts else "")
+        )
+
+    def get_summary(self) -> str:
+        """Formatted usage summary: by call type (latency share), provider (with cache hit rates) and task."""
+        overall = self.totals()
+        lines = ["=" * 60, "LLM USAGE SUMMARY", "=" * 60]
+        lines.append(
+            f"Calls: {overall.calls} (failures={overall.failures})  Tokens: {overall.total_tokens:,} "
+            f"(prompt={overall.prompt_tokens:,}, completion={overall.completion_tokens:,}, "
+            f"cached={overall.cached_tokens:,})  Cost: ${overall.cost:.4f}"
+        )
+
+        lines.append("\nBY CALL TYPE (sorted by LLM time):")
+        for call_type, totals in sorted(self.breakdown("call_type").items(), key=lambda item: item[1].latency, reverse=True):
+            share = totals.latency / overall.latency * 100 if overall.latency else 0.0
+            lines.append(
+                f"  {call_type}: {totals.calls} calls, {totals.total_tokens:,} tokens, ${totals.cost:.4f}, "
+                f"{totals.latency:.1f}s ({share:.0f}% of LLM time, avg {totals.avg_latency:.2f}s)"
+            )
+
+        cache_totals = get_cache_metrics().get_provider_totals()
+        lines.append("\nBY PROVIDER:")
+        for provider, totals in self.breakdown("provider").items():
+            line = (
+                f"  {provider}: {totals.calls} calls, {totals.total_tokens:,} tokens, ${totals.cost:.4f}, "
+                f"prompt tokens cached {totals.cached_rate:.1f}%"
+            )
+            cache = cache_totals.get(provider)
+            if cache is not None and cache.total_calls:
+                line += f", cache hit rate {cache.hit_rate:.1f}% ({cache.cache_hits}/{cache.total_calls})"
+            lines.append(line)
+
+        tasks = sorted(self.breakdown("task").items(), key=lambda item: item[1].cost, reverse=True)[:10]
+        if tasks:
+            lines.append("\nTOP TASKS BY COST:")
+            for task_id, totals in tasks:
+                lines.append(
+                    f"  {task_id or '(no task)'}: {totals.calls} calls, {totals.total_tokens:,} tokens, "
+                    f"${totals.cost:.4f}, {totals.latency:.1f}s"
+                )
+        lines.append("=" * 60)
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """Clear all totals and the rolling window (budgets are kept)."""
+        with self._lock:
+            self._overall = UsageTotals()
+            self._totals.clear()
+            self._recent.clear()
+            self._budget_baselines.clear()
+            self._finished_tasks.clear()
+
+
+def _current_task_id() -> str:
+    try:
+        from core.state.agent_state import STATE
+
+        return STATE.get_agent_property("current_task_id", "") or ""
+    except Exception:  # pragma: no cover
+        return ""
+
+
+def _add_to_agent_token_count(tokens: int) -> None:
+    """Bump the agent's per-task token count (called under the ledger lock)."""
+    try:
+        from core.state.agent_state import STATE
+
+        STATE.set_agent_property("token_count", STATE.get_agent_property("token_count", 0) + tokens)
+    except Exception:  # pragma: no cover
+        pass
+
+
+# Global usage ledger instance
+_usage_ledger: Optional[UsageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Get the global usage ledger, with prices and the default task budget from configuration."""
+    global _usage_ledger
+    with _ledger_lock:
+        if _usage_ledger is None:
+            prices = {**MODEL_PRICES, **_load_price_overrides()}
+            budget = None
+            try:
+                from core.config import TASK_COST_BUDGET_USD, TASK_BUDGET_DOWNGRADE_RATIO
+
+                if TASK_COST_BUDGET_USD > 0:
+                    budget = UsageBudget(max_cost=TASK_COST_BUDGET_USD, downgrade_ratio=TASK_BUDGET_DOWNGRADE_RATIO)
+            except ImportError:  # pragma: no cover
+                pass
+            _usage_ledger = UsageLedger(prices=prices, default_budget=budget)
+        return _usage_ledger
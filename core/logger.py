@@ -56,5 +56,16 @@ def define_log_level(print_level="ERROR", logfile_level="DEBUG", name: str = Non
     return _logger
 
 
+def is_level_enabled(level: str = "DEBUG") -> bool:
+    """Return True if at least one sink would emit records at ``level``.
+
+    Lets callers skip building expensive log output that would be dropped.
+    """
+    try:
+        return _logger.level(level).no >= _logger._core.min_level
+    except Exception:
+        return True
+
+
 # Create global logger with defaults
 logger = define_log_level()
@@ -14,7 +14,7 @@ import shutil
 import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from core.logger import logger
 from core.mcp.mcp_config import MCPServerConfig
@@ -64,19 +64,39 @@ class MCPTransport(ABC):
 
 
 class StdioTransport(MCPTransport):
-    """Stdio transport using subprocess communication."""
+    """
+    Stdio transport using subprocess communication.
+
+    Requests are pipelined: a single reader task demultiplexes responses by
+    JSON-RPC id into per-request futures, so a slow tool call does not block
+    other calls to the same server. Only writes to stdin are serialised.
+    """
 
-    def __init__(self, command: str, args: List[str], env: Dict[str, str]):
+    # asyncio's default 64 KiB line limit is too small for large tool results.
+    _STREAM_LIMIT = 16 * 1024 * 1024
+
+    def __init__(self, command: str, args: List[str], env: Dict[str, str], request_timeout: float = 30.0):
         self.command = command
         self.args = args
         self.env = env
+        self.request_timeout = request_timeout
         self._process: Optional[asyncio.subprocess.Process] = None
         self._request_id = 0
-        self._lock = asyncio.Lock()
+        self._pending_requests: Dict[int, asyncio.Future] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        # Fire-and-forget cancellations; the loop only holds weak task references.
+        self._background_tasks: Set[asyncio.Task] = set()
 
     @property
     def is_connected(self) -> bool:
-        return self._process is not None and self._process.returncode is None
+        # Without its reader the transport can send but never hear an answer
+        return (
+            self._process is not None
+            and self._process.returncode is None
+            and self._reader_task is not None
+            and not self._reader_task.done()
+        )
 
     def _resolve_command(self, command: str) -> str:
         """
@@ -136,6 +156,7 @@ class StdioTransport(MCPTransport):
                         stdout=asyncio.subprocess.PIPE,
                         stderr=asyncio.subprocess.PIPE,
                         env=full_env,
+                        limit=self._STREAM_LIMIT,
                     )
                 else:
                     self._process = await asyncio.create_subprocess_exec(
@@ -145,6 +166,7 @@ class StdioTransport(MCPTransport):
                         stdout=asyncio.subprocess.PIPE,
                         stderr=asyncio.subprocess.PIPE,
                         env=full_env,
+                        limit=self._STREAM_LIMIT,
                     )
             except FileNotFoundError as e:
                 logger.error(f"[StdioTransport] Command not found: '{command}'. Make sure it is installed and in PATH. Error: {e}")
@@ -154,6 +176,7 @@ class StdioTransport(MCPTransport):
                 return False
 
             logger.debug(f"[StdioTransport] Subprocess started with PID {self._process.pid}")
+            self._reader_task = asyncio.create_task(self._read_responses())
 
             # Send initialize request
             init_response = await self.send_request("initialize", {
@@ -212,6 +235,16 @@ class StdioTransport(MCPTransport):
 
     async def disconnect(self) -> None:
         """Terminate the subprocess."""
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+
+        self._fail_pending("Connection closed")
+
         if self._process:
             try:
                 self._process.terminate()
@@ -223,94 +256,143 @@ class StdioTransport(MCPTransport):
             finally:
                 self._process = None
 
-    async def send_request(self, method: str, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Send a JSON-RPC request and wait for response."""
+    def _fail_pending(self, message: str) -> None:
+        """Resolve every in-flight request with an error response."""
+        for future in self._pending_requests.values():
+            if not future.done():
+                future.set_result({"error": {"code": -1, "message": message}})
+        self._pending_requests.clear()
+
+    async def _read_responses(self) -> None:
+        """Read stdout and route each response to the request waiting on its id."""
         import json
 
-        if not self.is_connected:
-            return {"error": {"code": -1, "message": "Not connected"}}
+        process = self._process
+        try:
+            while True:
+                response_line = await process.stdout.readline()
 
-        async with self._lock:
-            self._request_id += 1
-            request_id = self._request_id
+                if not response_line:
+                    # EOF: the server exited, so nothing pending will ever be answered.
+                    stderr = ""
+                    try:
+                        await asyncio.wait_for(process.wait(), timeout=1.0)
+                        stderr_data = await asyncio.wait_for(process.stderr.read(), timeout=1.0)
+                        stderr = stderr_data.decode() if stderr_data else ""
+                    except Exception:
+                        pass
+                    self._fail_pending(f"Process exited with code {process.returncode}. Stderr: {stderr}")
+                    return
 
-            request = {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "method": method,
-            }
-            if params is not None:
-                request["params"] = params
+                response_str = response_line.decode("utf-8", errors="replace").strip()
+                if not response_str:
+                    continue  # Skip empty lines
 
+                logger.debug(f"[StdioTransport] Received: {response_str[:200]}...")
+
+                try:
+                    response = json.loads(response_str)
+                except json.JSONDecodeError:
+                    logger.warning(f"[StdioTransport] Invalid JSON, skipping: {response_str[:100]}")
+                    continue
+
+                if not isinstance(response, dict):
+                    logger.warning(f"[StdioTransport] Not a JSON-RPC message, skipping: {response_str[:100]}")
+                    continue
+
+                if "id" not in response:
+                    # This is a notification, skip it
+                    logger.debug(f"[StdioTransport] Received notification: {response.get('method', 'unknown')}")
+                    continue
+
+                try:
+                    future = self._pending_requests.pop(response["id"], None)
+                except TypeError:
+                    logger.warning(f"[StdioTransport] Invalid response id, skipping: {response_str[:100]}")
+                    continue
+                if future is None:
+                    # Late answer to a request that already timed out or was cancelled
+                    logger.debug(f"[StdioTransport] Dropping response for unknown request id: {response.get('id')}")
+                elif not future.done():
+                    future.set_result(response)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The stream is unusable (e.g. a line over the size limit). With no
+            # reader nothing can be answered, so stop the server as well;
+            # is_connected turns False either way.
+            logger.error(f"[StdioTransport] Reader error: {type(e).__name__}: {e}")
+            self._fail_pending(f"Reader error: {e}")
             try:
-                # Send request
-                request_line = json.dumps(request) + "\n"
-                logger.debug(f"[StdioTransport] Sending: {request_line.strip()}")
-                self._process.stdin.write(request_line.encode())
-                await self._process.stdin.drain()
-
-                # Read response - keep reading until we get a response with matching id
-                # (skip notifications which don't have an id)
-                while True:
-                    response_line = await asyncio.wait_for(
-                        self._process.stdout.readline(),
-                        timeout=30.0
-                    )
+                process.terminate()
+            except ProcessLookupError:
+                pass
+
+    async def _write_message(self, message: Dict[str, Any]) -> None:
+        """Write one JSON-RPC message; writes are the only serialised step."""
+        import json
 
-                    if not response_line:
-                        # Check if process has died
-                        if self._process.returncode is not None:
-                            # Try to read stderr
-                            stderr = ""
-                            try:
-                                stderr_data = await asyncio.wait_for(
-                                    self._process.stderr.read(),
-                                    timeout=1.0
-                                )
-                                stderr = stderr_data.decode() if stderr_data else ""
-                            except:
-                                pass
-                            return {"error": {"code": -1, "message": f"Process exited with code {self._process.returncode}. Stderr: {stderr}"}}
-                        return {"error": {"code": -1, "message": "No response from server (empty line)"}}
-
-                    response_str = response_line.decode().strip()
-                    if not response_str:
-                        continue  # Skip empty lines
-
-                    logger.debug(f"[StdioTransport] Received: {response_str[:200]}...")
+        line = (json.dumps(message) + "\n").encode()
+        async with self._write_lock:
+            self._process.stdin.write(line)
+            await self._process.stdin.drain()
 
-                    try:
-                        response = json.loads(response_str)
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"[StdioTransport] Invalid JSON, skipping: {response_str[:100]}")
-                        continue
-
-                    # Check if this is a response to our request
-                    if "id" in response and response["id"] == request_id:
-                        return response
-                    elif "id" not in response:
-                        # This is a notification, skip it
-                        logger.debug(f"[StdioTransport] Received notification: {response.get('method', 'unknown')}")
-                        continue
-                    else:
-                        # Response for a different request (shouldn't happen with sequential requests)
-                        logger.warning(f"[StdioTransport] Received response for different request id: {response.get('id')}")
-                        continue
+    async def _cancel_remote(self, request_id: int, reason: str) -> None:
+        """Tell the server to stop working on ``request_id``."""
+        await self._send_notification("notifications/cancelled", {"requestId": request_id, "reason": reason})
 
-            except asyncio.TimeoutError:
-                logger.error(f"[StdioTransport] Request timeout for method '{method}'")
-                return {"error": {"code": -1, "message": f"Request timeout waiting for response to '{method}'"}}
-            except json.JSONDecodeError as e:
-                logger.error(f"[StdioTransport] Invalid JSON response: {e}")
-                return {"error": {"code": -1, "message": f"Invalid JSON response: {e}"}}
-            except Exception as e:
-                logger.error(f"[StdioTransport] Error sending request: {type(e).__name__}: {e}")
-                return {"error": {"code": -1, "message": str(e)}}
+    async def send_request(
+        self, method: str, params: Optional[Dict] = None, timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a JSON-RPC request and wait for response.
+
+        Any number of requests may be in flight at once. If the response does
+        not arrive within ``timeout`` seconds (default ``request_timeout``), or
+        the awaiting task is cancelled, the server is sent a
+        ``notifications/cancelled`` message for the request.
+        """
+        if not self.is_connected:
+            return {"error": {"code": -1, "message": "Not connected"}}
+
+        self._request_id += 1
+        request_id = self._request_id
+
+        request = {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": method,
+        }
+        if params is not None:
+            request["params"] = params
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending_requests[request_id] = future
+
+        try:
+            logger.debug(f"[StdioTransport] Sending: {method} (id={request_id})")
+            await self._write_message(request)
+            return await asyncio.wait_for(future, timeout=timeout if timeout is not None else self.request_timeout)
+
+        except asyncio.TimeoutError:
+            self._pending_requests.pop(request_id, None)
+            logger.error(f"[StdioTransport] Request timeout for method '{method}'")
+            await self._cancel_remote(request_id, "timeout")
+            return {"error": {"code": -1, "message": f"Request timeout waiting for response to '{method}'"}}
+        except asyncio.CancelledError:
+            if self._pending_requests.pop(request_id, None) is not None:
+                # The awaiting task is being cancelled; notify the server in the background.
+                task = asyncio.ensure_future(self._cancel_remote(request_id, "cancelled"))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            raise
+        except Exception as e:
+            self._pending_requests.pop(request_id, None)
+            logger.error(f"[StdioTransport] Error sending request: {type(e).__name__}: {e}")
+            return {"error": {"code": -1, "message": str(e)}}
 
     async def _send_notification(self, method: str, params: Optional[Dict] = None) -> None:
         """Send a JSON-RPC notification (no response expected)."""
-        import json
-
         if not self.is_connected:
             return
 
@@ -322,9 +404,7 @@ class StdioTransport(MCPTransport):
             notification["params"] = params
 
         try:
-            notification_line = json.dumps(notification) + "\n"
-            self._process.stdin.write(notification_line.encode())
-            await self._process.stdin.drain()
+            await self._write_message(notification)
         except Exception as e:
             logger.warning(f"Failed to send notification: {e}")
 
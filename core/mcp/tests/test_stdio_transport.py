@@ -0,0 +1,87 @@
+"""Tests for StdioTransport's reader against misbehaving servers."""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+
+from core.mcp.mcp_server import StdioTransport  # noqa: E402
+
+# Answers initialize, then for each tools/call first prints a line of junk
+# chosen by the tool name and then the real response.
+SERVER = r'''
+import json, sys
+
+JUNK = {
+    "latin1": b"caf\xe9 \xff\xfe not utf-8\n",
+    "array": b"[1, 2, 3]\n",
+    "bad_id": b'{"jsonrpc": "2.0", "id": [1], "result": {}}\n',
+    "huge": b"x" * (2 * 1024 * 1024) + b"\n",
+}
+
+out = sys.stdout.buffer
+for line in sys.stdin:
+    req = json.loads(line)
+    if "id" not in req:
+        continue
+    if req["method"] == "tools/call":
+        name = req["params"]["name"]
+        if name == "silent":
+            continue
+        out.write(JUNK.get(name, b""))
+    out.write((json.dumps({"jsonrpc": "2.0", "id": req["id"], "result": {"ok": True}}) + "\n").encode())
+    out.flush()
+'''
+
+
+def _run(scenario):
+    async def main():
+        transport = StdioTransport(sys.executable, ["-c", SERVER], {}, request_timeout=5.0)
+        transport._STREAM_LIMIT = 1024 * 1024
+        assert await transport.connect()
+        try:
+            return await scenario(transport)
+        finally:
+            await transport.disconnect()
+
+    return asyncio.run(main())
+
+
+def _call(transport, name, timeout=None):
+    return transport.send_request("tools/call", {"name": name, "arguments": {}}, timeout=timeout)
+
+
+def test_junk_lines_are_skipped_and_the_reader_keeps_going():
+    async def scenario(transport):
+        results = [await _call(transport, name) for name in ("latin1", "array", "bad_id", "plain")]
+        return results, transport.is_connected
+
+    results, connected = _run(scenario)
+    assert all(result.get("result") == {"ok": True} for result in results)
+    assert connected
+
+
+def test_dead_reader_marks_transport_disconnected():
+    async def scenario(transport):
+        # A line over the stream limit kills the reader
+        first = await _call(transport, "huge")
+        connected = transport.is_connected
+        second = await _call(transport, "plain")
+        return first, connected, second
+
+    first, connected, second = _run(scenario)
+    assert "Reader error" in first["error"]["message"]
+    assert not connected
+    assert second["error"]["message"] == "Not connected"
+
+
+def test_explicit_zero_timeout_is_not_the_default():
+    async def scenario(transport):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await _call(transport, "silent", timeout=0)
+        return result, loop.time() - started
+
+    result, elapsed = _run(scenario)
+    assert "timeout" in result["error"]["message"].lower()
+    assert elapsed < 1.0
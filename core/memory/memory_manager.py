@@ -6,7 +6,8 @@ Memory Manager for the Agent File System.
 
 This module provides a RAG-based memory system that:
 - Chunks the agent file system (markdown files) into semantic sections
-- Stores chunks in ChromaDB for fast retrieval (uses ChromaDB's built-in embeddings)
+- Stores chunks in ChromaDB for fast retrieval (vectors come from the shared
+  embedding service, so unchanged text is never embedded twice)
 - Supports retrieval via semantic query (returns pointers, not full content)
 - Supports incremental updates (only re-index changed files/sections)
 
@@ -18,8 +19,11 @@ the full content directly. This keeps retrieval lightweight.
 from __future__ import annotations
 
 import hashlib
+import json
 import re
+import threading
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -27,6 +31,7 @@ from typing import Any, Dict, List, Optional
 
 import chromadb
 
+from core.embedding_service import EmbeddingService, get_embedding_service, open_collection
 from core.logger import logger
 
 
@@ -93,6 +98,35 @@ class MemoryPointer:
         return f"[{self.file_path}] {self.section_path} - {self.summary[:50]}..."
 
 
+@dataclass
+class ChunkRecord:
+    """
+    Manifest entry for one indexed chunk of a file.
+
+    ``section_path`` plus ``content_hash`` identify the chunk's content, so a
+    re-chunked file can be diffed against what is already in ChromaDB.
+    """
+
+    chunk_id: str
+    section_path: str
+    content_hash: str
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "chunk_id": self.chunk_id,
+            "section_path": self.section_path,
+            "content_hash": self.content_hash,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChunkRecord":
+        return cls(
+            chunk_id=data.get("chunk_id", ""),
+            section_path=data.get("section_path", ""),
+            content_hash=data.get("content_hash", ""),
+        )
+
+
 @dataclass
 class FileIndex:
     """
@@ -102,9 +136,14 @@ class FileIndex:
     file_path: str
     content_hash: str                  # Hash of entire file content
     modified_at: str                   # File modification timestamp
-    chunk_ids: List[str] = field(default_factory=list)  # IDs of chunks from this file
+    chunks: List[ChunkRecord] = field(default_factory=list)  # Manifest of chunks from this file
     indexed_at: str = ""               # When this file was last indexed
 
+    @property
+    def chunk_ids(self) -> List[str]:
+        """IDs of chunks from this file."""
+        return [chunk.chunk_id for chunk in self.chunks]
+
 
 # ───────────────────────────── Memory Manager ─────────────────────────────
 
@@ -120,7 +159,7 @@ class MemoryManager:
 
     Key features:
     - Semantic chunking: Splits markdown by sections/headers
-    - Incremental updates: Only re-indexes changed files
+    - Incremental updates: Only re-embeds the sections of a file that changed
     - Pointer-based retrieval: Returns lightweight references, not full content
     - Duplicate detection: Prevents duplicate chunks in the index
 
@@ -149,6 +188,8 @@ class MemoryManager:
         chroma_path: str = "./chroma_db_memory",
         chunk_size_limit: int = 1500,    # Max chars per chunk
         chunk_overlap: int = 100,        # Overlap between chunks when splitting large sections
+        retrieval_cache_size: int = 128, # Cached retrieve() results (0 disables the cache)
+        embedding_service: Optional[EmbeddingService] = None,
     ):
         """
         Initialize the Memory Manager.
@@ -158,29 +199,49 @@ class MemoryManager:
             chroma_path: Path for ChromaDB persistence
             chunk_size_limit: Maximum characters per chunk before splitting
             chunk_overlap: Character overlap when splitting large chunks
+            retrieval_cache_size: Number of retrieve() results kept in an LRU
+                cache. Entries are keyed by the index generation, so any
+                change to the index makes them unreachable.
+            embedding_service: Service that embeds chunks and queries;
+                defaults to the process-wide one from ``core.config``.
         """
         self.agent_fs_path = Path(agent_file_system_path).resolve()
         self.chroma_path = chroma_path
         self.chunk_size_limit = chunk_size_limit
         self.chunk_overlap = chunk_overlap
 
-        # Initialize ChromaDB (uses built-in default embeddings)
+        self.embedding_service = embedding_service or get_embedding_service()
+
+        # Initialize ChromaDB (vectors are supplied by the embedding service)
         self.chroma_client = chromadb.PersistentClient(path=chroma_path)
-        self.collection = self.chroma_client.get_or_create_collection(
-            name=self.COLLECTION_NAME,
-            metadata={"description": "Agent file system memory chunks"}
-        )
+        self.collection, collection_empty = self._open_chunk_collection()
 
         # File index collection (tracks which files are indexed and their hashes)
         self.file_index_collection = self.chroma_client.get_or_create_collection(
             name=self.FILE_INDEX_COLLECTION,
             metadata={"description": "File index for incremental updates"}
         )
+        if collection_empty and self.file_index_collection.count():
+            # The chunks were dropped (e.g. the embedding model changed), so the
+            # manifests no longer describe what is indexed.
+            self.chroma_client.delete_collection(self.FILE_INDEX_COLLECTION)
+            self.file_index_collection = self.chroma_client.get_or_create_collection(
+                name=self.FILE_INDEX_COLLECTION,
+                metadata={"description": "File index for incremental updates"}
+            )
 
         # In-memory cache of file indices
         self._file_index_cache: Dict[str, FileIndex] = {}
         self._load_file_index_cache()
 
+        # Bumped whenever the indexed chunks change (update(), index_all(), clear())
+        self.generation = 0
+        self._retrieval_cache_size = retrieval_cache_size
+        self._retrieval_cache: "OrderedDict[tuple, List[MemoryPointer]]" = OrderedDict()
+        self._retrieval_lock = threading.Lock()
+        self.retrieval_cache_hits = 0
+        self.retrieval_cache_misses = 0
+
         logger.info(f"MemoryManager initialized. Agent FS: {self.agent_fs_path}, ChromaDB: {chroma_path}")
 
     # ───────────────────────────── Public API ─────────────────────────────
@@ -207,11 +268,68 @@ class MemoryManager:
 
         Returns:
             List of MemoryPointer objects, sorted by relevance (highest first)
+
+        Results are cached per (whitespace-normalised query, top_k,
+        min_relevance, file_filter, index generation), so repeating a query
+        against an unchanged index skips the embedding and vector search.
         """
         if not query or not query.strip():
             logger.warning("Empty query provided to retrieve()")
             return []
 
+        cache_key = (
+            " ".join(query.split()),
+            top_k,
+            min_relevance,
+            tuple(sorted(file_filter)) if file_filter else None,
+            self.generation,
+        )
+        cached = self._get_cached_retrieval(cache_key)
+        if cached is not None:
+            return cached
+
+        pointers = self._retrieve_uncached(query, top_k, min_relevance, file_filter)
+        self._put_cached_retrieval(cache_key, pointers)
+        return list(pointers)
+
+    def _get_cached_retrieval(self, key: tuple) -> Optional[List[MemoryPointer]]:
+        if self._retrieval_cache_size <= 0:
+            return None
+        with self._retrieval_lock:
+            pointers = self._retrieval_cache.get(key)
+            if pointers is None:
+                self.retrieval_cache_misses += 1
+                return None
+            self._retrieval_cache.move_to_end(key)
+            self.retrieval_cache_hits += 1
+            return list(pointers)
+
+    def _put_cached_retrieval(self, key: tuple, pointers: List[MemoryPointer]) -> None:
+        if self._retrieval_cache_size <= 0:
+            return
+        with self._retrieval_lock:
+            # Skip results computed against an index that has since changed
+            if key[-1] != self.generation:
+                return
+            self._retrieval_cache[key] = list(pointers)
+            self._retrieval_cache.move_to_end(key)
+            while len(self._retrieval_cache) > self._retrieval_cache_size:
+                self._retrieval_cache.popitem(last=False)
+
+    def _bump_generation(self) -> None:
+        """Mark the index as changed; cached retrievals become unreachable."""
+        with self._retrieval_lock:
+            self.generation += 1
+            self._retrieval_cache.clear()
+
+    def _retrieve_uncached(
+        self,
+        query: str,
+        top_k: int,
+        min_relevance: float,
+        file_filter: Optional[List[str]],
+    ) -> List[MemoryPointer]:
+        """Run the ChromaDB query behind retrieve()."""
         # Check if collection has any documents
         collection_count = self.collection.count()
         if collection_count == 0:
@@ -227,7 +345,7 @@ class MemoryManager:
         logger.info(f"[MEMORY QUERY] Query: {query}")
         try:
             results = self.collection.query(
-                query_texts=[query],
+                query_embeddings=[self.embedding_service.embed_query(query)],
                 n_results=min(top_k, collection_count),
                 where=where_filter,
                 include=["metadatas", "distances", "documents"],
@@ -307,10 +425,13 @@ class MemoryManager:
         Incrementally update the memory index.
 
         This method checks for changes in the agent file system and only
-        re-indexes files that have been modified, added, or deleted.
+        re-indexes files that have been modified, added, or deleted. Within a
+        modified file, only added or changed sections are re-embedded.
 
         Returns:
-            Summary dict with counts of added, updated, and removed files
+            Summary dict with counts of added, updated, and removed files and chunks
+
+        Any change bumps :attr:`generation`, invalidating cached retrievals.
         """
         logger.info("Starting incremental memory update...")
 
@@ -319,7 +440,9 @@ class MemoryManager:
             "files_updated": 0,
             "files_removed": 0,
             "chunks_added": 0,
+            "chunks_updated": 0,
             "chunks_removed": 0,
+            "chunks_unchanged": 0,
         }
 
         # Get current files in agent file system
@@ -334,6 +457,7 @@ class MemoryManager:
 
         # Remove deleted files from index
         for file_path in removed_files:
+            stats["chunks_removed"] += len(self._file_index_cache[file_path].chunks)
             self._remove_file_from_index(file_path)
             stats["files_removed"] += 1
 
@@ -349,24 +473,17 @@ class MemoryManager:
 
         # Index new files
         for file_path in new_files:
-            full_path = self.agent_fs_path / file_path
-            chunks_added = self._index_file(full_path)
+            diff = self._index_file(self.agent_fs_path / file_path)
             stats["files_added"] += 1
-            stats["chunks_added"] += chunks_added
+            for key, count in diff.items():
+                stats[f"chunks_{key}"] += count
 
-        # Re-index modified files
+        # Re-index modified files: only changed sections are re-embedded
         for file_path in modified_files:
-            full_path = self.agent_fs_path / file_path
-            # Remove old chunks first
-            old_index = self._file_index_cache.get(file_path)
-            if old_index:
-                stats["chunks_removed"] += len(old_index.chunk_ids)
-                self._remove_file_from_index(file_path)
-
-            # Re-index
-            chunks_added = self._index_file(full_path)
+            diff = self._index_file(self.agent_fs_path / file_path)
             stats["files_updated"] += 1
-            stats["chunks_added"] += chunks_added
+            for key, count in diff.items():
+                stats[f"chunks_{key}"] += count
 
         logger.info(f"Memory update complete: {stats}")
         return stats
@@ -404,9 +521,9 @@ class MemoryManager:
                     stats["files_skipped"] += 1
                     continue
 
-            chunks_created = self._index_file(file_path)
+            diff = self._index_file(file_path)
             stats["files_processed"] += 1
-            stats["chunks_created"] += chunks_created
+            stats["chunks_created"] += diff["added"] + diff["updated"]
 
         logger.info(f"Full indexing complete: {stats}")
         return stats
@@ -423,6 +540,10 @@ class MemoryManager:
             "total_files_indexed": len(self._file_index_cache),
             "agent_fs_path": str(self.agent_fs_path),
             "chroma_path": self.chroma_path,
+            "generation": self.generation,
+            "retrieval_cache_hits": self.retrieval_cache_hits,
+            "retrieval_cache_misses": self.retrieval_cache_misses,
+            "embedding_model": self.embedding_service.model_name,
         }
 
     def clear(self) -> None:
@@ -674,17 +795,26 @@ class MemoryManager:
 
     # ───────────────────────────── Indexing Helpers ─────────────────────────────
 
-    def _index_file(self, file_path: Path) -> int:
+    def _index_file(self, file_path: Path) -> Dict[str, int]:
         """
-        Index a single file and add its chunks to ChromaDB.
+        Index a single file, touching only the chunks that changed.
+
+        The file is re-chunked and each chunk is matched against the file's
+        manifest by (section_path, content_hash). Matching chunks are left
+        alone; changed sections are upserted under the id of the old chunk
+        with the same section path; new sections are added; sections no
+        longer present are deleted. Re-embedding cost is therefore
+        proportional to the diff, not the file size.
 
-        Returns the number of chunks created.
+        Returns:
+            Counts of chunks ``added``, ``updated``, ``removed`` and ``unchanged``.
         """
+        diff = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
         try:
             content = file_path.read_text(encoding="utf-8")
         except Exception as e:
             logger.error(f"Error reading file {file_path}: {e}")
-            return 0
+            return diff
 
         rel_path = str(file_path.relative_to(self.agent_fs_path))
         file_hash = self._compute_file_hash(file_path)
@@ -693,55 +823,91 @@ class MemoryManager:
         # Chunk the file
         chunks = self._chunk_markdown(content, rel_path)
 
-        if not chunks:
-            return 0
+        old_index = self._file_index_cache.get(rel_path)
+        old_records = list(old_index.chunks) if old_index else []
+
+        # Unchanged chunks keep their id and are not re-embedded
+        unmatched_old: Dict[tuple, List[ChunkRecord]] = {}
+        for record in old_records:
+            unmatched_old.setdefault((record.section_path, record.content_hash), []).append(record)
 
-        # Update file modification time in chunks
+        manifest: List[ChunkRecord] = []
+        pending: List[tuple] = []  # (position in manifest, chunk) still to be written
         for chunk in chunks:
+            same = unmatched_old.get((chunk.section_path, chunk.content_hash))
+            if same:
+                manifest.append(same.pop(0))
+                diff["unchanged"] += 1
+            else:
+                manifest.append(None)
+                pending.append((len(manifest) - 1, chunk))
+
+        # Changed sections reuse the id of a leftover chunk with the same section path
+        leftovers_by_path: Dict[str, List[ChunkRecord]] = {}
+        for records in unmatched_old.values():
+            for record in records:
+                leftovers_by_path.setdefault(record.section_path, []).append(record)
+
+        upserts: List[MemoryChunk] = []
+        for position, chunk in pending:
+            reusable = leftovers_by_path.get(chunk.section_path)
+            if reusable:
+                chunk.chunk_id = reusable.pop(0).chunk_id
+                diff["updated"] += 1
+            else:
+                diff["added"] += 1
             chunk.file_modified_at = file_modified
+            upserts.append(chunk)
+            manifest[position] = ChunkRecord(chunk.chunk_id, chunk.section_path, chunk.content_hash)
 
-        # Add to ChromaDB
-        chunk_ids = []
-        documents = []
-        metadatas = []
-
-        for chunk in chunks:
-            chunk_ids.append(chunk.chunk_id)
-            documents.append(chunk.content)
-            metadatas.append({
-                "file_path": chunk.file_path,
-                "section_path": chunk.section_path,
-                "title": chunk.title,
-                "summary": chunk.summary,
-                "content_hash": chunk.content_hash,
-                "file_modified_at": chunk.file_modified_at,
-                "indexed_at": chunk.indexed_at,
-                **chunk.metadata,
-            })
+        stale_ids = [record.chunk_id for records in leftovers_by_path.values() for record in records]
+        diff["removed"] = len(stale_ids)
 
         try:
-            self.collection.add(
-                ids=chunk_ids,
-                documents=documents,
-                metadatas=metadatas,
-            )
+            if upserts:
+                documents = [chunk.content for chunk in upserts]
+                self.collection.upsert(
+                    ids=[chunk.chunk_id for chunk in upserts],
+                    documents=documents,
+                    embeddings=self.embedding_service.embed(documents),
+                    metadatas=[self._chunk_metadata(chunk) for chunk in upserts],
+                )
+            if stale_ids:
+                self.collection.delete(ids=stale_ids)
         except Exception as e:
-            logger.error(f"Error adding chunks to ChromaDB: {e}")
-            return 0
+            logger.error(f"Error writing chunks to ChromaDB: {e}")
+            return {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+        if upserts or stale_ids:
+            self._bump_generation()
 
         # Update file index cache
         file_index = FileIndex(
             file_path=rel_path,
             content_hash=file_hash,
             modified_at=file_modified,
-            chunk_ids=chunk_ids,
+            chunks=manifest,
             indexed_at=datetime.utcnow().isoformat(),
         )
         self._file_index_cache[rel_path] = file_index
         self._save_file_index(file_index)
 
-        logger.debug(f"Indexed {len(chunks)} chunks from {rel_path}")
-        return len(chunks)
+        logger.debug(f"Indexed {rel_path}: {diff}")
+        return diff
+
+    @staticmethod
+    def _chunk_metadata(chunk: MemoryChunk) -> Dict[str, Any]:
+        """ChromaDB metadata stored alongside a chunk."""
+        return {
+            "file_path": chunk.file_path,
+            "section_path": chunk.section_path,
+            "title": chunk.title,
+            "summary": chunk.summary,
+            "content_hash": chunk.content_hash,
+            "file_modified_at": chunk.file_modified_at,
+            "indexed_at": chunk.indexed_at,
+            **chunk.metadata,
+        }
 
     def _remove_file_from_index(self, file_path: str) -> None:
         """Remove all chunks for a file from the index."""
@@ -764,6 +930,7 @@ class MemoryManager:
 
         # Remove from cache
         del self._file_index_cache[file_path]
+        self._bump_generation()
 
         logger.debug(f"Removed {len(file_index.chunk_ids)} chunks for {file_path}")
 
@@ -780,16 +947,23 @@ class MemoryManager:
         except Exception:
             pass
 
-        self.collection = self.chroma_client.get_or_create_collection(
-            name=self.COLLECTION_NAME,
-            metadata={"description": "Agent file system memory chunks"}
-        )
+        self.collection, _ = self._open_chunk_collection()
         self.file_index_collection = self.chroma_client.get_or_create_collection(
             name=self.FILE_INDEX_COLLECTION,
             metadata={"description": "File index for incremental updates"}
         )
 
         self._file_index_cache.clear()
+        self._bump_generation()
+
+    def _open_chunk_collection(self):
+        """Open the chunk collection, rebuilding it if it was embedded with another model."""
+        return open_collection(
+            self.chroma_client,
+            self.COLLECTION_NAME,
+            self.embedding_service,
+            metadata={"description": "Agent file system memory chunks"},
+        )
 
     # ───────────────────────────── File Index Persistence ─────────────────────────────
 
@@ -805,26 +979,40 @@ class MemoryManager:
                 meta = result.get("metadatas", [[]])[i] if result.get("metadatas") else {}
                 doc = result.get("documents", [[]])[i] if result.get("documents") else ""
 
-                # chunk_ids stored as comma-separated in document
-                chunk_ids = doc.split(",") if doc else []
-
                 self._file_index_cache[file_path] = FileIndex(
                     file_path=file_path,
                     content_hash=meta.get("content_hash", ""),
                     modified_at=meta.get("modified_at", ""),
-                    chunk_ids=chunk_ids,
+                    chunks=self._parse_manifest(doc),
                     indexed_at=meta.get("indexed_at", ""),
                 )
         except Exception as e:
             logger.warning(f"Error loading file index cache: {e}")
 
+    @staticmethod
+    def _parse_manifest(doc: str) -> List[ChunkRecord]:
+        """
+        Decode the chunk manifest stored as a file index document.
+
+        Older indexes stored bare comma-separated chunk ids. Those records
+        carry no hashes, so the next update re-embeds that file once and
+        rewrites the manifest in the current format.
+        """
+        if not doc:
+            return []
+        try:
+            data = json.loads(doc)
+        except json.JSONDecodeError:
+            return [ChunkRecord(chunk_id=chunk_id, section_path="", content_hash="") for chunk_id in doc.split(",")]
+        return [ChunkRecord.from_dict(entry) for entry in data.get("chunks", [])]
+
     def _save_file_index(self, file_index: FileIndex) -> None:
         """Save/update a file index entry in ChromaDB."""
         try:
-            # Store chunk_ids as comma-separated document
+            # Store the chunk manifest as a JSON document
             self.file_index_collection.upsert(
                 ids=[file_index.file_path],
-                documents=[",".join(file_index.chunk_ids)],
+                documents=[json.dumps({"chunks": [chunk.to_dict() for chunk in file_index.chunks]})],
                 metadatas=[{
                     "content_hash": file_index.content_hash,
                     "modified_at": file_index.modified_at,
@@ -116,6 +116,31 @@ This is the event stream of this task (from older to latest event):
 </objective>
 """
 
+FIX_ACTION_PARAMETERS_PROMPT = """
+<objective>
+You selected the action "{name}" ({description}), but some of its parameters are invalid.
+Provide corrected values for ONLY the fields listed below.
+</objective>
+
+<decision>
+The parameters you provided:
+{parameters}
+</decision>
+
+<invalid_fields>
+{field_errors}
+</invalid_fields>
+
+<schema>
+Schema of the invalid fields:
+{field_schema}
+</schema>
+
+<output_format>
+Return ONLY a valid JSON object mapping each invalid field name to its corrected value, with no extra commentary.
+</output_format>
+"""
+
 # KV CACHING OPTIMIZED: Static content FIRST, dynamic content in MIDDLE, output format LAST
 CHECK_TRIGGERS_STATE_PROMPT = """
 <objective>
@@ -38,6 +38,9 @@ class SkillManager:
         self._skills: Dict[str, Skill] = {}
         self._config: Optional[SkillsConfig] = None
         self._config_path: Optional[Path] = None
+        # Bumped whenever the skill set or a skill's state changes, so prompt
+        # caches keyed on it are invalidated
+        self.version = 0
         self._initialized = True
 
     async def initialize(self, config_path: Optional[Path] = None) -> None:
@@ -76,6 +79,7 @@ class SkillManager:
         self._skills.clear()
         for skill in skills:
             self._skills[skill.name] = skill
+        self.version += 1
 
         logger.info(f"[SKILLS] Discovered {len(self._skills)} skills")
 
@@ -208,6 +212,7 @@ class SkillManager:
         skill = self.get_skill(name)
         if skill:
             skill.enabled = True
+            self.version += 1
 
             # Update config
             if self._config:
@@ -232,6 +237,7 @@ class SkillManager:
         skill = self.get_skill(name)
         if skill:
             skill.enabled = False
+            self.version += 1
 
             # Update config
             if self._config:
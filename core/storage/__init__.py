@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+core.storage
+
+Pluggable storage engines for the agent log (prompt logs, action history and
+task logs) behind :class:`core.database_interface.DatabaseInterface`.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from .base import LogStore
+from .jsonl import JsonlLogStore
+from .sqlite import SQLiteLogStore
+from .migrate import migrate_jsonl_to_sqlite
+
+LOG_BACKENDS = ("sqlite", "jsonl")
+
+
+def create_log_store(backend: str, *, data_dir: Path, legacy_log_file: Path) -> LogStore:
+    """
+    Build the log store for ``backend``.
+
+    ``"sqlite"`` stores records in ``<data_dir>/agent_logs.db`` and migrates
+    ``legacy_log_file`` into it the first time it is found. ``"jsonl"`` keeps
+    using ``legacy_log_file`` as an append-only log.
+
+    Raises:
+        ValueError: If ``backend`` is not one of :data:`LOG_BACKENDS`.
+    """
+    if backend == "sqlite":
+        store = SQLiteLogStore(Path(data_dir) / "agent_logs.db")
+        migrate_jsonl_to_sqlite(legacy_log_file, store)
+        return store
+    if backend == "jsonl":
+        return JsonlLogStore(legacy_log_file)
+    raise ValueError(f"Unknown log backend '{backend}'. Expected one of: {', '.join(LOG_BACKENDS)}")
+
+
+__all__ = [
+    "LogStore",
+    "JsonlLogStore",
+    "SQLiteLogStore",
+    "migrate_jsonl_to_sqlite",
+    "create_log_store",
+    "LOG_BACKENDS",
+]
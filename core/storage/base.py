@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+core.storage.base
+
+Abstract interface for the agent log store used by :class:`DatabaseInterface`.
+
+A log store persists three kinds of records:
+
+* ``prompt_log``     – append-only LLM prompt/response records.
+* ``action_history`` – one record per action run, keyed by ``runId``.
+* ``task_log``       – one record per task, keyed by ``task_id``.
+
+Merge semantics (which fields are preserved on update, default timestamps,
+etc.) stay in :class:`DatabaseInterface`; backends only need to provide keyed
+reads/writes and indexed queries.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class LogStore(ABC):
+    """Storage engine for prompt logs, action history and task logs."""
+
+    # ------------------------------------------------------------------
+    # Prompt logs
+    # ------------------------------------------------------------------
+    @abstractmethod
+    def append_prompt_log(self, entry: Dict[str, Any]) -> None:
+        """Append a single prompt log record."""
+
+    @abstractmethod
+    def iter_prompt_logs(self) -> Iterator[Dict[str, Any]]:
+        """Iterate prompt log records in insertion order."""
+
+    # ------------------------------------------------------------------
+    # Action history
+    # ------------------------------------------------------------------
+    @abstractmethod
+    def get_action(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Return the action history record for ``run_id``, if any."""
+
+    @abstractmethod
+    def put_action(self, entry: Dict[str, Any]) -> None:
+        """Insert or replace the action history record keyed by ``entry["runId"]``."""
+
+    @abstractmethod
+    def iter_actions(self) -> Iterator[Dict[str, Any]]:
+        """Iterate every action history record."""
+
+    @abstractmethod
+    def find_actions_by_status(self, status: str) -> List[Dict[str, Any]]:
+        """Return action history records whose ``status`` equals ``status``."""
+
+    @abstractmethod
+    def recent_actions(self, limit: int) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` action records ordered by ``startedAt`` (newest first)."""
+
+    # ------------------------------------------------------------------
+    # Task logs
+    # ------------------------------------------------------------------
+    @abstractmethod
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return the task log record for ``task_id``, if any."""
+
+    @abstractmethod
+    def put_task(self, entry: Dict[str, Any]) -> None:
+        """Insert or replace the task log record keyed by ``entry["task_id"]``."""
+
+    @abstractmethod
+    def iter_tasks(self) -> Iterator[Dict[str, Any]]:
+        """Iterate every task log record."""
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def close(self) -> None:
+        """Release any resources held by the store."""
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+core.storage.jsonl
+
+Append-only JSONL log store. Compatible with the historical
+``agent_logs.txt`` format: every write appends one line, and on load the last
+line for a given run/task id wins. Action and task lookups are served from
+in-memory indexes built once when the store is opened, and the file is
+compacted when superseded lines start to dominate it. Prompt logs hold full
+prompts, so they are only counted in memory and read back from the file.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+from core.logger import logger
+from core.storage.base import LogStore
+
+
+class JsonlLogStore(LogStore):
+    """Log store backed by an append-only JSONL file with in-memory indexes."""
+
+    def __init__(self, path: str | Path, *, compact_min_lines: int = 1000) -> None:
+        """
+        Args:
+            path: JSONL file to append to; created when missing.
+            compact_min_lines: Minimum number of superseded lines before the
+                file is rewritten. Compaction only runs once superseded lines
+                outnumber live ones, so its cost is amortised O(1) per write.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self.compact_min_lines = compact_min_lines
+
+        self._lock = threading.Lock()
+        self._prompt_log_count = 0
+        self._actions: Dict[str, Dict[str, Any]] = {}
+        self._actions_by_status: Dict[str, Dict[str, None]] = {}
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._dead_lines = 0
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        with self.path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"[LOG PARSE] Skipping malformed line in {self.path}")
+                    continue
+                self._index(entry)
+
+    def _index(self, entry: Dict[str, Any]) -> None:
+        entry_type = entry.get("entry_type")
+        if entry_type == "prompt_log":
+            self._prompt_log_count += 1
+        elif entry_type == "action_history" and entry.get("runId"):
+            self._index_action(entry)
+        elif entry_type == "task_log" and entry.get("task_id"):
+            if entry["task_id"] in self._tasks:
+                self._dead_lines += 1
+            self._tasks[entry["task_id"]] = entry
+
+    def _index_action(self, entry: Dict[str, Any]) -> None:
+        run_id = entry["runId"]
+        previous = self._actions.get(run_id)
+        if previous is not None:
+            self._dead_lines += 1
+            self._actions_by_status.get(previous.get("status"), {}).pop(run_id, None)
+        self._actions[run_id] = entry
+        self._actions_by_status.setdefault(entry.get("status"), {})[run_id] = None
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry, default=str) + "\n")
+
+    def _maybe_compact(self) -> None:
+        live = self._prompt_log_count + len(self._actions) + len(self._tasks)
+        if self._dead_lines < self.compact_min_lines or self._dead_lines < live:
+            return
+        tmp_path = self.path.with_suffix(self.path.suffix + ".compact")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            for entry in self._iter_live():
+                handle.write(json.dumps(entry, default=str) + "\n")
+        os.replace(tmp_path, self.path)
+        self._dead_lines = 0
+
+    def _iter_live(self) -> Iterator[Dict[str, Any]]:
+        with self.path.open("rb") as handle:
+            yield from self._read_prompt_logs(handle, self.path.stat().st_size)
+        yield from self._actions.values()
+        yield from self._tasks.values()
+
+    # ------------------------------------------------------------------
+    # Prompt logs
+    # ------------------------------------------------------------------
+    def append_prompt_log(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._append(entry)
+            self._prompt_log_count += 1
+
+    def iter_prompt_logs(self) -> Iterator[Dict[str, Any]]:
+        # Open under the lock so the handle sees a consistent file; a later
+        # compaction replaces the path, not the file this handle reads.
+        with self._lock:
+            handle = self.path.open("rb")
+            end = self.path.stat().st_size
+        with handle:
+            yield from self._read_prompt_logs(handle, end)
+
+    def _read_prompt_logs(self, handle: BinaryIO, end: int) -> Iterator[Dict[str, Any]]:
+        """Prompt log entries in ``handle`` up to byte offset ``end``."""
+        while handle.tell() < end:
+            line = handle.readline()
+            if not line:
+                break
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("entry_type") == "prompt_log":
+                yield entry
+
+    # ------------------------------------------------------------------
+    # Action history
+    # ------------------------------------------------------------------
+    def get_action(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._actions.get(run_id)
+        return dict(entry) if entry is not None else None
+
+    def put_action(self, entry: Dict[str, Any]) -> None:
+        entry = dict(entry)
+        with self._lock:
+            self._append(entry)
+            self._index_action(entry)
+            self._maybe_compact()
+
+    def iter_actions(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            snapshot = [dict(entry) for entry in self._actions.values()]
+        yield from snapshot
+
+    def find_actions_by_status(self, status: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            run_ids = list(self._actions_by_status.get(status, {}))
+            return [dict(self._actions[run_id]) for run_id in run_ids]
+
+    def recent_actions(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            history = list(self._actions.values())
+        newest = heapq.nlargest(
+            limit,
+            history,
+            key=lambda e: (e.get("startedAt") is not None, e.get("startedAt") or ""),
+        )
+        return [dict(entry) for entry in newest]
+
+    # ------------------------------------------------------------------
+    # Task logs
+    # ------------------------------------------------------------------
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._tasks.get(task_id)
+        return json.loads(json.dumps(entry, default=str)) if entry is not None else None
+
+    def put_task(self, entry: Dict[str, Any]) -> None:
+        entry = dict(entry)
+        with self._lock:
+            self._append(entry)
+            if entry["task_id"] in self._tasks:
+                self._dead_lines += 1
+            self._tasks[entry["task_id"]] = entry
+            self._maybe_compact()
+
+    def iter_tasks(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            snapshot = [dict(entry) for entry in self._tasks.values()]
+        yield from snapshot
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+core.storage.migrate
+
+One-shot migration from the legacy ``agent_logs.txt`` JSONL file into the
+SQLite log store.
+
+Usage:
+    python -m core.storage.migrate core/data/agent_logs.txt core/data/agent_logs.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from core.logger import logger
+from core.storage.sqlite import SQLiteLogStore
+
+MIGRATED_SUFFIX = ".migrated"
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"[LOG MIGRATE] Skipping malformed line in {path}")
+
+
+def migrate_jsonl_to_sqlite(
+    jsonl_path: str | Path,
+    store: SQLiteLogStore,
+    *,
+    rename: bool = True,
+) -> int:
+    """
+    Import every entry of a legacy JSONL log into ``store``.
+
+    The import runs in a single transaction. On success the source file is
+    renamed to ``<name>.migrated`` (when ``rename`` is True) so the migration
+    never runs twice.
+
+    Args:
+        jsonl_path: Path to the legacy ``agent_logs.txt`` file.
+        store: Destination SQLite log store.
+        rename: Rename the source file after a successful import.
+
+    Returns:
+        Number of entries imported; ``0`` when the source is missing or empty.
+    """
+    jsonl_path = Path(jsonl_path)
+    if not jsonl_path.exists() or jsonl_path.stat().st_size == 0:
+        return 0
+
+    count = store.import_entries(_iter_jsonl(jsonl_path))
+    if rename:
+        jsonl_path.replace(jsonl_path.with_name(jsonl_path.name + MIGRATED_SUFFIX))
+    logger.info(f"[LOG MIGRATE] Imported {count} entries from {jsonl_path} into {store.path}")
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrate agent_logs.txt into the SQLite log store.")
+    parser.add_argument("source", help="Legacy JSONL log file (agent_logs.txt)")
+    parser.add_argument("destination", help="SQLite database file to create or extend")
+    parser.add_argument("--keep", action="store_true", help="Do not rename the source file afterwards")
+    args = parser.parse_args()
+
+    store = SQLiteLogStore(args.destination)
+    try:
+        count = migrate_jsonl_to_sqlite(args.source, store, rename=not args.keep)
+    finally:
+        store.close()
+    print(f"Imported {count} entries into {args.destination}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+core.storage.sqlite
+
+Embedded SQLite log store. Records are stored as JSON blobs alongside the
+columns they are looked up by (run id, task id, status, start time), so
+upserts and status/recency queries are index lookups instead of file scans.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from core.storage.base import LogStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prompt_logs (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    datetime TEXT,
+    data     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS action_history (
+    run_id     TEXT PRIMARY KEY,
+    session_id TEXT,
+    status     TEXT,
+    started_at TEXT,
+    data       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_action_history_status ON action_history (status);
+CREATE INDEX IF NOT EXISTS idx_action_history_started_at ON action_history (started_at);
+CREATE INDEX IF NOT EXISTS idx_action_history_session ON action_history (session_id);
+CREATE TABLE IF NOT EXISTS task_logs (
+    task_id TEXT PRIMARY KEY,
+    status  TEXT,
+    data    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_task_logs_status ON task_logs (status);
+"""
+
+
+def _dumps(entry: Dict[str, Any]) -> str:
+    return json.dumps(entry, default=str)
+
+
+class SQLiteLogStore(LogStore):
+    """Log store backed by a single SQLite database file (WAL mode)."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Prompt logs are written from asyncio.to_thread workers, so the
+        # connection is shared across threads and guarded by a lock.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _fetch(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, tuple(params)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    # The _write_* helpers expect the caller to hold ``self._lock``.
+    def _write_prompt_log(self, entry: Dict[str, Any]) -> None:
+        self._conn.execute(
+            "INSERT INTO prompt_logs (datetime, data) VALUES (?, ?)",
+            (entry.get("datetime"), _dumps(entry)),
+        )
+
+    # Upserts update the row in place: INSERT OR REPLACE would delete and
+    # re-insert it, moving an updated record to the end of the rowid order.
+    def _write_action(self, entry: Dict[str, Any]) -> None:
+        self._conn.execute(
+            "INSERT INTO action_history (run_id, session_id, status, started_at, data) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (run_id) DO UPDATE SET session_id = excluded.session_id, "
+            "status = excluded.status, started_at = excluded.started_at, data = excluded.data",
+            (
+                entry["runId"],
+                entry.get("sessionId"),
+                entry.get("status"),
+                entry.get("startedAt"),
+                _dumps(entry),
+            ),
+        )
+
+    def _write_task(self, entry: Dict[str, Any]) -> None:
+        self._conn.execute(
+            "INSERT INTO task_logs (task_id, status, data) VALUES (?, ?, ?) "
+            "ON CONFLICT (task_id) DO UPDATE SET status = excluded.status, data = excluded.data",
+            (entry["task_id"], entry.get("status"), _dumps(entry)),
+        )
+
+    # ------------------------------------------------------------------
+    # Prompt logs
+    # ------------------------------------------------------------------
+    def append_prompt_log(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._write_prompt_log(entry)
+
+    def iter_prompt_logs(self) -> Iterator[Dict[str, Any]]:
+        yield from self._fetch("SELECT data FROM prompt_logs ORDER BY id")
+
+    # ------------------------------------------------------------------
+    # Action history
+    # ------------------------------------------------------------------
+    def get_action(self, run_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._fetch("SELECT data FROM action_history WHERE run_id = ?", (run_id,))
+        return rows[0] if rows else None
+
+    def put_action(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._write_action(entry)
+
+    def iter_actions(self) -> Iterator[Dict[str, Any]]:
+        yield from self._fetch("SELECT data FROM action_history ORDER BY rowid")
+
+    def find_actions_by_status(self, status: str) -> List[Dict[str, Any]]:
+        return self._fetch(
+            "SELECT data FROM action_history WHERE status = ? ORDER BY rowid",
+            (status,),
+        )
+
+    def recent_actions(self, limit: int) -> List[Dict[str, Any]]:
+        return self._fetch(
+            "SELECT data FROM action_history "
+            "ORDER BY started_at IS NULL, started_at DESC LIMIT ?",
+            (limit,),
+        )
+
+    # ------------------------------------------------------------------
+    # Task logs
+    # ------------------------------------------------------------------
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._fetch("SELECT data FROM task_logs WHERE task_id = ?", (task_id,))
+        return rows[0] if rows else None
+
+    def put_task(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._write_task(entry)
+
+    def iter_tasks(self) -> Iterator[Dict[str, Any]]:
+        yield from self._fetch("SELECT data FROM task_logs ORDER BY rowid")
+
+    # ------------------------------------------------------------------
+    # Bulk import (used by the JSONL migrator)
+    # ------------------------------------------------------------------
+    def import_entries(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """Write a batch of raw log entries in one transaction.
+
+        Entries are dispatched on ``entry_type``; later entries for the same
+        run/task id replace earlier ones. Returns the number of rows written.
+        """
+        written = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for entry in entries:
+                    entry_type = entry.get("entry_type")
+                    if entry_type == "prompt_log":
+                        self._write_prompt_log(entry)
+                    elif entry_type == "action_history" and entry.get("runId"):
+                        self._write_action(entry)
+                    elif entry_type == "task_log" and entry.get("task_id"):
+                        self._write_task(entry)
+                    else:
+                        continue
+                    written += 1
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return written
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,137 @@
+"""Tests for the SQLite and JSONL log stores behind DatabaseInterface."""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+
+from core.storage import JsonlLogStore, SQLiteLogStore, create_log_store, migrate_jsonl_to_sqlite  # noqa: E402
+
+
+def _open(backend, tmp_path, **kwargs):
+    if backend == "sqlite":
+        return SQLiteLogStore(tmp_path / "agent_logs.db")
+    return JsonlLogStore(tmp_path / "agent_logs.txt", **kwargs)
+
+
+def _action(run_id, status="running", started_at="2024-01-01T00:00:00", **extra):
+    return {
+        "entry_type": "action_history",
+        "runId": run_id,
+        "sessionId": "s1",
+        "status": status,
+        "startedAt": started_at,
+        **extra,
+    }
+
+
+def _task(task_id, status="running", **extra):
+    return {"entry_type": "task_log", "task_id": task_id, "status": status, **extra}
+
+
+def _prompt(i):
+    return {"entry_type": "prompt_log", "datetime": f"2024-01-01T00:00:{i:02d}", "prompt": f"p{i}"}
+
+
+@pytest.fixture(params=["sqlite", "jsonl"])
+def backend(request):
+    return request.param
+
+
+def test_round_trip_survives_reopen(backend, tmp_path):
+    store = _open(backend, tmp_path)
+    for i in range(3):
+        store.append_prompt_log(_prompt(i))
+    store.put_action(_action("r1", outputs={"x": 1}))
+    store.put_task(_task("t1", name="Write report"))
+    store.close()
+
+    store = _open(backend, tmp_path)
+    assert [e["prompt"] for e in store.iter_prompt_logs()] == ["p0", "p1", "p2"]
+    assert store.get_action("r1")["outputs"] == {"x": 1}
+    assert store.get_task("t1")["name"] == "Write report"
+    assert store.get_action("missing") is None
+    assert store.get_task("missing") is None
+    store.close()
+
+
+def test_update_replaces_the_record_in_place(backend, tmp_path):
+    store = _open(backend, tmp_path)
+    store.put_action(_action("r1"))
+    store.put_action(_action("r2"))
+    store.put_action(_action("r1", status="success", outputs={"ok": True}))
+    store.put_task(_task("t1"))
+    store.put_task(_task("t1", status="completed"))
+
+    assert [e["runId"] for e in store.iter_actions()] == ["r1", "r2"]
+    assert store.get_action("r1")["status"] == "success"
+    assert [e["runId"] for e in store.find_actions_by_status("running")] == ["r2"]
+    assert [e["runId"] for e in store.find_actions_by_status("success")] == ["r1"]
+    assert [e["status"] for e in store.iter_tasks()] == ["completed"]
+    store.close()
+
+
+def test_recent_actions_are_newest_first(backend, tmp_path):
+    store = _open(backend, tmp_path)
+    store.put_action(_action("old", started_at="2024-01-01T00:00:00"))
+    store.put_action(_action("new", started_at="2024-01-03T00:00:00"))
+    store.put_action(_action("mid", started_at="2024-01-02T00:00:00"))
+    store.put_action(_action("unstarted", started_at=None))
+
+    assert [e["runId"] for e in store.recent_actions(3)] == ["new", "mid", "old"]
+    assert store.recent_actions(10)[-1]["runId"] == "unstarted"
+    store.close()
+
+
+def test_returned_records_are_copies(backend, tmp_path):
+    store = _open(backend, tmp_path)
+    store.put_action(_action("r1"))
+
+    store.find_actions_by_status("running")[0]["status"] = "tampered"
+    next(store.iter_actions())["status"] = "tampered"
+    store.get_action("r1")["status"] = "tampered"
+
+    assert store.get_action("r1")["status"] == "running"
+    store.close()
+
+
+def test_jsonl_compaction_drops_superseded_lines(tmp_path):
+    store = _open("jsonl", tmp_path, compact_min_lines=10)
+    store.append_prompt_log(_prompt(0))
+    for i in range(50):
+        store.put_action(_action("r1", status=f"step{i}"))
+    store.put_task(_task("t1"))
+
+    lines = store.path.read_text(encoding="utf-8").splitlines()
+    # Compaction ran (50 writes, far fewer lines left) and kept every live record
+    assert len(lines) < 20
+    assert store.get_action("r1")["status"] == "step49"
+    assert [e["prompt"] for e in store.iter_prompt_logs()] == ["p0"]
+    store.close()
+
+    reopened = _open("jsonl", tmp_path)
+    assert reopened.get_action("r1")["status"] == "step49"
+    assert reopened.get_task("t1")["status"] == "running"
+    assert [e["prompt"] for e in reopened.iter_prompt_logs()] == ["p0"]
+
+
+def test_sqlite_migrates_a_legacy_jsonl_log_once(tmp_path):
+    legacy = tmp_path / "agent_logs.txt"
+    entries = [_prompt(0), _action("r1"), _action("r1", status="success"), _task("t1")]
+    legacy.write_text("".join(json.dumps(e) + "\n" for e in entries) + "not json\n", encoding="utf-8")
+
+    store = create_log_store("sqlite", data_dir=tmp_path, legacy_log_file=legacy)
+    assert store.get_action("r1")["status"] == "success"
+    assert store.get_task("t1") is not None
+    assert len(list(store.iter_prompt_logs())) == 1
+    assert not legacy.exists()
+    assert (tmp_path / "agent_logs.txt.migrated").exists()
+    assert migrate_jsonl_to_sqlite(legacy, store) == 0
+    store.close()
+
+
+def test_unknown_backend_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        create_log_store("parquet", data_dir=tmp_path, legacy_log_file=tmp_path / "agent_logs.txt")
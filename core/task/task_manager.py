@@ -20,7 +20,7 @@ from core.event_stream.event_stream_manager import EventStreamManager
 from core.config import AGENT_WORKSPACE_ROOT, AGENT_FILE_SYSTEM_PATH
 from core.state.state_manager import StateManager
 from core.state.agent_state import STATE
-from core.llm import LLMCallType
+from core.llm import LLMCallType, get_usage_ledger
 
 if TYPE_CHECKING:
     from core.llm import LLMInterface
@@ -372,6 +372,11 @@ class TaskManager:
         if hasattr(self.event_stream_manager, 'set_skip_unprocessed_logging'):
             self.event_stream_manager.set_skip_unprocessed_logging(False)
 
+        # Report the task's LLM usage
+        ledger = get_usage_ledger()
+        logger.info(f"[TaskManager] {ledger.describe_task(task.id)}")
+        ledger.forget_task(task.id)
+
         # Reset agent state
         STATE.set_agent_property("current_task_id", "")
         STATE.set_agent_property("action_count", 0)
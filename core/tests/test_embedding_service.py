@@ -0,0 +1,116 @@
+"""Tests for the batched, cached embedding service."""
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from core.embedding_service import EmbeddingCache, EmbeddingService, HashEmbeddingModel  # noqa: E402
+
+
+class CountingModel(HashEmbeddingModel):
+    """Hash model that records the batches it is asked to embed."""
+
+    def __init__(self, dim=32):
+        super().__init__(dim)
+        self.batches = []
+
+    def embed_batch(self, texts):
+        self.batches.append(list(texts))
+        return super().embed_batch(texts)
+
+
+class FailingModel(CountingModel):
+    def embed_batch(self, texts):
+        self.batches.append(list(texts))
+        raise RuntimeError("model offline")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embeddings.db")
+    yield cache
+    cache.close()
+
+
+def test_vectors_match_the_model_and_keep_order(cache):
+    model = CountingModel()
+    service = EmbeddingService(model, cache, max_wait_ms=0)
+
+    texts = ["open the browser", "read the file", "open the browser"]
+    vectors = service.embed(texts)
+
+    assert vectors == [pytest.approx(HashEmbeddingModel(32).embed_one(text), abs=1e-6) for text in texts]
+    # Duplicates are embedded once
+    assert model.batches == [["open the browser", "read the file"]]
+
+
+def test_cache_survives_a_new_service(tmp_path):
+    texts = [f"document {i}" for i in range(10)]
+    first = EmbeddingCache(tmp_path / "embeddings.db")
+    EmbeddingService(CountingModel(), first, max_wait_ms=0).embed(texts)
+    first.close()
+
+    reopened = EmbeddingCache(tmp_path / "embeddings.db")
+    model = CountingModel()
+    service = EmbeddingService(model, reopened, max_wait_ms=0)
+    service.embed(texts)
+    stats = service.get_stats()
+    reopened.close()
+
+    assert model.batches == []
+    assert stats["cache_hits"] == 10
+
+
+def test_queries_are_not_persisted(cache):
+    model = CountingModel()
+    service = EmbeddingService(model, cache, max_wait_ms=1000)
+
+    # A query flushes at once instead of waiting for the batch to fill
+    service.embed_query("where is the report")
+    assert model.batches == [["where is the report"]]
+    assert cache.count(model.name) == 0
+
+
+def test_large_requests_are_split_into_batches(cache):
+    model = CountingModel()
+    service = EmbeddingService(model, cache, batch_size=4, max_wait_ms=0)
+
+    service.embed([f"text {i}" for i in range(10)])
+    assert [len(batch) for batch in model.batches] == [4, 4, 2]
+    assert cache.count(model.name) == 10
+
+
+def test_concurrent_callers_share_a_batch(cache):
+    model = CountingModel()
+    service = EmbeddingService(model, cache, batch_size=8, max_wait_ms=200)
+    barrier = threading.Barrier(4)
+    results = {}
+
+    def worker(index):
+        barrier.wait()
+        results[index] = service.embed(["shared", f"own {index}"])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(results) == 4
+    # Four callers, five distinct texts: fewer model calls than callers
+    assert sum(len(batch) for batch in model.batches) == 5
+    assert len(model.batches) < 4
+    assert all(result[0] == results[0][0] for result in results.values())
+
+
+def test_model_failure_reaches_every_caller_and_is_not_cached(cache):
+    model = FailingModel()
+    service = EmbeddingService(model, cache, max_wait_ms=0)
+
+    with pytest.raises(RuntimeError, match="model offline"):
+        service.embed(["a", "b"])
+    assert cache.count() == 0
+    assert service.get_stats()["pending"] == 0
@@ -0,0 +1,67 @@
+"""Tests for TriggerQueue's deterministic coalescing on put."""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from core.trigger import Trigger, TriggerCoalescer, TriggerQueue  # noqa: E402
+
+
+def _queue(merge_window=2.0):
+    return TriggerQueue(llm=None, coalescer=TriggerCoalescer(merge_window=merge_window))
+
+
+def _put_all(queue, *triggers):
+    async def run():
+        for trig in triggers:
+            await queue.put(trig, skip_merge=True)
+        return await queue.list_triggers()
+
+    return asyncio.run(run())
+
+
+def test_window_merge_keeps_the_follow_ups_delay():
+    now = time.time()
+    queued = _put_all(
+        _queue(),
+        Trigger(now, 5, "React to the tool result", {}, "task_1"),
+        Trigger(now + 60, 5, "Check on the download", {}, "task_1"),
+    )
+
+    (merged,) = queued
+    assert merged.fire_at == now + 60
+    assert "React to the tool result" in merged.next_action_description
+    assert "Check on the download" in merged.next_action_description
+
+
+def test_window_merge_keeps_a_new_immediate_trigger_immediate():
+    now = time.time()
+    (merged,) = _put_all(
+        _queue(),
+        Trigger(now + 60, 5, "Check on the download", {}, "task_1"),
+        Trigger(now, 5, "React to the tool result", {}, "task_1"),
+    )
+    assert merged.fire_at == now
+
+
+def test_outside_the_window_the_newest_trigger_replaces():
+    now = time.time()
+    (kept,) = _put_all(
+        _queue(merge_window=0),
+        Trigger(now, 5, "React to the tool result", {}, "task_1"),
+        Trigger(now + 60, 5, "Check on the download", {}, "task_1"),
+    )
+    assert kept.fire_at == now + 60
+    assert kept.next_action_description == "Check on the download"
+
+
+def test_duplicate_keeps_the_earlier_fire_time():
+    now = time.time()
+    (kept,) = _put_all(
+        _queue(),
+        Trigger(now + 60, 5, "Check on the download", {}, "task_1"),
+        Trigger(now, 5, "Check on the download", {}, "task_1"),
+    )
+    assert kept.fire_at == now
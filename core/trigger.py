@@ -3,18 +3,24 @@
 core.trigger
 
 Trigger in this framework is the entry point of ALL reactions by the agent.
+
+Incoming triggers are coalesced deterministically by :class:`TriggerCoalescer`
+(session-id and payload-key rules, a per-session dedupe index and a short
+time-window merge). The LLM is only consulted, when enabled, for triggers the
+rules cannot place.
 """
 from __future__ import annotations
 
 import asyncio
 import heapq
+import itertools
 import json
 import time
 from dataclasses import dataclass, field
-from collections import defaultdict, OrderedDict
-from typing import Dict, List, Optional, Any
-from core.logger import logger
-from core.llm import LLMInterface
+from collections import Counter, defaultdict, OrderedDict
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+from core.logger import logger, is_level_enabled
+from core.llm import LLMInterface, usage_tags
 from core.state.agent_state import STATE
 from core.prompt import CHECK_TRIGGERS_STATE_PROMPT
 from decorators.profiler import profile, OperationCategory
@@ -27,15 +33,145 @@ class Trigger:
     next_action_description: str
     payload: Dict[str, Any] = field(default_factory=dict, compare=False)
     session_id: Optional[str] = field(default=None, compare=False)
+    # Set by TriggerQueue.put(); used for the time-window merge
+    enqueued_at: float = field(default=0.0, compare=False, repr=False)
+
+
+# Trigger payload types that are never routed to another session
+SYSTEM_TRIGGER_TYPES = ("memory_processing", "task_execution", "scheduled")
+
+# Session ids that do not name a specific session (e.g. a fresh user chat)
+GENERIC_SESSION_IDS = (None, "", "chat")
+
+# Rebuild the heap once tombstoned entries outnumber live ones (and exceed this)
+_COMPACT_MIN_TOMBSTONES = 64
+
+
+# ──────────────────────── Trigger Coalescer ──────────────────────────
+class TriggerCoalescer:
+    """
+    Deterministic rules for placing an incoming trigger in the queue.
+
+    Session resolution, first match wins:
+      1. ``explicit``      - system triggers and callers passing ``skip_merge``
+      2. ``payload_key``   - the payload names the target (``session_id`` /
+                             ``task_id``)
+      3. ``named_session`` - the trigger already carries a specific session id
+      4. ``no_candidates`` - no other non-system session is queued
+      5. ``awaiting_reply``- exactly one queued session is waiting for the
+                             user's reply, so a generic chat continues it
+      otherwise the trigger is ambiguous (``resolve_session`` returns None).
+
+    Once the session is known, a trigger identical to one already queued for
+    that session is a duplicate, and triggers for the same session arriving
+    within ``merge_window`` seconds are merged rather than replaced.
+    """
+
+    def __init__(
+        self,
+        merge_window: float = 2.0,
+        payload_keys: Iterable[str] = ("session_id", "task_id"),
+    ) -> None:
+        self.merge_window = merge_window
+        self.payload_keys = tuple(payload_keys)
+        self.stats: Counter = Counter()
+
+    @staticmethod
+    def is_system_trigger(trig: Trigger) -> bool:
+        return trig.payload.get("type", "") in SYSTEM_TRIGGER_TYPES
+
+    def resolve_session(
+        self,
+        trig: Trigger,
+        queued: Dict[Optional[str], List[Trigger]],
+        skip_merge: bool = False,
+    ) -> Tuple[Optional[str], str]:
+        """
+        Decide which session ``trig`` belongs to.
+
+        Args:
+            trig: The incoming trigger.
+            queued: Per-session index of the triggers currently queued.
+            skip_merge: Keep the trigger's own session unconditionally.
+
+        Returns:
+            ``(session_id, rule)``; ``session_id`` is None when the rules are
+            inconclusive (``rule == "ambiguous"``).
+        """
+        if skip_merge or self.is_system_trigger(trig):
+            return trig.session_id, "explicit"
+
+        for key in self.payload_keys:
+            target = trig.payload.get(key)
+            if isinstance(target, str) and target:
+                return target, "payload_key"
+
+        if trig.session_id not in GENERIC_SESSION_IDS:
+            return trig.session_id, "named_session"
+
+        candidates = [
+            session_id
+            for session_id, triggers in queued.items()
+            if session_id not in GENERIC_SESSION_IDS
+            and triggers
+            and not all(self.is_system_trigger(t) for t in triggers)
+        ]
+        if not candidates:
+            return trig.session_id, "no_candidates"
+
+        awaiting = [
+            session_id
+            for session_id in candidates
+            if any(t.payload.get("wait_for_user_reply") for t in queued[session_id])
+        ]
+        if len(awaiting) == 1:
+            return awaiting[0], "awaiting_reply"
+
+        return None, "ambiguous"
+
+    @staticmethod
+    def fingerprint(trig: Trigger) -> Tuple[str, str]:
+        """Identity of a trigger's content, ignoring timing."""
+        try:
+            payload = json.dumps(trig.payload, sort_keys=True, default=str)
+        except (TypeError, ValueError):
+            payload = repr(sorted(trig.payload.items(), key=lambda kv: str(kv[0])))
+        return (trig.next_action_description or "").strip(), payload
+
+    def find_duplicate(self, trig: Trigger, same_session: List[Trigger]) -> Optional[Trigger]:
+        """Return the queued trigger with the same content as ``trig``, if any."""
+        fingerprint = self.fingerprint(trig)
+        for queued in same_session:
+            if self.fingerprint(queued) == fingerprint:
+                return queued
+        return None
+
+    def within_window(self, same_session: List[Trigger], now: float) -> bool:
+        """True if a trigger for the session was enqueued within the merge window."""
+        if self.merge_window <= 0:
+            return False
+        return any(now - t.enqueued_at <= self.merge_window for t in same_session)
 
 
 # ───────────────────────── Trigger Queue ─────────────────────────────
 class TriggerQueue:
     """
     Concurrency-safe priority queue for Trigger.
+
+    The heap holds ``[fire_at, priority, seq, trigger]`` entries and is
+    indexed by session id, so removing, reprioritising or rescheduling a
+    session's triggers costs O(log n) per trigger: the old entry is
+    tombstoned (its trigger slot cleared) and skipped when it reaches the
+    top, and a fresh entry is pushed if the trigger stays queued.
     """
 
-    def __init__(self, llm: LLMInterface) -> None:
+    def __init__(
+        self,
+        llm: LLMInterface,
+        *,
+        coalescer: Optional[TriggerCoalescer] = None,
+        llm_fallback: bool = False,
+    ) -> None:
         """
         Initialize a concurrency-safe trigger queue.
 
@@ -45,26 +181,132 @@ class TriggerQueue:
         loops can await triggers without busy waiting.
 
         Args:
-            llm: Interface used to resolve conflicts between competing triggers
-                for the same session.
+            llm: Interface used to resolve triggers the coalescing rules cannot
+                place, when ``llm_fallback`` is enabled.
+            coalescer: Deterministic coalescing rules. Defaults to
+                :class:`TriggerCoalescer` with its default settings.
+            llm_fallback: Ask the LLM which session an ambiguous trigger
+                continues. When False, ambiguous triggers keep their own
+                session id.
         """
-        self._heap: List[Trigger] = []
+        # Heap entries: [fire_at, priority, seq, trigger]; trigger is None once tombstoned
+        self._heap: List[list] = []
+        self._seq = itertools.count()
+        # id(trigger) -> its live heap entry
+        self._entries: Dict[int, list] = {}
+        # Per-session index of the live triggers
+        self._by_session: Dict[Optional[str], List[Trigger]] = defaultdict(list)
         self._cv = asyncio.Condition()
         self.llm = llm
+        self.coalescer = coalescer or TriggerCoalescer()
+        self.llm_fallback = llm_fallback
+
+    # =================================================================
+    # Indexed heap helpers (call with the condition held)
+    # =================================================================
+    def _push(self, trig: Trigger) -> None:
+        entry = [trig.fire_at, trig.priority, next(self._seq), trig]
+        self._entries[id(trig)] = entry
+        self._by_session[trig.session_id].append(trig)
+        heapq.heappush(self._heap, entry)
+
+    def _peek(self) -> Optional[Trigger]:
+        """Return the next trigger to fire without removing it."""
+        while self._heap and self._heap[0][3] is None:
+            heapq.heappop(self._heap)
+        return self._heap[0][3] if self._heap else None
+
+    def _unindex(self, trig: Trigger) -> None:
+        same = self._by_session.get(trig.session_id)
+        if not same:
+            return
+        for i, queued in enumerate(same):
+            if queued is trig:
+                del same[i]
+                break
+        if not same:
+            del self._by_session[trig.session_id]
+
+    def _tombstone(self, trig: Trigger) -> None:
+        entry = self._entries.pop(id(trig), None)
+        if entry is not None:
+            entry[3] = None
+
+    def _discard(self, trig: Trigger) -> None:
+        self._tombstone(trig)
+        self._unindex(trig)
+        self._maybe_compact()
+
+    def _ready_triggers(self, now: float) -> List[Trigger]:
+        """Live triggers with ``fire_at <= now``, found by walking only the ready part of the heap."""
+        ready: List[Trigger] = []
+        heap = self._heap
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            entry = heap[i]
+            if entry[0] > now:
+                continue  # heap order: nothing below is ready either
+            if entry[3] is not None:
+                ready.append(entry[3])
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    stack.append(child)
+        return ready
+
+    def _remove_session(self, session_id: Optional[str]) -> int:
+        """Remove every trigger queued for ``session_id``. Returns how many."""
+        same = self._by_session.pop(session_id, None) or []
+        for trig in same:
+            self._tombstone(trig)
+        self._maybe_compact()
+        return len(same)
+
+    def _reschedule(
+        self,
+        trig: Trigger,
+        fire_at: Optional[float] = None,
+        priority: Optional[int] = None,
+    ) -> None:
+        """Change a queued trigger's fire time and/or priority in O(log n)."""
+        self._tombstone(trig)
+        if fire_at is not None:
+            trig.fire_at = fire_at
+        if priority is not None:
+            trig.priority = priority
+        entry = [trig.fire_at, trig.priority, next(self._seq), trig]
+        self._entries[id(trig)] = entry
+        heapq.heappush(self._heap, entry)
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        """Drop tombstones in one O(n) pass once they dominate the heap."""
+        tombstones = len(self._heap) - len(self._entries)
+        if tombstones > _COMPACT_MIN_TOMBSTONES and tombstones > len(self._entries):
+            self._heap = [entry for entry in self._heap if entry[3] is not None]
+            heapq.heapify(self._heap)
+
+    def _live_triggers(self) -> List[Trigger]:
+        return [entry[3] for entry in self._heap if entry[3] is not None]
+
     # =================================================================
     # Pretty Printer for Debugging
     # =================================================================
     def _print_queue(self, label: str) -> None:
+        # Sorting and formatting the whole queue is only worth it if it is logged
+        if not is_level_enabled("DEBUG"):
+            return
+
         logger.debug("=" * 70)
         logger.debug(f"[TRIGGER QUEUE] {label}")
         logger.debug("=" * 70)
 
-        if not self._heap:
+        if not self._entries:
             logger.debug("(empty)")
             return
 
         now = time.time()
-        for i, t in enumerate(sorted(self._heap, key=lambda x: (x.fire_at, x.priority))):
+        for i, t in enumerate(sorted(self._live_triggers(), key=lambda x: (x.fire_at, x.priority))):
             logger.debug(
                 f"{i+1}. session_id={t.session_id} | "
                 f"prio={t.priority} | "
@@ -123,6 +365,8 @@ class TriggerQueue:
         """
         async with self._cv:
             self._heap.clear()
+            self._entries.clear()
+            self._by_session.clear()
             self._cv.notify_all()
         
     # =================================================================
@@ -131,82 +375,101 @@ class TriggerQueue:
     @profile("trigger_queue_put", OperationCategory.TRIGGER)
     async def put(self, trig: Trigger, skip_merge: bool = False) -> None:
         """
-        Insert a trigger into the queue, optionally merging with existing session triggers.
+        Insert a trigger into the queue, coalescing it with queued work.
 
-        When a trigger arrives for a session that already has queued work, the
-        method consults the LLM to generate a new session identifier that
-        represents the preferred trigger. Existing triggers for that session
-        are removed so the freshest trigger wins.
+        The target session is resolved by :class:`TriggerCoalescer` rules;
+        only triggers those rules find ambiguous are sent to the LLM, and
+        only when ``llm_fallback`` is enabled. Within the target session an
+        identical queued trigger absorbs the new one, triggers arriving within
+        the merge window are combined (firing at the new trigger's time), and
+        otherwise the freshest trigger replaces the older ones.
 
         Args:
             trig: Trigger instance describing when and why the agent should act.
-            skip_merge: If True, skip LLM-based trigger merging. Use for system
-                        triggers that should not be merged with user triggers.
+            skip_merge: If True, keep the trigger's own session id. Use for
+                system triggers and follow-ups whose session is already known.
         """
         logger.debug(f"\n[PUT] Incoming trigger for session={trig.session_id} (skip_merge={skip_merge})")
         self._print_queue("BEFORE PUT")
 
-        existing_triggers: List[Trigger] = self._heap
-
-        # Skip LLM merge for system triggers or when explicitly requested
-        # System triggers have types like "memory_processing", "task_execution"
-        trigger_type = trig.payload.get("type", "")
-        is_system_trigger = trigger_type in ("memory_processing", "task_execution", "scheduled")
-
-        if len(existing_triggers) > 0 and not skip_merge and not is_system_trigger:
-
-            # KV CACHING: System prompt is now minimal/static
-            # Dynamic context moved to user prompt
-            sys_msg = "You are a trigger management system."
+        async with self._cv:
+            session_id, rule = self.coalescer.resolve_session(trig, self._by_session, skip_merge)
+            existing_triggers = self._live_triggers() if session_id is None and self.llm_fallback else None
 
-            # If heap empty → push directly
-            if not existing_triggers:
-                existing_triggers.append(trig)
+        if session_id is None:
+            if existing_triggers:
+                session_id = await self._resolve_session_via_llm(trig, existing_triggers)
+                rule = "llm_fallback"
             else:
-                logger.debug("[TRIGGER QUEUE] Heap not empty → ignoring new trigger for LLM comparison")
-
-            # KV CACHING: Add dynamic context to user prompt
-            usr_msg = CHECK_TRIGGERS_STATE_PROMPT.format(
-                event_stream=self.create_event_stream_state(),
-                task_state=self.create_task_state(),
-                context=trig,
-                existing_triggers=existing_triggers,
-            )
-
-            new_trigger_id = await self.llm.generate_response_async(sys_msg, usr_msg)
-            logger.debug(f"[PUT] New trigger value: {new_trigger_id}")
-
-            # Update the incoming trigger's ID
-            trig.session_id = new_trigger_id
-        else:
-            logger.debug(f"[PUT] Skipping LLM merge (skip_merge={skip_merge}, is_system={is_system_trigger})")
+                session_id = trig.session_id
+        self.coalescer.stats[rule] += 1
+        logger.debug(f"[PUT] Resolved session={session_id} via rule={rule}")
+        trig.session_id = session_id
 
         async with self._cv:
-            # find all triggers in heap with same session_id
-            same = [t for t in self._heap if t.session_id == trig.session_id]
+            now = time.time()
+            trig.enqueued_at = now
+            same = list(self._by_session.get(session_id, ()))
+
+            duplicate = self.coalescer.find_duplicate(trig, same) if same else None
+            if duplicate is not None:
+                # Keep the queued copy, but never let the duplicate fire later
+                logger.debug("[PUT] Duplicate of a queued trigger → keeping the existing one")
+                self.coalescer.stats["duplicate"] += 1
+                if trig.fire_at < duplicate.fire_at or trig.priority < duplicate.priority:
+                    self._reschedule(
+                        duplicate,
+                        fire_at=min(duplicate.fire_at, trig.fire_at),
+                        priority=min(duplicate.priority, trig.priority),
+                    )
 
-            if same:
+            elif same and self.coalescer.within_window(same, now):
+                logger.debug(f"[PUT] {len(same)} trigger(s) queued within the merge window → MERGE")
+                self.coalescer.stats["window_merge"] += 1
+                merged = self._merge_trigger_group(session_id, same + [trig])
+                # Fire when the newest trigger asked to, as a replacement would;
+                # an earlier immediate trigger must not cancel a follow-up's delay
+                merged.fire_at = trig.fire_at
+                merged.enqueued_at = now
+                self._remove_session(session_id)
+                self._push(merged)
+
+            elif same:
                 logger.debug("[PUT] Existing trigger(s) found → PREFER NEW TRIGGER")
-                self._print_queue("BEFORE REPLACE (PUT)")
-
-                # Remove ALL old triggers for this session
-                self._heap = [t for t in self._heap if t.session_id != trig.session_id]
-
-                # NEW BEHAVIOUR: prefer new → push new trigger only
-                heapq.heappush(self._heap, trig)
-
-                logger.debug("[PUT] REPLACED old triggers with NEW trigger")
-                self._print_queue("AFTER REPLACE (PUT)")
+                self.coalescer.stats["replace"] += 1
+                self._remove_session(session_id)
+                self._push(trig)
 
             else:
                 logger.debug("[PUT] No existing session trigger → pushing normally")
-                heapq.heappush(self._heap, trig)
-
-            heapq.heapify(self._heap)
+                self._push(trig)
 
             self._print_queue("AFTER PUT")
             self._cv.notify()
 
+    async def _resolve_session_via_llm(self, trig: Trigger, existing_triggers: List[Trigger]) -> Optional[str]:
+        """Ask the LLM which queued session an ambiguous trigger continues."""
+        # KV CACHING: System prompt is now minimal/static
+        # Dynamic context moved to user prompt
+        sys_msg = "You are a trigger management system."
+        usr_msg = CHECK_TRIGGERS_STATE_PROMPT.format(
+            event_stream=self.create_event_stream_state(),
+            task_state=self.create_task_state(),
+            context=trig,
+            existing_triggers=existing_triggers,
+        )
+
+        try:
+            with usage_tags(call_type="trigger_merge"):
+                response = await self.llm.generate_response_async(sys_msg, usr_msg)
+        except Exception as e:
+            logger.warning(f"[PUT] LLM trigger merge failed, keeping session={trig.session_id}: {e}")
+            return trig.session_id
+
+        new_trigger_id = (response or "").strip().strip("\"'`")
+        logger.debug(f"[PUT] New trigger value: {new_trigger_id}")
+        return new_trigger_id or trig.session_id
+
     # =================================================================
     # GET
     # =================================================================
@@ -231,34 +494,40 @@ class TriggerQueue:
             while True:
                 now = time.time()
 
-                # collect ready triggers
-                ready: List[Trigger] = []
-                while self._heap and self._heap[0].fire_at <= now:
-                    ready.append(heapq.heappop(self._heap))
+                # collect ready triggers (left in place; only the winner is removed)
+                ready = self._ready_triggers(now)
 
                 if ready:
                     logger.debug(f"[GET] {len(ready)} trigger(s) are ready")
                     self._print_queue("READY BEFORE MERGE (GET)")
 
-                    merged_ready = self._merge_ready_triggers(ready)
-                    merged_ready.sort(key=lambda t: (t.priority, t.fire_at))
+                    grouped: Dict[Optional[str], List[Trigger]] = defaultdict(list)
+                    for t in ready:
+                        grouped[t.session_id].append(t)
+
+                    # The session whose merged trigger would sort first by (priority, fire_at)
+                    session_id = min(
+                        grouped,
+                        key=lambda sid: (
+                            min(t.priority for t in grouped[sid]),
+                            min(t.fire_at for t in grouped[sid]),
+                        ),
+                    )
+                    for t in grouped[session_id]:
+                        self._discard(t)
 
-                    trig = merged_ready.pop(0)
+                    trig = self._merge_trigger_group(session_id, grouped[session_id])
                     logger.info(
                         f"[TRIGGER FIRED] session={trig.session_id} | desc={trig.next_action_description}"
                     )
 
-                    # requeue leftover
-                    for t in merged_ready:
-                        heapq.heappush(self._heap, t)
-
                     self._print_queue("QUEUE AFTER GET (POST-MERGE)")
                     return trig
 
                 # wait for next trigger
-                if self._heap:
-                    next_fire = self._heap[0].fire_at
-                    delay = next_fire - now
+                head = self._peek()
+                if head is not None:
+                    delay = head.fire_at - now
                     if delay <= 0:
                         continue
                     try:
@@ -279,17 +548,17 @@ class TriggerQueue:
             The number of triggers stored in the heap.
         """
         async with self._cv:
-            return len(self._heap)
+            return len(self._entries)
 
     async def list_triggers(self) -> List[Trigger]:
         """
         List the triggers currently in the queue without altering order.
 
         Returns:
-            A shallow copy of the internal trigger heap contents.
+            A shallow copy of the queued triggers, in heap order.
         """
         async with self._cv:
-            return list(self._heap)
+            return self._live_triggers()
 
     # =================================================================
     # FIRE NOW
@@ -305,18 +574,39 @@ class TriggerQueue:
             session_id: Identifier of the session whose trigger should fire
                 now.
 
+        Returns:
+            ``True`` if at least one trigger was updated, otherwise ``False``.
+        """
+        return await self.reschedule(session_id, fire_at=time.time())
+
+    # =================================================================
+    # RESCHEDULE / REPRIORITISE
+    # =================================================================
+    async def reschedule(
+        self,
+        session_id: str,
+        *,
+        fire_at: Optional[float] = None,
+        priority: Optional[int] = None,
+    ) -> bool:
+        """
+        Change when and/or at what priority a session's triggers fire.
+
+        Args:
+            session_id: Session whose queued triggers should be updated.
+            fire_at: New fire time (epoch seconds). Unchanged if None.
+            priority: New priority (lower fires first). Unchanged if None.
+
         Returns:
             ``True`` if at least one trigger was updated, otherwise ``False``.
         """
         async with self._cv:
-            found = False
-            for t in self._heap:
-                if t.session_id == session_id:
-                    t.fire_at = time.time()
-                    found = True
-            if found:
+            same = list(self._by_session.get(session_id, ()))
+            for t in same:
+                self._reschedule(t, fire_at=fire_at, priority=priority)
+            if same:
                 self._cv.notify()
-            return found
+            return bool(same)
 
     # =================================================================
     # REMOVE SESSIONS
@@ -332,8 +622,8 @@ class TriggerQueue:
         if not session_ids:
             return
         async with self._cv:
-            self._heap = [t for t in self._heap if t.session_id not in session_ids]
-            heapq.heapify(self._heap)
+            for session_id in session_ids:
+                self._remove_session(session_id)
             self._cv.notify_all()
 
     # =================================================================
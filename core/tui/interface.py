@@ -5,7 +5,7 @@ import asyncio
 import os
 import time
 from asyncio import Queue
-from typing import Awaitable, Callable, Optional, Tuple, TYPE_CHECKING
+from typing import Awaitable, Callable, Optional, TYPE_CHECKING
 
 from rich.console import RenderableType
 from rich.table import Table
@@ -14,6 +14,7 @@ from rich.text import Text
 from core.logger import logger
 from core.state.agent_state import STATE
 from core.gui.handler import GUIHandler
+from core.llm.streaming import aclose_http_clients
 from core.tui.app import CraftApp
 from core.tui.data import TimelineEntry, ActionEntry, ActionUpdate, FootageUpdate
 from core.tui.mcp_settings import (
@@ -55,6 +56,8 @@ class TUIInterface:
 
     _CHAT_LABEL_WIDTH = 7
     _ACTION_LABEL_WIDTH = 5  # Adjusted for icon format [+] or [●]/[○]
+    # Longest wait for a pushed event before re-checking GUI mode state
+    _EVENT_IDLE_TIMEOUT = 0.5
 
     def __init__(
         self, agent: "AgentBase", *, default_provider: str, default_api_key: str
@@ -62,7 +65,6 @@ class TUIInterface:
         self._agent = agent
         self._running: bool = False
         self._tracked_sessions: set[str] = set()
-        self._seen_events: set[Tuple[str, str, str]] = set()
         self._status_message: str = "Agent is idle"
         self._app: CraftApp | None = None
         self._event_task: asyncio.Task[None] | None = None
@@ -665,7 +667,6 @@ Skills are automatically selected during task creation based on the task descrip
 
     async def _reset_interface_state(self) -> None:
         self._tracked_sessions.clear()
-        self._seen_events.clear()
         self.chat_updates = Queue()
         self.action_updates = Queue()
         self.status_updates = Queue()
@@ -709,55 +710,37 @@ Skills are automatically selected during task creation based on the task descrip
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
-            loop.run_until_complete(self._agent.react(trigger))
+            loop.run_until_complete(self._react_and_close_clients(trigger))
         finally:
             loop.close()
 
+    async def _react_and_close_clients(self, trigger) -> None:
+        try:
+            await self._agent.react(trigger)
+        finally:
+            # Pooled HTTP clients are per loop, and this loop is about to close
+            await aclose_http_clients()
+
     async def _watch_events(self) -> None:
-        """Refresh the conversation timeline with agent actions."""
+        """Refresh the conversation timeline with agent actions.
+
+        Events are pushed by the event stream as they are logged (from the
+        agent's worker thread), so there is no polling or deduplication. The
+        wait times out periodically only to notice GUI mode ending, which is
+        state rather than an event.
+        """
+        subscription = self._agent.event_stream_manager.subscribe()
         try:
             while self._running and self._agent.is_running:
-                stream = self._agent.event_stream_manager.get_stream()
-                if not stream:
-                    await asyncio.sleep(0.05)
-                    continue
-
-                for event in stream.as_list():
-                    key = (event.iso_ts, event.kind, event.message)
-                    if key in self._seen_events:
-                        continue
-                    self._seen_events.add(key)
-
-                    if event.kind == "screen":
-                        continue
-
-                    style = self._style_for_event(event.kind, event.severity)
-                    label = self._label_for_style(style, event.kind)
-                    display_text = event.display_text()
-
-                    if style in {"action", "task"}:
-                        await self._handle_action_event(
-                            event.kind,
-                            display_text,
-                            style=style,
-                        )
-                        continue
-
-                    if style not in {"agent", "system", "user", "error", "info"}:
-                        continue
-
-                    if display_text is not None:
-                        await self.chat_updates.put((label, display_text, style))
-
-                    # Set agent state to waiting_for_user when agent sends a response
-                    if style == "agent" and display_text:
-                        # Check if this is the final agent response (not during a task)
-                        if not self._current_task_name and self._agent_state == "working":
-                            self._agent_state = "waiting_for_user"
-                            status = self._generate_status_message()
-                            if status != self._status_message:
-                                self._status_message = status
-                                await self.status_updates.put(status)
+                try:
+                    _, event = await asyncio.wait_for(
+                        subscription.get(), timeout=self._EVENT_IDLE_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    event = None
+
+                if event is not None:
+                    await self._render_event(event)
 
                 # Check for GUI mode transitions
                 current_gui_mode = STATE.gui_mode
@@ -766,10 +749,43 @@ Skills are automatically selected during task creation based on the task descrip
                     self.signal_gui_mode_end()
                 self._last_gui_mode = current_gui_mode
 
-                await asyncio.sleep(0.05)
-
         except asyncio.CancelledError:  # pragma: no cover
             raise
+        finally:
+            subscription.close()
+
+    async def _render_event(self, event) -> None:
+        """Route a single event to the chat, action, or status views."""
+        if event.kind == "screen":
+            return
+
+        style = self._style_for_event(event.kind, event.severity)
+        label = self._label_for_style(style, event.kind)
+        display_text = event.display_text()
+
+        if style in {"action", "task"}:
+            await self._handle_action_event(
+                event.kind,
+                display_text,
+                style=style,
+            )
+            return
+
+        if style not in {"agent", "system", "user", "error", "info"}:
+            return
+
+        if display_text is not None:
+            await self.chat_updates.put((label, display_text, style))
+
+        # Set agent state to waiting_for_user when agent sends a response
+        if style == "agent" and display_text:
+            # Check if this is the final agent response (not during a task)
+            if not self._current_task_name and self._agent_state == "working":
+                self._agent_state = "waiting_for_user"
+                status = self._generate_status_message()
+                if status != self._status_message:
+                    self._status_message = status
+                    await self.status_updates.put(status)
 
     async def _handle_action_event(self, kind: str, message: str, *, style: str = "action") -> None:
         """Record an action update and refresh the status bar."""
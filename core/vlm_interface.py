@@ -18,8 +18,7 @@ from core.models.factory import ModelFactory
 from core.models.types import InterfaceType
 from core.google_gemini_client import GeminiClient
 from core.logger import logger
-from core.state.agent_state import STATE
-from core.llm import get_cache_metrics, get_cache_config
+from core.llm import get_cache_metrics, get_cache_config, get_usage_ledger
 
 class VLMInterface:
     _CODE_BLOCK_RE = re.compile(r"^```(?:\w+)?\s*|\s*```$", re.MULTILINE)
@@ -149,6 +148,7 @@ class VLMInterface:
             if log_response:
                 logger.info(f"[LLM SEND] system={system_prompt} | user={user_prompt}")
             
+            started = time.perf_counter()
             if self.provider == "openai":
                 response = self._openai_describe_bytes(image_bytes, system_prompt, user_prompt)
             elif self.provider == "remote":
@@ -164,7 +164,14 @@ class VLMInterface:
             
             cleaned = re.sub(self._CODE_BLOCK_RE, "", response.get("content", "").strip())
             
-            STATE.set_agent_property("token_count", STATE.get_agent_property("token_count", 0) + response.get("tokens_used", 0))
+            # VLM responses only report a total, so it is booked as prompt tokens
+            get_usage_ledger().record(
+                self.provider,
+                self.model,
+                prompt_tokens=response.get("tokens_used", 0),
+                latency=time.perf_counter() - started,
+                call_type="vlm",
+            )
             
             if log_response:
                 logger.info(f"[LLM RECV] {cleaned}")
@@ -9,6 +9,7 @@ from .profiler import (
     disable_profiling,
     is_profiling_enabled,
     set_auto_save_interval,
+    set_sample_rate,
     print_profile_report,
     save_profile_report,
     get_profiler,
@@ -24,24 +24,41 @@ Configuration:
         "log_dir": "decorators/logs"
     }
 
-    Set "enabled" to true to turn on profiling.
+    Set "enabled" to true to turn on profiling. The AGENT_PROFILER_ENABLED
+    environment variable ("1"/"0") overrides it for one process without
+    touching the file; the bench scripts use it to keep reports out of the tree.
     Set "auto_save_interval" to N to save after every N loops (0 = only at exit).
+
+    Optional keys bound the profiler's memory and overhead so it can stay on
+    in long-running deployments:
+        "sample_rate": 1.0        # fraction of calls that capture CPU/memory and a raw record
+        "max_records": 10000      # raw records kept (oldest dropped)
+        "max_loops": 1000         # loop breakdowns kept (oldest dropped)
+        "window_seconds": 60      # rolling report window (0 = disabled)
+        "max_windows": 60,        # window summaries kept in memory
+        "window_log": false       # also append each closed window to profile_windows_*.jsonl
+
+    Per-operation statistics are always exact in count/total/min/max/mean;
+    percentiles (p50/p95/p99) come from a constant-memory quantile sketch.
 """
 
 import atexit
 import asyncio
 import functools
 import json
+import math
+import os
+import random
 import statistics
 import threading
 import time
 import uuid
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar, Union
 import psutil
 
 
@@ -53,10 +70,27 @@ DEFAULT_CONFIG = {
     "enabled": False,  # Disabled by default - user must explicitly enable
     "auto_save_interval": 5,  # Save every N loops (0 = only at exit)
     "log_dir": "decorators/logs",
+    "sample_rate": 1.0,  # Fraction of calls that capture resource usage and a raw record
+    "max_records": 10000,  # Raw records kept in memory (oldest dropped)
+    "max_loops": 1000,  # Loop breakdowns kept in memory (oldest dropped)
+    "window_seconds": 60,  # Rolling report window length (0 = disabled)
+    "max_windows": 60,  # Window summaries kept in memory
+    "window_log": False,  # Append closed windows to profile_windows_*.jsonl
 }
 
 CONFIG_PATH = Path(__file__).parent / "profiler_config.json"
 
+# Environment override for "enabled" ("1"/"true"/"on" or "0"/"false"/"off")
+ENABLED_ENV_VAR = "AGENT_PROFILER_ENABLED"
+
+
+def _enabled_from_env() -> Optional[bool]:
+    """The ``enabled`` override from the environment, or None when unset."""
+    value = os.environ.get(ENABLED_ENV_VAR, "").strip().lower()
+    if not value:
+        return None
+    return value in ("1", "true", "yes", "on")
+
 
 def _load_profiler_config() -> Dict[str, Any]:
     """Load profiler configuration from file."""
@@ -109,16 +143,69 @@ class ProfileRecord:
         return asdict(self)
 
 
+class QuantileSketch:
+    """
+    Constant-memory streaming quantile estimator.
+
+    Values are counted in logarithmically sized buckets, so any quantile is
+    returned within ``relative_accuracy`` of the true value (DDSketch-style).
+    Memory depends only on the dynamic range of the values: ~1,200 buckets
+    cover 1 microsecond to 3 hours at the default 1% accuracy.
+    """
+
+    # Values at or below this (in ms) are counted in a single zero bucket.
+    MIN_VALUE = 1e-3
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value <= self.MIN_VALUE:
+            self._zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q``-quantile (0 <= q <= 1). Returns 0.0 when empty."""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(key-1), gamma^key]
+                return 2 * self._gamma ** key / (self._gamma + 1)
+        return 0.0  # pragma: no cover
+
+    def merge(self, other: "QuantileSketch") -> None:
+        self.count += other.count
+        self._zero_count += other._zero_count
+        for key, n in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + n
+
+
 @dataclass
 class OperationStats:
-    """Aggregated statistics for a single operation type."""
+    """Aggregated statistics for a single operation type (constant memory)."""
     name: str
     category: str
     count: int = 0
     total_ms: float = 0.0
     min_ms: float = float('inf')
     max_ms: float = 0.0
-    durations: List[float] = field(default_factory=list)
+    sketch: QuantileSketch = field(default_factory=QuantileSketch, repr=False)
+    # Welford running mean / sum of squared deviations for the std dev
+    _mean: float = field(default=0.0, repr=False)
+    _m2: float = field(default=0.0, repr=False)
 
     @property
     def avg_ms(self) -> float:
@@ -126,18 +213,29 @@ class OperationStats:
 
     @property
     def median_ms(self) -> float:
-        return statistics.median(self.durations) if self.durations else 0.0
+        return self.sketch.quantile(0.5)
+
+    @property
+    def p95_ms(self) -> float:
+        return self.sketch.quantile(0.95)
+
+    @property
+    def p99_ms(self) -> float:
+        return self.sketch.quantile(0.99)
 
     @property
     def std_dev_ms(self) -> float:
-        return statistics.stdev(self.durations) if len(self.durations) > 1 else 0.0
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
 
     def add_duration(self, duration_ms: float) -> None:
         self.count += 1
         self.total_ms += duration_ms
         self.min_ms = min(self.min_ms, duration_ms)
         self.max_ms = max(self.max_ms, duration_ms)
-        self.durations.append(duration_ms)
+        self.sketch.add(duration_ms)
+        delta = duration_ms - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (duration_ms - self._mean)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -149,6 +247,8 @@ class OperationStats:
             "min_ms": round(self.min_ms, 3) if self.min_ms != float('inf') else 0.0,
             "max_ms": round(self.max_ms, 3),
             "median_ms": round(self.median_ms, 3),
+            "p95_ms": round(self.p95_ms, 3),
+            "p99_ms": round(self.p99_ms, 3),
             "std_dev_ms": round(self.std_dev_ms, 3),
         }
 
@@ -160,7 +260,8 @@ class LoopStats:
     loop_number: int
     start_time: float
     end_time: Optional[float] = None
-    operations: List[ProfileRecord] = field(default_factory=list)
+    operation_count: int = 0
+    breakdown: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
 
     @property
     def duration_ms(self) -> float:
@@ -168,22 +269,20 @@ class LoopStats:
             return 0.0
         return (self.end_time - self.start_time) * 1000
 
-    def add_operation(self, record: ProfileRecord) -> None:
-        self.operations.append(record)
+    def add_operation(self, category: str, duration_ms: float) -> None:
+        self.operation_count += 1
+        self.breakdown[category] += duration_ms
 
     def get_breakdown(self) -> Dict[str, float]:
         """Get time breakdown by category."""
-        breakdown: Dict[str, float] = defaultdict(float)
-        for op in self.operations:
-            breakdown[op.category] += op.duration_ms
-        return dict(breakdown)
+        return dict(self.breakdown)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "loop_id": self.loop_id,
             "loop_number": self.loop_number,
             "duration_ms": round(self.duration_ms, 3),
-            "operation_count": len(self.operations),
+            "operation_count": self.operation_count,
             "breakdown_by_category": {k: round(v, 3) for k, v in self.get_breakdown().items()},
         }
 
@@ -196,6 +295,9 @@ class AgentProfiler:
     - Tracks individual operations with timing and metadata
     - Aggregates statistics by operation name and category
     - Tracks per-loop performance metrics
+    - Constant memory: bounded raw records/loops and percentile sketches
+    - Optional sampling of resource usage and raw records
+    - Rolling-window reports appended to a JSONL file
     - Thread-safe logging
     - Generates human-readable and JSON reports
     - Auto-saves at configurable intervals and on exit
@@ -228,26 +330,48 @@ class AgentProfiler:
         # Load config from file
         config = _load_profiler_config()
 
-        # Use config values, allow override via constructor
+        # Use config values, allow override via constructor or environment
+        if enabled is None:
+            enabled = _enabled_from_env()
         self.enabled = enabled if enabled is not None else config.get("enabled", False)
         self._auto_save_interval = config.get("auto_save_interval", 5)
         log_dir = log_dir or config.get("log_dir", "decorators/logs")
 
+        self.sample_rate = min(max(float(config.get("sample_rate", 1.0)), 0.0), 1.0)
+        self._max_loops = int(config.get("max_loops", 1000))
+        self._window_seconds = float(config.get("window_seconds", 60))
+        self._window_log = bool(config.get("window_log", False))
+
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
         # Generate unique session ID
         self.session_id = f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
         self.log_path = self.log_dir / f"profile_{self.session_id}.json"
+        self.window_log_path = self.log_dir / f"profile_windows_{self.session_id}.jsonl"
 
         # Thread safety
         self._write_lock = threading.Lock()
 
-        # Storage
-        self._records: List[ProfileRecord] = []
+        # psutil.Process() is costly to construct, so keep one handle
+        try:
+            self._process: Optional[psutil.Process] = psutil.Process()
+            self._process.cpu_percent(interval=None)  # prime the CPU counter
+        except Exception:
+            self._process = None
+
+        # Storage (all bounded)
+        self._records: Deque[ProfileRecord] = deque(maxlen=int(config.get("max_records", 10000)))
+        self._record_count = 0
         self._stats: Dict[str, OperationStats] = {}
         self._category_stats: Dict[str, OperationStats] = {}
-        self._loops: Dict[str, LoopStats] = {}
+        self._loops: "OrderedDict[str, LoopStats]" = OrderedDict()
+        self._loop_duration_stats = OperationStats(name="loop", category=OperationCategory.AGENT_LOOP.value)
+
+        # Rolling windows
+        self._window_start = time.time()
+        self._window_stats: Dict[str, OperationStats] = {}
+        self._windows: Deque[Dict[str, Any]] = deque(maxlen=int(config.get("max_windows", 60)))
 
         # Current loop tracking
         self._current_loop_id: Optional[str] = None
@@ -334,6 +458,9 @@ class AgentProfiler:
                 loop_number=self._loop_counter,
                 start_time=time.time(),
             )
+            # Unfinished loops are evicted too, so a crashed loop cannot pin memory
+            while len(self._loops) > self._max_loops:
+                self._loops.popitem(last=False)
 
         return loop_id
 
@@ -352,7 +479,9 @@ class AgentProfiler:
             return
 
         with self._write_lock:
-            self._loops[loop_id].end_time = time.time()
+            loop = self._loops[loop_id]
+            loop.end_time = time.time()
+            self._loop_duration_stats.add_duration(loop.duration_ms)
             if self._current_loop_id == loop_id:
                 self._current_loop_id = None
 
@@ -385,6 +514,10 @@ class AgentProfiler:
         """
         Record a profiling entry.
 
+        Aggregate statistics are updated for every call. Only a
+        ``sample_rate`` fraction of calls also capture CPU/memory usage and
+        keep a raw :class:`ProfileRecord`.
+
         Args:
             name: Name of the operation.
             duration_ms: Duration in milliseconds.
@@ -397,29 +530,32 @@ class AgentProfiler:
         if isinstance(category, OperationCategory):
             category = category.value
 
-        # Get resource usage
-        try:
-            process = psutil.Process()
-            cpu_percent = process.cpu_percent(interval=None)
-            memory_mb = process.memory_info().rss / 1e6
-        except Exception:
-            cpu_percent = None
-            memory_mb = None
-
-        record = ProfileRecord(
-            timestamp=time.time(),
-            name=name,
-            category=category,
-            duration_ms=round(duration_ms, 3),
-            loop_id=self._current_loop_id,
-            loop_number=self._loop_counter if self._current_loop_id else None,
-            cpu_percent=cpu_percent,
-            memory_mb=round(memory_mb, 3) if memory_mb else None,
-            meta=meta or {},
-        )
+        now = time.time()
+        sampled = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+        record = None
+        if sampled:
+            cpu_percent, memory_mb = self._resource_usage()
+            record = ProfileRecord(
+                timestamp=now,
+                name=name,
+                category=category,
+                duration_ms=round(duration_ms, 3),
+                loop_id=self._current_loop_id,
+                loop_number=self._loop_counter if self._current_loop_id else None,
+                cpu_percent=cpu_percent,
+                memory_mb=round(memory_mb, 3) if memory_mb else None,
+                meta=meta or {},
+            )
 
+        closed_window = None
         with self._write_lock:
-            self._records.append(record)
+            if self._window_seconds > 0 and now - self._window_start >= self._window_seconds:
+                closed_window = self._rotate_window(now)
+
+            if record is not None:
+                self._records.append(record)
+            self._record_count += 1
             self._has_data = True  # Mark that we have data to save
 
             # Update operation stats
@@ -432,9 +568,53 @@ class AgentProfiler:
                 self._category_stats[category] = OperationStats(name=category, category=category)
             self._category_stats[category].add_duration(duration_ms)
 
+            # Update the current rolling window
+            if self._window_seconds > 0:
+                if name not in self._window_stats:
+                    self._window_stats[name] = OperationStats(name=name, category=category)
+                self._window_stats[name].add_duration(duration_ms)
+
             # Add to current loop if active
             if self._current_loop_id and self._current_loop_id in self._loops:
-                self._loops[self._current_loop_id].add_operation(record)
+                self._loops[self._current_loop_id].add_operation(category, duration_ms)
+
+        if closed_window is not None:
+            self._emit_window(closed_window)
+
+    def _resource_usage(self) -> tuple:
+        """Return (cpu_percent, memory_mb) from the cached process handle."""
+        if self._process is None:
+            return None, None
+        try:
+            return self._process.cpu_percent(interval=None), self._process.memory_info().rss / 1e6
+        except Exception:
+            return None, None
+
+    def _rotate_window(self, now: float) -> Dict[str, Any]:
+        """Close the current window and start a new one. Caller holds the lock."""
+        window = {
+            "start": self._window_start,
+            "end": now,
+            "operation_stats": {k: v.to_dict() for k, v in self._window_stats.items()},
+        }
+        self._windows.append(window)
+        self._window_stats = {}
+        self._window_start = now
+        return window
+
+    def _emit_window(self, window: Dict[str, Any]) -> None:
+        """Append a closed window summary to the session's JSONL log, if enabled."""
+        if not self._window_log:
+            return
+        try:
+            with open(self.window_log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(window) + "\n")
+        except Exception:
+            pass  # Silently fail, like auto-save
+
+    def get_window_stats(self) -> List[Dict[str, Any]]:
+        """Get summaries of the most recent closed rolling windows (oldest first)."""
+        return list(self._windows)
 
     # =========================================================================
     # Reporting
@@ -484,21 +664,23 @@ class AgentProfiler:
         lines.append(f"Session ID: {self.session_id}")
         lines.append(f"Generated at: {datetime.now().isoformat()}")
         lines.append(f"Total duration: {(time.time() - self._session_start) * 1000:.1f}ms")
-        lines.append(f"Total operations recorded: {len(self._records)}")
-        lines.append(f"Agent loops completed: {len(self.get_loop_stats())}")
+        lines.append(f"Total operations recorded: {self._record_count}")
+        lines.append(f"Agent loops completed: {self._loop_duration_stats.count}")
+        if self.sample_rate < 1.0:
+            lines.append(f"Resource sampling rate: {self.sample_rate:.2%}")
         lines.append("")
 
         # Category summary
         lines.append("-" * 80)
         lines.append("TIME BY CATEGORY")
         lines.append("-" * 80)
-        lines.append(f"{'Category':<25} {'Count':>8} {'Total (ms)':>12} {'Avg (ms)':>10} {'Min (ms)':>10} {'Max (ms)':>10}")
+        lines.append(f"{'Category':<25} {'Count':>8} {'Total (ms)':>12} {'Avg (ms)':>10} {'p95 (ms)':>10} {'Max (ms)':>10}")
         lines.append("-" * 80)
 
         for cat_name, cat_stats in sorted(self._category_stats.items(), key=lambda x: x[1].total_ms, reverse=True):
             lines.append(
                 f"{cat_name:<25} {cat_stats.count:>8} {cat_stats.total_ms:>12.1f} "
-                f"{cat_stats.avg_ms:>10.1f} {cat_stats.min_ms if cat_stats.min_ms != float('inf') else 0:>10.1f} {cat_stats.max_ms:>10.1f}"
+                f"{cat_stats.avg_ms:>10.1f} {cat_stats.p95_ms:>10.1f} {cat_stats.max_ms:>10.1f}"
             )
         lines.append("")
 
@@ -540,12 +722,14 @@ class AgentProfiler:
             lines.append("-" * 80)
 
             loop_durations = [l.duration_ms for l in loop_stats]
-            lines.append(f"Total loops: {len(loop_stats)}")
-            lines.append(f"Average loop duration: {statistics.mean(loop_durations):.1f}ms")
-            lines.append(f"Min loop duration: {min(loop_durations):.1f}ms")
-            lines.append(f"Max loop duration: {max(loop_durations):.1f}ms")
-            if len(loop_durations) > 1:
-                lines.append(f"Std dev: {statistics.stdev(loop_durations):.1f}ms")
+            all_loops = self._loop_duration_stats
+            lines.append(f"Total loops: {all_loops.count}")
+            lines.append(f"Average loop duration: {all_loops.avg_ms:.1f}ms")
+            lines.append(f"Min loop duration: {all_loops.min_ms:.1f}ms")
+            lines.append(f"Max loop duration: {all_loops.max_ms:.1f}ms")
+            lines.append(f"p50/p95/p99: {all_loops.median_ms:.1f}/{all_loops.p95_ms:.1f}/{all_loops.p99_ms:.1f}ms")
+            if all_loops.count > 1:
+                lines.append(f"Std dev: {all_loops.std_dev_ms:.1f}ms")
             lines.append("")
 
             # Show individual loop breakdown (last 10 loops)
@@ -559,7 +743,7 @@ class AgentProfiler:
                     f"{k}: {v:.0f}ms" for k, v in sorted(loop.get_breakdown().items(), key=lambda x: x[1], reverse=True)[:4]
                 )
                 lines.append(
-                    f"{loop.loop_number:<8} {loop.duration_ms:>14.1f} {len(loop.operations):>12} {breakdown_str}"
+                    f"{loop.loop_number:<8} {loop.duration_ms:>14.1f} {loop.operation_count:>12} {breakdown_str}"
                 )
             lines.append("")
 
@@ -577,20 +761,37 @@ class AgentProfiler:
                     lines.append(f"    First half avg: {avg_first:.1f}ms, Second half avg: {avg_second:.1f}ms")
                     lines.append("")
 
+        # Rolling windows
+        if self._windows:
+            lines.append("-" * 80)
+            lines.append(f"RECENT {self._window_seconds:.0f}s WINDOWS (last 10)")
+            lines.append("-" * 80)
+            lines.append(f"{'Window end':<20} {'Ops':>8} {'Total (ms)':>12} {'Slowest operation (p95 ms)'}")
+            lines.append("-" * 80)
+            for window in list(self._windows)[-10:]:
+                ops = window["operation_stats"].values()
+                total_ms = sum(op["total_ms"] for op in ops)
+                count = sum(op["count"] for op in ops)
+                slowest = max(ops, key=lambda op: op["p95_ms"], default=None)
+                slowest_str = f"{slowest['name'][:30]} ({slowest['p95_ms']:.1f})" if slowest else "-"
+                end_str = datetime.fromtimestamp(window["end"]).strftime("%Y-%m-%d %H:%M:%S")
+                lines.append(f"{end_str:<20} {count:>8} {total_ms:>12.1f} {slowest_str}")
+            lines.append("")
+
         # All operations detail
         lines.append("-" * 80)
         lines.append("ALL OPERATIONS DETAIL")
         lines.append("-" * 80)
-        lines.append(f"{'Operation':<45} {'Cat':<12} {'Count':>6} {'Avg':>8} {'Min':>8} {'Max':>8} {'Total':>10}")
+        lines.append(f"{'Operation':<37} {'Cat':<12} {'Count':>6} {'Avg':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'Max':>8} {'Total':>10}")
         lines.append("-" * 80)
 
         for stat in sorted(self._stats.values(), key=lambda x: x.total_ms, reverse=True):
-            op_name = stat.name[:43] + ".." if len(stat.name) > 45 else stat.name
+            op_name = stat.name[:35] + ".." if len(stat.name) > 37 else stat.name
             cat_short = stat.category[:10] + ".." if len(stat.category) > 12 else stat.category
-            min_val = stat.min_ms if stat.min_ms != float('inf') else 0
             lines.append(
-                f"{op_name:<45} {cat_short:<12} {stat.count:>6} {stat.avg_ms:>8.1f} "
-                f"{min_val:>8.1f} {stat.max_ms:>8.1f} {stat.total_ms:>10.1f}"
+                f"{op_name:<37} {cat_short:<12} {stat.count:>6} {stat.avg_ms:>8.1f} "
+                f"{stat.median_ms:>8.1f} {stat.p95_ms:>8.1f} {stat.p99_ms:>8.1f} "
+                f"{stat.max_ms:>8.1f} {stat.total_ms:>10.1f}"
             )
 
         lines.append("")
@@ -637,6 +838,9 @@ class AgentProfiler:
             "operation_stats": {k: v.to_dict() for k, v in self._stats.items()},
             "category_stats": {k: v.to_dict() for k, v in self._category_stats.items()},
             "loop_stats": [l.to_dict() for l in self.get_loop_stats()],
+            "window_stats": self.get_window_stats(),
+            "total_records": self._record_count,
+            "sample_rate": self.sample_rate,
             "records": [r.to_dict() for r in self._records],
         }
 
@@ -652,9 +856,14 @@ class AgentProfiler:
         """Clear all recorded data."""
         with self._write_lock:
             self._records.clear()
+            self._record_count = 0
             self._stats.clear()
             self._category_stats.clear()
             self._loops.clear()
+            self._loop_duration_stats = OperationStats(name="loop", category=OperationCategory.AGENT_LOOP.value)
+            self._window_stats = {}
+            self._windows.clear()
+            self._window_start = time.time()
             self._current_loop_id = None
             self._loop_counter = 0
             self._session_start = time.time()
@@ -855,6 +1064,22 @@ def set_auto_save_interval(interval: int) -> None:
     _save_profiler_config(config)
 
 
+def set_sample_rate(rate: float) -> None:
+    """
+    Set the fraction of profiled calls that capture resource usage and a raw record.
+
+    Aggregate statistics still count every call.
+
+    Args:
+        rate: Value between 0.0 and 1.0 (1.0 = every call).
+    """
+    rate = min(max(float(rate), 0.0), 1.0)
+    profiler.sample_rate = rate
+    config = _load_profiler_config()
+    config["sample_rate"] = rate
+    _save_profiler_config(config)
+
+
 def print_profile_report() -> None:
     """Print the profiling report to stdout."""
     profiler.print_report()
@@ -879,7 +1104,8 @@ def get_profiler_config() -> Dict[str, Any]:
     Get the current profiler configuration.
 
     Returns:
-        Dict with keys: enabled, auto_save_interval, log_dir
+        Dict with keys: enabled, auto_save_interval, log_dir, sample_rate,
+        max_records, max_loops, window_seconds, max_windows, window_log
     """
     return _load_profiler_config()
 
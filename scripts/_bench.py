@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Shared setup for the bench_*.py scripts; import it before any project module.
+
+Puts the repository root on the import path and turns the profiler off for
+this process (and any helper processes it starts), so benchmark runs do not
+write profile reports under decorators/logs.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ["AGENT_PROFILER_ENABLED"] = "0"
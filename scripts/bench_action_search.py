@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark action search relevance and latency over the bundled actions.
+
+Loads the actions under core/data/action and runs a fixed set of
+hand-labelled queries (each with the action a user would expect) through:
+  - chroma:   the previous path, a Chroma query per lookup over the
+              "name + description" embeddings
+  - lexical:  the in-memory index without vectors (BM25 + trigrams)
+  - hybrid:   the in-memory index fusing lexical and vector rankings
+
+Reports recall@1/5/10, MRR and per-query latency. Query embeddings are
+computed once up front for the hybrid run (as the index's query cache would
+on repeated lookups); pass --cold-queries to include the model call.
+
+Usage:
+    python scripts/bench_action_search.py
+    python scripts/bench_action_search.py --model hash --repeat 50
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import _bench  # noqa: F401  (sets the import path, turns the profiler off)
+
+from core.action.action_framework.loader import load_actions_from_directories  # noqa: E402
+from core.action.action_index import ActionSearchIndex  # noqa: E402
+from core.config import EMBEDDING_MODEL  # noqa: E402
+from core.embedding_service import EmbeddingService, create_embedding_model  # noqa: E402
+
+# (query, expected action)
+QUERIES = [
+    ("email my manager the weekly report", "send_gmail"),
+    ("check my inbox for new mail", "list_gmail"),
+    ("post an update to the team slack channel", "send_slack_message"),
+    ("find messages in slack mentioning the release", "search_slack_messages"),
+    ("schedule a zoom call for tomorrow at 3pm", "create_zoom_meeting"),
+    ("cancel the zoom meeting", "delete_zoom_meeting"),
+    ("am I free on thursday afternoon", "check_calendar_availability"),
+    ("set up a google meet with the client", "create_google_meet"),
+    ("save this text to notes.txt", "write_file"),
+    ("open config.yaml and show me what is in it", "read_file"),
+    ("replace the old function name in main.py", "stream_edit"),
+    ("what files are in the downloads directory", "list_folder"),
+    ("locate every csv file under my projects", "find_files"),
+    ("search the text file for the word invoice", "grep_files"),
+    ("look up the latest news about electric cars", "web_search"),
+    ("download the contents of this webpage", "web_fetch"),
+    ("call the REST api with a POST request", "http_request"),
+    ("run ls -la in the terminal", "run_shell"),
+    ("execute this python snippet", "run_python"),
+    ("turn my markdown notes into a pdf", "create_pdf"),
+    ("extract the text from the pdf contract", "read_pdf"),
+    ("what is in this screenshot", "describe_image"),
+    ("draw a picture of a cat in space", "generate_image"),
+    ("copy this to the clipboard", "clipboard_write"),
+    ("paste what I copied", "clipboard_read"),
+    ("click the submit button at 200 300", "mouse_click"),
+    ("press ctrl+s to save", "keyboard_hotkey"),
+    ("type hello world", "keyboard_type"),
+    ("scroll down the page", "scroll"),
+    ("maximize the chrome window", "window_control"),
+    ("launch the browser on github.com", "open_browser"),
+    ("message the group on telegram", "send_telegram_message"),
+    ("send a whatsapp text to mom", "send_whatsapp_web_text_message"),
+    ("dm alice on discord", "send_discord_dm"),
+    ("write a linkedin post about our launch", "create_linkedin_post"),
+    ("find software engineer jobs in berlin on linkedin", "search_linkedin_jobs"),
+    ("add a paragraph to the notion page", "append_notion_page_content"),
+    ("create a new folder in google drive", "create_drive_folder"),
+    ("get the transcript of the meeting recording bot", "get_recall_transcript"),
+    ("what do you remember about my preferences", "memory_search"),
+    ("pause for five seconds", "wait"),
+    ("the task is done, wrap it up", "task_end"),
+    ("update my todo list", "task_update_todos"),
+    ("switch to gui mode", "set_mode"),
+    ("enable more action sets for web research", "add_action_sets"),
+]
+
+
+def build_chroma(index: ActionSearchIndex, path: str):
+    import chromadb
+
+    client = chromadb.PersistentClient(path=path)
+    collection = client.get_or_create_collection("bench_actions")
+    index._ensure_current()
+    collection.add(ids=list(index._names), documents=list(index._documents), embeddings=index._action_vectors())
+    return collection
+
+
+def evaluate(label: str, search, args) -> None:
+    ranks = []
+    latencies = []
+    for query, expected in QUERIES:
+        results = search(query)
+        ranks.append(results.index(expected) + 1 if expected in results else None)
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            search(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    def recall(k: int) -> float:
+        return sum(1 for rank in ranks if rank is not None and rank <= k) / len(ranks)
+
+    mrr = sum(1.0 / rank for rank in ranks if rank) / len(ranks)
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"  {label:<8} R@1 {recall(1):5.2f}  R@5 {recall(5):5.2f}  R@10 {recall(10):5.2f}  MRR {mrr:5.3f}  "
+        f"p50 {statistics.median(latencies):7.3f} ms  p95 {p95:7.3f} ms"
+    )
+    if args.verbose:
+        for (query, expected), rank in zip(QUERIES, ranks):
+            if rank != 1:
+                print(f"      {expected:<32} rank {rank}  <- {query!r}")
+
+
+def main(args) -> None:
+    load_actions_from_directories(paths_to_scan=[str(Path(__file__).resolve().parent.parent / "core" / "data" / "action")])
+    service = EmbeddingService(create_embedding_model(args.model), None)
+    index = ActionSearchIndex(service)
+
+    start = time.perf_counter()
+    index._ensure_current()
+    build_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    index._action_vectors()
+    vector_ms = (time.perf_counter() - start) * 1000
+    print(
+        f"{len(index._names)} actions, {len(QUERIES)} queries, model {service.model_name}; "
+        f"lexical build {build_ms:.1f} ms, action vectors {vector_ms:.1f} ms\n"
+    )
+
+    if not args.cold_queries:
+        for query, _ in QUERIES:
+            index._query_vector(query)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        collection = build_chroma(index, tmp)
+
+        def chroma_search(query):
+            result = collection.query(query_embeddings=[service.embed_query(query)], n_results=args.top_k)
+            return result.get("ids", [[]])[0]
+
+        evaluate("chroma", chroma_search, args)
+        evaluate("lexical", lambda query: index.search(query, args.top_k, use_vectors=False), args)
+        evaluate("hybrid", lambda query: index.search(query, args.top_k), args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark action search relevance and latency")
+    parser.add_argument("--model", default=EMBEDDING_MODEL, help="Embedding model spec (e.g. chroma-default, hash:256)")
+    parser.add_argument("--top-k", type=int, default=10, help="Results per query")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--cold-queries", action="store_true", help="Do not pre-embed the queries for the hybrid run")
+    parser.add_argument("--verbose", action="store_true", help="List queries whose expected action is not ranked first")
+    main(parser.parse_args())
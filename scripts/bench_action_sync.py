@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark DatabaseInterface startup with a large action catalogue.
+
+Writes ``--actions`` synthetic action modules into a temporary data
+directory and constructs a DatabaseInterface over it several times:
+  - cold:    empty Chroma stores
+  - warm:    nothing changed since the previous start
+  - edited:  ``--edited`` actions changed their description, one removed
+
+Each scenario runs with the manifest diff sync and with the previous
+behaviour (delete every id, re-add every document). Embeddings come from
+the deterministic hash model without a vector cache, so the "embedded"
+column counts every document the sync sent to the model.
+
+Usage:
+    python scripts/bench_action_sync.py
+    python scripts/bench_action_sync.py --actions 1000 --edited 10
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import _bench  # noqa: F401  (sets the import path, turns the profiler off)
+
+from core.action.action_framework.registry import registry_instance  # noqa: E402
+from core.database_interface import ChromaSyncReport, DatabaseInterface  # noqa: E402
+from core.embedding_service import EmbeddingService, HashEmbeddingModel  # noqa: E402
+
+ACTION_TEMPLATE = '''from core.action.action_framework.registry import action
+
+
+@action(
+    name="synthetic_action_{index}",
+    description="{description}",
+    input_schema={{"path": {{"type": "string", "description": "Target path"}}}},
+    action_sets=["synthetic"],
+)
+def synthetic_action_{index}(input_data: dict) -> dict:
+    return {{"status": "success", "index": {index}}}
+'''
+
+
+class FullRebuildDatabaseInterface(DatabaseInterface):
+    """The previous sync: drop every stored id and re-add the whole catalogue."""
+
+    def _sync_collection(self, collection, label, entries, *, dry_run=False):
+        existing = collection.get() or {}
+        if existing.get("ids"):
+            collection.delete(ids=list(existing["ids"]))
+        report = ChromaSyncReport(collection=label, added=list(entries))
+        if entries:
+            documents = [document for document, _ in entries.values()]
+            collection.add(
+                ids=list(entries),
+                documents=documents,
+                embeddings=self.embedding_service.embed(documents),
+            )
+        return report
+
+
+def write_actions(action_dir: Path, count: int, edited: int = 0) -> None:
+    # When editing, only touch the edited files so the rest keep their bytecode
+    for index in range(edited or count):
+        description = f"Synthetic action {index}" + (" (revised)" if index < edited else "")
+        (action_dir / f"synthetic_action_{index}.py").write_text(
+            ACTION_TEMPLATE.format(index=index, description=description), encoding="utf-8"
+        )
+
+
+def start(cls, data_dir: Path, chroma_path: Path):
+    registry_instance._registry.clear()  # a fresh process starts with an empty registry
+    service = EmbeddingService(HashEmbeddingModel(), None)
+    began = time.perf_counter()
+    cls(data_dir=str(data_dir), chroma_path=str(chroma_path), embedding_service=service)
+    return time.perf_counter() - began, service.get_stats()["embedded"]
+
+
+def run(label: str, cls, root: Path, args) -> None:
+    data_dir = root / label / "data"
+    action_dir = data_dir / "action"
+    action_dir.mkdir(parents=True)
+    chroma_path = root / label / "chroma"
+
+    write_actions(action_dir, args.actions)
+    print(f"[{label}]")
+    for scenario in ("cold", "warm", "edited"):
+        if scenario == "edited":
+            write_actions(action_dir, args.actions, edited=args.edited)
+            (action_dir / f"synthetic_action_{args.actions - 1}.py").unlink()
+        elapsed, embedded = start(cls, data_dir, chroma_path)
+        print(f"  {scenario:<7} {elapsed * 1000:9.1f} ms  ({embedded} embedded)")
+    print()
+
+
+def main(args) -> None:
+    root = Path(tempfile.mkdtemp(prefix="bench_action_sync_"))
+    cwd = os.getcwd()
+    # The loader also scans core/data/action relative to the working directory
+    os.chdir(root)
+    try:
+        print(f"{args.actions} synthetic actions, {args.edited} edited\n")
+        run("diff sync", DatabaseInterface, root, args)
+        run("full rebuild", FullRebuildDatabaseInterface, root, args)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark incremental Chroma action sync at startup")
+    parser.add_argument("--actions", type=int, default=1000, help="Synthetic actions in the catalogue")
+    parser.add_argument("--edited", type=int, default=10, help="Actions edited before the last start")
+    main(parser.parse_args())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark the embedding service's cache and request batching.
+
+Uses the deterministic hash model wrapped with a fixed per-call latency
+(``--call-latency`` ms) and per-text cost (``--text-latency`` ms) to stand
+in for a real model, then measures:
+  - cold sync: embedding ``--docs`` documents into an empty on-disk cache
+  - warm sync: the same documents again from a fresh service (a restart)
+  - concurrent requests: ``--threads`` callers embedding one text each,
+    batched vs. with batching disabled (batch_size=1)
+
+Usage:
+    python scripts/bench_embedding_service.py
+    python scripts/bench_embedding_service.py --docs 1000 --threads 64 --call-latency 50
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import _bench  # noqa: F401  (sets the import path, turns the profiler off)
+
+from core.embedding_service import EmbeddingCache, EmbeddingService, HashEmbeddingModel  # noqa: E402
+
+
+class SlowHashModel(HashEmbeddingModel):
+    """
+    Hash model that sleeps like a real one: a fixed cost per call plus a cost
+    per text. Calls are serialised, as they are on a local ONNX model.
+    """
+
+    def __init__(self, call_latency_s: float, text_latency_s: float) -> None:
+        super().__init__(dim=384)
+        self.call_latency_s = call_latency_s
+        self.text_latency_s = text_latency_s
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def embed_batch(self, texts):
+        with self._lock:
+            self.calls += 1
+            time.sleep(self.call_latency_s + self.text_latency_s * len(texts))
+        return super().embed_batch(texts)
+
+
+def make_documents(count: int):
+    return [f"action_{i}\n\nPerform operation number {i} on the user's files and report the result" for i in range(count)]
+
+
+def run_sync(label: str, cache_path: Path, docs, args) -> None:
+    model = SlowHashModel(args.call_latency / 1000.0, args.text_latency / 1000.0)
+    service = EmbeddingService(model, EmbeddingCache(cache_path), batch_size=args.batch_size)
+    start = time.perf_counter()
+    service.embed(docs)
+    elapsed = time.perf_counter() - start
+    stats = service.get_stats()
+    print(
+        f"  {label:<6} {elapsed * 1000:9.1f} ms  "
+        f"({model.calls} model calls, {stats['embedded']} embedded, {stats['cache_hits']} from cache)"
+    )
+
+
+def run_concurrent(label: str, batch_size: int, args) -> None:
+    model = SlowHashModel(args.call_latency / 1000.0, args.text_latency / 1000.0)
+    service = EmbeddingService(model, None, batch_size=batch_size, max_wait_ms=args.max_wait)
+
+    def worker(i: int) -> None:
+        service.embed([f"concurrent request {i}"])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<10} {elapsed * 1000:9.1f} ms  ({model.calls} model calls)")
+
+
+def main(args) -> None:
+    docs = make_documents(args.docs)
+    print(
+        f"{args.docs} documents, batch size {args.batch_size}, "
+        f"model latency {args.call_latency:.0f} ms/call + {args.text_latency:.1f} ms/text\n"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / "embeddings.db"
+        print("[sync]")
+        run_sync("cold", cache_path, docs, args)
+        run_sync("warm", cache_path, docs, args)
+
+    print(f"\n[{args.threads} concurrent single-text requests, max wait {args.max_wait:.0f} ms]")
+    run_concurrent("batched", args.batch_size, args)
+    run_concurrent("unbatched", 1, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the embedding service cache and batching")
+    parser.add_argument("--docs", type=int, default=1000, help="Documents to sync")
+    parser.add_argument("--batch-size", type=int, default=64, help="Texts per model call")
+    parser.add_argument("--max-wait", type=float, default=10.0, help="Batch wait limit in ms")
+    parser.add_argument("--threads", type=int, default=32, help="Concurrent callers")
+    parser.add_argument("--call-latency", type=float, default=30.0, help="Simulated model latency per call in ms")
+    parser.add_argument("--text-latency", type=float, default=0.5, help="Simulated model latency per text in ms")
+    main(parser.parse_args())
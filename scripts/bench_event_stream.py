@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for EventStream logging.
+
+Logs N events and, like StateManager.bump_event_stream(), takes a prompt
+snapshot after each one. Reports the per-event cost and compares it with
+rebuilding the snapshot from every tail event (the pre-incremental approach).
+
+Usage:
+    python scripts/bench_event_stream.py
+    python scripts/bench_event_stream.py --events 20000
+"""
+
+import argparse
+import time
+
+import _bench  # noqa: F401  (sets the import path, turns the profiler off)
+
+from core.event_stream.event_stream import EventStream  # noqa: E402
+
+
+def full_rebuild(stream: EventStream) -> str:
+    """Snapshot built the old way: re-render and join every tail event."""
+    lines = []
+    if stream.head_summary:
+        lines.append("Summary of folded event stream: \n" + stream.head_summary)
+    if stream.tail_events:
+        lines.append("Recent Event: ")
+        lines.extend(r.compact_line() for r in stream.tail_events)
+    return "\n".join(lines) if lines else "(no events)"
+
+
+def run(events: int) -> None:
+    # Thresholds high enough that neither summarization nor the tail cap kicks in.
+    stream = EventStream(llm=None, summarize_at_tokens=10**12, max_tail_events=events + 1)
+    messages = [f"step {i}: executed action with a short result payload" for i in range(events)]
+
+    log_s = snap_s = 0.0
+    for i, message in enumerate(messages):
+        t0 = time.perf_counter()
+        stream.log("action_end", message)
+        t1 = time.perf_counter()
+        stream.to_prompt_snapshot()
+        log_s += t1 - t0
+        snap_s += time.perf_counter() - t1
+
+    assert stream.to_prompt_snapshot() == full_rebuild(stream), "incremental snapshot diverged"
+
+    # Old approach: rebuild from scratch after each event (sampled to keep runtime sane).
+    samples = list(range(0, events, max(events // 200, 1)))
+    rebuild_s = 0.0
+    for n in samples:
+        partial = EventStream(llm=None, summarize_at_tokens=10**12, max_tail_events=events + 1)
+        partial.tail_events.extend(list(stream.tail_events)[: n + 1])
+        t0 = time.perf_counter()
+        full_rebuild(partial)
+        rebuild_s += time.perf_counter() - t0
+    rebuild_per_event = rebuild_s / len(samples)
+
+    print(f"events logged:            {events}")
+    print(f"tail tokens:              {stream.get_token_count()}")
+    print(f"log() per event:          {log_s / events * 1e6:8.1f} us")
+    print(f"snapshot per event:       {snap_s / events * 1e6:8.1f} us (incremental)")
+    print(f"snapshot per event:       {rebuild_per_event * 1e6:8.1f} us (full rebuild, avg)")
+    print(f"total log+snapshot:       {(log_s + snap_s):8.3f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark EventStream log + snapshot cost")
+    parser.add_argument("--events", type=int, default=10_000)
+    args = parser.parse_args()
+    run(args.events)
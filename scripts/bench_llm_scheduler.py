@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Exercise the LLM request scheduler against a local fault-injecting server.
+
+Starts an OpenAI-compatible /chat/completions server on localhost that
+fails a share of requests (429 with Retry-After, 503, dropped connections)
+and enforces its own requests/minute limit, then sends a burst of
+concurrent streamed requests through:
+  - direct:    no scheduler, every failure surfaces to the caller
+  - scheduled: core.llm.scheduler with retries, buckets and priority lanes
+
+Half of the burst is background work queued first, the other half
+interactive; with a requests/minute limit the interactive lane should
+finish well ahead of the background one.
+
+Usage:
+    python scripts/bench_llm_scheduler.py
+    python scripts/bench_llm_scheduler.py --requests 60 --fault-rate 0.3 --rpm 300
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import _bench  # noqa: F401  (sets the import path, turns the profiler off)
+
+from core.llm.scheduler import (  # noqa: E402
+    RequestPriority,
+    RequestScheduler,
+    SchedulerConfig,
+    request_priority,
+)
+from core.llm.streaming import LLMUsage, get_http_client, stream_openai_compatible  # noqa: E402
+
+
+def make_handler(fault_rate: float, server_rpm: float, rng: random.Random):
+    lock = threading.Lock()
+    recent = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, body: bytes, headers=()):
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            now = time.monotonic()
+            with lock:
+                while recent and recent[0] < now - 60:
+                    recent.pop(0)
+                over_limit = server_rpm and len(recent) >= server_rpm
+                if not over_limit:
+                    recent.append(now)
+                roll = rng.random()
+            if over_limit:
+                self._reply(429, b'{"error": "rate limited"}', [("Retry-After", "1")])
+                return
+            if roll < fault_rate / 3:
+                self._reply(429, b'{"error": "rate limited"}', [("Retry-After", "0.5")])
+                return
+            if roll < fault_rate * 2 / 3:
+                self._reply(503, b'{"error": "overloaded"}')
+                return
+            if roll < fault_rate:
+                self.close_connection = True
+                self.connection.shutdown(2)
+                return
+            time.sleep(0.02)
+            events = [
+                {"choices": [{"delta": {"content": '{"ok": true}'}}]},
+                {"choices": [], "usage": {"prompt_tokens": 40, "completion_tokens": 5, "total_tokens": 45}},
+            ]
+            body = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+            self._reply(200, body.encode(), [("Content-Type", "text/event-stream")])
+
+    return Handler
+
+
+async def run(label: str, url: str, args, scheduler=None) -> None:
+    client = get_http_client("bench")
+    payload = {"model": "mock", "messages": [{"role": "user", "content": "hi"}]}
+    results = {RequestPriority.INTERACTIVE: [], RequestPriority.BACKGROUND: []}
+    failures = 0
+    started = time.perf_counter()
+
+    async def one(priority: RequestPriority, delay: float) -> None:
+        nonlocal failures
+        await asyncio.sleep(delay)
+        with request_priority(priority):
+            begin = time.perf_counter()
+            try:
+                factory = lambda: stream_openai_compatible(client, url, payload, {})  # noqa: E731
+                source = scheduler.stream(factory, tokens=50) if scheduler else factory()
+                async for item in source:
+                    if isinstance(item, LLMUsage):
+                        pass
+                results[priority].append(time.perf_counter() - begin)
+            except Exception:
+                failures += 1
+
+    half = args.requests // 2
+    # Background work is queued first; interactive requests arrive just after
+    jobs = [one(RequestPriority.BACKGROUND, 0.0) for _ in range(half)]
+    jobs += [one(RequestPriority.INTERACTIVE, 0.05) for _ in range(args.requests - half)]
+    await asyncio.gather(*jobs)
+    total = time.perf_counter() - started
+
+    print(f"  {label:<9} ok {args.requests - failures:3d}/{args.requests}  wall {total:6.2f}s")
+    for priority, latencies in results.items():
+        if latencies:
+            print(
+                f"            {priority.name.lower():<11} p50 {statistics.median(latencies):6.2f}s  "
+                f"max {max(latencies):6.2f}s"
+            )
+    if scheduler:
+        print(f"            {scheduler.get_stats()}")
+
+
+def main(args) -> None:
+    handler = make_handler(args.fault_rate, args.server_rpm, random.Random(args.seed))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/chat/completions"
+    print(
+        f"{args.requests} requests, fault rate {args.fault_rate:.0%}, "
+        f"server limit {args.server_rpm or 'none'} rpm, scheduler limit {args.rpm or 'none'} rpm\n"
+    )
+
+    async def both():
+        await run("direct", url, args)
+        config = SchedulerConfig(requests_per_minute=args.rpm, max_retries=args.retries, base_delay=0.2, max_delay=5)
+        await run("scheduled", url, args, RequestScheduler("bench", config))
+
+    asyncio.run(both())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exercise the LLM request scheduler against a fault-injecting server")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per run (half background, half interactive)")
+    parser.add_argument("--fault-rate", type=float, default=0.25, help="Share of requests the server fails")
+    parser.add_argument("--server-rpm", type=float, default=0, help="Requests/minute the server accepts (0 = unlimited)")
+    parser.add_argument("--rpm", type=float, default=600, help="Scheduler requests/minute limit (0 = unlimited)")
+    parser.add_argument("--retries", type=int, default=6, help="Scheduler retries per request")
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
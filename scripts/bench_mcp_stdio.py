@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark MCP stdio throughput as request concurrency scales.
+
+Starts a local echo MCP server (a child Python process) whose ``echo`` tool
+sleeps for ``--delay`` ms before answering, then fires ``--requests`` tool
+calls through ``StdioTransport`` at each concurrency level.
+
+With pipelined requests, throughput should grow roughly linearly with
+concurrency until the server or the pipe becomes the bottleneck.
+
+Usage:
+    python scripts/bench_mcp_stdio.py
+    python scripts/bench_mcp_stdio.py --delay 50 --requests 400 --concurrency 1 4 16 64
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import List
+
+import _bench  # noqa: F401  (sets the import path, turns the profiler off)
+
+from core.mcp.mcp_server import StdioTransport  # noqa: E402
+
+# Minimal MCP server: answers every request on its own task so slow calls
+# overlap, and honours notifications/cancelled.
+ECHO_SERVER = r'''
+import asyncio, json, sys, threading
+
+DELAY = float(sys.argv[1]) / 1000.0
+tasks = {}
+
+def write(msg):
+    sys.stdout.write(json.dumps(msg) + "\n")
+    sys.stdout.flush()
+
+async def handle(req):
+    method, rid = req.get("method"), req.get("id")
+    try:
+        if method == "initialize":
+            result = {"protocolVersion": "2024-11-05", "capabilities": {"tools": {}},
+                      "serverInfo": {"name": "echo", "version": "1.0.0"}}
+        elif method == "tools/list":
+            result = {"tools": [{"name": "echo", "description": "Echo the input back",
+                                 "inputSchema": {"type": "object", "properties": {"text": {"type": "string"}}}}]}
+        elif method == "tools/call":
+            await asyncio.sleep(DELAY)
+            result = {"content": [{"type": "text", "text": req["params"]["arguments"].get("text", "")}]}
+        else:
+            write({"jsonrpc": "2.0", "id": rid, "error": {"code": -32601, "message": "Method not found"}})
+            return
+        write({"jsonrpc": "2.0", "id": rid, "result": result})
+    except asyncio.CancelledError:
+        pass
+    finally:
+        tasks.pop(rid, None)
+
+def dispatch(line):
+    req = json.loads(line)
+    if "id" in req:
+        tasks[req["id"]] = asyncio.ensure_future(handle(req))
+    elif req.get("method") == "notifications/cancelled":
+        task = tasks.pop(req["params"]["requestId"], None)
+        if task:
+            task.cancel()
+
+async def main():
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+
+    def pump():
+        for line in sys.stdin:
+            if line.strip():
+                loop.call_soon_threadsafe(dispatch, line)
+        loop.call_soon_threadsafe(done.set_result, None)
+
+    threading.Thread(target=pump, daemon=True).start()
+    await done
+
+asyncio.run(main())
+'''
+
+
+async def run_level(transport: StdioTransport, total: int, concurrency: int) -> float:
+    """Issue ``total`` tool calls with at most ``concurrency`` in flight. Returns calls/s."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            response = await transport.send_request(
+                "tools/call", {"name": "echo", "arguments": {"text": str(i)}}
+            )
+            text = response["result"]["content"][0]["text"]
+            assert text == str(i), f"response routed to the wrong request: {text} != {i}"
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def main(delay_ms: float, total: int, levels: List[int]) -> None:
+    transport = StdioTransport(sys.executable, ["-c", ECHO_SERVER, str(delay_ms)], {})
+    if not await transport.connect():
+        raise SystemExit("Could not start the echo MCP server")
+
+    try:
+        print(f"echo tool delay: {delay_ms:.0f} ms, {total} calls per level\n")
+        print(f"{'concurrency':>11}  {'calls/s':>10}  {'speedup':>8}")
+        baseline = None
+        for level in levels:
+            rate = await run_level(transport, total, level)
+            baseline = baseline or rate
+            print(f"{level:>11}  {rate:>10.1f}  {rate / baseline:>7.1f}x")
+
+        # Timeouts send notifications/cancelled and leave the transport usable.
+        timed_out = await transport.send_request(
+            "tools/call", {"name": "echo", "arguments": {"text": "late"}}, timeout=delay_ms / 4000.0
+        )
+        still_ok = await transport.send_request("tools/list", {})
+        print(f"\ntimeout -> {timed_out['error']['message']!r}; next request ok: {'result' in still_ok}")
+    finally:
+        await transport.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark MCP stdio request pipelining")
+    parser.add_argument("--delay", type=float, default=20.0, help="Echo tool latency in ms")
+    parser.add_argument("--requests", type=int, default=200, help="Tool calls per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+    asyncio.run(main(args.delay, args.requests, args.concurrency))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Replay recorded prompts through the prompt-prefix cache planner.
+
+Reads the prompts of a recorded agent run and replays them, in order and
+with their recorded spacing, through core.llm.cache.planner for each
+provider. Reports how many prompt tokens each provider's cache placement
+would serve from cache (the theoretical prefix-reuse rate), next to the
+upper bound: the longest prefix each prompt shares with any earlier one.
+
+Prompt sources:
+  - a cassette recorded with LLM_CASSETTE_MODE=record (lines with "request")
+  - a JSONL prompt log (lines with "entry_type": "prompt_log")
+  - --demo: a synthetic task trace with two alternating call types
+
+Usage:
+    python scripts/bench_prompt_cache_plan.py --demo
+    python scripts/bench_prompt_cache_plan.py llm_cassette.jsonl --providers anthropic openai
+"""
+
+import argparse
+import bisect
+import datetime
+import hashlib
+import json
+import random
+from collections import defaultdict
+from pathlib import Path
+
+import _bench  # noqa: F401  (sets the import path, turns the profiler off)
+
+from core.llm.cache.planner import (  # noqa: E402
+    PROVIDER_RULES,
+    CachePlanner,
+    common_prefix_length,
+    estimate_prompt_tokens,
+)
+
+
+def _timestamp(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def load_prompts(path: Path):
+    """(system, user, time) for every prompt in a cassette or prompt log."""
+    prompts = []
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            if "request" in data:
+                request = data["request"] or {}
+                prompts.append((request.get("system"), request.get("user") or "", _timestamp(data.get("at"))))
+            elif data.get("entry_type") == "prompt_log":
+                prompt_input = data.get("input") or {}
+                prompts.append((
+                    prompt_input.get("system_prompt"),
+                    prompt_input.get("user_prompt") or "",
+                    _timestamp(data.get("datetime")),
+                ))
+    return prompts
+
+
+def demo_prompts(args):
+    """A task trace: action selection and reasoning alternate, the event stream grows each step."""
+    rng = random.Random(args.seed)
+    words = "open file read write search result task step agent user reply check list update".split()
+
+    def text(n):
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    systems = {
+        "action_selection": "You select the next action.\n" + text(1200),
+        "reasoning": "You reason about the task.\n" + text(900),
+    }
+    prompts = []
+    clock = 0.0
+    for task in range(args.tasks):
+        header = f"<task>\nTask {task}: {text(60)}\n</task>\n<actions>\n{text(900)}\n</actions>\n"
+        events = []
+        for step in range(args.steps):
+            events.append(f"[event {step}] {text(rng.randint(20, 120))}")
+            stream = "<event_stream>\n" + "\n".join(events) + "\n</event_stream>\n"
+            for call_type in ("reasoning", "action_selection"):
+                prompts.append((systems[call_type], header + stream + f"<call>{call_type}</call>", clock))
+                clock += args.interval
+        clock += args.interval * 10
+    return prompts
+
+
+def ideal_reuse(prompts):
+    """Tokens of each prompt shared, as a prefix, with any earlier prompt (no TTLs, no placement rules)."""
+    seen = []
+    reused = 0
+    for system, user, _ in prompts:
+        full = (system or "") + "\x00" + user
+        index = bisect.bisect_left(seen, full)
+        best = 0
+        for neighbour in seen[max(0, index - 1): index + 1]:
+            best = max(best, common_prefix_length(neighbour, full))
+        reused += best // 4
+        seen.insert(index, full)
+    return reused
+
+
+def replay(provider, prompts, args):
+    planner = CachePlanner()
+    per_channel = defaultdict(lambda: [0, 0, 0])  # prompts, prompt tokens, expected cached tokens
+    total_tokens = expected = stable = 0
+    modes = defaultdict(int)
+    for position, (system, user, at) in enumerate(prompts):
+        now = at if at is not None else position * args.interval
+        plan = planner.plan(provider, system, user, call_type=args.call_type, now=now)
+        total_tokens += plan.prompt_tokens
+        expected += plan.expected_cached_tokens
+        if plan.cacheable:
+            stable += estimate_prompt_tokens(plan.system_prompt, plan.stable_user_prefix)
+        modes[plan.mode] += 1
+        channel = hashlib.sha256((system or "").encode("utf-8")).hexdigest()[:8]
+        row = per_channel[channel]
+        row[0] += 1
+        row[1] += plan.prompt_tokens
+        row[2] += plan.expected_cached_tokens
+    return total_tokens, expected, stable, dict(modes), per_channel
+
+
+def main(args) -> None:
+    if args.demo:
+        prompts = demo_prompts(args)
+        source = f"demo trace ({args.tasks} tasks x {args.steps} steps x 2 call types)"
+    elif args.path:
+        prompts = load_prompts(Path(args.path))
+        source = args.path
+    else:
+        raise SystemExit("Pass a cassette / prompt log path, or --demo")
+    if not prompts:
+        raise SystemExit(f"No prompts found in {source}")
+
+    total = sum(estimate_prompt_tokens(system, user) for system, user, _ in prompts)
+    ideal = ideal_reuse(prompts)
+    print(f"{len(prompts)} prompts from {source}, ~{total:,} prompt tokens")
+    print(f"  ideal prefix reuse (any earlier prompt): ~{ideal:,} tokens ({ideal / max(total, 1):.1%})\n")
+
+    for provider in args.providers:
+        total_tokens, expected, stable, modes, per_channel = replay(provider, prompts, args)
+        print(
+            f"  {provider:<9} planned cache reads ~{expected:,} tokens ({expected / max(total_tokens, 1):.1%})  "
+            f"stable prefix ~{stable:,} ({stable / max(total_tokens, 1):.1%})  modes {modes}"
+        )
+        if args.channels:
+            for channel, (count, tokens, cached) in sorted(per_channel.items(), key=lambda item: -item[1][1]):
+                print(f"            system {channel}: {count:4d} prompts  {cached / max(tokens, 1):6.1%} cached")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded prompts through the prompt-prefix cache planner")
+    parser.add_argument("path", nargs="?", help="Cassette or JSONL prompt log")
+    parser.add_argument("--demo", action="store_true", help="Replay a synthetic task trace instead")
+    parser.add_argument("--providers", nargs="+", default=sorted(PROVIDER_RULES), choices=sorted(PROVIDER_RULES))
+    parser.add_argument("--call-type", default=None, help="Plan every prompt with this call type")
+    parser.add_argument("--interval", type=float, default=15.0, help="Seconds between prompts without a recorded time")
+    parser.add_argument("--channels", action="store_true", help="Break results down per system prompt")
+    parser.add_argument("--tasks", type=int, default=4, help="Demo: tasks in the trace")
+    parser.add_argument("--steps", type=int, default=12, help="Demo: steps per task")
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark TriggerQueue put/get throughput with a large backlog.
+
+Queues ``--queued`` task triggers (scheduled in the future), then measures:
+  - put(): a mix of user chats, task follow-ups and duplicate triggers
+  - get(): draining the whole queue once every trigger is due
+
+Each put mode is run twice: with the deterministic coalescer, and with a
+coalescer that defers every decision to the LLM (the previous behaviour,
+where each non-system put() made a model call). The stub LLM sleeps
+``--llm-latency`` ms per call to stand in for model latency.
+
+Usage:
+    python scripts/bench_trigger_queue.py
+    python scripts/bench_trigger_queue.py --queued 1000 --puts 1000 --llm-latency 300
+"""
+
+import argparse
+import asyncio
+import time
+
+import _bench  # noqa: F401  (sets the import path, turns the profiler off)
+
+from core.trigger import Trigger, TriggerCoalescer, TriggerQueue  # noqa: E402
+
+
+class StubLLM:
+    """Stands in for LLMInterface: answers "chat" after a fixed delay."""
+
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+        self.calls = 0
+
+    async def generate_response_async(self, system_prompt: str, user_prompt: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency_s)
+        return "chat"
+
+
+class AlwaysAskCoalescer(TriggerCoalescer):
+    """Legacy behaviour: every non-system trigger is ambiguous when the queue is non-empty."""
+
+    def resolve_session(self, trig, queued, skip_merge=False):
+        if skip_merge or self.is_system_trigger(trig) or not queued:
+            return trig.session_id, "explicit"
+        return None, "ambiguous"
+
+
+def make_workload(queued: int, puts: int):
+    far = time.time() + 3600
+    backlog = [
+        Trigger(
+            fire_at=far + i,
+            priority=5,
+            next_action_description="Perform the next best action for the task based on the todos and event stream",
+            session_id=f"task_{i}",
+            payload={"gui_mode": False, "wait_for_user_reply": i == 0},
+        )
+        for i in range(queued)
+    ]
+
+    incoming = []
+    for i in range(puts):
+        kind = i % 4
+        if kind == 0:  # user chat
+            incoming.append((Trigger(far, 1, f"Please respond to user chat #{i}", {"gui_mode": False}, "chat"), False))
+        elif kind == 1:  # follow-up for a known task session
+            incoming.append((Trigger(far, 5, "Perform the next best action", {"gui_mode": False}, f"task_{i % queued}"), True))
+        elif kind == 2:  # duplicate of a queued trigger
+            dup = backlog[i % queued]
+            incoming.append((Trigger(dup.fire_at, dup.priority, dup.next_action_description, dict(dup.payload), dup.session_id), False))
+        else:  # chat explicitly addressed to a task via the payload
+            incoming.append((Trigger(far, 1, f"Reply for task {i % queued}", {"task_id": f"task_{i % queued}"}, "chat"), False))
+    return backlog, incoming
+
+
+async def run_mode(label: str, queue: TriggerQueue, llm: StubLLM, queued: int, puts: int) -> None:
+    backlog, incoming = make_workload(queued, puts)
+    for trig in backlog:
+        await queue.put(trig, skip_merge=True)
+    queue.coalescer.stats.clear()
+
+    start = time.perf_counter()
+    for trig, skip_merge in incoming:
+        await queue.put(trig, skip_merge=skip_merge)
+    put_s = time.perf_counter() - start
+
+    # Make everything due, then drain.
+    for session_id in {t.session_id for t in await queue.list_triggers()}:
+        await queue.reschedule(session_id, fire_at=0.0)
+    size = await queue.size()
+    start = time.perf_counter()
+    drained = 0
+    while await queue.size():
+        await queue.get()
+        drained += 1
+    get_s = time.perf_counter() - start
+
+    rules = ", ".join(f"{k}={v}" for k, v in sorted(queue.coalescer.stats.items()))
+    print(f"[{label}]")
+    print(f"  put:  {puts / put_s:10.1f} triggers/s  ({put_s * 1000 / puts:.3f} ms each, {llm.calls} LLM calls)")
+    print(f"  get:  {drained / get_s:10.1f} triggers/s  ({size} queued, {drained} fired after merging)")
+    print(f"  rules: {rules}\n")
+
+
+async def main(queued: int, puts: int, latency_ms: float) -> None:
+    print(f"{queued} queued triggers, {puts} puts, stub LLM latency {latency_ms:.0f} ms\n")
+
+    llm = StubLLM(latency_ms / 1000.0)
+    await run_mode("deterministic coalescing", TriggerQueue(llm=llm), llm, queued, puts)
+
+    llm = StubLLM(latency_ms / 1000.0)
+    queue = TriggerQueue(llm=llm, coalescer=AlwaysAskCoalescer(), llm_fallback=True)
+    await run_mode("LLM on every put (legacy)", queue, llm, queued, puts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark TriggerQueue put/get throughput")
+    parser.add_argument("--queued", type=int, default=1000, help="Triggers already queued")
+    parser.add_argument("--puts", type=int, default=1000, help="Triggers put during the measurement")
+    parser.add_argument("--llm-latency", type=float, default=20.0, help="Stub LLM latency in ms")
+    args = parser.parse_args()
+    asyncio.run(main(args.queued, args.puts, args.llm_latency))